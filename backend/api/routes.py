@@ -647,7 +647,8 @@ def start_scrape(brand_id):
     """POST /api/brands/{brand_id}/scrape - Start scraping job
 
     Query params:
-        mode: 'full' (default) - re-scrape nav + products
+        mode: 'full' (default) - re-scrape nav + products (nav is reused
+                                 when the homepage navigation is unchanged)
               'products_only' - skip nav, re-extract products from existing urls.json
     """
     try:
@@ -699,7 +700,7 @@ def start_scrape(brand_id):
                         scraping_jobs[job_id]["current_action"] = "Stage 1: Extracting navigation..."
                         scraping_jobs[job_id]["progress"] = 10
 
-                    nav_result = extract_navigation(homepage_url)
+                    nav_result = extract_navigation(homepage_url, reuse_if_unchanged=True)
                     if not nav_result:
                         raise Exception("Navigation extraction failed")
 
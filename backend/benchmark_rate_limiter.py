@@ -0,0 +1,140 @@
+"""
+Benchmark: How evenly does the rate limiter hand out tokens under load?
+
+50 workers compete for tokens at a fixed rate, with one 429 pause in the
+middle. Compares the fair FIFO queue (AdaptiveRateLimiter) against the old
+sleep-and-poll loop (PollingRateLimiter below).
+
+Measures:
+    - Jitter: how far grant intervals drift from 1/rate
+    - Burst after pause: grants in the first 100ms after the pause ends
+    - Overtakes: grants that went to a worker who queued after another still waiting
+    - CPU time spent while waiting
+
+No network — the "request" is a short sleep.
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from stages.rate_limiter import AdaptiveRateLimiter, RateLimitState, _ts
+
+
+WAITERS = 50
+RATE = 20.0  # tokens/second
+ROUNDS = 3  # requests per waiter
+REQUEST_TIME = 0.05  # simulated request duration (s)
+PAUSE_AT = 40  # grant count at which a 429 pause hits
+PAUSE_DURATION = 1.0
+
+
+class PollingRateLimiter(AdaptiveRateLimiter):
+    """The previous _wait_for_token: lock, check, sleep, retry."""
+
+    async def _wait_for_token(self, timeout: float = 60.0):
+        while True:
+            async with self._lock:
+                if self._paused_until:
+                    wait_time = self._paused_until - time.time()
+                    if wait_time <= 0:
+                        self._paused_until = None
+                        self._state = RateLimitState.RUNNING
+                        wait_time = 0
+                else:
+                    wait_time = 0
+
+            if wait_time > 0:
+                await asyncio.sleep(min(wait_time, 5.0))
+                continue
+
+            async with self._lock:
+                now = time.time()
+                self._tokens = min(self._max_tokens, self._tokens + (now - self._last_refill) * self._rate)
+                self._last_refill = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self._total_requests += 1
+                    return
+                wait_time = (1.0 - self._tokens) / self._rate
+
+            await asyncio.sleep(min(wait_time, 5.0))
+
+
+async def run(limiter_cls) -> dict:
+    limiter = limiter_cls(initial_rate=RATE, max_rate=RATE, min_rate=RATE, burst_size=5, quiet=True)
+    limiter._ramp_interval = float("inf")  # Hold the rate fixed
+
+    grants = []  # (grant_time, request_time)
+    queue_order = []  # request_time of waiters still waiting, in arrival order
+    overtakes = 0
+    pause_end = None
+
+    async def worker():
+        nonlocal overtakes, pause_end
+        for _ in range(ROUNDS):
+            requested = time.perf_counter()
+            queue_order.append(requested)
+            async with await limiter.acquire():
+                granted = time.perf_counter()
+                if queue_order and queue_order[0] != requested:
+                    overtakes += 1
+                queue_order.remove(requested)
+                grants.append((granted, requested))
+
+                if len(grants) == PAUSE_AT:
+                    async with limiter._lock:
+                        limiter._paused_until = time.time() + PAUSE_DURATION
+                        limiter._state = RateLimitState.PAUSED
+                        limiter._tokens = min(3, limiter.burst_size)
+                        limiter._last_refill = time.time()
+                        limiter._wakeup.set()
+                    pause_end = time.perf_counter() + PAUSE_DURATION
+
+                await asyncio.sleep(REQUEST_TIME)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(WAITERS)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    times = sorted(g for g, _ in grants)
+    intervals = [b - a for a, b in zip(times, times[1:])]
+    # Ignore the pause gap itself when measuring steady-state jitter
+    steady = [i for i in intervals if i < PAUSE_DURATION / 2]
+    expected = 1.0 / RATE
+    jitter = statistics.pstdev([i - expected for i in steady]) if steady else 0.0
+    burst = sum(1 for t in times if pause_end and pause_end <= t < pause_end + 0.1)
+
+    return {
+        "grants": len(grants),
+        "wall": wall,
+        "cpu": cpu,
+        "jitter_ms": jitter * 1000,
+        "burst_after_pause": burst,
+        "overtakes": overtakes,
+        "max_wait": max(g - r for g, r in grants),
+    }
+
+
+async def main():
+    print(f"[{_ts()}] {WAITERS} waiters × {ROUNDS} requests at {RATE:.0f} tokens/s, "
+          f"{PAUSE_DURATION:.0f}s pause after {PAUSE_AT} grants\n")
+
+    results = {}
+    for name, cls in [("polling", PollingRateLimiter), ("fifo", AdaptiveRateLimiter)]:
+        results[name] = await run(cls)
+
+    print(f"{'':<10} {'wall':>7} {'cpu':>7} {'jitter':>9} {'burst':>6} {'overtakes':>10} {'max wait':>9}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['wall']:>6.2f}s {r['cpu']:>6.3f}s {r['jitter_ms']:>7.1f}ms "
+              f"{r['burst_after_pause']:>6} {r['overtakes']:>10} {r['max_wait']:>8.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
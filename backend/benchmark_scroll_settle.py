@@ -0,0 +1,193 @@
+"""
+Benchmark: How much category-scroll time do fixed sleeps waste?
+
+Serves fixture category pages from a local HTTP server and scrolls each one
+with url_extractor_async._scroll_and_extract_links, twice:
+    - fixed:  the old fixed waits (EXTRACTOR_SCROLL_SETTLE=0)
+    - settle: MutationObserver + fetch/XHR quiet detection, fixed waits as caps
+
+Fixtures replay the loading behaviour seen on real category pages
+(batch size, number of batches, API latency):
+    - static:        48 tiles server-rendered, nothing lazy
+    - infinite:      24 tiles per scroll, 8 batches, 150-450ms API latency
+    - slow_infinite: 24 tiles per scroll, 5 batches, 1200ms API latency
+    - load_more:     24 tiles per "Load More" click, 5 clicks, 300ms latency
+
+Measures wall time per category and links found - settle must find the
+same links as fixed (a lower count means it stopped waiting too early).
+"""
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).parent / "scraper"))
+sys.path.insert(0, str(Path(__file__).parent / "prod_page_v2"))
+
+import url_extractor
+from url_extractor import SETTLE_JS
+from url_extractor_async import _scroll_and_extract_links
+from browser_pool import BrowserPool
+
+
+TILES_PER_BATCH = 24
+
+# name -> (initial tiles, lazy batches, latency range (s), trigger)
+FIXTURES = {
+    "static": (48, 0, (0.0, 0.0), None),
+    "infinite": (24, 8, (0.15, 0.45), "scroll"),
+    "slow_infinite": (24, 5, (1.2, 1.2), "scroll"),
+    "load_more": (24, 5, (0.3, 0.3), "button"),
+}
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><style>
+  .tile {{ height: 420px; width: 300px; display: inline-block; margin: 8px; }}
+  footer {{ height: 600px; }}
+</style></head>
+<body>
+  <main class="product-grid" id="grid">{tiles}</main>
+  {button}
+  <footer><a href="/about">About</a> <a href="/contact">Contact</a></footer>
+  <script>
+    const fixture = "{name}", batches = {batches}, trigger = "{trigger}";
+    let loaded = 0, loading = false;
+    async function loadBatch() {{
+      if (loading || loaded >= batches) return;
+      loading = true;
+      const res = await fetch(`/api/${{fixture}}?batch=${{loaded + 1}}`);
+      const tiles = await res.json();
+      const grid = document.getElementById('grid');
+      for (const t of tiles) {{
+        const div = document.createElement('div');
+        div.className = 'tile product-card';
+        div.innerHTML = `<a class="product-link" href="${{t.url}}">${{t.name}}</a>`;
+        grid.appendChild(div);
+      }}
+      loaded++;
+      loading = false;
+      if (loaded >= batches) document.getElementById('more')?.remove();
+    }}
+    if (trigger === 'scroll') {{
+      window.addEventListener('scroll', () => {{
+        if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 800) loadBatch();
+      }});
+    }}
+    document.getElementById('more')?.addEventListener('click', loadBatch);
+  </script>
+</body></html>
+"""
+
+
+def _tiles(fixture: str, start: int, count: int) -> list:
+    return [{"url": f"/products/{fixture}-{i}", "name": f"Product {i}"} for i in range(start, start + count)]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: str, content_type: str):
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "collections" and parts[1] in FIXTURES:
+            name = parts[1]
+            initial, batches, _, trigger = FIXTURES[name]
+            tiles = "".join(
+                f'<div class="tile product-card"><a class="product-link" href="{t["url"]}">{t["name"]}</a></div>'
+                for t in _tiles(name, 0, initial)
+            )
+            button = '<button id="more" class="load-more-button">Load More</button>' if trigger == "button" else ""
+            self._send(PAGE_TEMPLATE.format(tiles=tiles, button=button, name=name,
+                                            batches=batches, trigger=trigger or ""), "text/html")
+        elif len(parts) == 2 and parts[0] == "api" and parts[1] in FIXTURES:
+            name = parts[1]
+            initial, _, (low, high), _ = FIXTURES[name]
+            batch = int(parse_qs(parsed.query).get("batch", ["1"])[0])
+            time.sleep(random.uniform(low, high))
+            start = initial + (batch - 1) * TILES_PER_BATCH
+            self._send(json.dumps(_tiles(name, start, TILES_PER_BATCH)), "application/json")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+class FixtureBrand:
+    """Just the load-more state _scroll_and_extract_links reads and writes."""
+
+    def __init__(self):
+        self.load_more_detected = None
+        self.load_more_button_selector = None
+        self.load_more_loading_mechanism = False
+        self.pagination_pattern = None
+        self.popup_playbook = None
+
+    def save_load_more_info(self, selector: str, modal_bypasses: dict):
+        self.load_more_detected = True
+        self.load_more_button_selector = selector
+        self.load_more_loading_mechanism = True
+
+    def mark_no_load_more(self):
+        self.load_more_detected = False
+
+
+async def scroll_fixture(pool: BrowserPool, base_url: str, name: str, settle: bool) -> dict:
+    url_extractor.SCROLL_SETTLE = settle
+    start = time.perf_counter()
+    result = await _scroll_and_extract_links(
+        pool.acquire, f"{base_url}/collections/{name}", FixtureBrand(), skip_pagination_detection=True
+    )
+    wall = time.perf_counter() - start
+    products = {link["url"] for link in result["links"] if "/products/" in link["url"]}
+    info = result["discovery_info"]
+    return {
+        "wall": wall,
+        "products": len(products),
+        "waited": info.get("settle_wait_ms", 0) / 1000,
+        "budget": info.get("settle_budget_ms", 0) / 1000,
+    }
+
+
+async def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    pool = BrowserPool(size=1, init_scripts=[SETTLE_JS])
+    await pool.start()
+    try:
+        print(f"\n{'fixture':<15} {'mode':<7} {'wall':>7} {'waited':>8} {'cap':>7} {'products':>9}")
+        totals = {"fixed": 0.0, "settle": 0.0}
+        for name, (initial, batches, _, _) in FIXTURES.items():
+            expected = initial + batches * TILES_PER_BATCH
+            for mode in ("fixed", "settle"):
+                r = await scroll_fixture(pool, base_url, name, settle=(mode == "settle"))
+                totals[mode] += r["wall"]
+                missing = "" if r["products"] == expected else f"  (expected {expected})"
+                print(f"{name:<15} {mode:<7} {r['wall']:>6.1f}s {r['waited']:>7.1f}s {r['budget']:>6.1f}s "
+                      f"{r['products']:>9}{missing}")
+
+        saved = totals["fixed"] - totals["settle"]
+        print(f"\nTotal: fixed {totals['fixed']:.1f}s, settle {totals['settle']:.1f}s "
+              f"→ {saved:.1f}s saved ({saved / len(FIXTURES):.1f}s per category)")
+    finally:
+        await pool.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
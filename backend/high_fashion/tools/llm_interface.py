@@ -16,6 +16,24 @@ env_path = os.path.join(project_root, 'config', '.env')
 load_dotenv(env_path)
 
 
+def _get_llm_cache():
+    """Pipeline LLM response cache, or None outside the backend (or when disabled)."""
+    try:
+        from scraper.llm_cache import get_llm_cache
+    except ImportError:
+        return None
+    return get_llm_cache()
+
+
+def _record_cache(hit: bool, usage: Optional[Dict[str, int]] = None):
+    """Count a cache lookup in the pipeline's LLMUsageTracker (no-op outside the backend)."""
+    try:
+        from scraper.llm_handler import LLMUsageTracker
+    except ImportError:
+        return
+    LLMUsageTracker.record_cache("generate", hit=hit, **(usage or {}))
+
+
 class LLMInterface(ABC):
     """Abstract base class for LLM providers"""
 
@@ -44,7 +62,33 @@ class ClaudeInterface(LLMInterface):
         except ImportError:
             raise ImportError("anthropic package not installed. Run: pip install anthropic")
     
-    def generate(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.0, response_model=None, debug: bool = False) -> str:
+    def generate(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.0, response_model=None,
+                 debug: bool = False, cache: bool = True) -> str:
+        """
+        Generate a response - structured (dict) when response_model is given.
+
+        Identical requests are answered from the on-disk LLM cache
+        (scraper/llm_cache.py) unless cache=False.
+        """
+        store = _get_llm_cache() if cache else None
+        if store is None:
+            return self._generate(prompt, max_tokens, temperature, response_model, debug)
+
+        from scraper.llm_cache import make_key
+        schema = response_model.model_json_schema() if response_model else None
+        key = make_key(self.model, prompt, max_tokens, schema=schema, temperature=temperature)
+        entry = store.get(key, "generate")
+        _record_cache(hit=entry is not None, usage=entry["usage"] if entry else None)
+        if entry is not None:
+            self._last_usage = {'input_tokens': 0, 'output_tokens': 0}
+            return entry["value"]["response"]
+
+        response = self._generate(prompt, max_tokens, temperature, response_model, debug)
+        if response:
+            store.put(key, "generate", {"response": response}, self._last_usage)
+        return response
+
+    def _generate(self, prompt: str, max_tokens: int, temperature: float, response_model, debug: bool):
         if response_model:
             # Use structured output with tools
             schema = response_model.model_json_schema()
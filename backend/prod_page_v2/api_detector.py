@@ -89,15 +89,45 @@ def looks_like_api_url(url: str) -> bool:
     return any(re.search(pattern, url, re.IGNORECASE) for pattern in API_URL_PATTERNS)
 
 
-def find_product_fields(obj, prefix="", found=None) -> list:
-    """Recursively find product-related fields in a JSON object."""
+# Traversal budgets for find_product_fields (CMS payloads can hold 100k+ nodes)
+MAX_FIELD_SCAN_NODES = 5000
+MAX_FIELD_SCAN_DEPTH = 3
+
+# A dict with one of these plus a PRODUCT_SHAPE_KEYS key is the product itself
+PRODUCT_NAME_KEYS = {'name', 'title', 'productname', 'product_name'}
+PRODUCT_SHAPE_KEYS = {'price', 'listprice', 'saleprice', 'variants', 'sizes', 'images'}
+
+
+def find_product_fields(obj, prefix="", found=None, max_nodes=MAX_FIELD_SCAN_NODES,
+                        max_depth=MAX_FIELD_SCAN_DEPTH) -> list:
+    """
+    Find product-related fields in a JSON object.
+
+    Depth-first walk bounded by max_nodes keys and max_depth levels (only the
+    first item of arrays is visited). Once a product-shaped object has been
+    scanned, remaining sibling branches are skipped.
+    """
     if found is None:
         found = []
 
+    budget = [max_nodes]
+    _scan_fields(obj, prefix, found, budget, max_depth)
+    return found
+
+
+def _scan_fields(obj, prefix, found, budget, depth) -> bool:
+    """Recursive worker for find_product_fields. Returns True to stop the walk."""
     if isinstance(obj, dict):
+        keys = {k.lower() for k in obj if isinstance(k, str)}
+        product_shaped = bool(keys & PRODUCT_NAME_KEYS) and bool(keys & PRODUCT_SHAPE_KEYS)
+
         for key, value in obj.items():
+            if budget[0] <= 0:
+                return True
+            budget[0] -= 1
+
             full_key = f"{prefix}.{key}" if prefix else key
-            key_lower = key.lower()
+            key_lower = str(key).lower()
 
             # Check if key matches product patterns
             for pattern in PRODUCT_FIELD_PATTERNS:
@@ -106,14 +136,17 @@ def find_product_fields(obj, prefix="", found=None) -> list:
                     break
 
             # Recurse into nested objects (limit depth)
-            if prefix.count('.') < 3:
-                find_product_fields(value, full_key, found)
+            if depth > 0 and isinstance(value, (dict, list)):
+                if _scan_fields(value, full_key, found, budget, depth - 1):
+                    return True
+
+        return product_shaped
 
     elif isinstance(obj, list) and obj:
         # Check first item of arrays
-        find_product_fields(obj[0], f"{prefix}[0]", found)
+        return _scan_fields(obj[0], f"{prefix}[0]", found, budget, depth)
 
-    return found
+    return False
 
 
 def extract_product_id_from_url(page_url: str) -> Optional[str]:
@@ -59,6 +59,11 @@ from contextlib import asynccontextmanager
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
 
+import sys
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+
+from page_loader import GALLERY_JS
+
 
 @dataclass
 class BrowserInstance:
@@ -114,17 +119,25 @@ class BrowserPool:
         size: Number of browser instances in pool (default: 10)
         pages_per_recycle: Restart browser after this many pages (default: 50)
         headless: Run browsers in headless mode (default: True)
+        init_scripts: Scripts added to every context (default: the gallery
+            extractor; stage 2 passes [] since it never reads galleries)
+        playbook: Optional PopupPlaybook installed on every context (hide
+            rules + consent cookies, so the site's known popups never render)
     """
 
     def __init__(
         self,
         size: int = 10,
         pages_per_recycle: int = 50,
-        headless: bool = True
+        headless: bool = True,
+        init_scripts: Optional[List[str]] = None,
+        playbook=None
     ):
         self.size = size
         self.pages_per_recycle = pages_per_recycle
         self.headless = headless
+        self.init_scripts = [GALLERY_JS] if init_scripts is None else list(init_scripts)
+        self.playbook = playbook
 
         # State
         self._playwright: Optional[Playwright] = None
@@ -132,6 +145,10 @@ class BrowserPool:
         self._available: asyncio.Queue = asyncio.Queue()  # Queue of available browser IDs
         self._lock = asyncio.Lock()  # Protects state modifications
 
+        # Resizing
+        self._next_id = size  # IDs for browsers added by resize()
+        self._retiring = 0  # Browsers to close as they come back (pool shrinking)
+
         # Stats (for monitoring)
         self._total_pages_served = 0
         self._total_recycles = 0
@@ -206,6 +223,15 @@ class BrowserPool:
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         )
 
+        # Gallery extractor runs in every page of this context, so
+        # extract_gallery_images() is a single evaluate() per product
+        for script in self.init_scripts:
+            await context.add_init_script(script)
+
+        # Recycled browsers pick up popups learned since the pool started
+        if self.playbook:
+            await self.playbook.install(context)
+
         return BrowserInstance(
             browser=browser,
             context=context,
@@ -298,6 +324,13 @@ class BrowserPool:
             instance.pages_served += 1
             self._total_pages_served += 1
 
+            # Pool is shrinking: close this browser instead of returning it
+            if self._retiring > 0:
+                self._retiring -= 1
+                del self._browsers[browser_id]
+                await instance.close()
+                return
+
             # Check if browser needs recycling
             if instance.pages_served >= self.pages_per_recycle:
                 # Recycle: close old browser, create new one
@@ -317,6 +350,51 @@ class BrowserPool:
         # This wakes up any callers waiting in acquire()
         await self._available.put(browser_id)
 
+    async def resize(self, size: int):
+        """
+        Grow or shrink the pool to `size` browsers.
+
+        Growing launches new browsers right away; browsers that fail to
+        launch are logged and left out (the pool ends up smaller, never
+        broken). Shrinking closes idle browsers now and busy ones when they
+        are released, so in-flight extractions are never interrupted.
+        """
+        size = max(1, size)
+        if not self._started or size == self.size:
+            return
+
+        if size > self.size:
+            async with self._lock:
+                # Cancel pending retirements first - those browsers are still alive
+                reuse = min(self._retiring, size - self.size)
+                self._retiring -= reuse
+                new_ids = list(range(self._next_id, self._next_id + size - self.size - reuse))
+                self._next_id += len(new_ids)
+                self.size = size
+
+            results = await asyncio.gather(*(self._create_browser(i) for i in new_ids), return_exceptions=True)
+            failed = [r for r in results if isinstance(r, BaseException)]
+            for browser in results:
+                if not isinstance(browser, BaseException):
+                    self._browsers[browser.id] = browser
+                    await self._available.put(browser.id)
+            if failed:
+                async with self._lock:
+                    self.size -= len(failed)
+                print(f"[BrowserPool] {len(failed)}/{len(new_ids)} browsers failed to launch "
+                      f"(pool at {self.size}): {failed[0]}")
+            return
+
+        async with self._lock:
+            self._retiring += self.size - size
+            self.size = size
+            # Close idle browsers immediately
+            while self._retiring > 0 and not self._available.empty():
+                browser_id = self._available.get_nowait()
+                instance = self._browsers.pop(browser_id)
+                self._retiring -= 1
+                await instance.close()
+
     async def shutdown(self):
         """
         Gracefully shut down the pool.
@@ -26,6 +26,11 @@ from page_loader import load_page
 # Fields we track for merge strategy (images handled separately by gallery pipeline)
 TRACKED_FIELDS = ['name', 'price', 'currency', 'description', 'variants', 'brand', 'sku', 'category']
 
+# Verification samples: up to VERIFY_SAMPLE_SIZE URLs after the discovery URL,
+# loaded VERIFY_CONCURRENCY at a time so wall-clock stays close to a single load
+VERIFY_SAMPLE_SIZE = 5
+VERIFY_CONCURRENCY = 3
+
 
 @dataclass
 class StrategyContribution:
@@ -107,10 +112,10 @@ class ProductExtractor:
     Usage:
         extractor = ProductExtractor()
 
-        # Discovery + verification on first 2 products
+        # Discovery on the first product, verification on up to 5 more
         config = await extractor.discover_and_verify(
             domain="khaite.com",
-            product_urls=["url1", "url2"]
+            product_urls=["url1", "url2", "url3"]
         )
 
         # Extract remaining products
@@ -607,61 +612,140 @@ class ProductExtractor:
     async def verify(
         self,
         contributions: List[StrategyContribution],
-        url: str
-    ) -> Tuple[bool, List[ExtractionResult]]:
+        urls,
+    ) -> Tuple[bool, List[List[ExtractionResult]]]:
         """
-        Verification phase: Confirm strategies work on second product.
+        Verification phase: Confirm strategies work on other products.
+
+        Pages are loaded concurrently (VERIFY_CONCURRENCY at a time). A strategy
+        is verified for the fields it still provides on at least half of the
+        pages that loaded.
+
+        Args:
+            contributions: Strategy contributions from discovery
+            urls: One verification URL or a list of them
 
         Returns:
-            (verified, results)
+            (verified, page_results) - the strategies' results, per page that loaded
         """
-        active_strategies = [c.strategy for c in contributions if c.fields]
+        if isinstance(urls, str):
+            urls = [urls]
+
+        active_strategies = {c.strategy for c in contributions if c.fields}
 
         if not active_strategies:
             print("  No strategies to verify")
             return False, []
 
-        print(f"\n[VERIFY] Testing {len(active_strategies)} strategies on: {url}")
+        print(f"\n[VERIFY] Testing {len(active_strategies)} strategies on {len(urls)} URLs")
 
-        page_data = await load_page(url, stealth=self.use_stealth)
-        results = []
+        semaphore = asyncio.Semaphore(VERIFY_CONCURRENCY)
+
+        async def verify_url(url: str) -> List[ExtractionResult]:
+            async with semaphore:
+                page_data = await load_page(url, stealth=self.use_stealth)
+            tasks = [s.extract(url, page_data) for s in self.strategies if s.strategy_type in active_strategies]
+            return list(await asyncio.gather(*tasks))
+
+        per_url = await asyncio.gather(*(verify_url(u) for u in urls), return_exceptions=True)
+
+        page_results = []
+        for url, outcome in zip(urls, per_url):
+            if isinstance(outcome, Exception):
+                print(f"  ✗ {url[:60]}: {outcome}")
+                continue
+            page_results.append(outcome)
+
+        if not page_results:
+            return False, page_results
+
+        quorum = (len(page_results) + 1) // 2
         verified_contributions = []
 
         for contribution in contributions:
             if not contribution.fields:
                 continue
 
-            # Find and run the strategy
-            for s in self.strategies:
-                if s.strategy_type == contribution.strategy:
-                    result = await s.extract(url, page_data)
-                    results.append(result)
-
-                    if result.success and result.product:
-                        fields = self._get_contributed_fields(result.product)
-                        # Check if it still provides the same fields
-                        common_fields = fields & contribution.fields
-                        if common_fields:
-                            print(f"  ✓ {contribution.strategy.value}: {', '.join(sorted(common_fields))}")
-                            verified_contributions.append(StrategyContribution(
-                                strategy=contribution.strategy,
-                                fields=common_fields,
-                                score=result.score
-                            ))
-                        else:
-                            print(f"  ⚠ {contribution.strategy.value}: different fields (was: {contribution.fields}, now: {fields})")
-                    else:
-                        print(f"  ✗ {contribution.strategy.value}: failed")
-                    break
+            field_hits: Dict[str, int] = {}
+            best_score = 0
+            for outcome in page_results:
+                for result in outcome:
+                    if result.strategy != contribution.strategy or not (result.success and result.product):
+                        continue
+                    for f in self._get_contributed_fields(result.product) & contribution.fields:
+                        field_hits[f] = field_hits.get(f, 0) + 1
+                    best_score = max(best_score, result.score)
+
+            common_fields = {f for f, hits in field_hits.items() if hits >= quorum}
+            if common_fields:
+                min_hits = min(field_hits[f] for f in common_fields)
+                print(f"  ✓ {contribution.strategy.value}: {', '.join(sorted(common_fields))} ({min_hits}/{len(page_results)} pages)")
+                verified_contributions.append(StrategyContribution(
+                    strategy=contribution.strategy,
+                    fields=common_fields,
+                    score=best_score
+                ))
+            elif field_hits:
+                print(f"  ⚠ {contribution.strategy.value}: below quorum {field_hits} (need {quorum}/{len(page_results)})")
+            else:
+                print(f"  ✗ {contribution.strategy.value}: failed")
 
         if verified_contributions:
-            merged = self._merge_products(results, url)
+            merged = self._merge_products(page_results[0], urls[0])
             merged_fields = self._get_contributed_fields(merged)
-            print(f"\n  ✓ Verified {len(verified_contributions)} strategies")
-            print(f"    Merged fields: {', '.join(sorted(merged_fields))}")
-            return True, results
+            print(f"\n  ✓ Verified {len(verified_contributions)} strategies on {len(page_results)} pages")
+            print(f"    Merged fields (first page): {', '.join(sorted(merged_fields))}")
+            return True, page_results
+
+        return False, page_results
+
+    def _reconcile_field_sources(
+        self,
+        field_sources: Dict[str, str],
+        page_results: List[List[ExtractionResult]],
+        contributions: List[StrategyContribution],
+    ) -> Dict[str, str]:
+        """
+        Re-check ground-truth field sources against the verification pages.
+
+        A field keeps its validated source unless that source falls below
+        quorum on the verification pages. Only then does it switch, to the
+        cheapest strategy that provided the field during discovery, meets
+        quorum, and agrees with the validated source's value on every page
+        where both produced one (at least one such page).
+        """
+        quorum = (len(page_results) + 1) // 2
+        discovered = {c.strategy.value: c.fields for c in contributions}
+        pages = [
+            {r.strategy.value: r.product for r in outcome if r.success and r.product}
+            for outcome in page_results
+        ]
+
+        def has(product: Optional[Product], field_name: str) -> bool:
+            return product is not None and field_name in self._get_contributed_fields(product)
+
+        reconciled = dict(field_sources)
+        for field_name, strat_val in field_sources.items():
+            current = sum(has(page.get(strat_val), field_name) for page in pages)
+            if current >= quorum:
+                continue
+
+            for strat in self.STRATEGY_COST_ORDER:
+                if strat.value == strat_val or field_name not in discovered.get(strat.value, set()):
+                    continue
+                hits = sum(has(page.get(strat.value), field_name) for page in pages)
+                if hits < quorum:
+                    continue
+                shared = [page for page in pages
+                          if has(page.get(strat.value), field_name) and has(page.get(strat_val), field_name)]
+                if shared and all(self._validate_field(field_name, page[strat.value], page[strat_val])
+                                  for page in shared):
+                    print(f"    Field source {field_name}: {strat_val} ({current} pages) → "
+                          f"{strat.value} ({hits} pages, agrees on {len(shared)})")
+                    reconciled[field_name] = strat.value
+                    break
 
-        return False, results
+        return reconciled
 
     async def discover_and_verify(
         self,
@@ -673,7 +757,9 @@ class ProductExtractor:
 
         Args:
             domain: Brand domain (e.g., "khaite.com")
-            product_urls: List of product URLs (need at least 2)
+            product_urls: List of product URLs (need at least 2). The first is
+                used for discovery; up to VERIFY_SAMPLE_SIZE of the rest are
+                verified concurrently.
 
         Returns:
             MultiStrategyConfig if successful, None if failed
@@ -698,12 +784,16 @@ class ProductExtractor:
         print(f"VERIFICATION PHASE - {domain}")
         print('='*60)
 
-        verified, verify_results = await self.verify(contributions, product_urls[1])
+        verify_urls = product_urls[1:1 + VERIFY_SAMPLE_SIZE]
+        verified, verify_pages = await self.verify(contributions, verify_urls)
 
         if not verified:
             print(f"\n❌ Verification failed for {domain}")
             return None
 
+        if field_sources and len(verify_urls) > 1:
+            field_sources = self._reconcile_field_sources(field_sources, verify_pages, contributions)
+
         # Phase 3: Gallery discovery
         print(f"\n{'='*60}")
         print(f"GALLERY DISCOVERY - {domain}")
@@ -848,6 +938,8 @@ class ProductExtractor:
                 error=f"Page load failed (status={page_data.status_code})",
                 strategy=ExtractionStrategy.SHOPIFY_JSON,
                 status_code=page_data.status_code,
+                latency=page_data.response_time,
+                headers=page_data.response_headers,
             )
 
         import asyncio as _asyncio
@@ -905,6 +997,8 @@ class ProductExtractor:
                 strategy=ExtractionStrategy.SHOPIFY_JSON,  # placeholder
                 score=merged_product.completeness_score(),
                 status_code=page_data.status_code,
+                latency=page_data.response_time,
+                headers=page_data.response_headers,
             )
 
         reason = "No product name" if not has_real_name else "Name only, no price/images/description"
@@ -913,6 +1007,8 @@ class ProductExtractor:
             error=reason,
             strategy=ExtractionStrategy.SHOPIFY_JSON,
             status_code=page_data.status_code,
+            latency=page_data.response_time,
+            headers=page_data.response_headers,
         )
 
     async def calibrate_wait_time(
@@ -1220,7 +1316,7 @@ Return JSON with:
             product_image_indices: List[int] = Field(description="List of image indices that are product images")
             reasoning: str = Field(description="Explanation of pattern used")
 
-        result = llm.call(
+        result = await llm.acall(
             prompt=prompt,
             expected_format="json",
             response_model=ImageSelection,
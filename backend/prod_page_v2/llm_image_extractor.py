@@ -157,7 +157,7 @@ async def extract_product_images_with_llm(
 
     # Call LLM using existing handler
     handler = LLMHandler()
-    result = handler.call_text(prompt, max_tokens=1024, operation="product_image_extraction")
+    result = await handler.acall_text(prompt, max_tokens=1024, operation="product_image_extraction")
 
     if not result.get("success"):
         return {
@@ -62,6 +62,8 @@ class PageData:
     loaded: bool = True  # False if page failed to load or is an error page
     status_code: int = 0  # HTTP status from navigation response
     waf_detected: bool = False  # True if WAF/bot challenge was detected
+    response_time: float = 0.0  # Seconds from navigation start to the HTTP response
+    response_headers: Dict[str, str] = field(default_factory=dict)  # Rate-limit headers (Retry-After, X-RateLimit-*, CF)
 
 
 class ExtractionStrategy(Enum):
@@ -184,6 +186,8 @@ class ExtractionResult:
     error: Optional[str] = None
     score: int = 0  # completeness score
     status_code: int = 0  # HTTP status from page load
+    latency: float = 0.0  # Page response time (s), for the rate limiter's congestion control
+    headers: Dict[str, str] = field(default_factory=dict)  # Rate-limit headers from the page response
 
     @classmethod
     def failure(cls, strategy: ExtractionStrategy, error: str) -> 'ExtractionResult':
@@ -33,6 +33,9 @@ IGNORE_DOMAINS = [
     'doubleclick', 'criteo', 'onetrust', 'cookielaw',
 ]
 
+# Response headers the rate limiter understands (lowercase prefixes)
+RATE_LIMIT_HEADER_PREFIXES = ('retry-after', 'x-ratelimit-', 'x-rate-limit-', 'ratelimit-', 'cf-')
+
 # WAF/bot challenge detection threshold and markers
 WAF_MAX_LENGTH = 5000  # Real product pages are much larger than this
 
@@ -338,10 +341,15 @@ async def load_page_on_existing(
         t0 = _time.monotonic()
         response = await page.goto(url, wait_until='domcontentloaded', timeout=30000)
         t_goto = _time.monotonic()
+        page_data.response_time = t_goto - t0
 
-        # Capture HTTP status
+        # Capture HTTP status and rate-limit headers
         if response:
             page_data.status_code = response.status
+            page_data.response_headers = {
+                k: v for k, v in response.headers.items()
+                if k.lower().startswith(RATE_LIMIT_HEADER_PREFIXES)
+            }
             if response.status >= 400:
                 page_data.loaded = False
                 print(f"[PageLoader] HTTP {response.status} for {url}")
@@ -427,6 +435,194 @@ async def load_page_on_existing(
     return page_data
 
 
+
+
+# =============================================================================
+# GALLERY EXTRACTION (single round trip)
+# =============================================================================
+# The whole gallery pipeline runs inside the page:
+#   select → pick URL attribute / best srcset entry → cluster by DOM ancestry
+#   → pick primary cluster → unwrap /_next/image → strip size params → dedupe
+#
+# GALLERY_JS defines window.__galleryExtract(plan). BrowserPool registers it
+# on each context with add_init_script, so every pooled page already has it
+# and extract_gallery_images() is one page.evaluate() call. Pages that didn't
+# get the init script (standalone browsers, test scripts) have it injected on
+# first use.
+#
+# The plan (selector, URL attribute, ancestry depth) is compiled from the
+# per-domain gallery config once and cached.
+# =============================================================================
+
+GALLERY_JS = r"""
+window.__galleryExtract = (plan) => {
+    const SIZE_KEYS = new Set(['width', 'height', 'w', 'h', 'size', 'sw', 'sh', 'resize',
+                               'crop', 'fit', 'quality', 'q', 'format', 'auto']);
+
+    // URL attributes must be absolute - a relative src is usually a lazy-load placeholder
+    const absolute = (val) => {
+        if (!val) return null;
+        if (val.startsWith('//')) return 'https:' + val;
+        return val.startsWith('http') ? val : null;
+    };
+
+    // srcset candidates are often relative (Next.js "/_next/image?url=...&w=1080"):
+    // resolve them against the page, then keep only http(s) URLs
+    const resolve = (val) => {
+        if (!val) return null;
+        try {
+            const url = new URL(val, document.baseURI).href;
+            return /^https?:/.test(url) ? url : null;
+        } catch (e) {
+            return null;
+        }
+    };
+
+    const bestFromSrcset = (srcset) => {
+        let bestUrl = null;
+        let bestWidth = 0;
+        for (const part of srcset.split(',')) {
+            const pieces = part.trim().split(/\s+/);
+            if (pieces.length >= 2) {
+                const w = parseInt(pieces[1]);
+                if (w > bestWidth) {
+                    bestWidth = w;
+                    bestUrl = pieces[0];
+                }
+            } else if (pieces[0]) {
+                bestUrl = bestUrl || pieces[0];
+            }
+        }
+        return resolve(bestUrl);
+    };
+
+    const fullResolution = (url) => {
+        try {
+            let parsed = new URL(url);
+            // Unwrap Next.js /_next/image?url=... wrapper
+            if (parsed.pathname.includes('/_next/image') && parsed.searchParams.get('url')) {
+                let inner = parsed.searchParams.get('url');
+                try { inner = decodeURIComponent(inner); } catch (e) {}
+                parsed = new URL(inner, parsed.origin);
+                url = parsed.href;
+            }
+            // Drop size-related query params, keep others (like v=timestamp)
+            if (parsed.search) {
+                for (const key of Array.from(parsed.searchParams.keys())) {
+                    if (SIZE_KEYS.has(key.toLowerCase())) parsed.searchParams.delete(key);
+                }
+                url = parsed.toString();
+            }
+        } catch (e) {}
+        // Inline size patterns: _140x140, _20x_crop_center, ...
+        url = url.replace(/_\d{1,4}x\d{0,4}(?:_crop_center)?(?=\.\w{3,4})/g, '');
+        // CDN path-based size variants → largest (/r/s/123.jpg → /r/b/123.jpg)
+        return url.replace(/\/r\/[sgtm]\//g, '/r/b/');
+    };
+
+    const attrs = [plan.urlAttr, 'src', 'data-src', 'data-zoom', 'data-large', 'data-high-res'];
+    const clusters = new Map();  // ancestry -> [{url, domIndex}]
+    const elements = document.querySelectorAll(plan.selector);
+
+    for (let i = 0; i < elements.length; i++) {
+        const el = elements[i];
+
+        let url = null;
+        for (const attr of attrs) {
+            url = absolute(el.getAttribute(attr));
+            if (url) break;
+        }
+        if (!url) {
+            const srcset = el.getAttribute('srcset');
+            if (srcset) url = bestFromSrcset(srcset);
+        }
+        if (!url) continue;
+
+        // Ancestry path: walk up N levels and capture tag.class signatures
+        const ancestry = [];
+        let node = el.parentElement;
+        for (let j = 0; j < plan.depth && node && node !== document.body; j++) {
+            const cls = (node.className && typeof node.className === 'string')
+                ? '.' + node.className.trim().split(/\s+/).slice(0, 2).join('.')
+                : '';
+            ancestry.push(node.tagName.toLowerCase() + cls);
+            node = node.parentElement;
+        }
+        const key = ancestry.join(' > ');
+        if (!clusters.has(key)) clusters.set(key, []);
+        clusters.get(key).push({url: url, domIndex: i});
+    }
+
+    // Primary cluster: the largest (product galleries have the most images),
+    // earliest in the DOM on ties. Map preserves first-seen order.
+    let primary = null;
+    let primaryKey = null;
+    for (const [key, imgs] of clusters) {
+        if (!primary || imgs.length > primary.length) {
+            primary = imgs;
+            primaryKey = key;
+        }
+    }
+
+    const seen = new Set();
+    const urls = [];
+    for (const img of primary || []) {
+        const clean = fullResolution(img.url);
+        const identity = clean.split('?')[0].split('/').pop();  // filename as identity
+        if (!seen.has(identity)) {
+            seen.add(identity);
+            urls.push(clean);
+        }
+    }
+
+    return {
+        urls: urls,
+        clusters: Array.from(clusters, ([key, imgs]) => [key, imgs.length, key === primaryKey]),
+    };
+};
+"""
+
+# Compiled gallery plans, keyed by the config they came from
+_GALLERY_PLANS: Dict[str, Optional[Dict[str, Any]]] = {}
+
+
+def compile_gallery_plan(gallery_config, ancestry_depth: int = 4) -> Optional[Dict[str, Any]]:
+    """
+    Turn a gallery config into the plan GALLERY_JS runs (cached per config).
+
+    Returns None if the config has no usable selector.
+    """
+    cache_key = json.dumps([gallery_config, ancestry_depth], sort_keys=True)
+    if cache_key in _GALLERY_PLANS:
+        return _GALLERY_PLANS[cache_key]
+
+    if isinstance(gallery_config, dict):
+        # New format: multiple selectors
+        image_selectors = gallery_config.get("image_selectors", [])
+        # Legacy format: single selector
+        if not image_selectors:
+            single = gallery_config.get("image_selector", "")
+            if single:
+                image_selectors = [single]
+        url_attribute = gallery_config.get("url_attribute", "src")
+        container_selector = gallery_config.get("container_selector", "")
+
+        if image_selectors:
+            selector = ", ".join(image_selectors)
+        elif container_selector:
+            selector = f"{container_selector} img, {container_selector} source"
+        else:
+            selector = None
+    else:
+        # Legacy string format — treat as container selector
+        url_attribute = "src"
+        selector = f"{gallery_config} img, {gallery_config} source" if gallery_config else None
+
+    plan = {"selector": selector, "urlAttr": url_attribute, "depth": ancestry_depth} if selector else None
+    _GALLERY_PLANS[cache_key] = plan
+    return plan
+
+
 async def extract_gallery_images(page, gallery_config, ancestry_depth: int = 4) -> List[str]:
     """
     Extract product images from the gallery using DOM ancestry-based clustering.
@@ -436,6 +632,9 @@ async def extract_gallery_images(page, gallery_config, ancestry_depth: int = 4)
     related products, and other non-product images that live in different
     parts of the DOM tree.
 
+    Runs entirely in the page (GALLERY_JS) and returns the deduped,
+    full-resolution URL list in one round trip.
+
     Args:
         page: Playwright Page object (already loaded)
         gallery_config: Either a config dict with keys:
@@ -448,220 +647,31 @@ async def extract_gallery_images(page, gallery_config, ancestry_depth: int = 4)
     Returns:
         List of full-resolution image URLs from the primary product cluster
     """
-    try:
-        # Normalize config format
-        if isinstance(gallery_config, dict):
-            # New format: multiple selectors
-            image_selectors = gallery_config.get("image_selectors", [])
-            # Legacy format: single selector
-            if not image_selectors:
-                single = gallery_config.get("image_selector", "")
-                if single:
-                    image_selectors = [single]
-            url_attribute = gallery_config.get("url_attribute", "src")
-            container_selector = gallery_config.get("container_selector", "")
-
-            # Build combined selector
-            if image_selectors:
-                selector = ", ".join(image_selectors)
-            elif container_selector:
-                selector = f"{container_selector} img, {container_selector} source"
-            else:
-                return []
-        else:
-            # Legacy string format — treat as container selector
-            url_attribute = "src"
-            selector = f"{gallery_config} img, {gallery_config} source"
-
-        # Extract images WITH their ancestry paths using JavaScript
-        # This lets us cluster images by their DOM position
-        images_with_ancestry = await page.evaluate(f"""(config) => {{
-            const selector = config.selector;
-            const urlAttr = config.urlAttr;
-            const depth = config.depth;
-
-            const elements = document.querySelectorAll(selector);
-            const results = [];
-
-            for (let i = 0; i < elements.length; i++) {{
-                const el = elements[i];
-
-                // Get the image URL from various attributes
-                let url = null;
-                const attrs = [urlAttr, 'src', 'data-src', 'data-zoom', 'data-large', 'data-high-res'];
-                for (const attr of attrs) {{
-                    const val = el.getAttribute(attr);
-                    if (val && (val.startsWith('http') || val.startsWith('//'))) {{
-                        url = val.startsWith('//') ? 'https:' + val : val;
-                        break;
-                    }}
-                }}
-
-                // Try srcset if no URL yet
-                if (!url) {{
-                    const srcset = el.getAttribute('srcset');
-                    if (srcset) {{
-                        // Get largest from srcset
-                        let bestUrl = null;
-                        let bestWidth = 0;
-                        for (const part of srcset.split(',')) {{
-                            const pieces = part.trim().split(/\\s+/);
-                            if (pieces.length >= 2) {{
-                                const w = parseInt(pieces[1]);
-                                if (w > bestWidth) {{
-                                    bestWidth = w;
-                                    bestUrl = pieces[0];
-                                }}
-                            }} else if (pieces[0] && pieces[0].startsWith('http')) {{
-                                bestUrl = bestUrl || pieces[0];
-                            }}
-                        }}
-                        url = bestUrl;
-                    }}
-                }}
-
-                if (!url) continue;
-
-                // Build ancestry path: walk up N levels and capture tag.class signatures
-                const ancestry = [];
-                let node = el.parentElement;
-                for (let j = 0; j < depth && node && node !== document.body; j++) {{
-                    const tag = node.tagName.toLowerCase();
-                    const cls = (node.className && typeof node.className === 'string')
-                        ? '.' + node.className.trim().split(/\\s+/).slice(0, 2).join('.')
-                        : '';
-                    ancestry.push(tag + cls);
-                    node = node.parentElement;
-                }}
-
-                results.push({{
-                    url: url,
-                    ancestry: ancestry.join(' > '),
-                    domIndex: i  // preserve DOM order
-                }});
-            }}
-
-            return results;
-        }}""", {"selector": selector, "urlAttr": url_attribute, "depth": ancestry_depth})
-
-        if not images_with_ancestry:
-            return []
-
-        # Cluster images by their ancestry path
-        # Images sharing the same ancestor chain are likely in the same gallery section
-        clusters = {}
-        for img in images_with_ancestry:
-            ancestry = img.get("ancestry", "")
-            if ancestry not in clusters:
-                clusters[ancestry] = []
-            clusters[ancestry].append(img)
-
-        if not clusters:
-            return []
-
-        # Pick the primary cluster: the LARGEST one (product galleries have the most images)
-        # If there's only one cluster, use it
-        if len(clusters) == 1:
-            primary_cluster = list(clusters.values())[0]
-        else:
-            # Sort clusters by size (descending), then by DOM order as tiebreaker
-            sorted_clusters = sorted(
-                clusters.values(),
-                key=lambda c: (-len(c), min(img["domIndex"] for img in c))
-            )
-            primary_cluster = sorted_clusters[0]
-
-            # Debug logging
-            print(f"[GalleryExtract] Found {len(clusters)} clusters, selected primary with {len(primary_cluster)} images")
-            for ancestry, imgs in clusters.items():
-                marker = "→" if imgs == primary_cluster else " "
-                print(f"  {marker} [{len(imgs)} imgs] {ancestry[:60]}...")
-
-        # Extract URLs from primary cluster, preserving order
-        raw_urls = [img["url"] for img in sorted(primary_cluster, key=lambda x: x["domIndex"])]
+    plan = compile_gallery_plan(gallery_config, ancestry_depth)
+    if not plan:
+        return []
 
-        return _dedupe_and_clean(raw_urls)
+    try:
+        result = await page.evaluate(
+            "(plan) => window.__galleryExtract ? window.__galleryExtract(plan) : null", plan
+        )
+        if result is None:
+            # Page wasn't created with the init script — inject it once
+            await page.evaluate(GALLERY_JS)
+            result = await page.evaluate("(plan) => window.__galleryExtract(plan)", plan)
+
+        clusters = result.get("clusters", [])
+        if len(clusters) > 1:
+            primary_size = next((size for _, size, is_primary in clusters if is_primary), 0)
+            print(f"[GalleryExtract] Found {len(clusters)} clusters, selected primary with {primary_size} images")
+            for ancestry, size, is_primary in clusters:
+                marker = "→" if is_primary else " "
+                print(f"  {marker} [{size} imgs] {ancestry[:60]}...")
+
+        return result.get("urls", [])
 
     except Exception as e:
         print(f"[GalleryExtract] Error: {e}")
         import traceback
         traceback.print_exc()
         return []
-
-
-def _dedupe_and_clean(raw_urls: List[str]) -> List[str]:
-    """Deduplicate and strip size suffixes from image URLs."""
-    import re
-    from urllib.parse import urlparse, parse_qs, unquote
-
-    seen = set()
-    cleaned = []
-    for url in raw_urls:
-        # Unwrap Next.js /_next/image?url=... wrapper
-        if '/_next/image' in url:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
-            if 'url' in params:
-                url = unquote(params['url'][0])
-
-        clean = _strip_size_suffix(url)
-        # Upgrade CDN path-based size variants to largest available
-        # e.g. cloudfront.net/r/s/123.jpg or /r/g/123.jpg → /r/b/123.jpg
-        clean = re.sub(r'/r/[sgtm]/', '/r/b/', clean)
-        identity = clean.split("?")[0].split("/")[-1]  # filename as identity
-        if identity not in seen:
-            seen.add(identity)
-            cleaned.append(clean)
-    return cleaned
-
-
-def _best_from_srcset(srcset: str) -> Optional[str]:
-    """Pick the largest image from a srcset attribute."""
-    best_url = None
-    best_width = 0
-    for part in srcset.split(","):
-        part = part.strip()
-        pieces = part.split()
-        if len(pieces) >= 2:
-            url = pieces[0]
-            descriptor = pieces[1]
-            try:
-                w = int(descriptor.rstrip("w"))
-                if w > best_width:
-                    best_width = w
-                    best_url = url
-            except ValueError:
-                pass
-        elif len(pieces) == 1 and pieces[0].startswith("http"):
-            best_url = best_url or pieces[0]
-    return best_url
-
-
-def _strip_size_suffix(url: str) -> str:
-    """
-    Strip size/resize parameters from image URLs to get full resolution.
-
-    Handles:
-    - ?width=960 → removed
-    - &width=750 → removed
-    - _140x140.jpg → _140x140 removed
-    - Keeps ?v=timestamp (cache busting)
-    """
-    import re
-    from urllib.parse import urlparse, urlencode, parse_qs
-
-    parsed = urlparse(url)
-
-    # Remove size-related query params, keep others (like v=timestamp)
-    if parsed.query:
-        params = parse_qs(parsed.query, keep_blank_values=True)
-        size_keys = {"width", "height", "w", "h", "size", "sw", "sh", "resize",
-                     "crop", "fit", "quality", "q", "format", "auto"}
-        filtered = {k: v[0] for k, v in params.items() if k.lower() not in size_keys}
-        new_query = urlencode(filtered) if filtered else ""
-        url = parsed._replace(query=new_query).geturl()
-
-    # Remove inline size patterns from filename: _140x140, _500x500, _20x_crop_center, etc.
-    url = re.sub(r'_\d{1,4}x\d{0,4}(?:_crop_center)?(?=\.\w{3,4})', '', url)
-
-    return url
@@ -2,16 +2,23 @@
 API Intercept extraction strategy.
 
 Extracts product data from captured JSON API responses during page load.
+
+The winning endpoint of a domain (response URL pattern + path to the product
+object) is remembered in brand_meta.json (section "products", key
+"api_endpoint"), so later pages - and later runs - go straight to it instead
+of scoring every captured response.
 """
 
 import re
-from typing import Optional, List, Dict, Any
+from collections import deque
+from typing import Optional, List, Dict, Any, Tuple
+from urllib.parse import urlparse
 
 import sys
 sys.path.insert(0, str(__file__).rsplit('/', 2)[0])
 
 from models import Product, Variant, ExtractionResult, ExtractionStrategy
-from strategies.base import BaseStrategy, PageData
+from strategies.base import BaseStrategy, PageData, response_url_pattern, url_matches_pattern
 
 
 # Fields that indicate product data
@@ -24,6 +31,18 @@ PRODUCT_INDICATORS = [
     'images', 'image', 'gallery',
 ]
 
+# A dict with a name key plus one of these looks like the product itself
+PRODUCT_NAME_KEYS = {'title', 'name', 'productname', 'product_name'}
+PRODUCT_SHAPE_KEYS = {
+    'price', 'listprice', 'saleprice', 'pricerange', 'variants',
+    'sizes', 'images', 'skuavailabilities',
+}
+
+# Traversal budgets when scoring captured JSON (CMS payloads can hold 100k+ nodes)
+MAX_SCAN_NODES = 5000
+MAX_SCAN_DEPTH = 3
+PRODUCT_SHAPE_BONUS = 50
+
 # Domains to ignore (tracking, analytics, etc.)
 IGNORE_DOMAINS = [
     'google', 'facebook', 'analytics', 'tracking', 'pixel',
@@ -32,11 +51,42 @@ IGNORE_DOMAINS = [
 ]
 
 
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.replace('www.', '')
+
+
+def _load_saved_endpoint(domain: str) -> Optional[Tuple[str, List[Any]]]:
+    """(pattern, path) of the endpoint saved by a previous run, or None."""
+    try:
+        from stages.storage import load_brand_meta
+        meta = load_brand_meta(domain) or {}
+    except Exception:
+        return None  # Standalone run (no stages package) or unreadable meta
+    saved = meta.get("products", {}).get("api_endpoint")
+    if not saved or not saved.get("pattern"):
+        return None
+    return saved["pattern"], list(saved.get("path") or [])
+
+
+def _save_endpoint(domain: str, pattern: str, path: List[Any]):
+    try:
+        from stages.storage import update_brand_meta
+        update_brand_meta(domain, "products", {"api_endpoint": {"pattern": pattern, "path": path}})
+    except Exception as e:
+        print(f"  [API] Could not save endpoint for {domain}: {e}")
+
+
 class ApiInterceptStrategy(BaseStrategy):
     """Extract product data from intercepted API responses."""
 
     strategy_type = ExtractionStrategy.API_INTERCEPT
 
+    def __init__(self):
+        # domain -> (response URL pattern, path to product object) of the winning
+        # endpoint, so later pages skip scoring and go straight to that path
+        self._endpoint_memory: Dict[str, Tuple[str, List[Any]]] = {}
+        self._loaded_domains: set = set()  # Saved endpoint already read from brand_meta
+
     async def extract(self, url: str, page_data: Optional[PageData] = None) -> ExtractionResult:
         """Extract product from captured API responses."""
         try:
@@ -46,16 +96,29 @@ class ApiInterceptStrategy(BaseStrategy):
                     "No JSON responses captured"
                 )
 
+            domain = _domain(url)
+
+            remembered = self._lookup_remembered(domain, page_data.json_responses)
+            if remembered:
+                data, product_data = remembered
+                product = self._parse_api_response(data, url, product_data)
+                return ExtractionResult.from_product(product, self.strategy_type)
+
             # Find the best product API response
-            best_response = self._find_best_product_response(page_data.json_responses)
+            best = self._find_best_product_response(page_data.json_responses)
 
-            if not best_response:
+            if not best:
                 return ExtractionResult.failure(
                     self.strategy_type,
                     "No product data found in API responses"
                 )
 
-            product = self._parse_api_response(best_response, url)
+            best_response, api_url, scan_path = best
+            product_data, path = self._find_product_object(best_response, scan_path)
+            if api_url and product_data and self._is_product_shaped(product_data):
+                self._remember(domain, response_url_pattern(api_url), path)
+
+            product = self._parse_api_response(best_response, url, product_data)
             return ExtractionResult.from_product(product, self.strategy_type)
 
         except Exception as e:
@@ -65,11 +128,50 @@ class ApiInterceptStrategy(BaseStrategy):
         """Check if we have captured API responses."""
         if not page_data or not page_data.json_responses:
             return False
+        # The remembered endpoint answers without scoring every response
+        if self._lookup_remembered(_domain(url), page_data.json_responses):
+            return True
         # Check if any response looks like product data
         return self._find_best_product_response(page_data.json_responses) is not None
 
-    def _find_best_product_response(self, responses: Dict[str, Any]) -> Optional[dict]:
-        """Find and merge API responses containing product data."""
+    def _lookup_remembered(self, domain: str, responses: Dict[str, Any]) -> Optional[Tuple[Any, dict]]:
+        """Resolve the remembered endpoint + path for a domain, if it still holds a product."""
+        if domain not in self._loaded_domains:
+            self._loaded_domains.add(domain)
+            saved = _load_saved_endpoint(domain)
+            if saved:
+                self._endpoint_memory.setdefault(domain, saved)
+
+        memo = self._endpoint_memory.get(domain)
+        if not memo:
+            return None
+
+        pattern, path = memo
+        for api_url, data in responses.items():
+            if not url_matches_pattern(api_url, pattern):
+                continue
+            obj = self._navigate(data, path)
+            if isinstance(obj, dict) and self._is_product_shaped(obj):
+                return data, obj
+
+        # Endpoint not captured on this page, or changed shape - rescan
+        # (the memory is replaced when the rescan finds a new winner)
+        return None
+
+    def _remember(self, domain: str, pattern: str, path: List[Any]):
+        """Keep the winning endpoint for this domain, here and in brand_meta."""
+        if self._endpoint_memory.get(domain) == (pattern, path):
+            return
+        self._endpoint_memory[domain] = (pattern, path)
+        _save_endpoint(domain, pattern, path)
+
+    def _find_best_product_response(self, responses: Dict[str, Any]) -> Optional[Tuple[Any, Optional[str], Optional[List[Any]]]]:
+        """
+        Find and merge API responses containing product data.
+
+        Returns (data, api_url, product_path). api_url is None when the page
+        has complementary responses to merge (not safe to remember).
+        """
         candidates = []
 
         for api_url, data in responses.items():
@@ -78,9 +180,9 @@ class ApiInterceptStrategy(BaseStrategy):
                 continue
 
             # Score this response
-            score = self._score_product_response(data)
+            score, product_path = self._score_product_response(data)
             if score > 0:
-                candidates.append((score, data, api_url))
+                candidates.append((score, data, api_url, product_path))
 
         if not candidates:
             return None
@@ -90,7 +192,7 @@ class ApiInterceptStrategy(BaseStrategy):
 
         # Try to merge complementary responses (content-based detection)
         merged = {}
-        for score, data, api_url in candidates:
+        for score, data, api_url, _ in candidates:
             # Detect by content, not URL pattern
             if isinstance(data, dict):
                 # Product info response: has selectedColor with name/images (Kering pattern)
@@ -121,44 +223,72 @@ class ApiInterceptStrategy(BaseStrategy):
 
         # If we merged data and got a name, use merged result
         if merged and 'name' in merged:
-            return merged
+            return merged, None, None
 
-        # Otherwise return the single best response
-        return candidates[0][1]
+        # Otherwise return the single best response. Pages with complementary
+        # responses aren't remembered: the merge has to run on every page.
+        _, data, api_url, product_path = candidates[0]
+        if merged:
+            return data, None, product_path
+        return data, api_url, product_path
 
     def _is_tracking_domain(self, url: str) -> bool:
         """Check if URL is from a tracking/analytics domain."""
         url_lower = url.lower()
         return any(domain in url_lower for domain in IGNORE_DOMAINS)
 
-    def _score_product_response(self, data: Any, prefix: str = "") -> int:
-        """Score how likely this response contains product data."""
+    def _is_product_shaped(self, obj: dict) -> bool:
+        """A dict with a name key and a price/variants/images key."""
+        keys = {k.lower() for k in obj.keys() if isinstance(k, str)}
+        return bool(keys & PRODUCT_NAME_KEYS) and bool(keys & PRODUCT_SHAPE_KEYS)
+
+    def _score_product_response(self, data: Any) -> Tuple[int, Optional[List[Any]]]:
+        """
+        Score how likely this response contains product data.
+
+        Breadth-first walk bounded by MAX_SCAN_NODES and MAX_SCAN_DEPTH (only the
+        first item of arrays is visited). Stops at the first product-shaped
+        object and returns its path alongside the score.
+        """
         score = 0
+        nodes = 0
+        queue = deque([(data, [], 0)])
 
-        if isinstance(data, dict):
-            for key, value in data.items():
-                key_lower = key.lower()
+        while queue and nodes < MAX_SCAN_NODES:
+            node, path, depth = queue.popleft()
+
+            if isinstance(node, dict):
+                if self._is_product_shaped(node):
+                    return score + PRODUCT_SHAPE_BONUS, path
 
-                # Check for product indicators
-                for indicator in PRODUCT_INDICATORS:
-                    if indicator.lower() in key_lower:
-                        score += 10
+                for key, value in node.items():
+                    nodes += 1
+                    if nodes >= MAX_SCAN_NODES:
                         break
+                    key_lower = str(key).lower()
 
-                # Recurse into nested objects (limit depth)
-                if prefix.count('.') < 3:
-                    score += self._score_product_response(value, f"{prefix}.{key}")
+                    # Check for product indicators
+                    for indicator in PRODUCT_INDICATORS:
+                        if indicator.lower() in key_lower:
+                            score += 10
+                            break
 
-        elif isinstance(data, list) and data:
-            # Check first item of arrays
-            score += self._score_product_response(data[0], f"{prefix}[0]")
+                    if depth < MAX_SCAN_DEPTH and isinstance(value, (dict, list)):
+                        queue.append((value, path + [key], depth + 1))
 
-        return score
+            elif isinstance(node, list) and node:
+                # Check first item of arrays
+                nodes += 1
+                if isinstance(node[0], (dict, list)):
+                    queue.append((node[0], path + [0], depth))
 
-    def _parse_api_response(self, data: dict, url: str) -> Product:
+        return score, None
+
+    def _parse_api_response(self, data: Any, url: str, product_data: Optional[dict] = None) -> Product:
         """Parse API response into Product model."""
         # Try to find product data at various paths
-        product_data = self._find_product_object(data)
+        if product_data is None:
+            product_data, _ = self._find_product_object(data)
 
         if not product_data:
             product_data = data
@@ -190,8 +320,28 @@ class ApiInterceptStrategy(BaseStrategy):
             raw_data=data,
         )
 
-    def _find_product_object(self, data: dict) -> Optional[dict]:
-        """Find the product object within nested data."""
+    def _navigate(self, data: Any, path: List[Any]) -> Any:
+        """Follow a list of dict keys / list indices, None if it breaks."""
+        obj = data
+        try:
+            for key in path:
+                if isinstance(key, int):
+                    obj = obj[key]
+                else:
+                    obj = obj.get(key)
+                if obj is None:
+                    return None
+        except (KeyError, IndexError, TypeError, AttributeError):
+            return None
+        return obj
+
+    def _find_product_object(self, data: Any, scan_path: Optional[List[Any]] = None) -> Tuple[Optional[dict], List[Any]]:
+        """
+        Find the product object within nested data.
+
+        Returns (object, path). Tries the product-shaped path the bounded scan
+        found, then the common paths. Path is [] when the top-level object is used.
+        """
         # Common paths where product data might be
         paths = [
             ['product'],
@@ -201,23 +351,17 @@ class ApiInterceptStrategy(BaseStrategy):
             ['items', 0],
             ['products', 0],
         ]
+        if scan_path:
+            paths.insert(0, scan_path)
 
         for path in paths:
-            obj = data
-            try:
-                for key in path:
-                    if isinstance(key, int):
-                        obj = obj[key]
-                    else:
-                        obj = obj.get(key)
-                    if obj is None:
-                        break
-                if obj and isinstance(obj, dict):
-                    return obj
-            except (KeyError, IndexError, TypeError):
-                continue
+            obj = self._navigate(data, path)
+            if obj and isinstance(obj, dict):
+                return obj, path
 
-        return None
+        if isinstance(data, dict):
+            return data, []
+        return None, []
 
     def _find_field(self, data: dict, keys: List[str]) -> Optional[str]:
         """Find first matching field from list of possible keys."""
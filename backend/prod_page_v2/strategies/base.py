@@ -2,8 +2,11 @@
 Base class for extraction strategies.
 """
 
+import re
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
+from urllib.parse import urlparse
 
 import sys
 sys.path.insert(0, str(__file__).rsplit('/', 2)[0])
@@ -11,6 +14,53 @@ sys.path.insert(0, str(__file__).rsplit('/', 2)[0])
 from models import Product, Variant, ExtractionResult, ExtractionStrategy, MissingFields, PageData
 
 
+def response_url_pattern(url: str) -> str:
+    """
+    Generalize a captured response URL into a glob pattern.
+
+    Query strings and scheme are dropped and product-specific path segments
+    (ids, slugs) become wildcards, so the same endpoint matches on every
+    product page of a domain. Match against strip_url_scheme(url).
+    """
+    parsed = urlparse(url)
+    segments = []
+    for seg in parsed.path.split('/'):
+        if re.search(r'\d', seg) or (len(seg) > 12 and re.search(r'[-_]', seg)):
+            segments.append('*')
+        else:
+            segments.append(seg)
+    return f"{parsed.netloc}{'/'.join(segments)}"
+
+
+def strip_url_scheme(url: str) -> str:
+    """host + path of a URL, the form response_url_pattern() globs against."""
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path}"
+
+
+@lru_cache(maxsize=256)
+def _compile_url_pattern(pattern: str) -> re.Pattern:
+    parts = []
+    for c in pattern:
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        else:
+            parts.append(re.escape(c))
+    return re.compile(''.join(parts))
+
+
+def url_matches_pattern(url: str, pattern: str) -> bool:
+    """
+    Whether a response URL matches a response_url_pattern() glob.
+
+    Unlike fnmatch, * stands in for (part of) one path segment and never
+    crosses a '/', so "shop.com/api/*" doesn't match "shop.com/api/a/b".
+    """
+    return _compile_url_pattern(pattern).fullmatch(strip_url_scheme(url)) is not None
+
+
 class BaseStrategy(ABC):
     """Base class for extraction strategies."""
 
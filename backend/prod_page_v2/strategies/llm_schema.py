@@ -8,9 +8,10 @@ Path format: [response_index].path.to.field
 Example: [1].product.name means response #1, then product.name
 """
 
+import hashlib
 import json
 import re
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator
 from urllib.parse import urlparse
 from pathlib import Path
 from pydantic import BaseModel, Field
@@ -20,7 +21,7 @@ sys.path.insert(0, str(__file__).rsplit('/', 2)[0])
 sys.path.insert(0, str(__file__).rsplit('/', 4)[0])
 
 from models import Product, Variant, ExtractionResult, ExtractionStrategy
-from strategies.base import BaseStrategy, PageData
+from strategies.base import BaseStrategy, PageData, response_url_pattern, url_matches_pattern
 
 try:
     from backend.scraper.llm_handler import LLMHandler
@@ -86,6 +87,7 @@ class LlmSchemaStrategy(BaseStrategy):
         self.llm = LLMHandler() if LLMHandler else None
         self.schema_dir = schema_dir or Path(__file__).parent.parent / "schemas"
         self.schema_dir.mkdir(exist_ok=True)
+        self._compiled: Dict[str, CompiledSchema] = {}
 
     async def extract(self, url: str, page_data: Optional[PageData] = None) -> ExtractionResult:
         """Extract product using saved schema or discover new one."""
@@ -99,16 +101,18 @@ class LlmSchemaStrategy(BaseStrategy):
         if not useful_responses:
             return ExtractionResult.failure(self.strategy_type, "No useful API responses")
 
-        # Convert to indexed list for path extraction
-        responses_list = list(useful_responses.values())
+        # Ordered (url, data) pairs: accessors match by URL pattern, then index
+        responses_list = list(useful_responses.items())
 
-        schema = self._load_schema(domain)
+        compiled = self._load_schema(domain)
 
-        if schema:
+        if compiled:
             # Use saved schema - NO LLM!
             print(f"    [llm_schema] Using saved schema for {domain} (no LLM)")
-            product_data = self._extract_with_schema(responses_list, schema)
+            product_data = self._extract_with_schema(responses_list, compiled)
             if product_data:
+                if compiled.learn_url_patterns([u for u, _ in responses_list]):
+                    self._save_compiled(domain, compiled)
                 product = self._build_product(product_data, url)
                 return ExtractionResult.from_product(product, self.strategy_type)
             else:
@@ -124,11 +128,11 @@ class LlmSchemaStrategy(BaseStrategy):
         schema = self._discover_schema(api_data)
 
         if schema:
-            self._save_schema(domain, schema)
+            self._save_schema(domain, schema, response_urls=[u for u, _ in responses_list])
             print(f"    [llm_schema] Saved schema for {domain}")
 
             # Try extracting with the new schema
-            product_data = self._extract_with_schema(responses_list, schema)
+            product_data = self._extract_with_schema(responses_list, self._compiled[domain])
             if product_data:
                 product = self._build_product(product_data, url)
                 return ExtractionResult.from_product(product, self.strategy_type)
@@ -208,70 +212,60 @@ class LlmSchemaStrategy(BaseStrategy):
             return result["data"]
         return None
 
-    def _extract_with_schema(self, responses: List[Dict], schema: Dict) -> Optional[Dict]:
-        """Extract product data using schema paths - NO LLM."""
+    def _extract_with_schema(self, responses: List[Tuple[str, Any]], compiled: 'CompiledSchema') -> Optional[Dict]:
+        """Extract product data using compiled schema accessors - NO LLM."""
         try:
             product_data = {}
 
             # Simple fields
-            for field in ['name', 'price', 'currency', 'description', 'brand', 'category', 'sku']:
-                path = schema.get(field)
-                if path:
-                    value = self._get_by_path(responses, path)
-                    if value is not None:
-                        product_data[field] = value
+            for field, accessor in compiled.fields.items():
+                value = accessor(responses)
+                if value is not None:
+                    product_data[field] = value
 
             # Images
-            images_path = schema.get('images')
-            if images_path:
-                images_data = self._get_by_path(responses, images_path)
+            if compiled.images:
+                images_data = compiled.images(responses)
                 if images_data and isinstance(images_data, list):
-                    url_field = schema.get('image_url_field', 'url')
                     images = []
                     for img in images_data:
                         if isinstance(img, str):
                             images.append(img)
                         elif isinstance(img, dict):
                             # Try multiple common field names
-                            for f in [url_field, 'url', 'src', 'source', 'image', 'imageUrl']:
+                            for f in compiled.image_url_fields:
                                 if f in img:
                                     images.append(img[f])
                                     break
                     product_data['images'] = images
 
             # Variants
-            variants_path = schema.get('variants')
-            if variants_path:
-                variants_data = self._get_by_path(responses, variants_path)
+            if compiled.variants:
+                variants_data = compiled.variants(responses)
                 if variants_data and isinstance(variants_data, list):
                     variants = []
-                    size_field = schema.get('variant_size_field', 'size')
-                    color_field = schema.get('variant_color_field', 'color')
-                    price_field = schema.get('variant_price_field', 'price')
-                    avail_field = schema.get('variant_available_field', 'available')
-                    stock_field = schema.get('variant_stock_field', 'stock')
-                    sku_field = schema.get('variant_sku_field', 'sku')
+                    vf = compiled.variant_fields
 
                     for v in variants_data:
                         if isinstance(v, dict):
                             variant = {}
                             # Size - try multiple field names
-                            for f in [size_field, 'size', 'name', 'title', 'option', 'sizeLabel']:
+                            for f in vf['size']:
                                 if f in v:
                                     variant['size'] = v[f]
                                     break
                             # Color
-                            for f in [color_field, 'color', 'colorName', 'colour']:
+                            for f in vf['color']:
                                 if f in v:
                                     variant['color'] = v[f]
                                     break
                             # Price
-                            for f in [price_field, 'price', 'amount', 'value']:
+                            for f in vf['price']:
                                 if f in v:
                                     variant['price'] = v[f]
                                     break
                             # Availability
-                            for f in [avail_field, 'available', 'inStock', 'in_stock', 'isAvailable', 'availability']:
+                            for f in vf['available']:
                                 if f in v:
                                     val = v[f]
                                     if isinstance(val, bool):
@@ -282,12 +276,12 @@ class LlmSchemaStrategy(BaseStrategy):
                                         variant['available'] = val > 0
                                     break
                             # Stock count
-                            for f in [stock_field, 'stock', 'stockCount', 'stock_count', 'inventory', 'quantity']:
+                            for f in vf['stock_count']:
                                 if f in v:
                                     variant['stock_count'] = v[f]
                                     break
                             # SKU
-                            for f in [sku_field, 'sku', 'id', 'variantId', 'variant_id']:
+                            for f in vf['sku']:
                                 if f in v:
                                     variant['sku'] = v[f]
                                     break
@@ -304,65 +298,6 @@ class LlmSchemaStrategy(BaseStrategy):
             print(f"    [llm_schema] Schema extraction error: {e}")
             return None
 
-    def _get_by_path(self, responses: List[Dict], path: str) -> Any:
-        """Get value from responses using path like [1].product.name"""
-        if not path or path == 'null':
-            return None
-
-        # Check if it's a literal value (no brackets or dots)
-        if not any(c in path for c in '.[]'):
-            return path  # Return as literal (e.g., "USD")
-
-        # Parse response index from [N] prefix
-        match = re.match(r'\[(\d+)\]\.?(.*)', path)
-        if match:
-            idx = int(match.group(1)) - 1  # 1-indexed to 0-indexed
-            remaining_path = match.group(2)
-
-            if idx < 0 or idx >= len(responses):
-                return None
-
-            data = responses[idx]
-
-            if not remaining_path:
-                return data
-
-            return self._navigate_path(data, remaining_path)
-        else:
-            # No index prefix - try all responses
-            for data in responses:
-                result = self._navigate_path(data, path)
-                if result is not None:
-                    return result
-            return None
-
-    def _navigate_path(self, data: Any, path: str) -> Any:
-        """Navigate a dot-notation path within a data structure."""
-        if not path:
-            return data
-
-        parts = path.replace('[', '.').replace(']', '').split('.')
-        current = data
-
-        for part in parts:
-            if not part:
-                continue
-            if isinstance(current, dict):
-                current = current.get(part)
-            elif isinstance(current, list):
-                try:
-                    idx = int(part)
-                    current = current[idx]
-                except (ValueError, IndexError):
-                    return None
-            else:
-                return None
-
-            if current is None:
-                return None
-
-        return current
-
     def _build_product(self, data: Dict, url: str) -> Product:
         """Build Product from extracted data."""
         variants = []
@@ -391,19 +326,226 @@ class LlmSchemaStrategy(BaseStrategy):
             sku=data.get('sku'),
         )
 
-    def _load_schema(self, domain: str) -> Optional[Dict]:
-        """Load saved schema for domain."""
-        path = self.schema_dir / f"{domain.replace('.', '_')}.json"
-        if path.exists():
+    def _schema_path(self, domain: str) -> Path:
+        return self.schema_dir / f"{domain.replace('.', '_')}.json"
+
+    def _compiled_path(self, domain: str) -> Path:
+        return self.schema_dir / f"{domain.replace('.', '_')}.compiled.json"
+
+    def _load_schema(self, domain: str) -> Optional['CompiledSchema']:
+        """
+        Load the compiled schema for a domain.
+
+        Compiled accessors are memoized per schema file mtime, so the JSON is
+        only parsed and compiled once per run. The compiled spec (tokenized paths
+        plus response URL patterns) is cached next to the schema file and
+        rebuilt whenever the schema hash no longer matches.
+        """
+        path = self._schema_path(domain)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            self._compiled.pop(domain, None)
+            return None
+
+        cached = self._compiled.get(domain)
+        if cached and cached.mtime == mtime:
+            return cached
+
+        try:
+            with open(path) as f:
+                schema = json.load(f)
+        except Exception:
+            return None
+
+        schema_hash = _hash_schema(schema)
+        url_patterns = {}
+        compiled_path = self._compiled_path(domain)
+        if compiled_path.exists():
             try:
-                with open(path) as f:
-                    return json.load(f)
-            except:
+                spec = json.loads(compiled_path.read_text())
+                if spec.get('schema_hash') == schema_hash:
+                    url_patterns = {int(k): v for k, v in spec.get('url_patterns', {}).items()}
+            except Exception:
                 pass
-        return None
 
-    def _save_schema(self, domain: str, schema: Dict):
-        """Save schema for domain."""
-        path = self.schema_dir / f"{domain.replace('.', '_')}.json"
+        compiled = CompiledSchema(schema, schema_hash, url_patterns, mtime)
+        self._compiled[domain] = compiled
+        if not compiled_path.exists() or not url_patterns:
+            self._save_compiled(domain, compiled)
+        return compiled
+
+    def _save_schema(self, domain: str, schema: Dict, response_urls: Optional[List[str]] = None):
+        """Save schema for domain, plus its compiled sidecar."""
+        path = self._schema_path(domain)
         with open(path, 'w') as f:
             json.dump(schema, f, indent=2)
+
+        compiled = CompiledSchema(schema, _hash_schema(schema), {}, path.stat().st_mtime_ns)
+        if response_urls:
+            compiled.learn_url_patterns(response_urls)
+        self._compiled[domain] = compiled
+        self._save_compiled(domain, compiled)
+
+    def _save_compiled(self, domain: str, compiled: 'CompiledSchema'):
+        """Write the compiled spec next to the schema file."""
+        try:
+            self._compiled_path(domain).write_text(json.dumps(compiled.to_dict(), indent=2))
+        except OSError:
+            pass
+
+
+def _hash_schema(schema: Dict) -> str:
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+
+
+def _compile_path(tokens: List[str]) -> Callable[[Any], Any]:
+    """Compile tokenized dot-notation into a closure that walks one response."""
+    steps = []
+    for t in tokens:
+        if not t:
+            continue
+        try:
+            steps.append((t, int(t)))
+        except ValueError:
+            steps.append((t, None))
+
+    def walk(data: Any) -> Any:
+        current = data
+        for key, idx in steps:
+            if isinstance(current, dict):
+                current = current.get(key)
+            elif isinstance(current, list):
+                if idx is None:
+                    return None
+                try:
+                    current = current[idx]
+                except IndexError:
+                    return None
+            else:
+                return None
+
+            if current is None:
+                return None
+        return current
+
+    return walk
+
+
+def _candidates(preferred: Optional[str], defaults: List[str]) -> Tuple[str, ...]:
+    """Ordered, de-duplicated field name candidates (schema choice first)."""
+    names = [preferred] + defaults if preferred else defaults
+    return tuple(dict.fromkeys(names))
+
+
+class CompiledSchema:
+    """
+    Per-domain schema compiled into accessor closures.
+
+    Each path like ``[1].product.name`` is tokenized once. At extraction time
+    the accessor walks the responses whose URL matches the pattern learned
+    for that index, in capture order, then the response at the positional
+    index, and returns the first value found.
+    """
+
+    SIMPLE_FIELDS = ['name', 'price', 'currency', 'description', 'brand', 'category', 'sku']
+
+    def __init__(self, schema: Dict, schema_hash: str, url_patterns: Dict[int, str], mtime: int = 0):
+        self.schema = schema
+        self.schema_hash = schema_hash
+        self.url_patterns = dict(url_patterns)
+        self.mtime = mtime
+        self._indices = set()
+
+        self.fields = {}
+        for field in self.SIMPLE_FIELDS:
+            accessor = self._compile(schema.get(field))
+            if accessor:
+                self.fields[field] = accessor
+
+        self.images = self._compile(schema.get('images'))
+        self.variants = self._compile(schema.get('variants'))
+
+        self.image_url_fields = _candidates(
+            schema.get('image_url_field', 'url'), ['url', 'src', 'source', 'image', 'imageUrl'])
+        self.variant_fields = {
+            'size': _candidates(schema.get('variant_size_field', 'size'),
+                                ['size', 'name', 'title', 'option', 'sizeLabel']),
+            'color': _candidates(schema.get('variant_color_field', 'color'),
+                                 ['color', 'colorName', 'colour']),
+            'price': _candidates(schema.get('variant_price_field', 'price'),
+                                 ['price', 'amount', 'value']),
+            'available': _candidates(schema.get('variant_available_field', 'available'),
+                                     ['available', 'inStock', 'in_stock', 'isAvailable', 'availability']),
+            'stock_count': _candidates(schema.get('variant_stock_field', 'stock'),
+                                       ['stock', 'stockCount', 'stock_count', 'inventory', 'quantity']),
+            'sku': _candidates(schema.get('variant_sku_field', 'sku'),
+                               ['sku', 'id', 'variantId', 'variant_id']),
+        }
+
+    def _compile(self, path: Optional[str]) -> Optional[Callable[[List[Tuple[str, Any]]], Any]]:
+        """Compile a schema path into an accessor over [(response_url, data), ...]."""
+        if not path or path == 'null':
+            return None
+
+        # Literal value (no brackets or dots), e.g. "USD"
+        if not any(c in path for c in '.[]'):
+            return lambda responses: path
+
+        match = re.match(r'\[(\d+)\]\.?(.*)', path)
+        if not match:
+            # No index prefix - try all responses
+            walk = _compile_path(path.replace('[', '.').replace(']', '').split('.'))
+
+            def any_response(responses):
+                for _, data in responses:
+                    result = walk(data)
+                    if result is not None:
+                        return result
+                return None
+            return any_response
+
+        idx = int(match.group(1)) - 1  # 1-indexed to 0-indexed
+        remaining = match.group(2)
+        walk = _compile_path(remaining.replace('[', '.').replace(']', '').split('.'))
+        self._indices.add(idx)
+
+        def indexed(responses):
+            for data in self._select(responses, idx):
+                result = walk(data)
+                if result is not None:
+                    return result
+            return None
+        return indexed
+
+    def _select(self, responses: List[Tuple[str, Any]], idx: int) -> Iterator[Any]:
+        """
+        Candidate responses for a schema index: every response matching the
+        learned URL pattern (several endpoints can share one), then the one
+        at the positional index.
+        """
+        pattern = self.url_patterns.get(idx)
+        positional_seen = False
+        if pattern:
+            for i, (url, data) in enumerate(responses):
+                if url_matches_pattern(url, pattern):
+                    positional_seen = positional_seen or i == idx
+                    yield data
+        if 0 <= idx < len(responses) and not positional_seen:
+            yield responses[idx][1]
+
+    def learn_url_patterns(self, response_urls: List[str]) -> bool:
+        """Record URL patterns for indices that don't have one yet."""
+        learned = False
+        for idx in self._indices:
+            if idx not in self.url_patterns and 0 <= idx < len(response_urls):
+                self.url_patterns[idx] = response_url_pattern(response_urls[idx])
+                learned = True
+        return learned
+
+    def to_dict(self) -> dict:
+        return {
+            "schema_hash": self.schema_hash,
+            "url_patterns": {str(k): v for k, v in sorted(self.url_patterns.items())},
+        }
+
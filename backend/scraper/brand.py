@@ -129,6 +129,10 @@ class Brand:
         self.load_more_modals_applied: bool = False  # Track if modals were already applied this session
         self.load_more_loading_mechanism: bool = False  # Track if we know this site uses load more (across all pages)
 
+        # Popup playbook (navigation/popup_playbook.py): installed on every browser
+        # context so known popups never render; dismissals record new ones into it
+        self.popup_playbook = None
+
         # Product queue for discovered products
         self.product_queue = Queue()
         self.seen_product_urls = set()  # Track discovered products to avoid duplicates
@@ -140,9 +144,14 @@ class Brand:
         # Lineage memory for multi-page extraction optimization (global sets)
         self.approved_lineages = set()  # Global approved lineages across all categories
         self.rejected_lineages = set()  # Global rejected lineages across all categories
+        self.approved_url_lineages = set()  # Stage 2 link lineages classified as products
+        self.rejected_url_lineages = set()  # Stage 2 link lineages classified as non-products
+        # Saved decisions of previous runs (lineage_memory.py) - fills the sets above
+        self.lineage_memory = None
 
         # Pagination cache: reuse pagination pattern across categories
         self.pagination_pattern: Optional[Dict] = None  # {url_pattern, pagination_type} from first detection
+        self.pagination_http: Optional[bool] = None  # Pages 2+ server-rendered (fetch without a browser)?
         self._pagination_lock = threading.Lock()
 
         # HTML processing pipeline
@@ -1667,11 +1676,14 @@ Return JSON:
         if product.image:
             self.image_download_queue.put(product)
 
-    def store_lineage_memory(self, category_url: str, rejected_lineages: set, approved_lineages: set = None):
-        """Store lineage memory globally (across all categories and pages)"""
+    def store_lineage_memory(self, category_url: str, rejected_lineages: set, approved_lineages: set = None,
+                             confidence: str = "Medium"):
+        """Store lineage memory globally (across all categories and pages) - and for later runs"""
         self.rejected_lineages.update(rejected_lineages)
         if approved_lineages:
             self.approved_lineages.update(approved_lineages)
+        if self.lineage_memory is not None:
+            self.lineage_memory.record("product", approved_lineages or (), rejected_lineages, confidence)
 
     def get_lineage_memory(self, category_url: str) -> dict:
         """Get global lineage memory"""
@@ -0,0 +1,227 @@
+"""
+Cross-category batching of link lineage classification.
+
+THE PROBLEM:
+    classify_product_links() sends one LLM request per category page for the
+    lineages it hasn't seen yet. Stage 2 classifies many categories at once
+    (pool workers, parallel pagination pages), and pages finishing together
+    each send a small request - mostly for the same header/grid/footer
+    lineages, since they are the same site templates. Each one is classified
+    again because the others' answers aren't in the brand's lineage memory yet.
+
+THE SOLUTION:
+    A LineageBatcher per brand collects unknown lineages from all concurrent
+    callers for BATCH_WINDOW_S:
+    - lineages already known (classified since the caller looked) resolve at once
+    - lineages already queued or in flight are awaited, not sent again
+    - the rest go into one batched prompt, one section per category page
+
+    The first caller into a batch waits out the window (or until the batch is
+    full), sends it, and writes the decisions into the brand's
+    approved_url_lineages / rejected_url_lineages. Every waiter then reads its
+    lineages' decisions from the batch.
+
+USAGE:
+    batcher = get_lineage_batcher(brand_instance)
+    result = batcher.classify(page_url, category_name, sampled_links)
+    # {'decisions': {lineage: is_product}, 'confidence', 'analysis', 'batched'} or None on failure
+"""
+import threading
+from typing import Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+from llm_handler import LLMHandler
+from prompts import url_classification
+
+
+# How long the first caller waits for other categories to join its batch
+BATCH_WINDOW_S = 0.3
+
+# Links per batched prompt - a full batch is sent without waiting out the window
+MAX_BATCH_LINKS = 150
+
+
+def classify_links(pages: List[Dict]) -> Optional[Dict]:
+    """
+    One URL classification LLM call for links of one or more category pages.
+
+    Args:
+        pages: List of {page_url, category_name, links}
+
+    Returns:
+        {'decisions': {lineage: is_product}, 'confidence', 'analysis'} or None if the call failed.
+        A lineage is a product lineage if any of its links was classified as a product.
+    """
+    if len(pages) == 1:
+        page = pages[0]
+        prompt = url_classification.get_prompt(page['page_url'], page['category_name'], page['links'])
+    else:
+        prompt = url_classification.get_batch_prompt(pages)
+
+    response = LLMHandler().call(
+        prompt,
+        expected_format="json",
+        response_model=url_classification.get_response_model(),
+        operation="url_classification",
+    )
+    if not response.get("success"):
+        return None
+
+    data = response.get("data", {})
+    product_indices = set(data.get("product_link_indices", []))
+    links = [link for page in pages for link in page['links']]
+
+    decisions: Dict[str, bool] = {}
+    for i, link in enumerate(links):
+        lineage = link.get("lineage", "unknown")
+        decisions[lineage] = decisions.get(lineage, False) or i in product_indices
+
+    return {
+        "decisions": decisions,
+        "confidence": data.get("confidence", "Medium"),
+        "analysis": data.get("analysis", ""),
+    }
+
+
+class _Batch:
+    """Lineages queued for one LLM call, and its outcome once sent."""
+
+    def __init__(self):
+        self.pages: List[Dict] = []
+        self.lineages = set()
+        self.link_count = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+
+
+class LineageBatcher:
+    """Coalesces concurrent classify_product_links() LLM calls of one brand."""
+
+    def __init__(self, brand_instance, window_s: float = BATCH_WINDOW_S, max_links: int = MAX_BATCH_LINKS):
+        self.brand = brand_instance
+        self.window_s = window_s
+        self.max_links = max_links
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+        self._pending: Dict[str, _Batch] = {}   # lineage -> batch classifying it
+        self.stats = {"requests": 0, "llm_calls": 0, "lineages_shared": 0}
+
+    def _known(self, lineage: str) -> Optional[bool]:
+        if lineage in (getattr(self.brand, 'approved_url_lineages', None) or ()):
+            return True
+        if lineage in (getattr(self.brand, 'rejected_url_lineages', None) or ()):
+            return False
+        return None
+
+    def classify(self, page_url: str, category_name: str, links: List[Dict]) -> Optional[Dict]:
+        """
+        Decisions for the lineages of `links`, classified together with other
+        categories' concurrent requests.
+
+        Returns:
+            {'decisions': {lineage: is_product}, 'confidence', 'analysis',
+             'batched': categories sharing the LLM call(s), 1 if none}
+            or None if the LLM call for any of them failed
+        """
+        decisions: Dict[str, bool] = {}
+        waits: Dict[_Batch, List[str]] = {}
+        lead: Optional[_Batch] = None
+
+        with self._lock:
+            self.stats["requests"] += 1
+            new_links = []
+            for link in links:
+                lineage = link.get("lineage", "unknown")
+                known = self._known(lineage)
+                if known is not None:
+                    decisions[lineage] = known
+                elif lineage in self._pending:
+                    batch = self._pending[lineage]
+                    if lineage not in waits.setdefault(batch, []):
+                        waits[batch].append(lineage)
+                        self.stats["lineages_shared"] += 1
+                else:
+                    new_links.append(link)
+
+            if new_links:
+                batch = self._open
+                if batch is not None and batch.link_count + len(new_links) > self.max_links and batch.pages:
+                    batch.full.set()  # Its leader sends it now; start another
+                    batch = None
+                if batch is None:
+                    batch = self._open = _Batch()
+                    lead = batch
+
+                batch.pages.append({"page_url": page_url, "category_name": category_name, "links": new_links})
+                batch.link_count += len(new_links)
+                for link in new_links:
+                    lineage = link.get("lineage", "unknown")
+                    batch.lineages.add(lineage)
+                    self._pending[lineage] = batch
+                    waits.setdefault(batch, [])
+                    if lineage not in waits[batch]:
+                        waits[batch].append(lineage)
+                if batch.link_count >= self.max_links:
+                    batch.full.set()
+
+        if lead is not None:
+            self._send(lead)
+
+        confidence, analysis = "High", ""
+        for batch, lineages in waits.items():
+            batch.done.wait()
+            if batch.result is None:
+                return None
+            confidence, analysis = batch.result["confidence"], batch.result["analysis"]
+            for lineage in lineages:
+                decisions[lineage] = batch.result["decisions"].get(lineage, False)
+
+        return {
+            "decisions": decisions,
+            "confidence": confidence,
+            "analysis": analysis,
+            "batched": max((len(batch.pages) for batch in waits), default=1),
+        }
+
+    def _send(self, batch: _Batch):
+        """Leader: wait for others to join, then classify the batch and publish its decisions."""
+        batch.full.wait(timeout=self.window_s)
+        with self._lock:
+            if self._open is batch:
+                self._open = None
+
+        try:
+            self.stats["llm_calls"] += 1
+            batch.result = classify_links(batch.pages)
+        except Exception as e:
+            print(f"   ❌ Batched lineage classification failed: {e}")
+            batch.result = None
+        finally:
+            with self._lock:
+                if batch.result is not None:
+                    approved = {l for l, ok in batch.result["decisions"].items() if ok}
+                    rejected = set(batch.result["decisions"]) - approved
+                    if getattr(self.brand, 'approved_url_lineages', None) is None:
+                        self.brand.approved_url_lineages = set()
+                    if getattr(self.brand, 'rejected_url_lineages', None) is None:
+                        self.brand.rejected_url_lineages = set()
+                    self.brand.approved_url_lineages.update(approved)
+                    self.brand.rejected_url_lineages.update(rejected)
+                for lineage in batch.lineages:
+                    if self._pending.get(lineage) is batch:
+                        del self._pending[lineage]
+                batch.done.set()
+
+
+_batchers: "WeakKeyDictionary" = WeakKeyDictionary()
+_batchers_lock = threading.Lock()
+
+
+def get_lineage_batcher(brand_instance) -> LineageBatcher:
+    """The brand's batcher - shared by every thread classifying its categories."""
+    with _batchers_lock:
+        batcher = _batchers.get(brand_instance)
+        if batcher is None:
+            batcher = _batchers[brand_instance] = LineageBatcher(brand_instance)
+        return batcher
@@ -0,0 +1,210 @@
+"""
+Per-domain lineage memory - link classification decisions kept across runs.
+
+THE PROBLEM:
+    The Brand's lineage sets (approved_url_lineages / rejected_url_lineages for
+    stage 2 link classification, approved_lineages / rejected_lineages from
+    store_lineage_memory for product filtering) live only for one run. Every
+    stage 2 re-run of an unchanged site pays the LLM again to classify the
+    same DOM lineages - the same product grid, header, footer and carousel.
+
+THE SOLUTION:
+    Decisions are saved in brand_meta.json (section "lineages") with:
+    - version: LINEAGE_MEMORY_VERSION - bumped when lineage strings change
+      shape; a saved memory of another version is dropped whole
+    - confidence per lineage: the LLM's confidence, or "Low" for heuristic
+      decisions (URL-pattern fallback, single-lineage auto-approve)
+
+    At stage 2 start, trusted entries are loaded into the Brand's sets, so
+    known lineages skip classification. An entry is trusted if its confidence
+    is above "Low", or once a later run made the same "Low" decision again
+    (LOW_CONFIRMATIONS) - a heuristic answer that holds run after run stops
+    costing an LLM call. Entries expire:
+    - on mismatch: a remembered-rejected lineage whose links look like product
+      URLs on a page left without product links is re-classified (a page with
+      no product links at all - an empty category - expires nothing)
+    - when unused: lineages not seen for MAX_MISSED_RUNS runs are dropped
+
+USAGE:
+    memory = load_saved_lineage_memory(domain) or LineageMemory()
+    memory.apply(brand)                      # fill the Brand's lineage sets
+    ... stage 2 records decisions / marks lineages seen ...
+    memory.save(domain, brand)
+"""
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+
+# Bump when lineage extraction changes - saved decisions no longer match
+LINEAGE_MEMORY_VERSION = 1
+
+# Confidence below which a saved decision is re-checked on the next run
+TRUSTED_CONFIDENCE = ("High", "Medium")
+
+# Runs that must repeat a "Low" decision before it is trusted too
+LOW_CONFIRMATIONS = 1
+
+# Runs a saved lineage may go unseen before it's forgotten
+MAX_MISSED_RUNS = 3
+
+# kind -> Brand attributes holding its (approved, rejected) sets
+KINDS = {
+    "url": ("approved_url_lineages", "rejected_url_lineages"),
+    "product": ("approved_lineages", "rejected_lineages"),
+}
+
+
+@dataclass
+class LineageMemory:
+    """Saved lineage decisions of one domain, by kind ("url", "product")."""
+    # {kind: {lineage: {'approved', 'confidence', 'confirmations', 'version', 'updated', 'missed_runs'}}}
+    entries: Dict[str, Dict[str, dict]] = field(default_factory=lambda: {kind: {} for kind in KINDS})
+    loaded: Dict[str, Set[str]] = field(default_factory=lambda: {kind: set() for kind in KINDS})
+    seen_lineages: Dict[str, Set[str]] = field(default_factory=lambda: {kind: set() for kind in KINDS})
+    run_started: str = field(default_factory=lambda: datetime.now().isoformat())
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    # =========================================================================
+    # During the run
+    # =========================================================================
+
+    def apply(self, brand) -> int:
+        """Put trusted saved decisions into the Brand's lineage sets. Returns lineages loaded."""
+        for kind, (approved_attr, rejected_attr) in KINDS.items():
+            approved = getattr(brand, approved_attr)
+            rejected = getattr(brand, rejected_attr)
+            for lineage, entry in self.entries[kind].items():
+                if not _trusted(entry):
+                    continue
+                (approved if entry["approved"] else rejected).add(lineage)
+                self.loaded[kind].add(lineage)
+        return sum(len(lineages) for lineages in self.loaded.values())
+
+    def seen(self, kind: str, lineages: Iterable[str]):
+        with self._lock:
+            self.seen_lineages[kind].update(lineages)
+
+    def record(self, kind: str, approved: Iterable[str], rejected: Iterable[str], confidence: str):
+        """
+        Remember decisions made this run (they replace any saved ones). A
+        decision repeating one saved by an earlier run counts as a confirmation.
+        """
+        now = datetime.now().isoformat()
+        confidence = str(confidence or "Low").strip().capitalize()
+        with self._lock:
+            for is_approved, lineages in ((True, approved), (False, rejected)):
+                for lineage in lineages:
+                    self.entries[kind][lineage] = {
+                        "approved": is_approved,
+                        "confidence": confidence,
+                        "confirmations": self._confirmations(kind, lineage, is_approved),
+                        "version": LINEAGE_MEMORY_VERSION,
+                        "updated": now,
+                        "missed_runs": 0,
+                    }
+                    self.loaded[kind].discard(lineage)
+                    self.seen_lineages[kind].add(lineage)
+
+    def _confirmations(self, kind: str, lineage: str, approved: bool) -> int:
+        """Confirmations of a decision about to be recorded. Caller holds the lock."""
+        old = self.entries[kind].get(lineage)
+        if not old or old.get("approved") != approved:
+            return 0
+        confirmations = old.get("confirmations", 0)
+        if old.get("updated", "") < self.run_started:
+            confirmations += 1  # Saved by an earlier run - once per run
+        return confirmations
+
+    def expire(self, kind: str, lineages: Iterable[str], brand) -> Set[str]:
+        """
+        Forget saved decisions that no longer match the site. Only lineages
+        loaded from disk expire (once) - this run's decisions stand.
+
+        Returns:
+            The lineages removed from the memory and the Brand's sets
+        """
+        approved_attr, rejected_attr = KINDS[kind]
+        with self._lock:
+            expired = set(lineages) & self.loaded[kind]
+            for lineage in expired:
+                self.loaded[kind].discard(lineage)
+                self.entries[kind].pop(lineage, None)
+                getattr(brand, approved_attr).discard(lineage)
+                getattr(brand, rejected_attr).discard(lineage)
+        return expired
+
+    def _rechecked(self, kind: str, lineage: str) -> bool:
+        """A saved decision that wasn't trusted, so is in the Brand's sets because this run made it again."""
+        entry = self.entries[kind].get(lineage)
+        return entry is not None and not _trusted(entry) and entry.get("updated", "") < self.run_started
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    def to_dict(self) -> dict:
+        return {"version": LINEAGE_MEMORY_VERSION, **self.entries}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LineageMemory':
+        memory = cls()
+        if data.get("version") != LINEAGE_MEMORY_VERSION:
+            return memory
+        for kind in KINDS:
+            memory.entries[kind] = {
+                lineage: entry for lineage, entry in (data.get(kind) or {}).items()
+                if entry.get("version") == LINEAGE_MEMORY_VERSION
+            }
+        return memory
+
+    def save(self, domain: str, brand=None):
+        """
+        Save this run's decisions with the still-current saved ones.
+
+        With `brand`, decisions made outside record() (its lineage sets) are
+        kept too, at "Low" confidence so they are re-checked next run. Saved
+        "Low" decisions the Brand's sets made again this run are confirmed
+        (or replaced, if the decision changed).
+        """
+        from stages.storage import update_brand_meta
+
+        if brand is not None:
+            for kind, (approved_attr, rejected_attr) in KINDS.items():
+                approved = getattr(brand, approved_attr)
+                rejected = getattr(brand, rejected_attr) - approved
+                known = self.entries[kind]
+                self.record(kind, [l for l in approved if l not in known], [l for l in rejected if l not in known], "Low")
+                self.record(kind, [l for l in approved if self._rechecked(kind, l)],
+                            [l for l in rejected if self._rechecked(kind, l)], "Low")
+
+        with self._lock:
+            for kind in KINDS:
+                for lineage, entry in list(self.entries[kind].items()):
+                    if lineage in self.seen_lineages[kind]:
+                        entry["missed_runs"] = 0
+                    else:
+                        entry["missed_runs"] = entry.get("missed_runs", 0) + 1
+                        if entry["missed_runs"] >= MAX_MISSED_RUNS:
+                            del self.entries[kind][lineage]
+            data = self.to_dict()
+
+        update_brand_meta(domain, "lineages", data)
+        counts = ", ".join(f"{len(self.entries[kind])} {kind}" for kind in KINDS)
+        print(f"Lineage memory saved ({counts} lineages)")
+
+
+def _trusted(entry: dict) -> bool:
+    return entry.get("confidence") in TRUSTED_CONFIDENCE or entry.get("confirmations", 0) >= LOW_CONFIRMATIONS
+
+
+def load_saved_lineage_memory(domain: str) -> Optional[LineageMemory]:
+    """Lineage decisions saved by previous runs, or None."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    data = meta.get("lineages")
+    if not data:
+        return None
+    return LineageMemory.from_dict(data)
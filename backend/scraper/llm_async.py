@@ -0,0 +1,274 @@
+"""
+Asyncio-native LLM client - every request in the process shares one event loop.
+
+THE PROBLEM:
+    LLMHandler.call() was synchronous and retried with time.sleep():
+    - stage 2 calls it from ThreadPoolExecutor workers, and nothing bounds how
+      many requests are in flight - a 60-category brand bursts into 429s, then
+      every worker sleeps the same fixed 2s and bursts again
+    - async code paths (gallery discovery, navigation classification, popup
+      detection) call it directly, freezing their event loop - and every
+      page on it - for the seconds each request takes
+    - identical prompts sent at the same time (forked explorers classifying
+      the same button, the same gallery on two tabs) are each paid for
+
+THE SOLUTION:
+    AsyncLLMClient sends every request from one background event loop, with:
+    - a global in-flight limit (LLM_MAX_IN_FLIGHT, default 8)
+    - a token-per-minute budget (LLM_TOKENS_PER_MINUTE, default 400k): a
+      request waits until its estimated input tokens + max_tokens fit, and
+      the estimate is settled against the real usage once it returns
+    - jittered exponential backoff on rate limits, overload, timeouts and
+      connection errors (Retry-After honoured) - asyncio.sleep, so retries
+      never hold a thread or a loop
+    - coalescing: a request identical to one in flight awaits that request's
+      response (with zero usage - it was paid for once)
+
+    LLMHandler.acall/acall_text/acall_with_image await it from any event
+    loop; LLMHandler.call/call_text/call_with_image are thin sync wrappers.
+
+USAGE:
+    client = get_async_client()
+    message = await client.create(model=..., max_tokens=..., messages=[...])
+    result = client.run(handler.acall(prompt, ...))     # block from a thread
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_TOKENS_PER_MINUTE = 400_000
+DEFAULT_MAX_RETRIES = 5
+
+# Backoff: equal jitter around BASE * 2^attempt, capped
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# Rough token costs for budgeting before the real usage is known
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1600
+
+# Errors worth retrying - anything else fails straight back to the caller
+RETRIABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRIABLE_ERRORS = {'RateLimitError', 'APIConnectionError', 'APITimeoutError', 'InternalServerError',
+                    'OverloadedError', 'TimeoutError', 'ConnectionError'}
+RETRIABLE_KEYWORDS = ('timeout', 'rate limit', 'too many requests', 'overloaded')
+
+
+def is_retriable(error: Exception) -> bool:
+    """True for transient API failures (rate limit, overload, 5xx, timeout, connection)."""
+    if getattr(error, 'status_code', None) in RETRIABLE_STATUS:
+        return True
+    if type(error).__name__ in RETRIABLE_ERRORS:
+        return True
+    return any(keyword in str(error).lower() for keyword in RETRIABLE_KEYWORDS)
+
+
+def backoff_delay(attempt: int, error: Exception = None) -> float:
+    """Seconds before retry `attempt` (0-based) - Retry-After if the API sent one."""
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    try:
+        if retry_after:
+            return min(float(retry_after), BACKOFF_CAP) + random.uniform(0, 1)
+    except ValueError:
+        pass
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Input tokens (from prompt size) + max_tokens of a messages.create() request."""
+    chars = 0
+    images = 0
+    for message in request.get('messages', []):
+        content = message.get('content')
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for block in content or []:
+            if block.get('type') == 'image':
+                images += 1
+            else:
+                chars += len(block.get('text', ''))
+    if request.get('tools'):
+        chars += len(json.dumps(request['tools']))
+    return chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS + request.get('max_tokens', 0)
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class TokenBudget:
+    """Token bucket refilled continuously at tokens_per_minute / 60 per second."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.available = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO - a large request isn't starved by small ones
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.available < tokens:
+                await asyncio.sleep((tokens - self.available) * 60 / self.capacity)
+                self._refill()
+            self.available -= tokens
+
+    def settle(self, estimated: int, actual: int):
+        """Correct a reservation once the real usage is known (may go negative)."""
+        self.available = min(self.capacity, self.available + estimated - actual)
+
+
+class AsyncLLMClient:
+    """Anthropic messages client with global concurrency, token budget, backoff and coalescing."""
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        self.max_in_flight = max_in_flight
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+
+        # Created on the background loop
+        self._api = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._budget: Optional[TokenBudget] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {"requests": 0, "coalesced": 0, "retries": 0, "budget_wait_s": 0.0}
+
+    # =========================================================================
+    # Background loop
+    # =========================================================================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._start_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    started = threading.Event()
+
+                    def run():
+                        asyncio.set_event_loop(loop)
+                        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+                        self._budget = TokenBudget(self.tokens_per_minute)
+                        started.set()
+                        loop.run_forever()
+
+                    threading.Thread(target=run, name="llm-client", daemon=True).start()
+                    started.wait()
+                    self._loop = loop
+        return self._loop
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def run(self, coro):
+        """Run a coroutine on the client loop and block until it's done (sync callers)."""
+        loop = self._ensure_loop()
+        if self._on_loop():
+            coro.close()
+            raise RuntimeError("Blocking LLM call on the LLM client loop - await it instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def create(self, **request) -> Any:
+        """messages.create() - awaitable from any event loop; the request runs on the client loop."""
+        loop = self._ensure_loop()
+        if self._on_loop():
+            return await self._create(request)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._create(request), loop))
+
+    # =========================================================================
+    # Requests (client loop only)
+    # =========================================================================
+
+    async def _create(self, request: Dict[str, Any]) -> Any:
+        key = request_key(request)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            message = await asyncio.shield(task)
+            return _without_usage(message)
+
+        task = asyncio.ensure_future(self._send(request))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _send(self, request: Dict[str, Any]) -> Any:
+        if self._api is None:
+            from anthropic import AsyncAnthropic
+            # Retries are ours - the SDK's would sleep outside the budget
+            self._api = AsyncAnthropic(api_key=os.getenv('CLAUDE_API_KEY') or os.getenv('ANTHROPIC_API_KEY'),
+                                       max_retries=0)
+
+        estimated = estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            waited = time.monotonic()
+            await self._budget.acquire(estimated)
+            self.stats["budget_wait_s"] += time.monotonic() - waited
+
+            try:
+                async with self._semaphore:
+                    self.stats["requests"] += 1
+                    message = await self._api.messages.create(**request)
+            except Exception as e:
+                self._budget.settle(estimated, 0)
+                if attempt >= self.max_retries or not is_retriable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                self.stats["retries"] += 1
+                print(f"🔄 LLM retry {attempt + 1}/{self.max_retries} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            usage = getattr(message, 'usage', None)
+            if usage is not None:
+                self._budget.settle(estimated, usage.input_tokens + usage.output_tokens)
+            return message
+
+
+def _without_usage(message: Any) -> Any:
+    """Copy of a shared response with zero usage - its tokens were counted for the original caller."""
+    usage = getattr(message, 'usage', None)
+    if usage is None or not hasattr(message, 'model_copy'):
+        return message
+    return message.model_copy(update={"usage": usage.model_copy(update={"input_tokens": 0, "output_tokens": 0})})
+
+
+_client: Optional[AsyncLLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_async_client() -> AsyncLLMClient:
+    """Process-wide client - limits apply across every thread and event loop."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncLLMClient(
+                    max_in_flight=int(os.getenv('LLM_MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT)),
+                    tokens_per_minute=int(os.getenv('LLM_TOKENS_PER_MINUTE', DEFAULT_TOKENS_PER_MINUTE)),
+                )
+    return _client
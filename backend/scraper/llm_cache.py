@@ -0,0 +1,244 @@
+"""
+Content-addressed on-disk cache of LLM responses.
+
+THE PROBLEM:
+    Re-running a brand sends the same prompts again: the nav tree from the
+    same link dump, lineage classification of the same DOM patterns, gallery
+    discovery on the same category HTML, brand validation of the same pages.
+    Every one is a paid round trip whose answer is already known from the
+    last run.
+
+THE SOLUTION:
+    Successful responses are stored in SQLite (extractions/llm_cache.sqlite),
+    keyed by a hash of everything that determines the answer:
+    - model and max_tokens (and temperature)
+    - sha256 of the prompt (and of the image, for vision calls)
+    - the response model's JSON schema, for structured output
+
+    The prompt is part of the key, so a changed page means a changed prompt
+    and a fresh call - entries never need invalidating, only expiring:
+    - per-operation TTLs (OPERATION_TTLS) bound how long an answer is trusted
+    - the file is kept under LLM_CACHE_MAX_MB, least recently used evicted first
+
+    Set LLM_CACHE=0 to disable; pass cache=False to bypass a single call.
+
+USAGE:
+    cache = get_llm_cache()                   # None when disabled
+    key = make_key(model, prompt, max_tokens, schema=schema)
+    entry = cache.get(key, operation)         # {'value', 'usage'} or None
+    if entry is None:
+        ... call the API ...
+        cache.put(key, operation, {"data": data}, usage)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "extractions" / "llm_cache.sqlite"
+
+# Size limit of the cache file's payloads (LLM_CACHE_MAX_MB overrides)
+DEFAULT_MAX_MB = 256
+
+# Eviction trims down to this share of the limit so it doesn't run on every put
+EVICT_TO = 0.9
+
+DAY = 24 * 3600
+
+# How long an answer is trusted, by operation (seconds)
+DEFAULT_TTL = 7 * DAY
+OPERATION_TTLS = {
+    # Menu structure - prompts carry the live link dump, so a changed menu misses anyway
+    "nav_tree_extraction": 14 * DAY,
+    "identify_menu_button": 14 * DAY,
+    "identify_tabs": 14 * DAY,
+    "identify_back_button": 14 * DAY,
+    "classify_button": 14 * DAY,
+    "classify_buttons_batch": 14 * DAY,
+    "filter_menu_containers": 14 * DAY,
+    # URL classification - lineage patterns of one site
+    "lineage_filtering": 14 * DAY,
+    "url_classification": 14 * DAY,
+    "product_link_classification": 14 * DAY,
+    # Page layout discovery - site redesigns invalidate these soonest
+    "gallery_discovery": 7 * DAY,
+    "dom_pattern_discovery": 7 * DAY,
+    "api_schema_discovery": 7 * DAY,
+    "product_container_analysis": 7 * DAY,
+    "pagination_analysis": 7 * DAY,
+    "pagination_detection": 7 * DAY,
+    # Product pages - the prompt is the page itself
+    "product_image_extraction": 30 * DAY,
+    "image_filter": 30 * DAY,
+    "ground_truth_extraction": 30 * DAY,
+}
+
+
+def ttl_for(operation: str) -> int:
+    return OPERATION_TTLS.get(operation, DEFAULT_TTL)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def make_key(model: str, prompt: str, max_tokens: int, schema: Optional[dict] = None,
+             image_b64: Optional[str] = None, media_type: Optional[str] = None,
+             temperature: float = 0.0) -> str:
+    """Cache key of one request - identical requests give identical keys."""
+    parts = {
+        "model": model,
+        "prompt": _sha256(prompt),
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "schema": schema,
+        "image": _sha256(image_b64) if image_b64 else None,
+        "media_type": media_type if image_b64 else None,
+    }
+    return _sha256(json.dumps(parts, sort_keys=True, default=str))
+
+
+class LLMResponseCache:
+    """SQLite store of LLM responses with per-operation TTLs and LRU size eviction."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # One connection shared by pipeline threads - every access holds the lock
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                operation TEXT,
+                value TEXT NOT NULL,
+                input_tokens INTEGER DEFAULT 0,
+                output_tokens INTEGER DEFAULT 0,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER DEFAULT 0
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        # Process-wide counters (per-stage numbers live in LLMUsageTracker)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_avoided = {"input_tokens": 0, "output_tokens": 0}
+
+    def get(self, key: str, operation: str) -> Optional[Dict[str, Any]]:
+        """Stored {'value', 'usage'} for key, or None if absent or older than the operation's TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, input_tokens, output_tokens, size, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row and now - row[4] > ttl_for(operation):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._bytes -= row[3]
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            self.tokens_avoided["input_tokens"] += row[1]
+            self.tokens_avoided["output_tokens"] += row[2]
+
+        return {"value": json.loads(row[0]), "usage": {"input_tokens": row[1], "output_tokens": row[2]}}
+
+    def put(self, key: str, operation: str, value: Dict[str, Any], usage: Optional[Dict[str, int]] = None):
+        """Store a successful response. Values must be JSON-serialisable."""
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        usage = usage or {}
+        size = len(payload)
+        now = time.time()
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, operation, value, input_tokens, output_tokens, size, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, operation, payload, usage.get("input_tokens", 0), usage.get("output_tokens", 0),
+                 size, now, now)
+            )
+            self._bytes += size - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under EVICT_TO of the limit. Caller holds the lock."""
+        target = self.max_bytes * EVICT_TO
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            evicted.append((key,))
+            self._bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        print(f"    [LLM CACHE] Evicted {len(evicted)} entries ({self._bytes / 1024 / 1024:.1f} MB kept)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            **self.tokens_avoided,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._bytes = 0
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE", "1").lower() not in ("0", "false", "off", "no")
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache, or None when disabled (LLM_CACHE=0) or the file can't be opened."""
+    global _cache
+    if not cache_enabled():
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH
+                max_mb = float(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB))
+                try:
+                    _cache = LLMResponseCache(path, max_bytes=int(max_mb * 1024 * 1024))
+                except sqlite3.Error as e:
+                    print(f"    [LLM CACHE] Disabled - could not open {path}: {e}")
+                    os.environ["LLM_CACHE"] = "0"
+                    return None
+    return _cache
@@ -9,6 +9,7 @@ All LLM calls should go through this module for:
 - Centralized metrics reporting
 """
 
+import asyncio
 import time
 import json
 import re
@@ -28,6 +29,13 @@ try:
 except ImportError:
     ClaudeInterface = None
 
+try:
+    from scraper.llm_cache import get_llm_cache, make_key
+except ImportError:
+    get_llm_cache = None
+
+from scraper.llm_async import backoff_delay, get_async_client, is_retriable
+
 
 # Claude Sonnet 4 pricing (per 1M tokens)
 INPUT_COST_PER_M = 3.0   # $3 per 1M input tokens
@@ -102,6 +110,25 @@ class LLMUsageTracker:
     def record_call(cls, operation: str, input_tokens: int, output_tokens: int,
                     stage: str = None):
         """Record an LLM call with its usage."""
+        op = cls._get_operation(operation, stage)
+        op["calls"] += 1
+        op["input_tokens"] += input_tokens
+        op["output_tokens"] += output_tokens
+        op["cost"] += calculate_cost(input_tokens, output_tokens)
+
+    @classmethod
+    def record_cache(cls, operation: str, hit: bool, input_tokens: int = 0,
+                     output_tokens: int = 0, stage: str = None):
+        """Record a response cache lookup. Hits carry the tokens the original call used."""
+        op = cls._get_operation(operation, stage)
+        if hit:
+            op["cache_hits"] += 1
+            op["cost_avoided"] += calculate_cost(input_tokens, output_tokens)
+        else:
+            op["cache_misses"] += 1
+
+    @classmethod
+    def _get_operation(cls, operation: str, stage: str = None) -> Dict[str, Any]:
         stage = stage or cls._current_stage
 
         if stage not in cls._operations:
@@ -112,14 +139,12 @@ class LLMUsageTracker:
                 "calls": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
-                "cost": 0.0
+                "cost": 0.0,
+                "cache_hits": 0,
+                "cache_misses": 0,
+                "cost_avoided": 0.0
             }
-
-        op = cls._operations[stage][operation]
-        op["calls"] += 1
-        op["input_tokens"] += input_tokens
-        op["output_tokens"] += output_tokens
-        op["cost"] += calculate_cost(input_tokens, output_tokens)
+        return cls._operations[stage][operation]
 
     @classmethod
     def get_stage_summary(cls, stage: str) -> Dict[str, Any]:
@@ -127,7 +152,8 @@ class LLMUsageTracker:
         if stage not in cls._operations:
             return {
                 "operations": [],
-                "summary": {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+                "summary": {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0,
+                            "cache_hits": 0, "cache_misses": 0, "cost_avoided": 0.0}
             }
 
         operations = []
@@ -135,6 +161,9 @@ class LLMUsageTracker:
         total_input = 0
         total_output = 0
         total_cost = 0.0
+        total_hits = 0
+        total_misses = 0
+        total_avoided = 0.0
 
         for op_name, op_data in cls._operations[stage].items():
             operations.append({
@@ -142,12 +171,18 @@ class LLMUsageTracker:
                 "calls": op_data["calls"],
                 "input_tokens": op_data["input_tokens"],
                 "output_tokens": op_data["output_tokens"],
-                "cost": op_data["cost"]
+                "cost": op_data["cost"],
+                "cache_hits": op_data["cache_hits"],
+                "cache_misses": op_data["cache_misses"],
+                "cost_avoided": op_data["cost_avoided"]
             })
             total_calls += op_data["calls"]
             total_input += op_data["input_tokens"]
             total_output += op_data["output_tokens"]
             total_cost += op_data["cost"]
+            total_hits += op_data["cache_hits"]
+            total_misses += op_data["cache_misses"]
+            total_avoided += op_data["cost_avoided"]
 
         return {
             "operations": operations,
@@ -155,7 +190,10 @@ class LLMUsageTracker:
                 "calls": total_calls,
                 "input_tokens": total_input,
                 "output_tokens": total_output,
-                "cost": round(total_cost, 6)
+                "cost": round(total_cost, 6),
+                "cache_hits": total_hits,
+                "cache_misses": total_misses,
+                "cost_avoided": round(total_avoided, 6)
             }
         }
 
@@ -163,15 +201,14 @@ class LLMUsageTracker:
     def get_all_stages_summary(cls) -> Dict[str, Any]:
         """Get summary across all stages."""
         result = {}
-        grand_total = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0}
+        grand_total = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost": 0.0,
+                       "cache_hits": 0, "cache_misses": 0, "cost_avoided": 0.0}
 
         for stage in cls._operations:
             stage_summary = cls.get_stage_summary(stage)
             result[stage] = stage_summary
-            grand_total["calls"] += stage_summary["summary"]["calls"]
-            grand_total["input_tokens"] += stage_summary["summary"]["input_tokens"]
-            grand_total["output_tokens"] += stage_summary["summary"]["output_tokens"]
-            grand_total["cost"] += stage_summary["summary"]["cost"]
+            for key in grand_total:
+                grand_total[key] += stage_summary["summary"][key]
 
         result["_total"] = {
             "summary": grand_total
@@ -204,9 +241,14 @@ class LLMHandler:
     - Retry logic
     - Structured output parsing
 
+    Requests are sent by the shared AsyncLLMClient (llm_async.py): async code
+    awaits acall/acall_text/acall_with_image, threads use the blocking
+    call/call_text/call_with_image wrappers.
+
     Usage:
         handler = LLMHandler()
         result = handler.call(prompt, operation="gallery_discovery")
+        result = await handler.acall(prompt, operation="gallery_discovery")
     """
 
     # Class-level usage tracking (legacy - for backwards compatibility)
@@ -274,9 +316,79 @@ class LLMHandler:
             # New operation-level tracking
             LLMUsageTracker.record_call(operation, input_tokens, output_tokens)
 
-    def call(self, prompt: str, expected_format: str = "json", response_model: BaseModel = None,
-             max_tokens: int = 8192, max_retries: int = 4, debug: bool = False,
-             operation: str = "llm_call") -> Dict[str, Any]:
+    # =========================================================================
+    # Response cache (see llm_cache.py)
+    # =========================================================================
+
+    def _cache_key(self, cache: bool, prompt: str, max_tokens: int, **parts) -> Optional[str]:
+        """Cache key for this request, or None when caching is off for it."""
+        if not cache or get_llm_cache is None or get_llm_cache() is None:
+            return None
+        return make_key(self.model, prompt, max_tokens, **parts)
+
+    def _cache_get(self, key: Optional[str], operation: str) -> Optional[Dict[str, Any]]:
+        """Cached result for key (a free call - zero usage), or None. Both count in LLMUsageTracker."""
+        if key is None:
+            return None
+        entry = get_llm_cache().get(key, operation)
+        if entry is None:
+            LLMUsageTracker.record_cache(operation, hit=False)
+            return None
+
+        LLMUsageTracker.record_cache(operation, hit=True, **entry["usage"])
+        return {
+            **entry["value"],
+            "latency_ms": 0.0,
+            "success": True,
+            "usage": {"input_tokens": 0, "output_tokens": 0},
+            "cached": True
+        }
+
+    def _cache_put(self, key: Optional[str], operation: str, value: Dict[str, Any],
+                   usage: Optional[Dict[str, int]]):
+        if key is not None:
+            get_llm_cache().put(key, operation, value, usage)
+
+    # =========================================================================
+    # Async API - requests go through the shared AsyncLLMClient (llm_async.py)
+    # =========================================================================
+
+    def _message_request(self, content: Any, max_tokens: int, temperature: float = None,
+                         response_model: BaseModel = None) -> Dict[str, Any]:
+        """messages.create() arguments - structured output via a forced tool when response_model is given."""
+        request = {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": content}]
+        }
+        if temperature is not None:
+            request["temperature"] = temperature
+        if response_model:
+            request["tool_choice"] = {"type": "tool", "name": "structured_output"}
+            request["tools"] = [{
+                "name": "structured_output",
+                "description": "Return structured data matching the schema",
+                "input_schema": response_model.model_json_schema()
+            }]
+        return request
+
+    @staticmethod
+    def _message_usage(message: Any) -> Optional[Dict[str, int]]:
+        usage = getattr(message, 'usage', None)
+        if usage is None:
+            return None
+        return {"input_tokens": usage.input_tokens, "output_tokens": usage.output_tokens}
+
+    @staticmethod
+    def _structured_output(message: Any) -> Dict[str, Any]:
+        for block in message.content or []:
+            if getattr(block, 'type', None) == 'tool_use':
+                return block.input
+        raise ValueError("No structured output received from API")
+
+    async def acall(self, prompt: str, expected_format: str = "json", response_model: BaseModel = None,
+                    max_tokens: int = 8192, max_retries: int = 4, debug: bool = False,
+                    operation: str = "llm_call", cache: bool = True) -> Dict[str, Any]:
         """
         Generic LLM call with response parsing and intelligent retry logic
         
@@ -286,100 +398,113 @@ class LLMHandler:
             response_model: Pydantic model class for structured JSON output
             max_tokens: Maximum tokens for response (default: 8192)
             max_retries: Maximum number of retries on different errors (default: 4)
+            cache: Serve/store the response from the on-disk cache (default: True)
             
         Returns:
             Dictionary with parsed response and metadata
         """
         start_time = time.time()
         errors_seen = set()
-        
+
+        structured = expected_format == "json" and response_model is not None
+        cache_key = self._cache_key(
+            cache and self.client is not None, prompt, max_tokens, temperature=0.0,
+            schema=response_model.model_json_schema() if structured else None
+        )
+        cached = self._cache_get(cache_key, operation)
+        if cached:
+            return {**cached, "attempts": 0}
+
+        client = get_async_client()
+        request = self._message_request(prompt, max_tokens, temperature=0.0,
+                                        response_model=response_model if structured else None)
+        if debug:
+            print(f"🔍 DEBUG: {operation} - {len(prompt)} chars (~{len(prompt)//4} tokens), "
+                  f"max_tokens={max_tokens}, structured={structured}")
+
         for attempt in range(max_retries + 1):
             try:
-                if self.client:
-                    if expected_format == "json" and response_model:
-                        # Use structured output with native API
-                        response = self.client.generate(prompt, max_tokens=max_tokens, response_model=response_model, debug=debug)
-
-                        # Check for empty response (common LLM failure mode)
-                        if not response or response == {}:
-                            empty_error = "LLM returned empty structured output ({})"
-                            print(f"⚠️  {empty_error}")
-
-                            # Treat empty response as a retriable error
-                            if attempt < max_retries:
-                                wait_seconds = 2
-                                print(f"🔄 Retry {attempt + 1}/{max_retries} after {wait_seconds}s due to empty response")
-                                time.sleep(wait_seconds)
-                                continue  # Retry
-                            else:
-                                # Last attempt failed, return error
-                                latency_ms = (time.time() - start_time) * 1000
-                                return {
-                                    "error": empty_error,
-                                    "latency_ms": latency_ms,
-                                    "success": False,
-                                    "attempts": attempt + 1
-                                }
-
-                        latency_ms = (time.time() - start_time) * 1000
-
-                        # response is already the structured data
-                        if response_model:
-                            try:
-                                validated_result = response_model(**response)
-                                result = validated_result.model_dump()
-                            except Exception as validation_error:
-                                print(f"⚠️  Pydantic validation failed: {validation_error}")
-                                print(f"    Raw response: {response}")
-
-                                # If validation fails, treat as retriable error
-                                if attempt < max_retries:
-                                    wait_seconds = 2
-                                    print(f"🔄 Retry {attempt + 1}/{max_retries} after {wait_seconds}s due to validation failure")
-                                    time.sleep(wait_seconds)
-                                    continue  # Retry
-                                else:
-                                    # Last attempt, return the error
-                                    return {
-                                        "error": f"Validation failed: {validation_error}",
-                                        "latency_ms": latency_ms,
-                                        "success": False,
-                                        "attempts": attempt + 1,
-                                        "raw_response": response
-                                    }
+                if not self.client:
+                    raise NotImplementedError("No LLM client available - use WebFetch externally")
+
+                # Transient API errors are retried (with backoff) inside the client
+                message = await client.create(**request)
+                usage = self._message_usage(message)
+                self._track_usage(usage, operation)
+
+                if structured:
+                    # Use structured output with native API
+                    response = self._structured_output(message)
+
+                    # Check for empty response (common LLM failure mode)
+                    if not response or response == {}:
+                        empty_error = "LLM returned empty structured output ({})"
+                        print(f"⚠️  {empty_error}")
+
+                        # Treat empty response as a retriable error
+                        if attempt < max_retries:
+                            wait_seconds = backoff_delay(attempt)
+                            print(f"🔄 Retry {attempt + 1}/{max_retries} after {wait_seconds:.1f}s due to empty response")
+                            await asyncio.sleep(wait_seconds)
+                            continue  # Retry
                         else:
-                            result = response
-
-                        # Get token usage if available
-                        usage = self.client.get_last_usage() if hasattr(self.client, 'get_last_usage') else None
-                        self._track_usage(usage, operation)
-
-                        return {
-                            "data": result,
-                            "latency_ms": latency_ms,
-                            "success": True,
-                            "attempts": attempt + 1,
-                            "usage": usage
-                        }
-                    else:
-                        # Regular text generation
-                        response = self.client.generate(prompt, max_tokens=max_tokens)
-                        latency_ms = (time.time() - start_time) * 1000
-
-                        # Get token usage if available
-                        usage = self.client.get_last_usage() if hasattr(self.client, 'get_last_usage') else None
-                        self._track_usage(usage, operation)
-
-                        return {
-                            "response": response,
-                            "latency_ms": latency_ms,
-                            "success": True,
-                            "attempts": attempt + 1,
-                            "usage": usage
-                        }
+                            # Last attempt failed, return error
+                            latency_ms = (time.time() - start_time) * 1000
+                            return {
+                                "error": empty_error,
+                                "latency_ms": latency_ms,
+                                "success": False,
+                                "attempts": attempt + 1
+                            }
+
+                    latency_ms = (time.time() - start_time) * 1000
+
+                    try:
+                        validated_result = response_model(**response)
+                        result = validated_result.model_dump()
+                    except Exception as validation_error:
+                        print(f"⚠️  Pydantic validation failed: {validation_error}")
+                        print(f"    Raw response: {response}")
+
+                        # If validation fails, treat as retriable error
+                        if attempt < max_retries:
+                            wait_seconds = backoff_delay(attempt)
+                            print(f"🔄 Retry {attempt + 1}/{max_retries} after {wait_seconds:.1f}s due to validation failure")
+                            await asyncio.sleep(wait_seconds)
+                            continue  # Retry
+                        else:
+                            # Last attempt, return the error
+                            return {
+                                "error": f"Validation failed: {validation_error}",
+                                "latency_ms": latency_ms,
+                                "success": False,
+                                "attempts": attempt + 1,
+                                "raw_response": response
+                            }
+
+                    self._cache_put(cache_key, operation, {"data": result}, usage)
+
+                    return {
+                        "data": result,
+                        "latency_ms": latency_ms,
+                        "success": True,
+                        "attempts": attempt + 1,
+                        "usage": usage
+                    }
                 else:
-                    raise NotImplementedError("No LLM client available - use WebFetch externally")
-                    
+                    # Regular text generation
+                    response = message.content[0].text.strip()
+                    latency_ms = (time.time() - start_time) * 1000
+                    self._cache_put(cache_key, operation, {"response": response}, usage)
+
+                    return {
+                        "response": response,
+                        "latency_ms": latency_ms,
+                        "success": True,
+                        "attempts": attempt + 1,
+                        "usage": usage
+                    }
+
             except Exception as e:
                 error_str = str(e)
                 error_type = type(e).__name__
@@ -387,26 +512,14 @@ class LLMHandler:
                 # Check if this is a new error we haven't seen
                 error_signature = f"{error_type}: {error_str}"
                 
-                # Determine if we should retry
-                should_retry = False
-                wait_seconds = 0
-                
-                # Always retry on timeout/rate limit errors
-                if any(keyword in error_str.lower() for keyword in ['timeout', 'rate limit', 'too many requests', 'overloaded']):
-                    should_retry = True
-                    wait_seconds = min(2 ** attempt, 30)  # Exponential backoff, max 30s
-                    print(f"🔄 Retry {attempt + 1}/{max_retries} after {wait_seconds}s due to: {error_str}")
-                
-                # Retry on new errors (not seen before)
-                elif error_signature not in errors_seen:
-                    should_retry = True
+                # Timeouts/rate limits reaching here already used up the client's retries;
+                # retry once on new errors (not seen before)
+                should_retry = not is_retriable(e) and error_signature not in errors_seen
+                if should_retry:
                     errors_seen.add(error_signature)
-                    wait_seconds = 1  # Short wait for new errors
                     print(f"🔄 Retry {attempt + 1}/{max_retries} on new error: {error_str}")
-                
-                # Don't retry if we've seen this exact error before (unless it's timeout/rate limit)
                 else:
-                    print(f"❌ Skipping retry - already seen error: {error_str}")
+                    print(f"❌ Skipping retry - {error_str}")
                 
                 # If this is the last attempt or we shouldn't retry, return error
                 if attempt >= max_retries or not should_retry:
@@ -419,12 +532,12 @@ class LLMHandler:
                         "errors_seen": list(errors_seen)
                     }
                 
-                # Wait before retry
-                if wait_seconds > 0:
-                    time.sleep(wait_seconds)
+                # Short wait before retrying a new error
+                await asyncio.sleep(backoff_delay(0))
 
-    def call_with_image(self, prompt: str, image_b64: str, media_type: str = "image/png",
-                        max_tokens: int = 8000, operation: str = "vision_call") -> Dict[str, Any]:
+    async def acall_with_image(self, prompt: str, image_b64: str, media_type: str = "image/png",
+                               max_tokens: int = 8000, operation: str = "vision_call",
+                               cache: bool = True) -> Dict[str, Any]:
         """
         LLM call with an image (vision).
 
@@ -434,62 +547,25 @@ class LLMHandler:
             media_type: Image media type (default: image/png)
             max_tokens: Maximum tokens for response
             operation: Operation name for tracking
+            cache: Serve/store the response from the on-disk cache (default: True)
 
         Returns:
             Dictionary with response text and metadata
         """
-        import os
-        from anthropic import Anthropic
-
-        start_time = time.time()
-
-        try:
-            # Use Anthropic client directly for vision calls
-            client = Anthropic(api_key=os.getenv('CLAUDE_API_KEY'))
-
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                messages=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": image_b64}},
-                        {"type": "text", "text": prompt}
-                    ]
-                }]
-            )
-
-            latency_ms = (time.time() - start_time) * 1000
-
-            # Track usage
-            if response.usage:
-                usage = {
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens
-                }
-                self._track_usage(usage, operation)
-            else:
-                usage = None
-
-            result_text = response.content[0].text.strip()
-
-            return {
-                "response": result_text,
-                "latency_ms": latency_ms,
-                "success": True,
-                "usage": usage
-            }
-
-        except Exception as e:
-            latency_ms = (time.time() - start_time) * 1000
-            return {
-                "error": str(e),
-                "latency_ms": latency_ms,
-                "success": False
-            }
-
-    def call_text(self, prompt: str, max_tokens: int = 1500,
-                  operation: str = "text_call") -> Dict[str, Any]:
+        cache_key = self._cache_key(cache, prompt, max_tokens, temperature=None,
+                                    image_b64=image_b64, media_type=media_type)
+        cached = self._cache_get(cache_key, operation)
+        if cached:
+            return cached
+
+        content = [
+            {"type": "image", "source": {"type": "base64", "media_type": media_type, "data": image_b64}},
+            {"type": "text", "text": prompt}
+        ]
+        return await self._acall_plain(content, max_tokens, operation, cache_key)
+
+    async def acall_text(self, prompt: str, max_tokens: int = 1500,
+                         operation: str = "text_call", cache: bool = True) -> Dict[str, Any]:
         """
         Simple text-only LLM call.
 
@@ -497,37 +573,34 @@ class LLMHandler:
             prompt: Text prompt to send
             max_tokens: Maximum tokens for response
             operation: Operation name for tracking
+            cache: Serve/store the response from the on-disk cache (default: True)
 
         Returns:
             Dictionary with response text and metadata
         """
-        import os
-        from anthropic import Anthropic
+        cache_key = self._cache_key(cache, prompt, max_tokens, temperature=None)
+        cached = self._cache_get(cache_key, operation)
+        if cached:
+            return cached
 
+        return await self._acall_plain(prompt, max_tokens, operation, cache_key)
+
+    async def _acall_plain(self, content: Any, max_tokens: int, operation: str,
+                           cache_key: Optional[str]) -> Dict[str, Any]:
+        """One request, text response - shared by acall_text and acall_with_image."""
         start_time = time.time()
 
         try:
-            client = Anthropic(api_key=os.getenv('CLAUDE_API_KEY'))
-
-            response = client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                messages=[{"role": "user", "content": prompt}]
-            )
+            message = await get_async_client().create(**self._message_request(content, max_tokens))
 
             latency_ms = (time.time() - start_time) * 1000
 
             # Track usage
-            if response.usage:
-                usage = {
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens
-                }
-                self._track_usage(usage, operation)
-            else:
-                usage = None
+            usage = self._message_usage(message)
+            self._track_usage(usage, operation)
 
-            result_text = response.content[0].text.strip()
+            result_text = message.content[0].text.strip()
+            self._cache_put(cache_key, operation, {"response": result_text}, usage)
 
             return {
                 "response": result_text,
@@ -543,4 +616,31 @@ class LLMHandler:
                 "latency_ms": latency_ms,
                 "success": False
             }
-    
+
+    # =========================================================================
+    # Sync API - thin wrappers that block on the async client
+    # =========================================================================
+
+    def call(self, prompt: str, expected_format: str = "json", response_model: BaseModel = None,
+             max_tokens: int = 8192, max_retries: int = 4, debug: bool = False,
+             operation: str = "llm_call", cache: bool = True) -> Dict[str, Any]:
+        """Blocking acall() - for threads. Async code should await acall()."""
+        return get_async_client().run(self.acall(
+            prompt, expected_format=expected_format, response_model=response_model, max_tokens=max_tokens,
+            max_retries=max_retries, debug=debug, operation=operation, cache=cache
+        ))
+
+    def call_with_image(self, prompt: str, image_b64: str, media_type: str = "image/png",
+                        max_tokens: int = 8000, operation: str = "vision_call",
+                        cache: bool = True) -> Dict[str, Any]:
+        """Blocking acall_with_image() - for threads. Async code should await acall_with_image()."""
+        return get_async_client().run(self.acall_with_image(
+            prompt, image_b64, media_type=media_type, max_tokens=max_tokens, operation=operation, cache=cache
+        ))
+
+    def call_text(self, prompt: str, max_tokens: int = 1500,
+                  operation: str = "text_call", cache: bool = True) -> Dict[str, Any]:
+        """Blocking acall_text() - for threads. Async code should await acall_text()."""
+        return get_async_client().run(self.acall_text(
+            prompt, max_tokens=max_tokens, operation=operation, cache=cache
+        ))
@@ -330,7 +330,7 @@ class ModalBypassEngine:
                         })
                         
                         # Save successful attack to brand data
-                        self._save_successful_attack(modal.modal_type.value, css_rule)
+                        self._save_successful_attack(modal.modal_type.value, css_rule, modal.selector)
                         results["modals_bypassed"] += 1
                         break
                     else:
@@ -672,8 +672,12 @@ class ModalBypassEngine:
         modal_bypasses = self.brand_data.get("modal_bypasses", {})
         return modal_bypasses.get(modal_type, [])
 
-    def _save_successful_attack(self, modal_type: str, css_rule: str):
-        """Save successful attack to brand data"""
+    def _save_successful_attack(self, modal_type: str, css_rule: str, selector: str = None):
+        """Save successful attack to brand data
+
+        The selector it worked on is kept under "selectors" so
+        PopupPlaybook.add_modal_bypasses() can hide it before the page loads.
+        """
         if "modal_bypasses" not in self.brand_data:
             self.brand_data["modal_bypasses"] = {}
         
@@ -685,6 +689,9 @@ class ModalBypassEngine:
             self.brand_data["modal_bypasses"][modal_type].append(css_rule)
             self.brand_data["modal_bypasses"]["last_updated"] = time.strftime("%Y-%m-%d")
 
+        if selector:
+            self.brand_data["modal_bypasses"].setdefault("selectors", {})[selector] = css_rule
+
 
 # Convenience functions for easy integration
 def bypass_page_modals(page: Page, url: str, brand_data: Dict = None) -> Dict[str, any]:
@@ -1,5 +1,7 @@
 """ARIA snapshot utilities."""
 from .diff import (
+    AriaDelta,
+    AriaLineIndex,
     get_new_content,
     diff_aria_states,
     find_menu_start,
@@ -16,6 +18,8 @@ from .elements import (
 )
 
 __all__ = [
+    'AriaDelta',
+    'AriaLineIndex',
     'get_new_content',
     'diff_aria_states',
     'find_menu_start',
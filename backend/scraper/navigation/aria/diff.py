@@ -3,7 +3,114 @@ ARIA snapshot diffing utilities.
 
 Compare before/after ARIA snapshots to detect menu changes,
 new content revealed by interactions, etc.
+
+One-shot helpers (get_new_content, diff_aria_states, ...) rebuild a line set
+of the whole "before" snapshot on every call. Explorers that diff snapshot
+after snapshot keep an AriaLineIndex instead: it holds the line counts of the
+last snapshot and only re-indexes the window between the common prefix and
+suffix of the next one - on a mega-menu that's the few lines a click changed,
+not the whole page.
 """
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class AriaDelta:
+    """What changed between two consecutive snapshots in an AriaLineIndex."""
+    added: list = field(default_factory=list)    # New lines (not anywhere in the previous snapshot), in order
+    removed: list = field(default_factory=list)  # Unique lines gone from the snapshot
+    first_new_idx: Optional[int] = None          # Index of the first added line in the new snapshot
+    removal_ratio: float = 0.0                   # Unique removed lines / unique lines before
+    snapshot_bytes: int = 0
+    diff_ms: float = 0.0
+
+
+class AriaLineIndex:
+    """
+    Line index of the latest ARIA snapshot, updated incrementally.
+
+    Usage:
+        index = AriaLineIndex()
+        index.update(await menu.aria_snapshot())
+        ...click...
+        delta = index.update(await menu.aria_snapshot())
+        delta.added, delta.removal_ratio, delta.diff_ms
+    """
+
+    def __init__(self, snapshot: str = None):
+        # Start as the empty snapshot ('' splits into one empty line)
+        self.snapshot: str = ''
+        self.lines: list[str] = ['']
+        self.counts: Counter = Counter({'': 1})
+        self.stripped: Counter = Counter({'': 1})
+        if snapshot:
+            self.update(snapshot)
+
+    def __contains__(self, line: str) -> bool:
+        return self.counts[line] > 0
+
+    def contains_stripped(self, line: str) -> bool:
+        """Line present at any indentation."""
+        return self.stripped[line.lstrip()] > 0
+
+    def update(self, snapshot: str) -> AriaDelta:
+        """Replace the indexed snapshot, returning what changed."""
+        start = time.perf_counter()
+        if snapshot == self.snapshot:
+            return AriaDelta(snapshot_bytes=len(snapshot), diff_ms=(time.perf_counter() - start) * 1000)
+
+        old = self.lines
+        new = snapshot.split('\n')
+        before_unique = len(self.counts)
+
+        # Only the window between the common prefix and suffix changed
+        prefix = 0
+        limit = min(len(old), len(new))
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        old_window = old[prefix:len(old) - suffix]
+        new_window = new[prefix:len(new) - suffix]
+
+        # Added = not anywhere in the old snapshot (same semantics as the set diff)
+        first_new_idx = None
+        added = []
+        for i, line in enumerate(new_window):
+            if self.counts[line] == 0:
+                if first_new_idx is None:
+                    first_new_idx = prefix + i
+                added.append(line)
+
+        for line in old_window:
+            self.counts[line] -= 1
+            self.stripped[line.lstrip()] -= 1
+        for line in new_window:
+            self.counts[line] += 1
+            self.stripped[line.lstrip()] += 1
+
+        removed = {line for line in old_window if self.counts[line] <= 0}
+        for line in removed:
+            del self.counts[line]
+        for line in {line.lstrip() for line in old_window}:
+            if self.stripped[line] <= 0:
+                del self.stripped[line]
+
+        self.snapshot = snapshot
+        self.lines = new
+        return AriaDelta(
+            added=added,
+            removed=list(removed),
+            first_new_idx=first_new_idx,
+            removal_ratio=len(removed) / before_unique if before_unique else 0.0,
+            snapshot_bytes=len(snapshot),
+            diff_ms=(time.perf_counter() - start) * 1000,
+        )
 
 
 def get_new_content(aria_before: str, aria_after: str) -> str:
@@ -24,6 +24,8 @@ from playwright.async_api import async_playwright, Page
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from scraper.navigation.llm_popup_dismiss import dismiss_popups_with_llm
+from scraper.navigation.menu.cache import cache_menu_button, get_cached_menu_button, reopen_menu_fast
+from scraper.navigation.aria.diff import AriaLineIndex
 from scraper.navigation.output.tree import NavTree, build_tree_from_results
 from scraper.llm_handler import LLMHandler, LLMUsageTracker
 from utils.page_wait import wait_for_page_ready
@@ -45,6 +47,7 @@ class MenuContext:
     base_url: str             # URL to return to if we navigate away
     menu_start_line: str      # First new line when menu opened (for quick check)
     boundary_marker: str = None  # First landmark after menu (e.g., "- banner:") to truncate ARIA
+    container_selector: str = None  # Menu element, when found - open check without a body snapshot
 
     @classmethod
     def from_menu_result(cls, result: dict, base_url: str) -> Optional['MenuContext']:
@@ -60,7 +63,8 @@ class MenuContext:
             before_aria=result['before_aria'],
             base_url=base_url,
             menu_start_line=menu_start_line,
-            boundary_marker=boundary_marker
+            boundary_marker=boundary_marker,
+            container_selector=result.get('menu_container_selector')
         )
 
 
@@ -70,10 +74,6 @@ _llm_usage = {"input_tokens": 0, "output_tokens": 0}
 # Shared LLMHandler instance for this module
 _llm_handler = None
 
-# Cached menu button info - avoids re-detecting on every reset
-# Format: {'selector': str, 'method': 'click'|'hover'}
-_cached_menu_button = None
-
 # Hover behavior tracking for current site
 # If hover repeatedly fails to reveal content, stop trying and only click
 _hover_stats = {"attempts": 0, "successes": 0}
@@ -129,20 +129,6 @@ def _track_llm_result(result: dict):
         _llm_usage["input_tokens"] += result["usage"].get("input_tokens", 0)
         _llm_usage["output_tokens"] += result["usage"].get("output_tokens", 0)
 
-def _cache_menu_button(selector: str, method: str = 'click', controls_id: str = None):
-    """Cache the menu button selector and what it controls for fast reopening."""
-    global _cached_menu_button
-    _cached_menu_button = {'selector': selector, 'method': method, 'controls': controls_id}
-    print(f"    [NAV] Cached menu button: {selector} ({method})")
-    if controls_id:
-        print(f"    [NAV] Controls: #{controls_id}")
-
-def _clear_menu_cache():
-    """Clear the menu button cache."""
-    global _cached_menu_button
-    _cached_menu_button = None
-
-
 # =============================================================================
 # ARIA Boundary Detection: Identify where menu ends in page ARIA
 # =============================================================================
@@ -151,38 +137,6 @@ def _clear_menu_cache():
 ARIA_LANDMARKS = ['banner:', 'main:', 'contentinfo:', 'footer:', 'region:', 'complementary:']
 
 
-async def reopen_menu_fast(page: Page) -> bool:
-    """
-    Reopen menu using cached button info (no LLM detection).
-    Returns True if successful, False if cache miss or failure.
-    """
-    global _cached_menu_button
-    if not _cached_menu_button:
-        return False
-
-    selector = _cached_menu_button['selector']
-    method = _cached_menu_button['method']
-
-    try:
-        el = page.locator(selector).first
-        if not await el.is_visible():
-            print(f"    [NAV] Cached menu button not visible: {selector}")
-            return False
-
-        if method == 'hover':
-            await el.hover()
-        else:
-            await el.click()
-
-        await page.wait_for_timeout(400)
-        print(f"    [NAV] Reopened menu via cache: {selector}")
-        return True
-    except Exception as e:
-        print(f"    [NAV] Cache reopen failed: {e}")
-        _clear_menu_cache()
-        return False
-
-
 # =============================================================================
 # LLM: Find top-level nav items
 # =============================================================================
@@ -390,11 +344,11 @@ async def find_menu_container(page: Page) -> tuple[str | None, str | None]:
     Returns:
         (aria_snapshot, selector) or (None, None) if not found
     """
-    global _cached_menu_button
+    cached = get_cached_menu_button(page)
 
     # PRIORITY 1: Use aria-controls from the menu button we clicked
-    if _cached_menu_button and _cached_menu_button.get('controls'):
-        controls_id = _cached_menu_button['controls']
+    if cached and cached.get('controls'):
+        controls_id = cached['controls']
         # Use attribute selector to handle special characters in ID
         selector = f'[id="{controls_id}"]'
         try:
@@ -410,17 +364,20 @@ async def find_menu_container(page: Page) -> tuple[str | None, str | None]:
     return None, None
 
 
-def compute_aria_diff(before_aria: str, after_aria: str) -> list[str]:
+def compute_aria_diff(before_aria: str | AriaLineIndex, after_aria: str) -> list[str]:
     """
     Compute ARIA diff - lines that are in after but not in before.
     This represents what became visible (e.g., the menu content).
+
+    Pass an AriaLineIndex as before_aria to reuse its line index.
     """
-    before_lines = set(before_aria.split('\n'))
-    new_lines = [l for l in after_aria.split('\n') if l not in before_lines]
+    if not isinstance(before_aria, AriaLineIndex):
+        before_aria = AriaLineIndex(before_aria)
+    new_lines = [l for l in after_aria.split('\n') if l not in before_aria]
     return new_lines
 
 
-def is_duplicate_block(block_aria: str, before_aria: str, threshold: float = 0.8) -> bool:
+def is_duplicate_block(block_aria: str, before_aria: str | AriaLineIndex, threshold: float = 0.8) -> bool:
     """
     Check if block content exists in BEFORE with different indentation.
 
@@ -429,7 +386,8 @@ def is_duplicate_block(block_aria: str, before_aria: str, threshold: float = 0.8
 
     Args:
         block_aria: ARIA content of the candidate block
-        before_aria: ARIA content from before menu opened
+        before_aria: ARIA content from before menu opened, or its AriaLineIndex
+            (callers checking several blocks build the index once)
         threshold: Fraction of block lines that must match to be considered duplicate
 
     Returns:
@@ -440,17 +398,18 @@ def is_duplicate_block(block_aria: str, before_aria: str, threshold: float = 0.8
     if not stripped_block:
         return False
 
-    # Strip indentation from before and build a set for fast lookup
-    stripped_before = {line.lstrip() for line in before_aria.split('\n') if line.strip()}
+    # Indentation-insensitive lookup into before
+    if not isinstance(before_aria, AriaLineIndex):
+        before_aria = AriaLineIndex(before_aria)
 
     # Count how many block lines exist in before (ignoring indentation)
-    matches = sum(1 for line in stripped_block if line in stripped_before)
+    matches = sum(1 for line in stripped_block if before_aria.contains_stripped(line))
     match_ratio = matches / len(stripped_block)
 
     return match_ratio >= threshold
 
 
-async def _discover_menu_container(page: Page, diff_text: str, before_aria: str) -> str | None:
+async def _discover_menu_container(page: Page, diff_text: str, before_index: AriaLineIndex) -> str | None:
     """
     Discover menu container by finding element whose ARIA matches the diff content.
 
@@ -459,7 +418,7 @@ async def _discover_menu_container(page: Page, diff_text: str, before_aria: str)
     Args:
         page: Playwright page
         diff_text: The ARIA diff content (new lines that appeared)
-        before_aria: ARIA before menu opened (to filter out pre-existing content)
+        before_index: Line index of the ARIA before menu opened (to filter out pre-existing content)
 
     Returns:
         CSS selector for the menu container, or None if not found
@@ -470,7 +429,6 @@ async def _discover_menu_container(page: Page, diff_text: str, before_aria: str)
 
     # Strip leading whitespace for comparison (indentation differs between full-page and element ARIA)
     diff_lines = set(line.lstrip() for line in diff_text.split('\n') if line.strip())
-    before_lines = set(line.lstrip() for line in before_aria.split('\n') if line.strip())
 
     print(f"    [DISCOVER] Diff has {len(diff_lines)} unique lines")
 
@@ -541,7 +499,7 @@ async def _discover_menu_container(page: Page, diff_text: str, before_aria: str)
             coverage = len(diff_in_el) / len(diff_lines)
 
             # Check how much is NEW (not from before)
-            new_in_el = el_lines - before_lines
+            new_in_el = {line for line in el_lines if not before_index.contains_stripped(line)}
             if len(el_lines) == 0:
                 continue
 
@@ -664,7 +622,9 @@ async def find_menu_from_aria_diff(page: Page, before_aria: str, after_aria: str
         (menu_aria, selector, additional_branches) or (None, None, []) if not found
     """
     # 1. Compute diff - what became visible
-    new_lines = compute_aria_diff(before_aria, after_aria)
+    # One index of BEFORE serves the diff and every candidate check below
+    before_index = AriaLineIndex(before_aria)
+    new_lines = compute_aria_diff(before_index, after_aria)
 
     print(f"    [ARIA-DIFF] {len(new_lines)} new lines appeared")
 
@@ -680,13 +640,12 @@ async def find_menu_from_aria_diff(page: Page, before_aria: str, after_aria: str
     if not candidate_roles:
         # Fallback: discover menu container by matching ARIA content
         print(f"    [ARIA-DIFF] No standard roles, discovering container by content...")
-        selector = await _discover_menu_container(page, diff_text, before_aria)
+        selector = await _discover_menu_container(page, diff_text, before_index)
         return diff_text, selector, []
 
     print(f"    [ARIA-DIFF] Container roles found: {candidate_roles}")
 
     # 3. Collect candidate containers (new content, reasonable size)
-    before_lines = set(before_aria.split('\n'))
     candidates = []
 
     for role in candidate_roles:
@@ -706,7 +665,7 @@ async def find_menu_from_aria_diff(page: Page, before_aria: str, after_aria: str
 
                 # Check if content is mostly new
                 el_lines = set(el_aria.split('\n'))
-                new_in_el = el_lines - before_lines
+                new_in_el = {line for line in el_lines if line not in before_index}
 
                 if len(el_lines) == 0:
                     continue
@@ -716,7 +675,7 @@ async def find_menu_from_aria_diff(page: Page, before_aria: str, after_aria: str
                     continue
 
                 # Check if this block is duplicate content (e.g., footer in menu drawer)
-                if is_duplicate_block(el_aria, before_aria):
+                if is_duplicate_block(el_aria, before_index):
                     print(f"    [ARIA-DIFF] Skipping duplicate block: {role}[{i}]")
                     continue
 
@@ -766,7 +725,7 @@ Reply: EXCLUDE: 0, 2 (or EXCLUDE: NONE if all should be included)"""
 
     try:
         llm = _get_llm_handler()
-        result = llm.call_text(prompt, max_tokens=50, operation="filter_menu_containers")
+        result = await llm.acall_text(prompt, max_tokens=50, operation="filter_menu_containers")
         _track_llm_result(result)
         response = result.get('response', '').strip()
 
@@ -1003,7 +962,7 @@ REASON: This menu has no top-level tabs, just direct category links"""
     screenshot_b64 = base64.b64encode(screenshot_bytes).decode('utf-8')
 
     llm = _get_llm_handler()
-    result = llm.call_with_image(
+    result = await llm.acall_with_image(
         prompt=prompt,
         image_b64=screenshot_b64,
         media_type="image/png",
@@ -1230,6 +1189,14 @@ async def check_and_restore_menu(page: Page, menu_ctx: Optional[MenuContext]) ->
     if menu_ctx is None:
         return True  # No menu context = nothing to check
 
+    # Fastest check: menu element still visible (no snapshot at all)
+    if menu_ctx.container_selector:
+        try:
+            if await page.locator(menu_ctx.container_selector).first.is_visible():
+                return True
+        except Exception:
+            pass
+
     # Fast check: look for the marker line in current ARIA
     current_aria = await page.locator('body').aria_snapshot()
 
@@ -1749,7 +1716,7 @@ async def open_menu(page: Page) -> bool:
     if candidates or buttons:
         prompt = prompt_identify_menu_button(candidates, buttons)
         llm = _get_llm_handler()
-        result = llm.call_text(prompt, max_tokens=50, operation="identify_menu_button")
+        result = await llm.acall_text(prompt, max_tokens=50, operation="identify_menu_button")
         _track_llm_result(result)
 
         response = result.get('response', '')
@@ -1780,7 +1747,7 @@ async def open_menu(page: Page) -> bool:
                             if await try_hover_then_click(el, f"candidate {selector}"):
                                 # Get aria-controls to know what element this button controls
                                 controls_id = await el.get_attribute('aria-controls')
-                                _cache_menu_button(selector, 'click', controls_id)
+                                cache_menu_button(page, selector, 'click', controls_id)
                                 return True
 
                 elif elem_type == 'B' and idx < len(buttons):
@@ -1805,7 +1772,7 @@ async def open_menu(page: Page) -> bool:
                         if await try_hover_then_click(el, f"button \"{text or aria or '(icon)'}\""):
                             # Get aria-controls to know what element this button controls
                             controls_id = await el.get_attribute('aria-controls')
-                            _cache_menu_button(btn_selector, 'click', controls_id)
+                            cache_menu_button(page, btn_selector, 'click', controls_id)
                             return True
 
             except Exception as e:
@@ -1845,7 +1812,7 @@ async def open_menu(page: Page) -> bool:
                     controls_id = await el.get_attribute('aria-controls')
                     # Try hover first, then click if hover doesn't reveal menu
                     if await try_hover_then_click(el, selector):
-                        _cache_menu_button(selector, 'click', controls_id)
+                        cache_menu_button(page, selector, 'click', controls_id)
                         return True
         except:
             continue
@@ -51,7 +51,7 @@ Most buttons are SEPARATE (their own distinct category), so the list is usually
 
     try:
         llm = get_llm_handler()
-        llm_result = llm.call(
+        llm_result = await llm.acall(
             prompt,
             expected_format="json",
             response_model=ButtonClassification,
@@ -103,7 +103,7 @@ Does this button EXPAND/SHOW MORE of the "{link_name}" category, or is it a SEPA
 
     try:
         llm = get_llm_handler()
-        result = llm.call(
+        result = await llm.acall(
             prompt,
             expected_format="json",
             response_model=SingleButtonClassification,
@@ -36,13 +36,16 @@ def reset_llm_usage():
     _llm_usage = {"input_tokens": 0, "output_tokens": 0}
 
 
-def call_llm(prompt: str, max_tokens: int = 500) -> dict:
+def call_llm(prompt: str, max_tokens: int = 500, cache: bool = True) -> dict:
     """
     Call LLM with the given prompt and track usage.
 
+    Identical prompts are answered from the LLM response cache (zero usage)
+    unless cache=False.
+
     Returns dict with 'text' and 'usage' keys.
     """
     llm = get_llm_handler()
-    result = llm.call_text(prompt=prompt, max_tokens=max_tokens)
+    result = llm.call_text(prompt=prompt, max_tokens=max_tokens, cache=cache)
     track_llm_result(result)
     return result
@@ -6,18 +6,16 @@ Uses Claude to identify and dismiss popups/modals/overlays.
 
 import asyncio
 import base64
-import os
 import sys
 from pathlib import Path
 
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent.parent.parent / 'config' / '.env')
 
-from anthropic import Anthropic
 from playwright.async_api import async_playwright, Page
 
-
-client = Anthropic(api_key=os.getenv('CLAUDE_API_KEY'))
+from scraper.navigation.llm.client import get_llm_handler, track_llm_result
+from scraper.navigation.popup_playbook import PopupPlaybook, learn_cookies, learn_popup
 
 
 async def ask_llm_for_popup(page: Page, menu_is_open: bool = False) -> dict | None:
@@ -74,19 +72,19 @@ If you don't see a clear CLOSE/DISMISS button, respond: NONE
 ARIA Snapshot:
 """ + aria[:8000]
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+    response = await get_llm_handler().acall_with_image(
+        prompt=prompt,
+        image_b64=screenshot_b64,
+        media_type="image/png",
         max_tokens=150,
-        messages=[{
-            "role": "user",
-            "content": [
-                {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": screenshot_b64}},
-                {"type": "text", "text": prompt}
-            ]
-        }]
+        operation="popup_detection"
     )
+    track_llm_result(response)
+    if not response.get("success"):
+        print(f"    LLM popup check failed: {response.get('error')}")
+        return None
 
-    result = response.content[0].text.strip()
+    result = response["response"]
     # Print full response including reasoning
     for line in result.split('\n'):
         print(f"    LLM: {line}")
@@ -103,9 +101,10 @@ ARIA Snapshot:
     return None
 
 
-async def try_direct_popup_selectors(page: Page) -> int:
+async def try_direct_popup_selectors(page: Page, playbook: PopupPlaybook = None) -> int:
     """
     Try common popup selectors directly (faster than LLM, catches non-ARIA popups).
+    Popup containers are recorded into `playbook` when given.
     Returns number dismissed.
     """
     from scraper.navigation.popup_selectors import POPUP_CLOSE_SELECTORS, POPUP_IFRAME_SELECTORS
@@ -119,6 +118,7 @@ async def try_direct_popup_selectors(page: Page) -> int:
             if 'iframe' in sel:
                 iframe = page.locator(sel)
                 if await iframe.count() > 0 and await iframe.is_visible():
+                    await learn_popup(playbook, iframe.first)
                     await page.evaluate(f'document.querySelector(\'{sel}\')?.parentElement?.remove()')
                     print(f"    [DIRECT] Removed iframe: {sel}")
                     dismissed += 1
@@ -126,6 +126,7 @@ async def try_direct_popup_selectors(page: Page) -> int:
 
             btn = page.locator(sel).first
             if await btn.count() > 0 and await btn.is_visible():
+                await learn_popup(playbook, btn)
                 await btn.click(timeout=2000)
                 await page.wait_for_timeout(300)
                 print(f"    [DIRECT] Clicked: {sel}")
@@ -136,10 +137,11 @@ async def try_direct_popup_selectors(page: Page) -> int:
     return dismissed
 
 
-async def remove_overlay_elements(page: Page) -> int:
+async def remove_overlay_elements(page: Page, playbook: PopupPlaybook = None) -> int:
     """
     Remove known popup/overlay elements from DOM entirely.
     This ensures they can't intercept clicks even if hidden.
+    Selectors that matched are recorded into `playbook` when given.
 
     Returns number of elements removed.
     """
@@ -159,13 +161,16 @@ async def remove_overlay_elements(page: Page) -> int:
             if count > 0:
                 print(f"    [DOM] Removed {count} elements: {selector}")
                 removed += count
+                if playbook is not None:
+                    playbook.add_rule(selector)
         except:
             continue
 
     return removed
 
 
-async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_open: bool = False) -> int:
+async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_open: bool = False,
+                                  record: list = None, playbook: PopupPlaybook = None) -> int:
     """
     Dismiss popups - first try direct selectors, then LLM fallback.
 
@@ -173,6 +178,10 @@ async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_ope
         page: Playwright page
         max_attempts: Max LLM attempts (direct selectors don't count)
         menu_is_open: If True, be extra careful about "Close" buttons
+        record: Optional list - each LLM-chosen dismissal is appended as
+            {'role', 'name'} so replay_popup_dismissals() can repeat it
+        playbook: Optional PopupPlaybook - dismissed popup containers and
+            the consent cookies they set are recorded so later runs hide them
 
     Returns:
         Number of popups dismissed
@@ -183,7 +192,7 @@ async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_ope
     # Skip when menu is open - direct selectors can match menu's close button
     if not menu_is_open:
         print("  [Direct popup check]")
-        direct_dismissed = await try_direct_popup_selectors(page)
+        direct_dismissed = await try_direct_popup_selectors(page, playbook)
         dismissed += direct_dismissed
         if direct_dismissed > 0:
             await page.wait_for_timeout(500)
@@ -215,8 +224,11 @@ async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_ope
         try:
             locator = page.get_by_role(role, name=name, exact=False)
             if await locator.count() > 0:
+                await learn_popup(playbook, locator.first)
                 await locator.first.click(timeout=3000)
                 dismissed += 1
+                if record is not None:
+                    record.append({"role": role, "name": name})
                 print(f"    ✓ Dismissed")
                 await page.wait_for_timeout(300)
             else:
@@ -230,12 +242,56 @@ async def dismiss_popups_with_llm(page: Page, max_attempts: int = 1, menu_is_ope
     # Skip when menu is open - selectors like role="dialog" can match menu drawer
     if not menu_is_open:
         print("  [DOM removal]")
-        removed = await remove_overlay_elements(page)
+        removed = await remove_overlay_elements(page, playbook)
         if removed > 0:
             await page.wait_for_timeout(300)
     else:
         print("  [DOM removal SKIPPED - menu is open]")
 
+    if dismissed:
+        await learn_cookies(playbook, page)
+    return dismissed
+
+
+async def replay_popup_dismissals(page: Page, popups: list, menu_is_open: bool = False,
+                                  playbook: PopupPlaybook = None) -> int:
+    """
+    Dismiss popups without the LLM, using dismissals recorded on a previous run.
+
+    Recorded popups that aren't showing this time are skipped - newsletter and
+    promo modals don't appear on every visit.
+
+    Args:
+        page: Playwright page
+        popups: [{'role', 'name'}, ...] from dismiss_popups_with_llm(record=...)
+        menu_is_open: If True, skip direct selectors and DOM removal (as above)
+        playbook: Optional PopupPlaybook to record into (as above)
+
+    Returns:
+        Number of popups dismissed
+    """
+    dismissed = 0
+
+    if not menu_is_open:
+        dismissed += await try_direct_popup_selectors(page, playbook)
+
+    for popup in popups:
+        try:
+            locator = page.get_by_role(popup["role"], name=popup["name"], exact=False).first
+            if await locator.count() > 0 and await locator.is_visible():
+                await learn_popup(playbook, locator)
+                await locator.click(timeout=3000)
+                dismissed += 1
+                print(f"    [REPLAY] Dismissed: {popup['role']} \"{popup['name']}\"")
+                await page.wait_for_timeout(300)
+        except Exception:
+            continue
+
+    if not menu_is_open:
+        await remove_overlay_elements(page, playbook)
+
+    if dismissed:
+        await learn_cookies(playbook, page)
     return dismissed
 
 
@@ -1,29 +1,34 @@
 """
 Menu button caching for fast menu reopening.
+
+Cached per Playwright page, not per process: two brands explored in the same
+process (or concurrently on different pages) never see each other's button.
 """
+from weakref import WeakKeyDictionary
+
 from playwright.async_api import Page
 
-# Cached menu button info - avoids re-detecting on every reset
-# Format: {'selector': str, 'method': 'click'|'hover'}
-_cached_menu_button = None
+# Cached menu button info per page - avoids re-detecting on every reset
+# Format: {'selector': str, 'method': 'click'|'hover', 'controls': str|None}
+_cached_menu_buttons: "WeakKeyDictionary[Page, dict]" = WeakKeyDictionary()
 
 
-def cache_menu_button(selector: str, method: str = 'click'):
-    """Cache the menu button selector for fast reopening."""
-    global _cached_menu_button
-    _cached_menu_button = {'selector': selector, 'method': method}
+def cache_menu_button(page: Page, selector: str, method: str = 'click', controls_id: str = None):
+    """Cache the menu button selector (and the element it controls) for fast reopening."""
+    _cached_menu_buttons[page] = {'selector': selector, 'method': method, 'controls': controls_id}
     print(f"    [NAV] Cached menu button: {selector} ({method})")
+    if controls_id:
+        print(f"    [NAV] Controls: #{controls_id}")
 
 
-def clear_menu_cache():
-    """Clear the menu button cache."""
-    global _cached_menu_button
-    _cached_menu_button = None
+def clear_menu_cache(page: Page):
+    """Clear the menu button cache for this page."""
+    _cached_menu_buttons.pop(page, None)
 
 
-def get_cached_menu_button() -> dict | None:
-    """Get the cached menu button info."""
-    return _cached_menu_button
+def get_cached_menu_button(page: Page) -> dict | None:
+    """Get the cached menu button info for this page."""
+    return _cached_menu_buttons.get(page)
 
 
 async def reopen_menu_fast(page: Page) -> bool:
@@ -31,12 +36,12 @@ async def reopen_menu_fast(page: Page) -> bool:
     Reopen menu using cached button info (no LLM detection).
     Returns True if successful, False if cache miss or failure.
     """
-    global _cached_menu_button
-    if not _cached_menu_button:
+    cached = _cached_menu_buttons.get(page)
+    if not cached:
         return False
 
-    selector = _cached_menu_button['selector']
-    method = _cached_menu_button['method']
+    selector = cached['selector']
+    method = cached['method']
 
     try:
         el = page.locator(selector).first
@@ -54,5 +59,5 @@ async def reopen_menu_fast(page: Page) -> bool:
         return True
     except Exception as e:
         print(f"    [NAV] Cache reopen failed: {e}")
-        clear_menu_cache()
+        clear_menu_cache(page)
         return False
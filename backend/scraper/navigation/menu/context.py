@@ -17,6 +17,7 @@ class MenuContext:
     base_url: str             # URL to return to if we navigate away
     menu_start_line: str      # First new line when menu opened (for quick check)
     boundary_marker: str = None  # First landmark after menu (e.g., "- banner:") to truncate ARIA
+    container_selector: str = None  # Menu element, when found - open check without a body snapshot
 
     @classmethod
     def from_menu_result(cls, result: dict, base_url: str) -> Optional['MenuContext']:
@@ -32,5 +33,6 @@ class MenuContext:
             before_aria=result['before_aria'],
             base_url=base_url,
             menu_start_line=menu_start_line,
-            boundary_marker=boundary_marker
+            boundary_marker=boundary_marker,
+            container_selector=result.get('menu_container_selector')
         )
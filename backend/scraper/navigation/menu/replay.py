@@ -0,0 +1,83 @@
+"""
+Per-domain navigation replay plan.
+
+THE PROBLEM:
+    Every stage 1 run rediscovers the same things with LLM calls: which popup
+    button to dismiss, which header button opens the menu, the menu container,
+    the top-level tabs, which CSS groups are utility links, and which buttons
+    expand their neighbouring link. None of that changes between runs of the
+    same site.
+
+THE SOLUTION:
+    NavExplorer records each of those decisions into a ReplayPlan while it
+    explores. The plan is saved in brand_meta.json (section "nav", key
+    "replay_plan"). On the next run the explorer replays it: menu button,
+    container and tabs are verified against the live page, and LLM decisions
+    are looked up instead of asked. If the page no longer matches (button
+    gone, tabs changed), the explorer falls back to full exploration and
+    records a fresh plan.
+
+USAGE:
+    plan = load_saved_plan(domain)            # None on first run
+    tree, stats = await explore(url, replay_plan=plan)
+    ReplayPlan.from_dict(stats['replay_plan']).save(domain)
+"""
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+
+@dataclass
+class ReplayPlan:
+    """Everything NavExplorer.setup()/step() would otherwise ask the LLM for."""
+    menu_button: Optional[dict] = None       # {'selector', 'method', 'controls'}
+    menu_selector: Optional[str] = None      # Menu container selector
+    tabs: list = field(default_factory=list)  # [{'text', 'role'}, ...]
+    back_button_selector: Optional[str] = None
+    popups: list = field(default_factory=list)  # [{'role', 'name'}, ...]
+    excluded_groups: dict = field(default_factory=dict)  # {depth: [css groups]}
+    relationships: dict = field(default_factory=dict)    # {"button|link": 'EXPANDS'|'SEPARATE'}
+
+    @property
+    def replayable(self) -> bool:
+        """A plan without a menu button can't reopen the menu, so can't be replayed."""
+        return bool(self.menu_button and self.menu_button.get('selector'))
+
+    @staticmethod
+    def relationship_key(button_name: str, link_name: str) -> str:
+        return f"{button_name}|{link_name}"
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        # JSON keys are strings - keep depth keys explicit so from_dict can restore them
+        data['excluded_groups'] = {str(d): sorted(g) for d, g in self.excluded_groups.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ReplayPlan':
+        return cls(
+            menu_button=data.get('menu_button'),
+            menu_selector=data.get('menu_selector'),
+            tabs=data.get('tabs') or [],
+            back_button_selector=data.get('back_button_selector'),
+            popups=data.get('popups') or [],
+            excluded_groups={int(d): set(g) for d, g in (data.get('excluded_groups') or {}).items()},
+            relationships=data.get('relationships') or {},
+        )
+
+    def save(self, domain: str):
+        """Persist the plan for the next run of this domain."""
+        from stages.storage import update_brand_meta
+
+        update_brand_meta(domain, "nav", {"replay_plan": self.to_dict()})
+
+
+def load_saved_plan(domain: str) -> Optional[ReplayPlan]:
+    """Replay plan recorded on a previous run, or None."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    data = meta.get("nav", {}).get("replay_plan")
+    if not data:
+        return None
+    plan = ReplayPlan.from_dict(data)
+    return plan if plan.replayable else None
@@ -0,0 +1,342 @@
+"""
+Per-domain popup playbook - popups hidden before page scripts run.
+
+THE PROBLEM:
+    Every page load in Stages 1-3 meets the same cookie banner and newsletter
+    modal, and every page pays to get rid of them again:
+    - stage 1: dismiss_popups_with_llm() - ~40 selector probes, then a
+      screenshot + LLM call, with waits after each click
+    - stage 2: _dismiss_popups() twice per category page, with a settle wait
+      in between for late popups
+    The consent cookie a click sets is lost with the context, and the CSS
+    attacks ModalBypassEngine finds are kept only in memory.
+
+THE SOLUTION:
+    Whatever a dismissal learns is compiled into a playbook per domain,
+    saved in brand_meta.json (section "popups"):
+    - hide rules: CSS for each popup container that was dismissed (the
+      container is found from the clicked button - fixed/dialog ancestor
+      with a popup-like id/class, never one holding menu-sized link lists),
+      plus overlay selectors removed and ModalBypassEngine attacks that worked
+    - consent cookies: consent/popup-suppression cookies the clicks set
+
+    Next run, install() puts the rules in an init script (a <style> added
+    before any page script runs) and the cookies in the context, so popups
+    never render. Pages report that via window.__popupPlaybook; when no
+    popup the playbook doesn't know is showing, the dismissal passes - and
+    their waits - are skipped. A popup it doesn't know (a new banner or
+    modal) is dismissed as before, and its container becomes a new rule.
+
+USAGE:
+    playbook = load_saved_playbook(domain) or PopupPlaybook()
+    await playbook.install(context)             # or install_sync(context)
+    if not await popups_hidden(page):
+        await dismiss_popups_with_llm(page, playbook=playbook)   # learns new popups
+    if playbook.changed:
+        playbook.save(domain)
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+# Cookies worth replaying: consent managers and "popup already seen" flags
+CONSENT_COOKIE_PATTERN = re.compile(
+    r'consent|optanon|cookiebot|didomi|gdpr|euconsent|usercentrics|cookielaw|cookieyes|'
+    r'cmplz|notice_|truste|evidon|borlabs|popup|newsletter|geoloc|__kla_|attn_|__attentive',
+    re.IGNORECASE
+)
+
+# CSS applied to a learned popup container unless a better attack was recorded
+DEFAULT_HIDE_CSS = "display: none !important;"
+
+# Scroll locks popups leave on <body> once their container is hidden
+SCROLL_UNLOCK_CSS = (
+    "html.no-scroll, body.no-scroll, body.modal-open, body.overflow-hidden, "
+    "body.noscroll, body.locked { overflow: auto !important; }"
+)
+
+# Selectors too broad to hide site-wide (would take menus/drawers with them)
+_BROAD_SELECTOR = re.compile(r'^(html|body)$|\*=|^\[(role|aria-modal|data-modal)|^\w*\.(modal|popup|overlay|dialog)$')
+
+# Walk up from a dismiss button to the popup container it belongs to
+POPUP_CONTAINER_JS = r"""
+(el) => {
+    const KEYWORDS = /cookie|consent|gdpr|privacy|newsletter|sign-?up|subscribe|pop-?up|popin|modal|klaviyo|attentive|onetrust|didomi|cookiebot|usercentrics|geoloc|promo|offer|discount|overlay|interstitial/i;
+    const MAX_LINKS = 15;  // Menus and drawers hold more links than any popup
+    const stable = (token) => token && token.length < 40 && !/\d{4,}/.test(token) && /^[A-Za-z_-][\w-]*$/.test(token);
+
+    let found = null;
+    for (let node = el; node && node !== document.body; node = node.parentElement) {
+        const role = node.getAttribute('role');
+        const isOverlay = role === 'dialog' || role === 'alertdialog'
+            || node.getAttribute('aria-modal') === 'true'
+            || getComputedStyle(node).position === 'fixed';
+        if (!isOverlay) continue;
+        if (node.querySelectorAll('a[href]').length > MAX_LINKS) break;
+
+        let selector = null;
+        const label = node.getAttribute('aria-label');
+        const keyed = Array.from(node.classList).filter(c => stable(c) && KEYWORDS.test(c));
+        if (node.id && stable(node.id) && KEYWORDS.test(node.id)) {
+            selector = '#' + CSS.escape(node.id);
+        } else if (keyed.length) {
+            selector = node.tagName.toLowerCase() + keyed.slice(0, 2).map(c => '.' + CSS.escape(c)).join('');
+        } else if (label && label.length < 40 && KEYWORDS.test(label)) {
+            selector = '[aria-label="' + label.replace(/"/g, '\\"') + '"]';
+        }
+        if (selector) found = selector;  // Keep climbing - outermost wrapper takes the backdrop too
+    }
+    return found;
+}
+"""
+
+
+def _hide_rules_script(css: str) -> str:
+    """Init script adding the playbook <style> as soon as the document exists."""
+    return """
+(() => {
+    window.__popupPlaybook = true;
+    const css = %s;
+    const install = () => {
+        if (!document.documentElement || document.getElementById('__popup-playbook')) return;
+        const style = document.createElement('style');
+        style.id = '__popup-playbook';
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) {
+        install();
+    } else {
+        new MutationObserver((_, observer) => {
+            if (document.documentElement) { install(); observer.disconnect(); }
+        }).observe(document, {childList: true});
+    }
+    document.addEventListener('DOMContentLoaded', install);
+})();
+""" % json.dumps(css)
+
+
+@dataclass
+class PopupPlaybook:
+    """CSS hide rules and consent cookies that keep one domain's popups from rendering."""
+    rules: dict = field(default_factory=dict)    # {selector: css declarations}
+    cookies: list = field(default_factory=list)  # Playwright add_cookies() dicts
+    changed: bool = False                        # Learned something since load
+
+    @property
+    def empty(self) -> bool:
+        return not self.rules and not self.cookies
+
+    # =========================================================================
+    # Learning
+    # =========================================================================
+
+    def add_rule(self, selector: Optional[str], css: str = DEFAULT_HIDE_CSS) -> bool:
+        """Hide `selector` on every page. Broad selectors (body, [role=dialog], ...) are refused."""
+        selector = (selector or "").strip()
+        if not selector or _BROAD_SELECTOR.search(selector) or selector in self.rules:
+            return False
+        self.rules[selector] = css
+        self.changed = True
+        print(f"    [PLAYBOOK] Hide rule: {selector}")
+        return True
+
+    def add_cookies(self, cookies: list) -> int:
+        """Keep consent/popup cookies from a context's cookies(). Returns number added or updated."""
+        known = {(c["name"], c.get("domain"), c.get("path")): c for c in self.cookies}
+        added = 0
+        for cookie in cookies:
+            if not CONSENT_COOKIE_PATTERN.search(cookie.get("name", "")):
+                continue
+            # Session cookie on replay - a stored expiry would eventually be in the past
+            kept = {k: cookie[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+                    if k in cookie}
+            key = (kept["name"], kept.get("domain"), kept.get("path"))
+            if known.get(key, {}).get("value") != kept.get("value"):
+                known[key] = kept
+                added += 1
+        if added:
+            self.cookies = list(known.values())
+            self.changed = True
+            print(f"    [PLAYBOOK] {added} consent cookie(s)")
+        return added
+
+    def add_modal_bypasses(self, modal_bypasses: dict) -> int:
+        """
+        Compile ModalBypassEngine results into hide rules.
+
+        Accepts brand_data["modal_bypasses"] (successful attacks by selector)
+        or a bypass_blocking_modals_only() result (blocking_elements_found).
+        """
+        added = 0
+        for selector, css in (modal_bypasses.get("selectors") or {}).items():
+            added += self.add_rule(selector, css)
+        for element in modal_bypasses.get("blocking_elements_found") or []:
+            if element.get("bypassed") and element.get("type") != "scroll_lock":
+                added += self.add_rule(element.get("selector"))
+        return added
+
+    # =========================================================================
+    # Installing
+    # =========================================================================
+
+    def css(self) -> str:
+        rules = [f"{selector} {{ {css} }}" for selector, css in self.rules.items()]
+        return "\n".join(rules + [SCROLL_UNLOCK_CSS])
+
+    def _cookies_for_context(self) -> list:
+        return [c for c in self.cookies if c.get("domain") and c.get("path")]
+
+    async def install(self, context) -> bool:
+        """Add hide rules and cookies to a Playwright (async) context. False if nothing to install."""
+        if self.empty:
+            return False
+        if self.rules:
+            await context.add_init_script(_hide_rules_script(self.css()))
+        if self.cookies:
+            try:
+                await context.add_cookies(self._cookies_for_context())
+            except Exception as e:
+                print(f"    [PLAYBOOK] Could not add cookies: {e}")
+        return True
+
+    def install_sync(self, context) -> bool:
+        """install() for a sync Playwright context."""
+        if self.empty:
+            return False
+        if self.rules:
+            context.add_init_script(_hide_rules_script(self.css()))
+        if self.cookies:
+            try:
+                context.add_cookies(self._cookies_for_context())
+            except Exception as e:
+                print(f"    [PLAYBOOK] Could not add cookies: {e}")
+        return True
+
+    # =========================================================================
+    # Persistence
+    # =========================================================================
+
+    def to_dict(self) -> dict:
+        return {"rules": self.rules, "cookies": self.cookies}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'PopupPlaybook':
+        return cls(rules=dict(data.get("rules") or {}), cookies=list(data.get("cookies") or []))
+
+    def save(self, domain: str):
+        """Merge into the saved playbook - runs in other stages may have learned more."""
+        from stages.storage import update_brand_meta
+
+        merged = load_saved_playbook(domain) or PopupPlaybook()
+        for selector, css in self.rules.items():
+            merged.rules.setdefault(selector, css)
+        merged.add_cookies(self.cookies)
+        update_brand_meta(domain, "popups", merged.to_dict())
+        self.changed = False
+        print(f"    [PLAYBOOK] Saved ({len(merged.rules)} rules, {len(merged.cookies)} cookies)")
+
+
+def load_saved_playbook(domain: str) -> Optional[PopupPlaybook]:
+    """Popup playbook learned on previous runs, or None."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    data = meta.get("popups")
+    if not data:
+        return None
+    playbook = PopupPlaybook.from_dict(data)
+    return None if playbook.empty else playbook
+
+
+# =============================================================================
+# Page helpers (async + sync)
+# =============================================================================
+
+# A visible popup the playbook didn't hide: dialog/modal, or a fixed layer
+# that is popup-named or covers much of the viewport (menus/drawers excluded)
+UNKNOWN_POPUP_JS = r"""
+() => {
+    if (!window.__popupPlaybook) return true;
+    const KEYWORDS = /cookie|consent|gdpr|privacy|newsletter|sign-?up|subscribe|pop-?up|popin|modal|klaviyo|attentive|onetrust|didomi|cookiebot|usercentrics|geoloc|promo|offer|discount|overlay|interstitial/i;
+    const MAX_LINKS = 15;
+    const viewport = window.innerWidth * window.innerHeight;
+    const visible = (node) => {
+        const style = getComputedStyle(node);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity) === 0) return false;
+        const rect = node.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && rect.bottom > 0 && rect.top < window.innerHeight;
+    };
+    for (const node of document.querySelectorAll('body *')) {
+        const role = node.getAttribute('role');
+        const isDialog = role === 'dialog' || role === 'alertdialog'
+            || node.getAttribute('aria-modal') === 'true' || (node.tagName === 'DIALOG' && node.open);
+        if (!isDialog && getComputedStyle(node).position !== 'fixed') continue;
+        if (!visible(node) || node.querySelectorAll('a[href]').length > MAX_LINKS) continue;
+        const rect = node.getBoundingClientRect();
+        const named = KEYWORDS.test((node.id || '') + ' ' + (typeof node.className === 'string' ? node.className : '')
+            + ' ' + (node.getAttribute('aria-label') || ''));
+        if (isDialog || named || rect.width * rect.height > viewport * 0.3) return true;
+    }
+    return false;
+}
+"""
+
+
+async def popups_hidden(page) -> bool:
+    """
+    True if a playbook is installed on this page's context and no popup it
+    doesn't know is showing - dismissal can be skipped. False means dismiss
+    as usual (the dismissal teaches the playbook the new popup).
+    """
+    try:
+        return not await page.evaluate(UNKNOWN_POPUP_JS)
+    except Exception:
+        return False
+
+
+def popups_hidden_sync(page) -> bool:
+    try:
+        return not page.evaluate(UNKNOWN_POPUP_JS)
+    except Exception:
+        return False
+
+
+async def learn_popup(playbook: Optional[PopupPlaybook], locator):
+    """Record the popup container of a dismiss button - call before clicking it."""
+    if playbook is None:
+        return
+    try:
+        playbook.add_rule(await locator.evaluate(POPUP_CONTAINER_JS))
+    except Exception:
+        pass
+
+
+def learn_popup_sync(playbook: Optional[PopupPlaybook], locator):
+    if playbook is None:
+        return
+    try:
+        playbook.add_rule(locator.evaluate(POPUP_CONTAINER_JS))
+    except Exception:
+        pass
+
+
+async def learn_cookies(playbook: Optional[PopupPlaybook], page):
+    """Record consent cookies set by the dismissals so far."""
+    if playbook is None:
+        return
+    try:
+        playbook.add_cookies(await page.context.cookies())
+    except Exception:
+        pass
+
+
+def learn_cookies_sync(playbook: Optional[PopupPlaybook], page):
+    if playbook is None:
+        return
+    try:
+        playbook.add_cookies(page.context.cookies())
+    except Exception:
+        pass
@@ -1,6 +1,14 @@
 """
 Static link extractor for sites where all nav links are already in DOM.
 No clicking needed - just dump all links to LLM to organize into tree.
+
+Two ways to get the links:
+- extract_tree(): headless=False browser, popups dismissed, hamburger opened,
+  links read from the live DOM (plus a screenshot for the LLM)
+- extract_tree_http(): one pooled HTTP GET, links read by a streaming HTML
+  parser in the same "indent text | href" format - no browser at all. Only
+  valid for server-rendered menus; stages/navigation.py verifies it against
+  the browser links once per domain (http_links_match) before trusting it.
 """
 
 import asyncio
@@ -8,6 +16,7 @@ import base64
 import json
 import os
 import sys
+from html.parser import HTMLParser
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -17,6 +26,7 @@ from playwright.async_api import async_playwright
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from scraper.navigation.llm_popup_dismiss import dismiss_popups_with_llm
+from scraper.navigation.popup_playbook import PopupPlaybook, popups_hidden
 from scraper.llm_handler import LLMHandler, LLMUsageTracker
 
 # Import hamburger detection from dynamic explorer
@@ -25,6 +35,27 @@ from scraper.navigation.dynamic_explorer import open_menu
 # Match viewport with dynamic explorer (triggers hamburger menus)
 VIEWPORT = {'width': 768, 'height': 900}
 
+HTTP_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Share of the browser's links the HTTP parse must also find to replace it
+HTTP_COVERAGE_THRESHOLD = 0.9
+
+# Fewer links than this in the raw HTML means the menu is rendered by JS
+MIN_HTTP_LINKS = 10
+
+# Elements that never have children (no end tag to pop)
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+              'meta', 'param', 'source', 'track', 'wbr'}
+
+# Unclosed siblings a new element implicitly ends: <li>, <dt>/<dd>, <option>
+_IMPLIED_END = {'li': ('li',), 'dt': ('dt', 'dd'), 'dd': ('dt', 'dd'), 'option': ('option',)}
+_LIST_SCOPES = {'ul', 'ol', 'menu', 'dl', 'select'}
+
+# Elements whose text never shows up in innerText
+_HIDDEN_TEXT_TAGS = {'script', 'style', 'noscript', 'template'}
+
+_http_session = None
+
 
 async def get_nav_links_with_structure(page) -> str:
     """
@@ -79,6 +110,160 @@ async def get_nav_links_with_structure(page) -> str:
     return result
 
 
+class _NavLinkParser(HTMLParser):
+    """
+    Streaming equivalent of get_nav_links_with_structure's DOM walk.
+
+    Tracks the open-element stack so each <a href> knows its depth below
+    <body>; collects (depth, text, href) as anchors close.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []      # Open tag names
+        self.body_depth = None
+        self.anchor = None   # [depth, href, text parts] of the open <a>
+        self.hidden = 0      # Inside <script>/<style>/...
+        self.links = []      # [(depth, text, href)]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            return
+        if tag == 'a' and 'a' in self.stack:
+            self.handle_endtag('a')  # <a> can't nest - browsers close the open one
+        if tag in _IMPLIED_END:
+            self._close_implied(_IMPLIED_END[tag])
+        self.stack.append(tag)
+        if tag == 'body' and self.body_depth is None:
+            self.body_depth = len(self.stack)
+        elif tag in _HIDDEN_TEXT_TAGS:
+            self.hidden += 1
+        elif tag == 'a':
+            href = (dict(attrs).get('href') or '').strip()
+            # Depth = parents between the link and <body>
+            depth = len(self.stack) - 1 - (self.body_depth or 1)
+            self.anchor = [max(depth, 0), href, []]
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in _VOID_TAGS:
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return  # Stray end tag - browsers ignore it
+        # Pop up to the matching element (closes implicitly-ended <li>, <p>, ...)
+        while self.stack:
+            open_tag = self.stack.pop()
+            if open_tag in _HIDDEN_TEXT_TAGS:
+                self.hidden -= 1
+            elif open_tag == 'a' and self.anchor:
+                self._close_anchor()
+            if open_tag == tag:
+                break
+
+    def _close_implied(self, siblings: tuple):
+        """A new <li> ends the previous <li> of the same list, like in a browser."""
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i] in _LIST_SCOPES:
+                return
+            if self.stack[i] in siblings:
+                self.handle_endtag(self.stack[i])
+                return
+
+    def handle_data(self, data):
+        if self.anchor and not self.hidden:
+            self.anchor[2].append(data)
+
+    def _close_anchor(self):
+        depth, href, parts = self.anchor
+        self.anchor = None
+        self.links.append((depth, ' '.join(''.join(parts).split()), href))
+
+    def links_text(self) -> str:
+        """Links in get_nav_links_with_structure's "indent text | href" format."""
+        valid = [(depth, text[:80], href) for depth, text, href in self.links
+                 if text and href and href != '#' and not href.startswith('javascript:')]
+        if not valid:
+            return ""
+        min_depth = min(depth for depth, _, _ in valid)
+
+        lines = []
+        seen = set()
+        for depth, text, href in valid:
+            key = f"{href}|{text}"
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append('  ' * min(depth - min_depth, 5) + text + ' | ' + href)
+        return '\n'.join(lines)
+
+
+def _get_http_session():
+    """Shared requests session - keeps connections to each site alive across runs."""
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _http_session = requests.Session()
+        _http_session.headers["User-Agent"] = HTTP_USER_AGENT
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        _http_session.mount("http://", adapter)
+        _http_session.mount("https://", adapter)
+    return _http_session
+
+
+def get_nav_links_http(url: str, timeout: int = 20) -> str:
+    """
+    Extract all links with depth indentation from the raw HTML - no browser.
+
+    The response is parsed as it streams in, so the page is never held twice
+    in memory. Returns "" if the page couldn't be fetched.
+    """
+    parser = _NavLinkParser()
+    try:
+        with _get_http_session().get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                print(f"    HTTP {response.status_code} for {url}")
+                return ""
+            if response.encoding is None:
+                response.encoding = 'utf-8'
+            for chunk in response.iter_content(chunk_size=65536, decode_unicode=True):
+                parser.feed(chunk)
+        parser.close()
+    except Exception as e:
+        print(f"    HTTP fetch failed: {e}")
+        return ""
+    return parser.links_text()
+
+
+def _link_keys(links_text: str) -> set:
+    """(text, href) pairs of a links_text dump, ignoring indentation."""
+    keys = set()
+    for line in links_text.split('\n'):
+        text, sep, href = line.strip().rpartition(' | ')
+        if sep:
+            keys.add((text.lower(), href))
+    return keys
+
+
+def http_links_match(browser_links: str, http_links: str,
+                     threshold: float = HTTP_COVERAGE_THRESHOLD) -> bool:
+    """
+    True if the HTTP parse found (nearly) every link the browser found.
+
+    Coverage is one-directional: the raw HTML may carry extra links (hidden
+    drawers, noscript fallbacks) - the LLM filters those like any other.
+    """
+    browser_keys = _link_keys(browser_links)
+    if not browser_keys:
+        return False
+    coverage = len(browser_keys & _link_keys(http_links)) / len(browser_keys)
+    print(f"    HTTP links cover {coverage:.0%} of browser links ({len(browser_keys)})")
+    return coverage >= threshold
+
+
 def resolve_urls_in_tree(node, base_url: str):
     """Recursively resolve relative URLs to absolute URLs in the tree."""
     from urllib.parse import urljoin
@@ -95,67 +280,36 @@ def resolve_urls_in_tree(node, base_url: str):
             resolve_urls_in_tree(children, base_url)
 
 
-async def extract_tree(url: str, output_dir: Path = None) -> tuple:
-    """Extract navigation tree using LLM to interpret DOM structure.
-    Returns (tree, links_text)
-    """
-    from urllib.parse import urlparse
-
-    print(f"\n{'='*70}")
-    print("STATIC NAV EXTRACTOR")
-    print(f"{'='*70}")
-    print(f"URL: {url}\n")
-
-    # Setup output dir early so we can save raw links before LLM
-    if output_dir is None:
-        domain = urlparse(url).netloc.replace('www.', '').replace('.', '_')
-        output_dir = Path(__file__).parent.parent.parent / 'extractions' / domain
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(headless=False)
-    page = await browser.new_page(viewport=VIEWPORT)
-    links_text = ""
-    llm_usage = {"input_tokens": 0, "output_tokens": 0}  # Initialize for tracking
+def _save_raw_links(links_text: str, output_dir: Path):
+    """Save raw links immediately (before LLM) for quick review."""
+    links_file = output_dir / 'raw_links.txt'
+    with open(links_file, 'w') as f:
+        f.write(links_text)
+    print(f"    Saved: {links_file}")
 
-    try:
-        print("[1] Loading page...")
-        await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-        await page.wait_for_timeout(3000)
+    print(f"    Found {len(links_text.split(chr(10)))} links")
+    print(f"\n    First 30 lines:")
+    for line in links_text.split('\n')[:30]:
+        print(f"    {line}")
+    if len(links_text.split('\n')) > 30:
+        print(f"    ... and {len(links_text.split(chr(10))) - 30} more")
 
-        print("[2] Dismissing popups...")
-        await dismiss_popups_with_llm(page)
 
-        print("[3] Opening hamburger menu if present...")
-        menu_opened = await open_menu(page)
-        if menu_opened:
-            print("    Hamburger menu opened")
-            await page.wait_for_timeout(500)
-        else:
-            print("    No hamburger menu found (or already open)")
-
-        print("[4] Extracting nav links with structure...")
-        links_text = await get_nav_links_with_structure(page)
+def build_tree_with_llm(url: str, links_text: str, output_dir: Path,
+                        screenshot_b64: str = None) -> tuple:
+    """
+    Ask the LLM to organize raw links into a category tree.
 
-        # Save raw links immediately (before LLM) for quick review
-        links_file = output_dir / 'raw_links.txt'
-        with open(links_file, 'w') as f:
-            f.write(links_text)
-        print(f"    Saved: {links_file}")
+    The screenshot (browser path only) helps it tell the main menu from
+    footer and utility links; without it the prompt is sent as text.
 
-        print(f"    Found {len(links_text.split(chr(10)))} links")
-        print(f"\n    First 30 lines:")
-        for line in links_text.split('\n')[:30]:
-            print(f"    {line}")
-        if len(links_text.split('\n')) > 30:
-            print(f"    ... and {len(links_text.split(chr(10))) - 30} more")
+    Returns (tree or None, llm_usage)
+    """
+    import re
 
-        print("\n[5] Asking LLM to build tree...")
+    llm_usage = {"input_tokens": 0, "output_tokens": 0}
 
-        screenshot = await page.screenshot()
-        screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
-
-        prompt = f"""Here are navigation links from a fashion website. Each "=== SECTION ===" header shows a top-level category, and indentation within shows hierarchy.
+    prompt = f"""Here are navigation links from a fashion website. Each "=== SECTION ===" header shows a top-level category, and indentation within shows hierarchy.
 
 {links_text}
 
@@ -190,8 +344,9 @@ RULES:
 Respond with ONLY the JSON array, no markdown, no explanation:
 """
 
-        # Use LLMHandler for unified tracking
-        llm = LLMHandler()
+    # Use LLMHandler for unified tracking
+    llm = LLMHandler()
+    if screenshot_b64:
         llm_response = llm.call_with_image(
             prompt=prompt,
             image_b64=screenshot_b64,
@@ -199,59 +354,123 @@ Respond with ONLY the JSON array, no markdown, no explanation:
             max_tokens=8000,
             operation="nav_tree_extraction"
         )
+    else:
+        llm_response = llm.call_text(prompt, max_tokens=8000, operation="nav_tree_extraction")
+
+    # Extract usage from response
+    if llm_response.get("usage"):
+        llm_usage["input_tokens"] += llm_response["usage"].get("input_tokens", 0)
+        llm_usage["output_tokens"] += llm_response["usage"].get("output_tokens", 0)
 
-        # Extract usage from response
-        if llm_response.get("usage"):
-            llm_usage["input_tokens"] += llm_response["usage"].get("input_tokens", 0)
-            llm_usage["output_tokens"] += llm_response["usage"].get("output_tokens", 0)
+    if not llm_response.get("success"):
+        print(f"\n[ERROR] LLM call failed: {llm_response.get('error')}")
+        return None, llm_usage
 
-        if not llm_response.get("success"):
-            print(f"\n[ERROR] LLM call failed: {llm_response.get('error')}")
-            return None, links_text, llm_usage
+    result = llm_response.get("response", "").strip()
 
-        result = llm_response.get("response", "").strip()
+    # Save raw LLM response for debugging
+    raw_response_file = output_dir / 'llm_response_raw.txt'
+    with open(raw_response_file, 'w') as f:
+        f.write(result)
+    print(f"    Saved raw LLM response: {raw_response_file}")
+
+    # Try to parse JSON
+    try:
+        # Find JSON in response
+        if '```json' in result:
+            result = result.split('```json')[1].split('```')[0]
+        elif '```' in result:
+            result = result.split('```')[1].split('```')[0]
+
+        result = result.strip()
+
+        # Clean up common JSON issues
+        # Remove trailing commas before ] or }
+        result = re.sub(r',(\s*[\]\}])', r'\1', result)
+        # Fix missing commas between } and {
+        result = re.sub(r'\}(\s*)\{', r'},\1{', result)
+        # Fix missing commas between ] and {
+        result = re.sub(r'\](\s*)\{', r'],\1{', result)
+        # Fix missing commas between " and {
+        result = re.sub(r'"(\s*)\{', r'",\1{', result)
+
+        tree = json.loads(result)
+
+        # Resolve relative URLs to absolute URLs
+        resolve_urls_in_tree(tree, url)
+
+        print("\n[6] Tree extracted:")
+        print(json.dumps(tree, indent=2))
+        return tree, llm_usage
+
+    except json.JSONDecodeError as e:
+        print(f"\n[ERROR] Could not parse JSON: {e}")
+        print(f"Raw response saved to: {raw_response_file}")
+        return None, llm_usage
 
-        # Save raw LLM response for debugging
-        raw_response_file = output_dir / 'llm_response_raw.txt'
-        with open(raw_response_file, 'w') as f:
-            f.write(result)
-        print(f"    Saved raw LLM response: {raw_response_file}")
 
-        # Try to parse JSON
-        try:
-            import re
+def _default_output_dir(url: str) -> Path:
+    """extractions/<domain>/ for a site URL."""
+    from urllib.parse import urlparse
+
+    domain = urlparse(url).netloc.replace('www.', '').replace('.', '_')
+    return Path(__file__).parent.parent.parent / 'extractions' / domain
+
+
+async def extract_tree(url: str, output_dir: Path = None, playbook: PopupPlaybook = None) -> tuple:
+    """Extract navigation tree using LLM to interpret DOM structure.
+    `playbook` hides known popups (and learns new ones from the dismissal).
+    Returns (tree, links_text, llm_usage)
+    """
+    print(f"\n{'='*70}")
+    print("STATIC NAV EXTRACTOR")
+    print(f"{'='*70}")
+    print(f"URL: {url}\n")
+
+    # Setup output dir early so we can save raw links before LLM
+    if output_dir is None:
+        output_dir = _default_output_dir(url)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(headless=False)
+    context = await browser.new_context(viewport=VIEWPORT)
+    if playbook:
+        await playbook.install(context)
+    page = await context.new_page()
+    links_text = ""
+
+    try:
+        print("[1] Loading page...")
+        await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        await page.wait_for_timeout(3000)
 
-            # Find JSON in response
-            if '```json' in result:
-                result = result.split('```json')[1].split('```')[0]
-            elif '```' in result:
-                result = result.split('```')[1].split('```')[0]
+        if await popups_hidden(page):
+            print("[2] Popups hidden by playbook (none unknown showing)")
+        else:
+            print("[2] Dismissing popups...")
+            await dismiss_popups_with_llm(page, playbook=playbook)
 
-            result = result.strip()
+        print("[3] Opening hamburger menu if present...")
+        menu_opened = await open_menu(page)
+        if menu_opened:
+            print("    Hamburger menu opened")
+            await page.wait_for_timeout(500)
+        else:
+            print("    No hamburger menu found (or already open)")
 
-            # Clean up common JSON issues
-            # Remove trailing commas before ] or }
-            result = re.sub(r',(\s*[\]\}])', r'\1', result)
-            # Fix missing commas between } and {
-            result = re.sub(r'\}(\s*)\{', r'},\1{', result)
-            # Fix missing commas between ] and {
-            result = re.sub(r'\](\s*)\{', r'],\1{', result)
-            # Fix missing commas between " and {
-            result = re.sub(r'"(\s*)\{', r'",\1{', result)
+        print("[4] Extracting nav links with structure...")
+        links_text = await get_nav_links_with_structure(page)
 
-            tree = json.loads(result)
+        _save_raw_links(links_text, output_dir)
 
-            # Resolve relative URLs to absolute URLs
-            resolve_urls_in_tree(tree, url)
+        print("\n[5] Asking LLM to build tree...")
 
-            print("\n[6] Tree extracted:")
-            print(json.dumps(tree, indent=2))
-            return tree, links_text, llm_usage
+        screenshot = await page.screenshot()
+        screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
 
-        except json.JSONDecodeError as e:
-            print(f"\n[ERROR] Could not parse JSON: {e}")
-            print(f"Raw response saved to: {raw_response_file}")
-            return None, links_text, llm_usage
+        tree, llm_usage = build_tree_with_llm(url, links_text, output_dir, screenshot_b64)
+        return tree, links_text, llm_usage
 
     finally:
         await page.wait_for_timeout(2000)
@@ -259,6 +478,36 @@ Respond with ONLY the JSON array, no markdown, no explanation:
         await playwright.stop()
 
 
+def extract_tree_http(url: str, output_dir: Path = None) -> tuple:
+    """Extract navigation tree from the server-rendered HTML - no browser.
+    Returns (tree, links_text, llm_usage); tree is None when the HTML has
+    too few links (menu rendered by JS) or the LLM call failed.
+    """
+    print(f"\n{'='*70}")
+    print("STATIC NAV EXTRACTOR (HTTP)")
+    print(f"{'='*70}")
+    print(f"URL: {url}\n")
+
+    if output_dir is None:
+        output_dir = _default_output_dir(url)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    llm_usage = {"input_tokens": 0, "output_tokens": 0}
+
+    print("[1] Fetching and parsing HTML...")
+    links_text = get_nav_links_http(url)
+    link_count = len(links_text.split('\n')) if links_text else 0
+    if link_count < MIN_HTTP_LINKS:
+        print(f"    Only {link_count} links in HTML - menu needs a browser")
+        return None, links_text, llm_usage
+
+    _save_raw_links(links_text, output_dir)
+
+    print("\n[2] Asking LLM to build tree...")
+    tree, llm_usage = build_tree_with_llm(url, links_text, output_dir)
+    return tree, links_text, llm_usage
+
+
 def tree_to_readable(node, indent=0) -> str:
     """Convert tree to readable text format."""
     lines = []
@@ -8,11 +8,13 @@ Simple DFS model:
 4. Push children to stack
 5. Mark explored
 """
+import asyncio
 from dataclasses import dataclass, field
 from typing import Optional
 from playwright.async_api import Page
 from pydantic import BaseModel, Field
 
+from scraper.navigation.aria.diff import AriaDelta, AriaLineIndex
 from scraper.navigation.extraction.nav_elements import extract_and_filter_nav_elements
 from scraper.navigation.llm.client import get_llm_handler
 from scraper.navigation.dynamic_explorer import (
@@ -21,8 +23,16 @@ from scraper.navigation.dynamic_explorer import (
     identify_tabs_with_llm,
     find_tabs_in_dom,
 )
-from scraper.navigation.llm_popup_dismiss import dismiss_popups_with_llm
+from scraper.navigation.llm_popup_dismiss import dismiss_popups_with_llm, replay_popup_dismissals
 from scraper.navigation.llm.classification import classify_button_relationships_batch
+from scraper.navigation.menu.cache import (
+    cache_menu_button,
+    clear_menu_cache,
+    get_cached_menu_button,
+    reopen_menu_fast,
+)
+from scraper.navigation.menu.replay import ReplayPlan
+from scraper.navigation.popup_playbook import PopupPlaybook, popups_hidden
 
 
 class BackButtonIdentification(BaseModel):
@@ -42,6 +52,8 @@ class StepResult:
     links_found: dict = field(default_factory=dict)
     children_added: int = 0
     error: str = None
+    snapshot_bytes: int = 0  # ARIA serialized this step
+    diff_ms: float = 0.0     # Time spent diffing snapshots this step
 
 
 class NavExplorer:
@@ -49,15 +61,18 @@ class NavExplorer:
     Simple DFS navigation explorer.
 
     Usage:
-        explorer = NavExplorer(page)
+        explorer = NavExplorer(page, replay_plan=load_saved_plan(domain))
         await explorer.setup(url)
 
         while not explorer.done():
             result = await explorer.step()
             print(result)
+
+        explorer.get_replay_plan().save(domain)
     """
 
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, replay_plan: Optional[ReplayPlan] = None,
+                 playbook: Optional[PopupPlaybook] = None):
         self.page = page
         self.base_url: str = None
         self.menu_selector: str = None
@@ -84,6 +99,21 @@ class NavExplorer:
         # LLM exclusion cache per depth level (CSS classes reused differently at each level)
         self.excluded_groups_cache: dict = {}  # {depth: set of excluded groups}
 
+        # Line index of the last menu snapshot - each snapshot is diffed against it incrementally
+        self.aria_index = AriaLineIndex()
+        self.snapshot_bytes: int = 0
+        self.diff_ms: float = 0.0
+
+        # Replay: plan saved by a previous run of this domain (None = explore from scratch)
+        self.replay_plan = replay_plan if replay_plan and replay_plan.replayable else None
+        self.replaying: bool = False
+        # Decisions recorded this run (saved for the next run)
+        self.plan = ReplayPlan()
+
+        # Popup playbook: hides known popups via the context (nothing to dismiss),
+        # and records what the LLM/selector dismissals find when it doesn't
+        self.playbook = playbook
+
 
     def _add_to_tree(self, path: list[str], name: str, url: str):
         """Add a link to the categories tree."""
@@ -107,13 +137,19 @@ class NavExplorer:
         """Navigate, open menu, detect structure, build initial stack."""
         self.base_url = url
 
+        if self.replay_plan:
+            result = await self._replay_setup(url)
+            if result:
+                return result
+            self._reset_after_mismatch()
+
         print(f"[SETUP] Navigating to {url}")
         await self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
         await self.page.wait_for_timeout(1500)
 
         # Dismiss popups
         print("[SETUP] Dismissing popups...")
-        await dismiss_popups_with_llm(self.page, max_attempts=2)
+        await self._dismiss_popups(max_attempts=2)
 
         # Open menu
         print("[SETUP] Opening menu...")
@@ -129,7 +165,7 @@ class NavExplorer:
         print(f"[SETUP] Menu selector: {self.menu_selector}")
 
         # Dismiss popups after menu open (with menu_is_open=True to skip risky selectors)
-        popups_dismissed = await dismiss_popups_with_llm(self.page, max_attempts=1, menu_is_open=True)
+        popups_dismissed = await self._dismiss_popups(max_attempts=1, menu_is_open=True)
 
         # Only check if menu closed if we actually clicked something
         # When popups_dismissed=0 and menu_is_open=True, we skipped all risky operations
@@ -152,100 +188,243 @@ class NavExplorer:
             if dom_result.get('found'):
                 self.tabs = dom_result['tabs']
                 print(f"[SETUP] Found tabs: {[t['text'] for t in self.tabs]}")
-
-                # Add tabs to stack (reversed so first tab is on top)
-                for tab in reversed(self.tabs):
-                    path = [tab['text']]
-                    self.stack.append((path, tab['text'], tab['role'], None, True))  # is_tab=True
+                self._push_tabs()
             else:
                 print("[SETUP] Could not find tabs in DOM")
 
         # If no tabs, analyze menu content now
         if not self.tabs:
-            print("[SETUP] No tabs - analyzing menu content...")
-            print(f"[SETUP] Menu ARIA ({len(menu_aria)} chars):")
-            for line in menu_aria.splitlines():
-                print(f"  {line}")
-
-            # Extract all nav elements with CSS grouping and LLM filtering
-            result = await extract_and_filter_nav_elements(
-                self.page, menu_aria, self.menu_selector
-            )
-            elements = result['elements']
-            # Store at depth 1 (root menu level, same as tab level)
-            if result['excluded_groups']:
-                self.excluded_groups_cache[1] = result['excluded_groups']
-
-            # Collect button-link pairs for batch classification
-            pairs_to_classify = []
-            for el in elements:
-                if el['type'] in ('button', 'tab', 'menuitem'):
-                    nearby_link = el.get('nearby_link')
-                    if nearby_link:
-                        pairs_to_classify.append((el['name'], nearby_link))
-
-            # Batch classify all pairs (one LLM call)
-            classifications = {}
-            if pairs_to_classify:
-                classifications = await classify_button_relationships_batch(pairs_to_classify)
-
-            # Process elements in DOM order
-            links_added = 0
-            expandables_added = 0
-
-            for el in elements:
-                name = el['name']
-                parent = el['parent']
-                path = [parent] if parent else []
+            await self._add_menu_elements(menu_aria)
 
-                if el['type'] == 'link':
-                    # Add link to tree
-                    self._add_to_tree(path, name, el['url'])
-                    links_added += 1
+        self.plan.menu_button = get_cached_menu_button(self.page)
+        print(f"[SETUP] Stack: {[name for _, name, _, _, _ in self.stack]}")
+        return {'success': True, 'stack_size': len(self.stack)}
 
-                elif el['type'] in ('button', 'tab', 'menuitem'):
-                    # Check if button expands a nearby link's category
-                    nearby_link = el.get('nearby_link')
-                    nearby_link_url = el.get('nearby_link_url')
-                    expands_info = None
+    def _push_tabs(self, tabs: list = None):
+        """Add tabs to stack (reversed so first tab is on top)."""
+        for tab in reversed(tabs if tabs is not None else self.tabs):
+            path = [tab['text']]
+            self.stack.append((path, tab['text'], tab['role'], None, True))  # is_tab=True
 
-                    # If expandable itself has a URL (link with chevron icon), record it
-                    if el.get('url'):
-                        self._add_to_tree(path, name, el['url'])
-                        links_added += 1
-                        print(f"[SETUP] Expandable '{name}' has URL: {el['url']}")
-
-                    if nearby_link:
-                        # Use batch classification result
-                        relationship = classifications.get(name, 'SEPARATE')
-                        if relationship == 'EXPANDS':
-                            print(f"[SETUP] Button '{name}' EXPANDS link '{nearby_link}'")
-                            # Button expands the link - children attach to the link node
-                            expands_info = {
-                                'link_name': nearby_link,
-                                'link_url': nearby_link_url
-                            }
-                            # Also add the link itself to the tree (it's a category)
-                            self._add_to_tree(path, nearby_link, nearby_link_url)
-                            links_added += 1
-
-                    # Check if expandable already has children in tree
-                    if not self._has_children(path, name):
-                        # No children yet, add to stack
-                        # Use aria_role for clicking (actual DOM role), not logical type
-                        full_path = path + [name]
-                        click_role = el.get('aria_role', el['type'])
-                        self.stack.append((full_path, name, click_role, expands_info, False))  # is_tab=False
-                        expandables_added += 1
-                        print(f"[SETUP] Expandable '{name}': added to stack")
-                    else:
-                        print(f"[SETUP] Expandable '{name}': already has children, skipping")
-
-            print(f"[SETUP] Total: {links_added} links, {expandables_added} expandables")
+    async def _replay_setup(self, url: str) -> dict | None:
+        """
+        Setup from the saved replay plan - no LLM calls.
+
+        Returns the setup result, or None if the page no longer matches the
+        plan (menu button gone, container missing, tabs changed).
+        """
+        plan = self.replay_plan
+        print(f"[SETUP] Replaying saved plan for {url}")
+        await self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await self.page.wait_for_timeout(1500)
+
+        self.replaying = True
+        self.plan = ReplayPlan.from_dict(plan.to_dict())
+        self.excluded_groups_cache = self.plan.excluded_groups
+
+        await self._dismiss_popups()
+
+        button = plan.menu_button
+        cache_menu_button(self.page, button['selector'], button.get('method', 'click'), button.get('controls'))
+        if not await reopen_menu_fast(self.page):
+            print("[SETUP] Replay mismatch: menu button")
+            return None
+
+        self.menu_selector = plan.menu_selector
+        menu_aria = None
+        if self.menu_selector:
+            try:
+                el = self.page.locator(self.menu_selector).first
+                if await el.count() > 0:
+                    menu_aria = await el.aria_snapshot()
+            except Exception:
+                pass
+        if not menu_aria or 'link' not in menu_aria.lower():
+            print(f"[SETUP] Replay mismatch: menu container {self.menu_selector}")
+            return None
+        print(f"[SETUP] Menu opened via plan ({len(menu_aria)} chars)")
+
+        if plan.tabs:
+            tab_names = [t['text'] for t in plan.tabs]
+            dom_result = await find_tabs_in_dom(self.page, tab_names, menu_aria)
+            found = {t['text'].lower() for t in dom_result.get('tabs', [])}
+            if not dom_result.get('found') or found != {n.lower() for n in tab_names}:
+                print(f"[SETUP] Replay mismatch: tabs {tab_names} → {sorted(found)}")
+                return None
+            self.tabs = dom_result['tabs']
+            print(f"[SETUP] Tabs via plan: {[t['text'] for t in self.tabs]}")
+            self._push_tabs()
+        elif not await self._add_menu_elements(menu_aria):
+            print("[SETUP] Replay mismatch: no nav elements in menu")
+            return None
 
         print(f"[SETUP] Stack: {[name for _, name, _, _, _ in self.stack]}")
+        return {'success': True, 'stack_size': len(self.stack), 'replayed': True}
+
+    async def setup_fork(self, url: str, parent: 'NavExplorer', tabs: list) -> dict:
+        """
+        Setup on a second page that explores some of parent's top-level tabs.
+
+        Replays what parent.setup() discovered (popups, menu button, container)
+        instead of rediscovering it, so a fork costs one page load.
+        """
+        self.base_url = url
+        # Shared with parent and the other forks: a decision made in one is reused by all
+        self.plan = parent.plan
+        self.excluded_groups_cache = parent.excluded_groups_cache
+        # Popups are dismissed from parent's recorded plan, not via LLM
+        self.replaying = True
+        self.menu_selector = parent.menu_selector
+        self.tabs = parent.tabs
+
+        await self.page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        await self.page.wait_for_timeout(1500)
+        await self._dismiss_popups()
+
+        button = get_cached_menu_button(parent.page)
+        if not button:
+            return {'success': False, 'error': 'No cached menu button to fork from'}
+        cache_menu_button(self.page, button['selector'], button.get('method', 'click'), button.get('controls'))
+        if not await reopen_menu_fast(self.page) or not await self._is_menu_open():
+            return {'success': False, 'error': 'Could not open menu on forked page'}
+
+        self._push_tabs(tabs)
         return {'success': True, 'stack_size': len(self.stack)}
 
+    def _reset_after_mismatch(self):
+        """Drop everything the failed replay set up, so setup() starts clean."""
+        print("[SETUP] Replay plan no longer matches - exploring from scratch")
+        clear_menu_cache(self.page)
+        self.replaying = False
+        self.plan = ReplayPlan()
+        self.menu_selector = None
+        self.stack = []
+        self.categories = {}
+        self.tabs = []
+        self.excluded_groups_cache = {}
+
+    async def _dismiss_popups(self, max_attempts: int = 1, menu_is_open: bool = False) -> int:
+        """Dismiss popups - none unknown to the playbook showing, replayed from the plan, or via LLM (recording what was clicked)."""
+        # Probed every time - a popup the playbook doesn't know may show up later
+        if await popups_hidden(self.page):
+            return 0
+        if self.replaying:
+            return await replay_popup_dismissals(self.page, self.plan.popups, menu_is_open=menu_is_open,
+                                                 playbook=self.playbook)
+        return await dismiss_popups_with_llm(
+            self.page, max_attempts=max_attempts, menu_is_open=menu_is_open, record=self.plan.popups,
+            playbook=self.playbook
+        )
+
+    async def _classify_pairs(self, pairs: list[tuple[str, str]]) -> dict:
+        """Batch-classify button-link pairs, answering pairs already in the plan without the LLM."""
+        key = ReplayPlan.relationship_key
+        known = self.plan.relationships
+        unknown = [(btn, link) for btn, link in pairs if key(btn, link) not in known]
+
+        if unknown:
+            fresh = await classify_button_relationships_batch(unknown)
+            for btn, link in unknown:
+                known[key(btn, link)] = fresh.get(btn, 'SEPARATE')
+
+        return {btn: known[key(btn, link)] for btn, link in pairs}
+
+    def get_replay_plan(self) -> ReplayPlan:
+        """Decisions recorded this run, for replaying the next run of this domain."""
+        self.plan.menu_button = get_cached_menu_button(self.page) or self.plan.menu_button
+        self.plan.menu_selector = self.menu_selector or self.plan.menu_selector
+        self.plan.tabs = [{'text': t['text'], 'role': t['role']} for t in self.tabs]
+        self.plan.excluded_groups = self.excluded_groups_cache
+        # Recovery re-dismisses the same popups - keep each once
+        unique = {(p['role'], p['name']): p for p in self.plan.popups}
+        self.plan.popups = list(unique.values())
+        return self.plan
+
+    async def _add_menu_elements(self, menu_aria: str) -> int:
+        """Seed the tree and stack from a menu without tabs. Returns elements found."""
+        print("[SETUP] No tabs - analyzing menu content...")
+        print(f"[SETUP] Menu ARIA ({len(menu_aria)} chars):")
+        for line in menu_aria.splitlines():
+            print(f"  {line}")
+
+        # Extract all nav elements with CSS grouping and LLM filtering
+        result = await extract_and_filter_nav_elements(
+            self.page, menu_aria, self.menu_selector,
+            excluded_groups_cache=self.excluded_groups_cache.get(1)
+        )
+        elements = result['elements']
+        # Store at depth 1 (root menu level, same as tab level)
+        if result['excluded_groups']:
+            self.excluded_groups_cache[1] = result['excluded_groups']
+
+        # Collect button-link pairs for batch classification
+        pairs_to_classify = []
+        for el in elements:
+            if el['type'] in ('button', 'tab', 'menuitem'):
+                nearby_link = el.get('nearby_link')
+                if nearby_link:
+                    pairs_to_classify.append((el['name'], nearby_link))
+
+        # Batch classify all pairs (one LLM call)
+        classifications = {}
+        if pairs_to_classify:
+            classifications = await self._classify_pairs(pairs_to_classify)
+
+        # Process elements in DOM order
+        links_added = 0
+        expandables_added = 0
+
+        for el in elements:
+            name = el['name']
+            parent = el['parent']
+            path = [parent] if parent else []
+
+            if el['type'] == 'link':
+                # Add link to tree
+                self._add_to_tree(path, name, el['url'])
+                links_added += 1
+
+            elif el['type'] in ('button', 'tab', 'menuitem'):
+                # Check if button expands a nearby link's category
+                nearby_link = el.get('nearby_link')
+                nearby_link_url = el.get('nearby_link_url')
+                expands_info = None
+
+                # If expandable itself has a URL (link with chevron icon), record it
+                if el.get('url'):
+                    self._add_to_tree(path, name, el['url'])
+                    links_added += 1
+                    print(f"[SETUP] Expandable '{name}' has URL: {el['url']}")
+
+                if nearby_link:
+                    # Use batch classification result
+                    relationship = classifications.get(name, 'SEPARATE')
+                    if relationship == 'EXPANDS':
+                        print(f"[SETUP] Button '{name}' EXPANDS link '{nearby_link}'")
+                        # Button expands the link - children attach to the link node
+                        expands_info = {
+                            'link_name': nearby_link,
+                            'link_url': nearby_link_url
+                        }
+                        # Also add the link itself to the tree (it's a category)
+                        self._add_to_tree(path, nearby_link, nearby_link_url)
+                        links_added += 1
+
+                # Check if expandable already has children in tree
+                if not self._has_children(path, name):
+                    # No children yet, add to stack
+                    # Use aria_role for clicking (actual DOM role), not logical type
+                    full_path = path + [name]
+                    click_role = el.get('aria_role', el['type'])
+                    self.stack.append((full_path, name, click_role, expands_info, False))  # is_tab=False
+                    expandables_added += 1
+                    print(f"[SETUP] Expandable '{name}': added to stack")
+                else:
+                    print(f"[SETUP] Expandable '{name}': already has children, skipping")
+
+        print(f"[SETUP] Total: {links_added} links, {expandables_added} expandables")
+        return len(elements)
+
     async def _get_aria(self) -> str:
         """Get ARIA from menu container or body."""
         # Try stored selector first
@@ -277,6 +456,14 @@ class NavExplorer:
         print(f"  [ARIA] WARNING: No menu container found, using body")
         return await self.page.locator('body').aria_snapshot()
 
+    async def _snapshot(self) -> tuple[str, AriaDelta]:
+        """Menu ARIA snapshot, diffed against the previous one through the line index."""
+        aria = await self._get_aria()
+        delta = self.aria_index.update(aria)
+        self.snapshot_bytes += delta.snapshot_bytes
+        self.diff_ms += delta.diff_ms
+        return aria, delta
+
     async def _is_menu_open(self) -> bool:
         """Check if menu is currently open."""
         if self.menu_selector:
@@ -373,6 +560,10 @@ class NavExplorer:
             '[data-testid*="back"]',
         ]
 
+        # Back button seen on a previous run (or earlier this run) goes first
+        if self.plan.back_button_selector:
+            selectors = [self.plan.back_button_selector] + [s for s in selectors if s != self.plan.back_button_selector]
+
         # First search inside the menu container
         for selector in selectors:
             try:
@@ -381,6 +572,7 @@ class NavExplorer:
                     # Verify it's not a carousel control
                     aria_label = await loc.get_attribute('aria-label') or ''
                     if 'carousel' not in aria_label.lower() and 'slider' not in aria_label.lower():
+                        self.plan.back_button_selector = selector
                         return selector
             except:
                 continue
@@ -398,6 +590,7 @@ class NavExplorer:
                                 aria_label = await loc.get_attribute('aria-label') or ''
                                 if 'carousel' not in aria_label.lower() and 'slider' not in aria_label.lower():
                                     print(f"    [BACK] Found in parent container: {selector}")
+                                    self.plan.back_button_selector = selector
                                     return selector
                         except:
                             continue
@@ -447,7 +640,7 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
 
         try:
             llm = get_llm_handler()
-            result = llm.call(
+            result = await llm.acall(
                 prompt,
                 expected_format="json",
                 response_model=BackButtonIdentification,
@@ -495,7 +688,7 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
             return False
 
         # Dismiss popups
-        await dismiss_popups_with_llm(self.page, max_attempts=1)
+        await self._dismiss_popups()
 
         # Reopen menu
         print(f"  [RECOVER] Reopening menu...")
@@ -540,6 +733,14 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
         4. Push children
         5. Mark explored
         """
+        bytes_before, diff_before = self.snapshot_bytes, self.diff_ms
+        result = await self._step()
+        result.snapshot_bytes = self.snapshot_bytes - bytes_before
+        result.diff_ms = self.diff_ms - diff_before
+        return result
+
+    async def _step(self) -> StepResult:
+        """One step (see step()); snapshot cost is filled in by step()."""
         if not self.stack:
             return StepResult(
                 success=False,
@@ -596,7 +797,7 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
         # For EXPANDABLES: capture BEFORE for diff
         elements_before = []
         if not is_tab_switch:
-            aria_before = await self._get_aria()
+            aria_before, _ = await self._snapshot()
             print(f"  [ARIA BEFORE] {len(aria_before)} chars, {len(aria_before.splitlines())} lines")
             # Print ARIA for debugging
             for line in aria_before.splitlines():
@@ -666,7 +867,7 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
             # Don't set is_in_place_expansion yet - will check diff after getting aria_after
 
         # Get ARIA after and extract elements
-        aria_after = await self._get_aria()
+        aria_after, after_delta = await self._snapshot()
         print(f"  [ARIA AFTER] {len(aria_after)} chars, {len(aria_after.splitlines())} lines")
         # Print ARIA for debugging
         for line in aria_after.splitlines():
@@ -674,12 +875,8 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
 
         # If no back button detected, use diff to determine submenu vs in-place
         if role != 'tab' and not entered_submenu and not is_tab_switch:
-            before_lines = set(aria_before.splitlines())
-            after_lines = set(aria_after.splitlines())
-            removed_lines = before_lines - after_lines
-
             # If >50% of original content removed, it's a submenu replacement
-            removal_ratio = len(removed_lines) / len(before_lines) if before_lines else 0
+            removal_ratio = after_delta.removal_ratio
             if removal_ratio > 0.5:
                 entered_submenu = True
                 self.in_submenu = True
@@ -769,7 +966,7 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
 
         classifications = {}
         if pairs_to_classify:
-            classifications = await classify_button_relationships_batch(pairs_to_classify)
+            classifications = await self._classify_pairs(pairs_to_classify)
 
         # Process elements: add links to tree first, then check expandables
         added_to_stack = 0
@@ -1032,20 +1229,115 @@ Return the 1-indexed number of the back button, or 0 if none of these is a back
         }
 
 
+async def _run_steps(explorer: NavExplorer, budget: dict, max_errors: int, label: str = '') -> dict:
+    """
+    Step one explorer until its stack is empty.
+
+    budget['steps'] is shared between concurrently running explorers, so
+    max_steps still caps the whole exploration.
+    """
+    consecutive_errors = 0
+    total_errors = 0
+    step_count = 0
+    prefix = f"[{label}] " if label else ""
+
+    while not explorer.done() and budget['steps'] > 0:
+        budget['steps'] -= 1
+        try:
+            result = await explorer.step()
+            step_count += 1
+
+            if result.success:
+                consecutive_errors = 0
+                links_count = len(result.links_found)
+                print(f"  {prefix}[{step_count}] {result.item_name}: {links_count} links, {result.children_added} children "
+                      f"({result.snapshot_bytes / 1024:.1f}KB ARIA, {result.diff_ms:.1f}ms diff)")
+            else:
+                consecutive_errors += 1
+                total_errors += 1
+                print(f"  {prefix}[{step_count}] {result.item_name}: ERROR - {result.error}")
+
+                if consecutive_errors >= max_errors:
+                    print(f"\n{prefix}[STOP] {max_errors} consecutive errors, stopping exploration")
+                    break
+
+        except Exception as e:
+            consecutive_errors += 1
+            total_errors += 1
+            step_count += 1
+            print(f"  {prefix}[{step_count}] EXCEPTION: {e}")
+
+            if consecutive_errors >= max_errors:
+                print(f"\n{prefix}[STOP] {max_errors} consecutive errors, stopping exploration")
+                break
+
+    return {'steps': step_count, 'errors': total_errors}
+
+
+async def _fork_tab_explorers(explorer: NavExplorer, url: str, max_parallel_tabs: int) -> list:
+    """
+    Spread explorer's top-level tabs over up to max_parallel_tabs pages.
+
+    explorer keeps the first share of tabs on its own page; each fork gets a
+    new page in the same browser context (cookies from popup dismissal carry
+    over). A fork that can't reopen the menu hands its tabs back to explorer.
+    """
+    tabs = explorer.tabs
+    workers = min(max_parallel_tabs, len(tabs))
+    shares = [tabs[i::workers] for i in range(workers)]
+
+    # explorer's stack holds every tab - keep only its own share
+    own = {t['text'] for t in shares[0]}
+    explorer.stack = [item for item in explorer.stack if not item[4] or item[1] in own]
+
+    explorers = [explorer]
+    for share in shares[1:]:
+        page = await explorer.page.context.new_page()
+        fork = NavExplorer(page, playbook=explorer.playbook)
+        names = [t['text'] for t in share]
+        try:
+            setup = await fork.setup_fork(url, explorer, share)
+        except Exception as e:
+            setup = {'success': False, 'error': str(e)}
+
+        if setup.get('success'):
+            print(f"[FORK] Page {len(explorers) + 1} explores tabs: {names}")
+            explorers.append(fork)
+        else:
+            print(f"[FORK] Fork for {names} failed ({setup.get('error')}) - exploring them on the main page")
+            await page.close()
+            # Bottom of the stack: explored after explorer's own tabs
+            explorer.stack[:0] = [([t['text']], t['text'], t['role'], None, True) for t in reversed(share)]
+
+    return explorers
+
+
 async def run_exploration(
     page: Page,
     url: str,
     max_steps: int = 200,
     max_errors: int = 5,
+    replay_plan: Optional[ReplayPlan] = None,
+    max_parallel_tabs: int = 4,
+    playbook: Optional[PopupPlaybook] = None,
 ) -> dict:
     """
     Run full navigation exploration with proper error handling.
 
+    When the menu has top-level tabs (Women/Men/Kids...), they are independent
+    subtrees: each is explored on its own page concurrently and the partial
+    category dicts are merged.
+
     Args:
-        page: Playwright page (browser must be open)
+        page: Playwright page (browser must be open; forks open pages in its context)
         url: URL to explore
-        max_steps: Maximum steps before stopping
-        max_errors: Maximum consecutive errors before stopping
+        max_steps: Maximum steps before stopping (across all pages)
+        max_errors: Maximum consecutive errors before stopping (per page)
+        replay_plan: Plan saved by a previous run - replayed without LLM
+            calls while the page still matches it
+        max_parallel_tabs: Pages exploring tabs at once (1 = sequential)
+        playbook: Popup playbook installed on page's context (learns from
+            dismissals when it didn't hide everything)
 
     Returns:
         {
@@ -1057,14 +1349,14 @@ async def run_exploration(
                 'explored': int,
                 'remaining': int,
                 'errors': int,
+                'pages': int,
             },
+            'replay_plan': dict,  # decisions recorded this run (ReplayPlan.to_dict())
+            'replayed': bool,
             'error': str or None,
         }
     """
-    explorer = NavExplorer(page)
-    consecutive_errors = 0
-    total_errors = 0
-    step_count = 0
+    explorer = NavExplorer(page, replay_plan=replay_plan, playbook=playbook)
 
     # Setup
     try:
@@ -1084,48 +1376,55 @@ async def run_exploration(
             'error': f'Setup exception: {e}',
         }
 
-    # Exploration loop
-    while not explorer.done() and step_count < max_steps:
-        try:
-            result = await explorer.step()
-            step_count += 1
-
-            if result.success:
-                consecutive_errors = 0
-                links_count = len(result.links_found)
-                print(f"  [{step_count}] {result.item_name}: {links_count} links, {result.children_added} children")
-            else:
-                consecutive_errors += 1
-                total_errors += 1
-                print(f"  [{step_count}] {result.item_name}: ERROR - {result.error}")
-
-                if consecutive_errors >= max_errors:
-                    print(f"\n[STOP] {max_errors} consecutive errors, stopping exploration")
-                    break
-
-        except Exception as e:
-            consecutive_errors += 1
-            total_errors += 1
-            step_count += 1
-            print(f"  [{step_count}] EXCEPTION: {e}")
+    # One page per share of top-level tabs
+    explorers = [explorer]
+    if max_parallel_tabs > 1 and len(explorer.tabs) > 1:
+        explorers = await _fork_tab_explorers(explorer, url, max_parallel_tabs)
 
-            if consecutive_errors >= max_errors:
-                print(f"\n[STOP] {max_errors} consecutive errors, stopping exploration")
-                break
+    # Exploration loops
+    budget = {'steps': max_steps}
+    try:
+        if len(explorers) == 1:
+            runs = [await _run_steps(explorer, budget, max_errors)]
+        else:
+            runs = await asyncio.gather(*(
+                _run_steps(e, budget, max_errors, label=f"P{i + 1}")
+                for i, e in enumerate(explorers)
+            ))
+    finally:
+        for fork in explorers[1:]:
+            await fork.page.close()
+
+    # Merge back into menu order - each explorer's keys start with one of its own tabs
+    tab_order = {t['text']: i for i, t in enumerate(explorer.tabs)}
+    merged = [item for e in explorers for item in e.categories.items()]
+    merged.sort(key=lambda item: tab_order.get(item[0].split(' > ')[0], len(tab_order)))
+    categories = dict(merged)
+
+    # A replay that found nothing means the menu changed under the plan
+    if explorer.replaying and not categories:
+        print("\n[REPLAY] Replay found no categories - exploring from scratch")
+        clear_menu_cache(page)
+        return await run_exploration(page, url, max_steps=max_steps, max_errors=max_errors,
+                                     max_parallel_tabs=max_parallel_tabs)
 
     # Results
-    categories = explorer.categories
     return {
         'success': True,
         'categories': categories,
         'tabs': [t['text'] for t in explorer.tabs],
         'stats': {
-            'total_steps': step_count,
+            'total_steps': sum(r['steps'] for r in runs),
             'total_links': len(categories),
-            'explored': len(explorer.explored),
-            'remaining': len(explorer.stack),
-            'errors': total_errors,
+            'explored': sum(len(e.explored) for e in explorers),
+            'remaining': sum(len(e.stack) for e in explorers),
+            'errors': sum(r['errors'] for r in runs),
+            'pages': len(explorers),
+            'snapshot_bytes': sum(e.snapshot_bytes for e in explorers),
+            'diff_ms': round(sum(e.diff_ms for e in explorers), 1),
         },
+        'replay_plan': explorer.get_replay_plan().to_dict(),
+        'replayed': explorer.replaying,
         'error': None,
     }
 
@@ -1190,14 +1489,22 @@ def categories_to_tree(categories: dict, tabs: list = None) -> dict:
     return root
 
 
-async def explore(url: str) -> tuple:
+async def explore(url: str, replay_plan: Optional[ReplayPlan] = None,
+                  playbook: Optional[PopupPlaybook] = None) -> tuple:
     """
     Main entry point - creates browser, runs exploration, returns tree.
 
+    Args:
+        url: URL to explore
+        replay_plan: Plan saved by a previous run of this domain (optional)
+        playbook: Popup playbook of this domain (optional) - installed on the
+            context, and filled with what this run's dismissals learn
+
     Returns:
         tuple: (tree_dict, stats_dict)
             tree_dict: {'name': 'root', 'children': [...], 'links': [...]}
-            stats_dict: {'total_links': int, 'total_steps': int, ...}
+            stats_dict: {'total_links': int, 'total_steps': int, ...,
+                         'replay_plan': dict, 'replayed': bool}
     """
     from playwright.async_api import async_playwright
 
@@ -1208,10 +1515,15 @@ async def explore(url: str) -> tuple:
 
     playwright = await async_playwright().start()
     browser = await playwright.chromium.launch(headless=False)
-    page = await browser.new_page(viewport={'width': 768, 'height': 900})
+    # Explicit context: tab forks open their pages in it (browser.new_page() contexts allow one page)
+    context = await browser.new_context(viewport={'width': 768, 'height': 900})
+    if playbook:
+        await playbook.install(context)
+    page = await context.new_page()
 
     try:
-        result = await run_exploration(page, url, max_steps=200, max_errors=5)
+        result = await run_exploration(page, url, max_steps=200, max_errors=5, replay_plan=replay_plan,
+                                       playbook=playbook)
 
         if not result['success']:
             print(f"\n[ERROR] {result['error']}")
@@ -1219,9 +1531,13 @@ async def explore(url: str) -> tuple:
 
         # Convert to tree format
         tree = categories_to_tree(result['categories'], result.get('tabs', []))
+        result['stats']['replay_plan'] = result['replay_plan']
+        result['stats']['replayed'] = result['replayed']
 
         print(f"\n{'='*70}")
-        print(f"COMPLETE: {result['stats']['total_links']} links in {result['stats']['total_steps']} steps")
+        print(f"COMPLETE: {result['stats']['total_links']} links in {result['stats']['total_steps']} steps "
+              f"({result['stats']['pages']} page{'s' if result['stats']['pages'] > 1 else ''})")
+        print(f"ARIA: {result['stats']['snapshot_bytes'] / 1024:.0f}KB snapshotted, {result['stats']['diff_ms']:.0f}ms diffing")
         print(f"{'='*70}")
 
         return tree, result['stats']
@@ -1481,6 +1481,10 @@ def apply_lineage_filtering(products: List[Dict[str, Any]], page_url: str, categ
 
         initial_count = len(products)
 
+        lineage_memory = getattr(brand_instance, 'lineage_memory', None)
+        if lineage_memory is not None:
+            lineage_memory.seen("product", {product.get('full_lineage') for product in products})
+
         # Step 1: Pre-filter globally rejected lineages
         if brand_instance and brand_instance.rejected_lineages:
             products = [
@@ -1538,7 +1542,7 @@ def apply_lineage_filtering(products: List[Dict[str, Any]], page_url: str, categ
             _log(f"   ⏭️  Only 1 new lineage pattern - auto-approving")
             # Store as approved
             if brand_instance:
-                brand_instance.store_lineage_memory(page_url, set(), unknown_lineages)
+                brand_instance.store_lineage_memory(page_url, set(), unknown_lineages, confidence="Low")
                 _log(f"   💾 Stored 1 approved lineage for this category")
             return products  # All products approved
 
@@ -1597,7 +1601,8 @@ def apply_lineage_filtering(products: List[Dict[str, Any]], page_url: str, categ
 
         # Step 7: Update global brand memory with new decisions
         if brand_instance:
-            brand_instance.store_lineage_memory(page_url, newly_rejected_lineages, newly_approved_lineages)
+            brand_instance.store_lineage_memory(page_url, newly_rejected_lineages, newly_approved_lineages,
+                                                confidence=result.get('confidence', 'Medium'))
             _log(f"   💾 Updated global lineage memory")
 
         # Step 8: Filter products - keep approved (old + new)
@@ -1810,6 +1815,23 @@ def extract_collection_hierarchy(navigation_tree: List[Dict]) -> List[Dict]:
     return extract_with_path(navigation_tree)
 
 
+# Common load more button selectors
+LOAD_MORE_SELECTORS = [
+    'button:has-text("Load More")',
+    'button:has-text("Show More")',
+    'button:has-text("View More")',
+    'a:has-text("Load More")',
+    'a:has-text("Show More")',
+    '[data-action*="load"]',
+    '[class*="load-more"]',
+    '[class*="show-more"]',
+    '[id*="load-more"]',
+    '.load-more-button',
+    '.show-more-button',
+    'button[onclick*="load"]'
+]
+
+
 def _handle_load_more_button(page, page_url: str, brand_instance) -> bool:
     """
     Handle load more button detection and clicking with smart caching.
@@ -1844,26 +1866,10 @@ def _detect_and_click_load_more(page, page_url: str, brand_instance) -> bool:
     try:
         _log(f"   🔍 First-time load more detection...")
         
-        # Common load more button selectors
-        load_more_selectors = [
-            'button:has-text("Load More")',
-            'button:has-text("Show More")',
-            'button:has-text("View More")',
-            'a:has-text("Load More")',
-            'a:has-text("Show More")',
-            '[data-action*="load"]',
-            '[class*="load-more"]',
-            '[class*="show-more"]',
-            '[id*="load-more"]',
-            '.load-more-button',
-            '.show-more-button',
-            'button[onclick*="load"]'
-        ]
-        
         detected_selector = None
         
         # Try each selector
-        for selector in load_more_selectors:
+        for selector in LOAD_MORE_SELECTORS:
             try:
                 elements = page.locator(selector)
                 if elements.count() > 0 and elements.first.is_visible():
@@ -1961,6 +1967,25 @@ def _click_load_more_button(page, selector: str) -> bool:
 
 
 
+# Elements that mark the end of a product listing
+PAGINATION_TRIGGER_SELECTORS = [
+    '.pagination',
+    '.pager', 
+    '.page-navigation',
+    '[class*="pagination"]',
+    '[class*="pager"]',
+    '.infinite-scroll',
+    '.scroll-trigger', 
+    '[class*="infinite"]',
+    '[class*="scroll-trigger"]',
+    '[data-infinite]',
+    'nav[role="navigation"]',
+    '[role="navigation"]',
+    '.nav-pagination',
+    '.pagination-wrapper'
+]
+
+
 def _detect_pagination_element(page):
     """
     Detect if pagination elements exist on the page (one-time detection).
@@ -1969,25 +1994,8 @@ def _detect_pagination_element(page):
         str or None: The selector of the first pagination element found, or None
     """
     try:
-        pagination_trigger_selectors = [
-            '.pagination',
-            '.pager', 
-            '.page-navigation',
-            '[class*="pagination"]',
-            '[class*="pager"]',
-            '.infinite-scroll',
-            '.scroll-trigger', 
-            '[class*="infinite"]',
-            '[class*="scroll-trigger"]',
-            '[data-infinite]',
-            'nav[role="navigation"]',
-            '[role="navigation"]',
-            '.nav-pagination',
-            '.pagination-wrapper'
-        ]
-        
         # Find the FIRST pagination element
-        for selector in pagination_trigger_selectors:
+        for selector in PAGINATION_TRIGGER_SELECTORS:
             try:
                 elements = page.locator(selector)
                 if elements.count() > 0 and elements.last.is_visible():
@@ -2016,6 +2024,20 @@ def _detect_post_scroll_pagination(page, page_url: str) -> Dict[str, Any]:
         - next_page_url: str | None (if no max detected)
         - reasoning: str
     """
+    _log(f"   🔍 More Links: Detecting post-scroll pagination patterns...")
+
+    # Extract bottom section links (last 30% of page)
+    bottom_links = _extract_bottom_page_links(page, page_url)
+    return _detect_pagination_from_links(bottom_links, page_url)
+
+
+def _detect_pagination_from_links(bottom_links: List[str], page_url: str) -> Dict[str, Any]:
+    """
+    Pagination analysis of a page's bottom-section links (no page access).
+
+    Shared by the sync and async (url_extractor_async) scrollers - returns
+    the same structure as _detect_post_scroll_pagination.
+    """
     result = {
         "pagination_found": False,
         "url_pattern": None,
@@ -2025,11 +2047,6 @@ def _detect_post_scroll_pagination(page, page_url: str) -> Dict[str, Any]:
     }
     
     try:
-        _log(f"   🔍 More Links: Detecting post-scroll pagination patterns...")
-        
-        # Extract bottom section links (last 30% of page)
-        bottom_links = _extract_bottom_page_links(page, page_url)
-        
         if not bottom_links:
             result["reasoning"] = "No links found in bottom section of page"
             _log(f"   📄 No bottom links found - single page category")
@@ -2117,62 +2134,70 @@ def _detect_post_scroll_pagination(page, page_url: str) -> Dict[str, Any]:
     return result
 
 
+# Links in the bottom 30% of the page, in DOM order
+BOTTOM_LINKS_JS = """
+    () => {
+        const pageHeight = document.body.scrollHeight;
+        const bottomThreshold = pageHeight * 0.7; // Bottom 30%
+        
+        // Get all links in DOM order (querySelectorAll preserves document order)
+        const allLinks = Array.from(document.querySelectorAll('a[href]'));
+        
+        // Filter for bottom 30% links while preserving DOM order
+        const bottomLinksInOrder = [];
+        allLinks.forEach(link => {
+            const rect = link.getBoundingClientRect();
+            const absoluteTop = rect.top + window.scrollY;
+            
+            if (absoluteTop >= bottomThreshold) {
+                const href = link.href;
+                if (href && !href.startsWith('javascript:') && !href.startsWith('#')) {
+                    bottomLinksInOrder.push(href);
+                }
+            }
+        });
+        
+        return bottomLinksInOrder;
+    }
+"""
+
+
 def _extract_bottom_page_links(page, base_url: str) -> List[str]:
     """Extract links from bottom 30% section of page"""
     try:
         # Get page dimensions and extract bottom section links
-        bottom_links = page.evaluate(f"""
-            () => {{
-                const pageHeight = document.body.scrollHeight;
-                const bottomThreshold = pageHeight * 0.7; // Bottom 30%
-                
-                // Get all links in DOM order (querySelectorAll preserves document order)
-                const allLinks = Array.from(document.querySelectorAll('a[href]'));
-                
-                // Filter for bottom 30% links while preserving DOM order
-                const bottomLinksInOrder = [];
-                allLinks.forEach(link => {{
-                    const rect = link.getBoundingClientRect();
-                    const absoluteTop = rect.top + window.scrollY;
-                    
-                    if (absoluteTop >= bottomThreshold) {{
-                        const href = link.href;
-                        if (href && !href.startsWith('javascript:') && !href.startsWith('#')) {{
-                            bottomLinksInOrder.push(href);
-                        }}
-                    }}
-                }});
-                
-                return bottomLinksInOrder;
-            }}
-        """)
-        
-        # Filter to same domain only
-        from urllib.parse import urlparse
-        base_domain = f"{urlparse(base_url).scheme}://{urlparse(base_url).netloc}"
-        
-        filtered_links = []
-        for link in bottom_links:
-            if link.startswith(base_domain) or link.startswith('/'):
-                if link.startswith('/'):
-                    link = urljoin(base_url, link)
-                filtered_links.append(link)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        ordered_unique_links = []
-        for link in filtered_links:
-            if link not in seen:
-                seen.add(link)
-                ordered_unique_links.append(link)
-        
-        return ordered_unique_links
-        
+        bottom_links = page.evaluate(BOTTOM_LINKS_JS)
+        return _same_domain_links(bottom_links, base_url)
+
     except Exception as e:
         _log(f"   ⚠️  Error extracting bottom links: {e}")
         return []
 
 
+def _same_domain_links(bottom_links: List[str], base_url: str) -> List[str]:
+    """Keep same-domain links (absolute), deduplicated in order."""
+    # Filter to same domain only
+    from urllib.parse import urlparse
+    base_domain = f"{urlparse(base_url).scheme}://{urlparse(base_url).netloc}"
+    
+    filtered_links = []
+    for link in bottom_links:
+        if link.startswith(base_domain) or link.startswith('/'):
+            if link.startswith('/'):
+                link = urljoin(base_url, link)
+            filtered_links.append(link)
+    
+    # Remove duplicates while preserving order
+    seen = set()
+    ordered_unique_links = []
+    for link in filtered_links:
+        if link not in seen:
+            seen.add(link)
+            ordered_unique_links.append(link)
+    
+    return ordered_unique_links
+
+
 def _filter_links_by_category(bottom_links: List[str], current_page_url: str) -> List[str]:
     """Filter bottom links to only include those related to the current category"""
     try:
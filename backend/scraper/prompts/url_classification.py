@@ -17,6 +17,56 @@ class URLClassification(BaseModel):
     confidence: str = Field(description="High/Medium/Low confidence in this classification")
 
 
+# Shared by the single-page and batched prompts
+CLASSIFICATION_INSTRUCTIONS = """**Classification Instructions:**
+1. Identify links that lead to PRODUCT DETAIL PAGES - individual product pages where you can view/buy a specific product.
+
+2. INCLUDE as product links:
+   - Links with URL patterns like /products/, /p/, /item/, /shop/, /product-detail/
+   - Links in product grid/listing containers (look for "product", "item", "card" in lineage)
+   - Links where text looks like a product name
+
+3. EXCLUDE (not product links):
+   - Category/collection navigation links (e.g., /collections/, /category/, /c/)
+   - Utility links (cart, wishlist, login, account, search)
+   - Footer/header navigation links
+   - "View All", "See More", "Load More" type links
+   - Recommendation section links if clearly separated from main grid
+   - Social media, policy pages, contact links
+   - Pagination links (page numbers, next/prev)
+   - **Small carousel/featured sections**: If only a few [CAROUSEL] links exist among many non-carousel products, exclude them (they're likely global featured products appearing on every page)
+
+4. Use lineage patterns to identify:
+   - Main product grid: usually consistent lineage with "grid", "product", "item", "catalog", "collection"
+   - Recommendations: often in separate containers like "recommend", "also-like", "related"
+   - Navigation: typically in "nav", "header", "footer", "menu" containers
+
+5. **[CAROUSEL] flag interpretation** (IMPORTANT):
+   - Links marked [CAROUSEL] are inside slider/carousel/swiper containers
+   - If MOST links are [CAROUSEL]: the carousel IS the main product display - INCLUDE them
+   - If only a FEW links are [CAROUSEL] (minority): these are likely featured/hero products that appear on every page - EXCLUDE them
+   - Use the ratio: if >50% of product-like links are [CAROUSEL], it's the main grid; if <20%, it's a featured section
+
+6. Position-based hints:
+   - If only a small number of [CAROUSEL] links appear at the start (low position indices), they're likely global featured products
+   - The main category products typically share a consistent lineage pattern
+   - Non-carousel links in product grids are usually the primary category products
+
+**Return:** The indices (0, 1, 2, etc.) of links that are genuine product pages. If links #0, #3, and #5 are products, return [0, 3, 5]."""
+
+
+def _format_links(links: List[Dict], start: int = 0) -> str:
+    """Numbered link list for the prompt (index, URL, lineage, text)."""
+    links_list = ""
+    for i, link in enumerate(links, start):
+        url = link.get('url', '')
+        lineage = link.get('lineage', 'unknown')
+        text = link.get('link_text', '').strip()[:50]  # Truncate long text
+        carousel_flag = " [CAROUSEL]" if link.get('in_carousel') else ""
+        links_list += f"{i}. URL: {url}{carousel_flag}\n   Lineage: {lineage}\n   Text: \"{text}\"\n\n"
+    return links_list
+
+
 def get_prompt(page_url: str, category_name: str, links: List[Dict]) -> str:
     """
     Generate URL classification prompt.
@@ -29,15 +79,8 @@ def get_prompt(page_url: str, category_name: str, links: List[Dict]) -> str:
     Returns:
         Formatted prompt string
     """
-    # Format links for display
-    links_list = ""
+    links_list = _format_links(links)
     carousel_count = sum(1 for l in links if l.get('in_carousel'))
-    for i, link in enumerate(links):
-        url = link.get('url', '')
-        lineage = link.get('lineage', 'unknown')
-        text = link.get('link_text', '').strip()[:50]  # Truncate long text
-        carousel_flag = " [CAROUSEL]" if link.get('in_carousel') else ""
-        links_list += f"{i}. URL: {url}{carousel_flag}\n   Lineage: {lineage}\n   Text: \"{text}\"\n\n"
 
     return f"""
 You are analyzing links extracted from an e-commerce category page to identify which links lead to actual product pages.
@@ -53,41 +96,49 @@ You are analyzing links extracted from an e-commerce category page to identify w
 **Links to Classify (index, URL, DOM lineage, link text):**
 {links_list.strip()}
 
-**Classification Instructions:**
-1. Identify links that lead to PRODUCT DETAIL PAGES - individual product pages where you can view/buy a specific product.
+{CLASSIFICATION_INSTRUCTIONS}
+""".strip()
 
-2. INCLUDE as product links:
-   - Links with URL patterns like /products/, /p/, /item/, /shop/, /product-detail/
-   - Links in product grid/listing containers (look for "product", "item", "card" in lineage)
-   - Links where text looks like a product name
 
-3. EXCLUDE (not product links):
-   - Category/collection navigation links (e.g., /collections/, /category/, /c/)
-   - Utility links (cart, wishlist, login, account, search)
-   - Footer/header navigation links
-   - "View All", "See More", "Load More" type links
-   - Recommendation section links if clearly separated from main grid
-   - Social media, policy pages, contact links
-   - Pagination links (page numbers, next/prev)
-   - **Small carousel/featured sections**: If only a few [CAROUSEL] links exist among many non-carousel products, exclude them (they're likely global featured products appearing on every page)
+def get_batch_prompt(pages: List[Dict]) -> str:
+    """
+    Generate one URL classification prompt for several category pages of the same site.
 
-4. Use lineage patterns to identify:
-   - Main product grid: usually consistent lineage with "grid", "product", "item", "catalog", "collection"
-   - Recommendations: often in separate containers like "recommend", "also-like", "related"
-   - Navigation: typically in "nav", "header", "footer", "menu" containers
+    Args:
+        pages: List of {page_url, category_name, links} - indices run on across
+            pages, so the response's product_link_indices cover all of them
 
-5. **[CAROUSEL] flag interpretation** (IMPORTANT):
-   - Links marked [CAROUSEL] are inside slider/carousel/swiper containers
-   - If MOST links are [CAROUSEL]: the carousel IS the main product display - INCLUDE them
-   - If only a FEW links are [CAROUSEL] (minority): these are likely featured/hero products that appear on every page - EXCLUDE them
-   - Use the ratio: if >50% of product-like links are [CAROUSEL], it's the main grid; if <20%, it's a featured section
+    Returns:
+        Formatted prompt string
+    """
+    sections = ""
+    total = 0
+    for page in pages:
+        links = page['links']
+        carousel_count = sum(1 for l in links if l.get('in_carousel'))
+        sections += (
+            f"### Category: {page['category_name']}\n"
+            f"Page URL: {page['page_url']}\n"
+            f"Links marked [CAROUSEL]: {carousel_count} of {len(links)}\n\n"
+            f"{_format_links(links, start=total)}"
+        )
+        total += len(links)
 
-6. Position-based hints:
-   - If only a small number of [CAROUSEL] links appear at the start (low position indices), they're likely global featured products
-   - The main category products typically share a consistent lineage pattern
-   - Non-carousel links in product grids are usually the primary category products
+    return f"""
+You are analyzing links extracted from {len(pages)} category pages of the same e-commerce site to identify which links lead to actual product pages.
+
+**Context:**
+- Each section below lists links from one category page; judge each link in the context of its own page
+- Links already classified on other pages of this site are left out, so a page may show only a few links
+- Total links to analyze: {total}
+- Links marked [CAROUSEL] are inside slider/carousel containers
+
+**Goal:** Identify which links are genuine product detail pages for each page's category.
+
+**Links to Classify (index, URL, DOM lineage, link text), by page:**
+{sections.strip()}
 
-**Return:** The indices (0, 1, 2, etc.) of links that are genuine product pages. If links #0, #3, and #5 are products, return [0, 3, 5].
+{CLASSIFICATION_INSTRUCTIONS}
 """.strip()
 
 
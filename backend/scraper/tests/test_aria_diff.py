@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+AriaLineIndex Tests
+===================
+
+The incremental line index must report the same changes as a full set diff
+of consecutive snapshots, while only re-indexing the changed window.
+
+Run:
+    python -m pytest scraper/tests/test_aria_diff.py
+"""
+
+import random
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+try:
+    from scraper.navigation.aria.diff import AriaLineIndex, get_new_content
+except ImportError:  # The navigation package needs playwright / anthropic
+    AriaLineIndex = None
+
+
+MENU = "\n".join([
+    '- navigation "Main":',
+    '  - link "Women"',
+    '  - link "Men"',
+    '  - button "Menu"',
+])
+
+MENU_OPEN = "\n".join([
+    '- navigation "Main":',
+    '  - link "Women"',
+    '  - list:',
+    '    - link "Dresses"',
+    '    - link "Shoes"',
+    '  - link "Men"',
+    '  - button "Menu"',
+])
+
+
+@unittest.skipIf(AriaLineIndex is None, "navigation dependencies not installed")
+class TestAriaLineIndex(unittest.TestCase):
+
+    def assert_matches_set_diff(self, index, before, after):
+        delta = index.update(after)
+        before_lines = set(before.split('\n'))
+        after_lines = after.split('\n')
+
+        self.assertEqual(delta.added, [line for line in after_lines if line not in before_lines])
+        self.assertEqual(set(delta.removed), before_lines - set(after_lines))
+        self.assertEqual(+index.counts, Counter(after_lines))
+        return delta
+
+    def test_revealed_lines(self):
+        index = AriaLineIndex(MENU)
+        delta = index.update(MENU_OPEN)
+
+        self.assertEqual(delta.added, ['  - list:', '    - link "Dresses"', '    - link "Shoes"'])
+        self.assertEqual(delta.first_new_idx, 2)
+        self.assertEqual(delta.removed, [])
+        self.assertEqual('\n'.join(delta.added), get_new_content(MENU, MENU_OPEN))
+
+    def test_closed_menu_removal_ratio(self):
+        index = AriaLineIndex(MENU_OPEN)
+        delta = index.update(MENU)
+
+        self.assertEqual(delta.added, [])
+        self.assertIsNone(delta.first_new_idx)
+        self.assertEqual(sorted(delta.removed), sorted(['  - list:', '    - link "Dresses"', '    - link "Shoes"']))
+        self.assertAlmostEqual(delta.removal_ratio, 3 / 7)
+
+    def test_unchanged_snapshot(self):
+        index = AriaLineIndex(MENU)
+        delta = index.update(MENU)
+
+        self.assertEqual(delta.added, [])
+        self.assertEqual(delta.removed, [])
+        self.assertEqual(delta.removal_ratio, 0.0)
+
+    def test_duplicate_line_kept_while_one_copy_remains(self):
+        before = 'a\nx\nb\nx\nc'
+        after = 'a\nb\nx\nc'
+        index = AriaLineIndex(before)
+        delta = index.update(after)
+
+        self.assertEqual(delta.removed, [])
+        self.assertIn('x', index)
+        self.assertEqual(index.counts['x'], 1)
+
+    def test_contains_stripped(self):
+        index = AriaLineIndex(MENU_OPEN)
+        self.assertTrue(index.contains_stripped('- link "Dresses"'))
+        index.update(MENU)
+        self.assertFalse(index.contains_stripped('- link "Dresses"'))
+        self.assertTrue(index.contains_stripped('- link "Men"'))
+
+    def test_random_snapshots_match_set_diff(self):
+        rng = random.Random(7)
+        vocabulary = [f'  - link "{i}"' for i in range(12)]
+        before = ''
+        index = AriaLineIndex()
+        for _ in range(200):
+            lines = before.split('\n') if before else []
+            for _ in range(rng.randint(1, 4)):
+                op = rng.random()
+                if op < 0.4 or not lines:
+                    lines.insert(rng.randint(0, len(lines)), rng.choice(vocabulary))
+                elif op < 0.8:
+                    del lines[rng.randrange(len(lines))]
+                else:
+                    lines[rng.randrange(len(lines))] = rng.choice(vocabulary)
+            after = '\n'.join(lines)
+            self.assert_matches_set_diff(index, before, after)
+            before = after
+
+
+if __name__ == "__main__":
+    unittest.main()
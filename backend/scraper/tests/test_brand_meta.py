@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Brand Metadata Tests
+====================
+
+update_brand_meta merges one section at a time, and concurrent writers
+(threads, other processes) never drop each other's keys.
+
+Run:
+    python -m pytest scraper/tests/test_brand_meta.py
+"""
+
+import multiprocessing
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import storage
+
+DOMAIN = "shop.test"
+
+
+def _write_keys(extractions_dir: str, prefix: str, count: int):
+    """Writer process: one update per key, into a shared section."""
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from stages import storage
+
+    storage.EXTRACTIONS_DIR = Path(extractions_dir)
+    for i in range(count):
+        storage.update_brand_meta(DOMAIN, "rate", {f"{prefix}{i}": i})
+
+
+class TestUpdateBrandMeta(ExtractionsTestCase):
+
+    def test_sections_merged(self):
+        storage.update_brand_meta(DOMAIN, "nav", {"method": "static"})
+        storage.update_brand_meta(DOMAIN, "products", {"wait_ms": 1500})
+        storage.update_brand_meta(DOMAIN, "products", {"concurrency": 6})
+        storage.update_brand_meta(DOMAIN, "products", {"wait_ms": 900})
+
+        meta = storage.load_brand_meta(DOMAIN)
+        self.assertEqual(meta["nav"], {"method": "static"})
+        self.assertEqual(meta["products"], {"wait_ms": 900, "concurrency": 6})
+        self.assertIn("last_updated", meta)
+
+    def test_no_temp_files_left(self):
+        storage.update_brand_meta(DOMAIN, "nav", {"method": "static"})
+        names = {path.name for path in storage.get_domain_dir(DOMAIN).iterdir()}
+        self.assertEqual(names - {".brand_meta.lock"}, {"brand_meta.json"})
+
+    def test_failed_write_keeps_old_file(self):
+        storage.update_brand_meta(DOMAIN, "nav", {"method": "static"})
+        with self.assertRaises(TypeError):
+            storage.update_brand_meta(DOMAIN, "nav", {"method": object()})
+
+        self.assertEqual(storage.load_brand_meta(DOMAIN)["nav"], {"method": "static"})
+        names = {path.name for path in storage.get_domain_dir(DOMAIN).iterdir()}
+        self.assertEqual(names - {".brand_meta.lock"}, {"brand_meta.json"})
+
+    def test_concurrent_threads_keep_every_key(self):
+        def write(prefix):
+            for i in range(25):
+                storage.update_brand_meta(DOMAIN, "rate", {f"{prefix}{i}": i})
+
+        threads = [threading.Thread(target=write, args=(f"t{n}-",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        self.assertEqual(len(storage.load_brand_meta(DOMAIN)["rate"]), 100)
+
+    def test_concurrent_processes_keep_every_key(self):
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=_write_keys, args=(str(self.tmp_path), f"p{n}-", 15)) for n in range(3)]
+        for process in processes:
+            process.start()
+        _write_keys(str(self.tmp_path), "main-", 15)
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+        self.assertEqual(len(storage.load_brand_meta(DOMAIN)["rate"]), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Concurrency Tuner Tests
+=======================
+
+Hill-climbing decisions of ConcurrencyTuner, the per-epoch CPU reading it
+sheds on, and failures while resizing the browser pool.
+
+Run:
+    python -m pytest scraper/tests/test_concurrency_tuner.py
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import concurrency_tuner, resources
+from stages.concurrency_tuner import ConcurrencyTuner, TunerState, load_saved_concurrency
+
+try:
+    from prod_page_v2.browser_pool import BrowserInstance, BrowserPool
+except ImportError:  # browser_pool needs playwright
+    BrowserPool = None
+
+
+def close_epoch(tuner, pages: int, latency: float, duration: float = 10.0) -> int:
+    """Finish an epoch with `pages` extractions of `latency` seconds each."""
+    tuner._latencies = [latency] * pages
+    tuner._epoch_start = time.time() - duration
+    return tuner._decide()
+
+
+class TunerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(resources, "over_budget", return_value=None),
+            mock.patch.object(resources, "affordable_browsers", return_value=None),
+        ]
+        self.over_budget = patches[0].start()
+        for patch in patches[1:]:
+            patch.start()
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+
+class TestTunerDecisions(TunerTestCase):
+
+    def test_steps_up_then_settles_at_the_knee(self):
+        tuner = ConcurrencyTuner(initial=4, step=2, quiet=True)
+
+        self.assertEqual(close_epoch(tuner, pages=20, latency=2.0), 6)      # 2 pages/s, 4 slots busy
+        self.assertEqual(close_epoch(tuner, pages=20, latency=2.9), 4)      # +2 browsers, same throughput
+        self.assertEqual(tuner.state, TunerState.SETTLED)
+        self.assertEqual(tuner.settled_limit(), 4)
+
+    def test_keeps_climbing_while_throughput_grows(self):
+        tuner = ConcurrencyTuner(initial=4, step=2, quiet=True)
+        close_epoch(tuner, pages=20, latency=2.0)
+        self.assertEqual(close_epoch(tuner, pages=30, latency=2.0), 8)      # +50% throughput
+
+    def test_holds_when_browsers_sit_idle(self):
+        tuner = ConcurrencyTuner(initial=10, quiet=True)
+        self.assertEqual(close_epoch(tuner, pages=10, latency=1.0), 10)     # 1 slot of 10 in use
+        self.assertEqual(tuner.state, TunerState.HOLDING)
+
+    def test_waits_for_enough_samples(self):
+        tuner = ConcurrencyTuner(initial=8, quiet=True)
+        self.assertEqual(close_epoch(tuner, pages=3, latency=2.0), 8)
+        self.assertEqual(tuner._latencies, [2.0] * 3)  # Epoch still open
+
+    def test_sheds_over_budget_and_respects_min(self):
+        self.over_budget.return_value = "CPU 95% busy"
+        tuner = ConcurrencyTuner(initial=4, min_limit=2, step=2, quiet=True)
+
+        self.assertEqual(close_epoch(tuner, pages=20, latency=2.0), 2)
+        self.assertEqual(tuner.state, TunerState.SHEDDING)
+        self.assertEqual(close_epoch(tuner, pages=20, latency=1.0), 2)
+
+    def test_cpu_judged_over_the_epoch(self):
+        marks = iter([(100, 1000), (500, 2000), (900, 3000)])
+        with mock.patch.object(resources, "cpu_times", side_effect=lambda: next(marks)):
+            tuner = ConcurrencyTuner(initial=4, quiet=True)
+            close_epoch(tuner, pages=20, latency=2.0)
+            close_epoch(tuner, pages=20, latency=2.0)
+
+        calls = [call.kwargs["cpu_since"] for call in self.over_budget.call_args_list]
+        self.assertEqual(calls, [(100, 1000), (500, 2000)])
+
+
+class TestOverBudget(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(resources, "available_memory_mb", return_value=64_000)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_busy_share_since_mark(self):
+        with mock.patch.object(resources, "cpu_times", return_value=(1000, 2000)):
+            self.assertAlmostEqual(resources.cpu_busy((100, 1000)), 0.9)
+            self.assertEqual(resources.over_budget(cpu_since=(100, 1000)), "CPU 90% busy")
+            self.assertIsNone(resources.over_budget(cpu_since=(900, 1000)))
+
+    def test_epoch_reading_overrides_load_average(self):
+        # The 1-minute average still remembers load from before the last shed
+        with mock.patch.object(resources, "cpu_times", return_value=(1000, 2000)), \
+                mock.patch.object(resources, "cpu_load", return_value=3.0):
+            self.assertIsNone(resources.over_budget(cpu_since=(950, 1000)))
+            self.assertEqual(resources.over_budget(), "CPU load 3.00/core")
+
+    def test_falls_back_to_load_average(self):
+        with mock.patch.object(resources, "cpu_times", return_value=None), \
+                mock.patch.object(resources, "cpu_load", return_value=0.9):
+            self.assertEqual(resources.over_budget(cpu_since=(0, 0)), "CPU load 0.90/core")
+
+    def test_low_memory(self):
+        with mock.patch.object(resources, "cpu_times", return_value=None), \
+                mock.patch.object(resources, "cpu_load", return_value=None), \
+                mock.patch.object(resources, "available_memory_mb", return_value=100):
+            self.assertEqual(resources.over_budget(), "100MB RAM free")
+
+
+class FakePool:
+    def __init__(self, size, fail_times=1):
+        self.size = size
+        self.fail_times = fail_times
+        self.resizes = []
+
+    async def resize(self, size):
+        self.resizes.append(size)
+        if len(self.resizes) <= self.fail_times:
+            raise RuntimeError("browser failed to launch")
+        self.size = size
+
+
+class TestTunerRun(TunerTestCase):
+
+    def test_epoch_error_does_not_kill_the_tuner(self):
+        real_sleep = asyncio.sleep
+
+        async def tick(_seconds):
+            await real_sleep(0)
+
+        async def run():
+            tuner = ConcurrencyTuner(initial=4, epoch=0.0, step=2, quiet=True)
+            pool = FakePool(size=4)
+            task = asyncio.create_task(tuner.run(pool))
+            for pages in (20, 30):
+                tuner._latencies = [2.0] * pages
+                tuner._epoch_start = time.time() - 10
+                while tuner._latencies:
+                    await real_sleep(0)
+            tuner.stop()
+            await task  # Must not raise
+            return pool
+
+        with mock.patch.object(concurrency_tuner.asyncio, "sleep", tick):
+            pool = asyncio.run(run())
+
+        self.assertEqual(pool.resizes, [6, 8])  # 6 failed to launch, the next epoch still ran
+        self.assertEqual(pool.size, 8)
+
+
+class TestSavedConcurrency(ExtractionsTestCase):
+
+    def test_saved_per_domain(self):
+        tuner = ConcurrencyTuner(initial=6, quiet=True)
+        tuner._best = {4: 2.0, 6: 2.05, 8: 2.06}
+        tuner.save("shop.test")
+        self.assertEqual(load_saved_concurrency("shop.test"), 4)
+        self.assertIsNone(load_saved_concurrency("other.test"))
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@unittest.skipIf(BrowserPool is None, "playwright not installed")
+class TestPoolResize(unittest.TestCase):
+
+    def make_pool(self, size, fail_ids=()):
+        pool = BrowserPool(size=size, init_scripts=[])
+
+        async def create_browser(browser_id):
+            await asyncio.sleep(0)
+            if browser_id in fail_ids:
+                raise RuntimeError(f"launch {browser_id} failed")
+            return BrowserInstance(browser=FakeBrowser(), context=FakeBrowser(), id=browser_id)
+
+        pool._create_browser = create_browser
+        return pool
+
+    async def start(self, pool):
+        for i in range(pool.size):
+            pool._browsers[i] = await pool._create_browser(i)
+            await pool._available.put(i)
+        pool._started = True
+
+    def test_grow_keeps_browsers_that_launched(self):
+        async def run():
+            pool = self.make_pool(2, fail_ids={3})
+            await self.start(pool)
+            await pool.resize(5)
+            return pool
+
+        pool = asyncio.run(run())
+        self.assertEqual(pool.size, 4)
+        self.assertEqual(sorted(pool._browsers), [0, 1, 2, 4])
+        self.assertEqual(pool._available.qsize(), 4)
+
+    def test_shrink_closes_idle_browsers(self):
+        async def run():
+            pool = self.make_pool(4)
+            await self.start(pool)
+            instances = dict(pool._browsers)
+            await pool.resize(2)
+            return pool, instances
+
+        pool, instances = asyncio.run(run())
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(len(pool._browsers), 2)
+        closed = [i for i, instance in instances.items() if instance.browser.closed]
+        self.assertEqual(len(closed), 2)
+        self.assertEqual(pool._retiring, 0)
+
+    def test_grow_cancels_pending_retirements(self):
+        async def run():
+            pool = self.make_pool(3)
+            await self.start(pool)
+            # All browsers busy: the shrink can only retire them on release
+            for _ in range(3):
+                pool._available.get_nowait()
+            await pool.resize(1)
+            await pool.resize(3)
+            return pool
+
+        pool = asyncio.run(run())
+        self.assertEqual((pool.size, pool._retiring, len(pool._browsers)), (3, 0, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
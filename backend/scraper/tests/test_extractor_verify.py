@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Extractor Verification Tests
+============================
+
+ProductExtractor.verify (a strategy's fields must hold on a quorum of the
+verification pages) and _reconcile_field_sources (a ground-truth field
+source only switches when it misses quorum and the replacement agrees
+with it).
+
+Run:
+    python -m pytest scraper/tests/test_extractor_verify.py
+"""
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "prod_page_v2"))
+
+try:
+    import extractor
+    from extractor import ProductExtractor, StrategyContribution
+except ImportError:  # extractor needs playwright
+    extractor = None
+
+if extractor:
+    Product, ExtractionResult, Strategy = extractor.Product, extractor.ExtractionResult, extractor.ExtractionStrategy
+
+
+def product(name="Wool Coat", price=None, **fields) -> "Product":
+    return Product(name=name, price=price, currency=fields.pop("currency", ""), images=[],
+                   description=fields.pop("description", ""), url="https://shop.test/p", **fields)
+
+
+def result(strategy, prod=None) -> "ExtractionResult":
+    if prod is None:
+        return ExtractionResult.failure(strategy, "nothing found")
+    return ExtractionResult.from_product(prod, strategy)
+
+
+class FakeStrategy:
+    """Returns a canned product per URL (None = extraction failed)."""
+
+    def __init__(self, strategy_type, products):
+        self.strategy_type = strategy_type
+        self.products = products
+
+    async def extract(self, url, page_data=None):
+        return result(self.strategy_type, self.products.get(url))
+
+
+def make_extractor(*strategies) -> "ProductExtractor":
+    instance = ProductExtractor.__new__(ProductExtractor)
+    instance.use_stealth = False
+    instance.strategies = list(strategies)
+    return instance
+
+
+URLS = ["https://shop.test/p/1", "https://shop.test/p/2", "https://shop.test/p/3"]
+
+
+@unittest.skipIf(extractor is None, "playwright not installed")
+class TestVerify(unittest.TestCase):
+
+    def setUp(self):
+        self.failing_urls = set()
+
+        async def load_page(url, stealth=True):
+            if url in self.failing_urls:
+                raise TimeoutError("page load timed out")
+            return object()
+
+        patch = mock.patch.object(extractor, "load_page", load_page)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def verify(self, instance, contributions, urls=URLS):
+        with mock.patch("builtins.print"):
+            return asyncio.run(instance.verify(contributions, urls))
+
+    def test_quorum_met(self):
+        ld_json = FakeStrategy(Strategy.LD_JSON, {
+            URLS[0]: product(price=100.0),
+            URLS[1]: product(price=120.0),
+            URLS[2]: product(),             # No price on one page of three
+        })
+        instance = make_extractor(ld_json)
+        contributions = [StrategyContribution(Strategy.LD_JSON, {"name", "price"})]
+
+        with mock.patch.object(instance, "_merge_products", return_value=product()):
+            verified, pages = self.verify(instance, contributions)
+
+        self.assertTrue(verified)
+        self.assertEqual(len(pages), 3)
+
+    def test_quorum_missed(self):
+        api = FakeStrategy(Strategy.API_INTERCEPT, {URLS[0]: product(price=100.0)})
+        instance = make_extractor(api)
+        contributions = [StrategyContribution(Strategy.API_INTERCEPT, {"name", "price"})]
+
+        verified, pages = self.verify(instance, contributions)
+
+        self.assertFalse(verified)
+        self.assertEqual(len(pages), 3)
+
+    def test_only_quorum_fields_kept(self):
+        ld_json = FakeStrategy(Strategy.LD_JSON, {
+            URLS[0]: product(price=100.0, sku="A1"),
+            URLS[1]: product(price=120.0),
+            URLS[2]: product(price=90.0),
+        })
+        instance = make_extractor(ld_json)
+        contributions = [StrategyContribution(Strategy.LD_JSON, {"name", "price", "sku"})]
+
+        with mock.patch.object(extractor, "StrategyContribution", wraps=StrategyContribution) as verified_contribution, \
+                mock.patch.object(instance, "_merge_products", return_value=product()):
+            verified, _ = self.verify(instance, contributions)
+
+        self.assertTrue(verified)
+        self.assertEqual(verified_contribution.call_args.kwargs["fields"], {"name", "price"})  # sku on 1 of 3
+
+    def test_failed_loads_not_counted(self):
+        self.failing_urls = {URLS[1], URLS[2]}
+        api = FakeStrategy(Strategy.API_INTERCEPT, {URLS[0]: product(price=100.0)})
+        instance = make_extractor(api)
+        contributions = [StrategyContribution(Strategy.API_INTERCEPT, {"name", "price"})]
+
+        with mock.patch.object(instance, "_merge_products", return_value=product()):
+            verified, pages = self.verify(instance, contributions)
+
+        self.assertTrue(verified)  # 1 of the 1 pages that loaded
+        self.assertEqual(len(pages), 1)
+
+    def test_no_pages_loaded(self):
+        self.failing_urls = set(URLS)
+        api = FakeStrategy(Strategy.API_INTERCEPT, {URLS[0]: product(price=100.0)})
+        verified, pages = self.verify(make_extractor(api), [StrategyContribution(Strategy.API_INTERCEPT, {"name"})])
+        self.assertEqual((verified, pages), (False, []))
+
+
+@unittest.skipIf(extractor is None, "playwright not installed")
+class TestReconcileFieldSources(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = make_extractor()
+        self.contributions = [
+            StrategyContribution(Strategy.LD_JSON, {"name", "price"}),
+            StrategyContribution(Strategy.API_INTERCEPT, {"name", "price"}),
+        ]
+
+    def reconcile(self, field_sources, pages):
+        page_results = [[result(strategy, prod) for strategy, prod in page.items()] for page in pages]
+        with mock.patch("builtins.print"):
+            return self.extractor._reconcile_field_sources(field_sources, page_results, self.contributions)
+
+    def test_source_kept_at_quorum(self):
+        pages = [
+            {Strategy.API_INTERCEPT: product(price=100.0), Strategy.LD_JSON: product(price=100.0)},
+            {Strategy.API_INTERCEPT: product(price=80.0), Strategy.LD_JSON: product(price=80.0)},
+            {Strategy.API_INTERCEPT: product(), Strategy.LD_JSON: product(price=60.0)},
+        ]
+        # API intercept has price on 2 of 3 pages: the cheaper LD+JSON doesn't take over
+        self.assertEqual(self.reconcile({"price": "api_intercept"}, pages), {"price": "api_intercept"})
+
+    def test_source_kept_against_single_dissenting_page(self):
+        # One page says the ground-truth source is wrong; that is not agreement
+        pages = [
+            {Strategy.API_INTERCEPT: product(price=100.0), Strategy.LD_JSON: product(price=20.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=80.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=60.0)},
+        ]
+        self.assertEqual(self.reconcile({"price": "api_intercept"}, pages), {"price": "api_intercept"})
+
+    def test_switch_backed_by_agreement(self):
+        pages = [
+            {Strategy.API_INTERCEPT: product(price=100.0), Strategy.LD_JSON: product(price=100.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=80.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=60.0)},
+        ]
+        self.assertEqual(self.reconcile({"price": "api_intercept"}, pages), {"price": "ld_json"})
+
+    def test_no_switch_without_a_shared_page(self):
+        pages = [
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=100.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=80.0)},
+        ]
+        self.assertEqual(self.reconcile({"price": "api_intercept"}, pages), {"price": "api_intercept"})
+
+    def test_replacement_must_have_been_discovered(self):
+        self.contributions = [StrategyContribution(Strategy.API_INTERCEPT, {"name", "price"})]
+        pages = [
+            {Strategy.API_INTERCEPT: product(price=100.0), Strategy.LD_JSON: product(price=100.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=80.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=60.0)},
+        ]
+        self.assertEqual(self.reconcile({"price": "api_intercept"}, pages), {"price": "api_intercept"})
+
+    def test_other_fields_untouched(self):
+        pages = [
+            {Strategy.API_INTERCEPT: product(price=100.0), Strategy.LD_JSON: product(price=100.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=80.0)},
+            {Strategy.API_INTERCEPT: None, Strategy.LD_JSON: product(price=60.0)},
+        ]
+        reconciled = self.reconcile({"price": "api_intercept", "name": "ld_json"}, pages)
+        self.assertEqual(reconciled, {"price": "ld_json", "name": "ld_json"})
+
+
+if __name__ == "__main__":
+    unittest.main()
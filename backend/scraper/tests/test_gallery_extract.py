@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Gallery Extraction Tests
+========================
+
+compile_gallery_plan turns a gallery config into the plan GALLERY_JS runs;
+window.__galleryExtract(plan) picks URLs, clusters them by DOM ancestry and
+cleans them up in the page. The JS runs under node against a minimal DOM
+built from small HTML fixtures (skipped when node isn't installed).
+
+Run:
+    python -m pytest scraper/tests/test_gallery_extract.py
+"""
+
+import json
+import shutil
+import subprocess
+import sys
+import unittest
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+try:
+    from prod_page_v2.page_loader import GALLERY_JS, compile_gallery_plan
+except ImportError:  # page_loader needs playwright
+    GALLERY_JS = compile_gallery_plan = None
+
+NODE = shutil.which("node")
+
+PAGE_URL = "https://shop.test/products/coat"
+
+# Just enough DOM for GALLERY_JS: querySelectorAll (tag, .class, [attr], [attr="v"]
+# and descendant selectors), getAttribute, parentElement, className, tagName
+DOM_HARNESS = r"""
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+
+const all = [];
+const build = (node, parent) => {
+    const el = {
+        tagName: node.tag.toUpperCase(),
+        attrs: node.attrs,
+        className: node.attrs['class'] || '',
+        parentElement: parent,
+        getAttribute(name) { return name in this.attrs ? this.attrs[name] : null; },
+    };
+    all.push(el);
+    node.children.forEach((child) => build(child, el));
+    return el;
+};
+build(input.tree, null);
+
+const compound = (text) => {
+    const m = text.match(/^([a-z0-9]+|\*)?((?:\.[\w-]+)*)((?:\[[^\]]+\])*)$/i);
+    if (!m) throw new Error('Unsupported selector: ' + text);
+    const classes = m[2] ? m[2].slice(1).split('.') : [];
+    const attrs = (m[3].match(/\[[^\]]+\]/g) || []).map((a) => {
+        const [name, value] = a.slice(1, -1).split('=');
+        return [name, value === undefined ? null : value.replace(/^"|"$/g, '')];
+    });
+    return (el) => (!m[1] || m[1] === '*' || el.tagName === m[1].toUpperCase())
+        && classes.every((c) => el.className.split(/\s+/).includes(c))
+        && attrs.every(([name, value]) => value === null
+            ? el.getAttribute(name) !== null : el.getAttribute(name) === value);
+};
+
+const matches = (el, parts) => {
+    if (!parts[parts.length - 1](el)) return false;
+    let i = parts.length - 2;
+    for (let node = el.parentElement; node && i >= 0; node = node.parentElement) {
+        if (parts[i](node)) i--;
+    }
+    return i < 0;
+};
+
+globalThis.window = globalThis;
+globalThis.document = {
+    baseURI: input.baseURI,
+    body: all.find((el) => el.tagName === 'BODY'),
+    querySelectorAll(selector) {
+        const groups = selector.split(',').map((s) => s.trim().split(/\s+/).map(compound));
+        return all.filter((el) => groups.some((parts) => matches(el, parts)));
+    },
+};
+
+eval(input.script);
+process.stdout.write(JSON.stringify(window.__galleryExtract(input.plan)));
+"""
+
+
+class _Tree(HTMLParser):
+    """HTML → {tag, attrs, children} (void elements have no children)."""
+
+    VOID = {'img', 'source', 'br', 'hr', 'meta', 'link', 'input'}
+
+    def __init__(self):
+        super().__init__()
+        self.root = {"tag": "html", "attrs": {}, "children": []}
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "html":
+            return
+        node = {"tag": tag, "attrs": {k: v or "" for k, v in attrs}, "children": []}
+        self.stack[-1]["children"].append(node)
+        if tag not in self.VOID:
+            self.stack.append(node)
+
+    def handle_endtag(self, tag):
+        if tag != "html" and len(self.stack) > 1 and self.stack[-1]["tag"] == tag:
+            self.stack.pop()
+
+
+def run_gallery_js(html: str, gallery_config, base_uri: str = PAGE_URL) -> dict:
+    parser = _Tree()
+    parser.feed(html)
+    payload = {
+        "tree": parser.root,
+        "baseURI": base_uri,
+        "plan": compile_gallery_plan(gallery_config),
+        "script": GALLERY_JS,
+    }
+    result = subprocess.run([NODE, "-e", DOM_HARNESS], input=json.dumps(payload),
+                            capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout)
+
+
+@unittest.skipIf(compile_gallery_plan is None, "playwright not installed")
+class TestCompileGalleryPlan(unittest.TestCase):
+
+    def test_image_selectors_joined(self):
+        plan = compile_gallery_plan({"image_selectors": [".gallery img", ".zoom img"], "url_attribute": "data-src"})
+        self.assertEqual(plan, {"selector": ".gallery img, .zoom img", "urlAttr": "data-src", "depth": 4})
+
+    def test_legacy_single_selector(self):
+        plan = compile_gallery_plan({"image_selector": ".pdp img"}, ancestry_depth=3)
+        self.assertEqual(plan, {"selector": ".pdp img", "urlAttr": "src", "depth": 3})
+
+    def test_container_selector_fallback(self):
+        plan = compile_gallery_plan({"container_selector": ".media"})
+        self.assertEqual(plan["selector"], ".media img, .media source")
+
+    def test_string_config(self):
+        self.assertEqual(compile_gallery_plan(".media")["selector"], ".media img, .media source")
+
+    def test_unusable_config(self):
+        self.assertIsNone(compile_gallery_plan({"url_attribute": "src"}))
+        self.assertIsNone(compile_gallery_plan(""))
+
+    def test_plan_cached_per_config(self):
+        config = {"image_selectors": [".cached img"]}
+        self.assertIs(compile_gallery_plan(config), compile_gallery_plan(dict(config)))
+        self.assertIsNot(compile_gallery_plan(config), compile_gallery_plan(config, ancestry_depth=2))
+
+
+@unittest.skipIf(compile_gallery_plan is None or NODE is None, "playwright or node not installed")
+class TestGalleryExtractJS(unittest.TestCase):
+
+    def test_relative_next_image_srcset_unwrapped(self):
+        wrapped = "/_next/image?url=https%3A%2F%2Fcdn.shop.test%2Fcoat-{n}.jpg&w={w}&q=75"
+        images = "".join(
+            f'<img src="{wrapped.format(n=n, w=64)}" '
+            f'srcset="{wrapped.format(n=n, w=640)} 640w, {wrapped.format(n=n, w=1080)} 1080w">'
+            for n in (1, 2)
+        )
+        html = f'<html><body><div class="gallery">{images}</div></body></html>'
+
+        result = run_gallery_js(html, {"image_selectors": [".gallery img"]})
+        self.assertEqual(result["urls"], ["https://cdn.shop.test/coat-1.jpg", "https://cdn.shop.test/coat-2.jpg"])
+
+    def test_relative_inner_url_resolved_to_site(self):
+        html = ('<html><body><div class="gallery">'
+                '<img srcset="/_next/image?url=%2Fassets%2Fcoat.jpg&w=1080 1080w">'
+                '</div></body></html>')
+        result = run_gallery_js(html, {"image_selectors": [".gallery img"]})
+        self.assertEqual(result["urls"], ["https://shop.test/assets/coat.jpg"])
+
+    def test_primary_cluster_is_largest(self):
+        html = """<html><body>
+            <div class="pdp"><ul class="slides">
+                <li><img src="https://cdn.shop.test/a.jpg"></li>
+                <li><img src="https://cdn.shop.test/b.jpg"></li>
+                <li><img src="https://cdn.shop.test/c.jpg"></li>
+            </ul></div>
+            <section class="recs">
+                <img src="https://cdn.shop.test/other-1.jpg">
+                <img src="https://cdn.shop.test/other-2.jpg">
+            </section>
+        </body></html>"""
+
+        result = run_gallery_js(html, {"image_selectors": ["img"]})
+        self.assertEqual(result["urls"], [f"https://cdn.shop.test/{n}.jpg" for n in "abc"])
+        self.assertEqual(sorted(size for _, size, _ in result["clusters"]), [2, 3])
+        self.assertEqual([size for _, size, primary in result["clusters"] if primary], [3])
+
+    def test_placeholder_src_skipped_and_sizes_stripped(self):
+        html = """<html><body><div class="gallery">
+            <img src="/static/blank.gif" data-src="//cdn.shop.test/p/coat_140x140.jpg?v=3&width=200">
+            <img src="https://cdn.shop.test/p/coat.jpg?v=3">
+            <img src="https://img.shop.test/r/s/991.jpg">
+        </div></body></html>"""
+
+        result = run_gallery_js(html, {"image_selectors": [".gallery img"]})
+        self.assertEqual(result["urls"], ["https://cdn.shop.test/p/coat.jpg?v=3", "https://img.shop.test/r/b/991.jpg"])
+
+    def test_no_matches(self):
+        result = run_gallery_js("<html><body><p>No images</p></body></html>", {"image_selectors": [".gallery img"]})
+        self.assertEqual(result, {"urls": [], "clusters": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
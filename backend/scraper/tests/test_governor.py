@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Resource Governor Tests
+=======================
+
+How ResourceGovernor splits the browser budget between stage 2 (URLs) and
+stage 3 (products), stage 2's blocking url slots, and the stage 2 browser
+pool following the governor's share (extract_categories_pooled).
+
+Run:
+    python -m pytest scraper/tests/test_governor.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import types
+import unittest
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from stages import resources
+from stages.governor import FAVOR_BACKLOG, ResourceGovernor
+
+try:
+    from stages import urls
+except ImportError:  # stage 2 needs playwright
+    urls = None
+
+
+class GovernorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        patch = mock.patch.object(resources, "over_budget", return_value=None)
+        self.over_budget = patch.start()
+        self.addCleanup(patch.stop)
+
+    def governor(self, url_workers=4, budget=10, **kwargs) -> ResourceGovernor:
+        return ResourceGovernor(url_workers=url_workers, budget=budget, **kwargs)
+
+
+class TestBudgetSplit(GovernorTestCase):
+
+    def test_url_workers_then_the_rest_for_products(self):
+        governor = self.governor()
+        self.assertEqual(governor.url_share(), 4)
+        self.assertEqual(governor.request_product_browsers(15), 6)
+        self.assertEqual(governor.stats["favoring"], "urls")
+
+    def test_products_cap_url_share(self):
+        governor = self.governor()
+        governor.report_backlog(FAVOR_BACKLOG)
+        self.assertEqual(governor.request_product_browsers(9), 9)
+        governor.report_backlog(0)
+        self.assertEqual(governor.url_share(), 1)  # Only one slot left until stage 3 shrinks
+        self.assertEqual(governor.request_product_browsers(6), 6)
+        self.assertEqual(governor.url_share(), 4)
+
+    def test_slots_in_use_are_reserved(self):
+        governor = self.governor()
+        for _ in range(3):
+            governor.acquire_url_slot()
+        governor.report_backlog(FAVOR_BACKLOG)  # Share drops to 1, three pages still loading
+        self.assertEqual(governor.request_product_browsers(15), 7)
+
+    def test_stage_two_never_starved(self):
+        governor = self.governor(budget=4)
+        self.assertEqual(governor.request_product_browsers(15), 1)
+        self.assertEqual(governor.url_share(), 3)
+
+    def test_urls_done_frees_whole_budget(self):
+        governor = self.governor()
+        governor.urls_done()
+        self.assertEqual(governor.url_share(), 0)
+        self.assertEqual(governor.request_product_browsers(15), 10)
+
+    def test_budget_from_free_ram(self):
+        with mock.patch.object(resources, "affordable_browsers", return_value=7):
+            self.assertEqual(ResourceGovernor(url_workers=4).budget, 7)
+        with mock.patch.object(resources, "affordable_browsers", return_value=None):
+            self.assertEqual(ResourceGovernor(url_workers=4).budget, 19)
+
+
+class TestFavorBacklog(GovernorTestCase):
+
+    def test_deep_backlog_squeezes_stage_two(self):
+        governor = self.governor()
+        governor.report_backlog(FAVOR_BACKLOG - 1)
+        self.assertEqual(governor.url_share(), 4)
+
+        governor.report_backlog(FAVOR_BACKLOG)
+        self.assertEqual(governor.url_share(), 1)
+        self.assertEqual(governor.request_product_browsers(15), 9)
+        self.assertEqual(governor.stats["favoring"], "products")
+
+    def test_custom_threshold(self):
+        governor = self.governor(favor_backlog=10)
+        governor.report_backlog(10)
+        self.assertEqual(governor.url_share(), 1)
+
+
+class TestOverBudget(GovernorTestCase):
+
+    def test_growth_refused_shrink_granted(self):
+        governor = self.governor()
+        self.assertEqual(governor.request_product_browsers(4), 4)
+
+        self.over_budget.return_value = "CPU 95% busy"
+        self.assertEqual(governor.url_share(), 1)
+        self.assertEqual(governor.request_product_browsers(8), 4)
+        self.assertEqual(governor.request_product_browsers(2), 2)
+
+
+class TestUrlSlots(GovernorTestCase):
+
+    def start_acquire(self, governor) -> threading.Event:
+        acquired = threading.Event()
+
+        def take():
+            governor.acquire_url_slot()
+            acquired.set()
+
+        threading.Thread(target=take, daemon=True).start()
+        return acquired
+
+    def test_blocks_at_share_until_release(self):
+        governor = self.governor(url_workers=2)
+        governor.acquire_url_slot()
+        governor.acquire_url_slot()
+
+        acquired = self.start_acquire(governor)
+        self.assertFalse(acquired.wait(0.2))
+
+        governor.release_url_slot()
+        self.assertTrue(acquired.wait(2))
+        self.assertEqual(governor.stats["url_browsers"], 2)
+
+    def test_unblocked_when_backlog_drains(self):
+        governor = self.governor(url_workers=2)
+        governor.report_backlog(FAVOR_BACKLOG)
+        governor.acquire_url_slot()
+
+        acquired = self.start_acquire(governor)
+        self.assertFalse(acquired.wait(0.2))
+
+        governor.report_backlog(0)
+        self.assertTrue(acquired.wait(2))
+
+    def test_released_on_exception(self):
+        governor = self.governor(url_workers=1)
+        with self.assertRaises(RuntimeError):
+            with governor.url_slot():
+                self.assertEqual(governor.stats["url_browsers"], 1)
+                raise RuntimeError("page crashed")
+        self.assertEqual(governor.stats["url_browsers"], 0)
+
+        with governor.url_slot():  # Would block forever if the slot leaked
+            pass
+
+
+class FakePool:
+    """BrowserPool stand-in recording its sizes."""
+
+    instances = []
+
+    def __init__(self, size, init_scripts=None, playbook=None):
+        self.size = size
+        self.sizes = [size]
+        self.shut_down = False
+        FakePool.instances.append(self)
+
+    async def start(self):
+        pass
+
+    async def resize(self, size):
+        self.size = size
+        self.sizes.append(size)
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield object()
+
+    async def shutdown(self):
+        self.shut_down = True
+
+
+@unittest.skipIf(urls is None, "playwright not installed")
+class TestPoolFollowsGovernor(GovernorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        FakePool.instances = []
+        patches = [
+            mock.patch.dict(sys.modules, {
+                "browser_pool": types.SimpleNamespace(BrowserPool=FakePool),
+                "url_extractor": types.SimpleNamespace(SETTLE_JS=""),
+            }),
+            mock.patch.object(urls, "POOL_RESIZE_INTERVAL_S", 0.01),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def run_stage(self, governor, categories, on_page=None, workers=4):
+        async def extract(url, name, acquire, brand_instance=None):
+            async with acquire():
+                if on_page:
+                    on_page(name)
+                await asyncio.sleep(0.1)
+            return {"urls": [url]}
+
+        with mock.patch.object(urls, "extract_urls_from_category_async", extract):
+            return list(urls.extract_categories_pooled(categories, workers=workers, governor=governor))
+
+    def test_pool_starts_at_share_and_follows_it(self):
+        governor = self.governor(url_workers=3)
+        categories = [{"url": f"https://shop.test/c/{n}", "name": f"c{n}"} for n in range(6)]
+
+        def on_page(name):
+            if name == "c0":
+                governor.report_backlog(FAVOR_BACKLOG)
+
+        results = self.run_stage(governor, categories, on_page)
+
+        self.assertEqual(len(results), 6)
+        pool = FakePool.instances[0]
+        self.assertEqual(pool.sizes[0], 3)
+        self.assertEqual(pool.sizes[-1], 1)
+        self.assertTrue(pool.shut_down)
+        self.assertEqual(governor.stats["url_browsers"], 0)
+
+    def test_pool_capped_by_workers_and_categories(self):
+        governor = self.governor(url_workers=8)
+        self.run_stage(governor, [{"url": "https://shop.test/c/1", "name": "c1"}])
+        self.assertEqual(FakePool.instances[0].sizes, [1])
+
+    def test_without_governor(self):
+        categories = [{"url": f"https://shop.test/c/{n}", "name": f"c{n}"} for n in range(3)]
+        start = time.monotonic()
+        self.assertEqual(len(self.run_stage(None, categories)), 3)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(FakePool.instances[0].sizes, [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
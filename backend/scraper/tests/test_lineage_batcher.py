@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Lineage Batcher Tests
+=====================
+
+Concurrent classify() calls of one brand must share LLM calls: unknown
+lineages are sent once, in one batch, and every caller gets its decisions.
+
+Run:
+    python -m pytest scraper/tests/test_lineage_batcher.py
+"""
+
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import lineage_batcher
+from lineage_batcher import LineageBatcher
+
+
+def links(*lineages):
+    return [{"url": f"https://shop.test/{lineage}/{i}", "lineage": lineage} for i, lineage in enumerate(lineages)]
+
+
+class FakeClassifier:
+    """Stands in for classify_links: products are the lineages starting with "grid"."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, pages):
+        self.calls.append(pages)
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        lineages = {link["lineage"] for page in pages for link in page["links"]}
+        return {
+            "decisions": {lineage: lineage.startswith("grid") for lineage in lineages},
+            "confidence": "High",
+            "analysis": "",
+        }
+
+
+class TestLineageBatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.brand = SimpleNamespace(approved_url_lineages=set(), rejected_url_lineages=set())
+        self.classifier = FakeClassifier()
+        patch = mock.patch.object(lineage_batcher, "classify_links", self.classifier)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def classify_concurrently(self, batcher, requests):
+        results = [None] * len(requests)
+
+        def run(i, page_links):
+            results[i] = batcher.classify(f"https://shop.test/c{i}", f"Category {i}", page_links)
+
+        threads = [threading.Thread(target=run, args=(i, page_links)) for i, page_links in enumerate(requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results
+
+    def test_concurrent_categories_share_one_call(self):
+        batcher = LineageBatcher(self.brand, window_s=0.2)
+        results = self.classify_concurrently(batcher, [
+            links("header", "grid-a", "footer"),
+            links("header", "grid-b", "footer"),
+            links("header", "grid-c"),
+        ])
+
+        self.assertEqual(len(self.classifier.calls), 1)
+        sent = [link["lineage"] for page in self.classifier.calls[0] for link in page["links"]]
+        self.assertEqual(sorted(sent), ["footer", "grid-a", "grid-b", "grid-c", "header"])
+
+        for result, grid in zip(results, ("grid-a", "grid-b", "grid-c")):
+            self.assertTrue(result["decisions"][grid])
+            self.assertFalse(result["decisions"]["header"])
+            self.assertEqual(result["batched"], len(self.classifier.calls[0]))
+
+        self.assertEqual(self.brand.approved_url_lineages, {"grid-a", "grid-b", "grid-c"})
+        self.assertEqual(self.brand.rejected_url_lineages, {"header", "footer"})
+        self.assertEqual(batcher._pending, {})
+
+    def test_known_lineages_skip_the_call(self):
+        self.brand.approved_url_lineages.add("grid")
+        self.brand.rejected_url_lineages.add("footer")
+        batcher = LineageBatcher(self.brand, window_s=0.01)
+
+        result = batcher.classify("https://shop.test/c", "Category", links("grid", "footer"))
+
+        self.assertEqual(self.classifier.calls, [])
+        self.assertEqual(result["decisions"], {"grid": True, "footer": False})
+
+    def test_in_flight_lineage_is_awaited_not_resent(self):
+        self.classifier.delay = 0.3
+        batcher = LineageBatcher(self.brand, window_s=0.0)
+        first = threading.Thread(target=batcher.classify, args=("https://shop.test/a", "A", links("header", "grid-a")))
+        first.start()
+        time.sleep(0.1)  # First batch sent and in flight
+
+        result = batcher.classify("https://shop.test/b", "B", links("header", "grid-b"))
+        first.join(timeout=5)
+
+        sent = [[link["lineage"] for page in call for link in page["links"]] for call in self.classifier.calls]
+        self.assertEqual(sent, [["header", "grid-a"], ["grid-b"]])
+        self.assertEqual(result["decisions"], {"header": False, "grid-b": True})
+        self.assertEqual(batcher.stats["lineages_shared"], 1)
+
+    def test_full_batch_sent_without_waiting(self):
+        batcher = LineageBatcher(self.brand, window_s=5.0, max_links=3)
+        started = time.monotonic()
+        result = batcher.classify("https://shop.test/c", "Category", links("a", "b", "grid"))
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(result["decisions"], {"a": False, "b": False, "grid": True})
+
+    def test_overflow_starts_another_batch(self):
+        batcher = LineageBatcher(self.brand, window_s=0.2, max_links=4)
+        self.classify_concurrently(batcher, [links("a", "b", "c"), links("d", "e", "f")])
+        self.assertEqual(len(self.classifier.calls), 2)
+
+    def test_failed_call_fails_every_waiter(self):
+        self.classifier.fail = True
+        batcher = LineageBatcher(self.brand, window_s=0.2)
+        results = self.classify_concurrently(batcher, [links("header", "grid-a"), links("header", "grid-b")])
+
+        self.assertEqual(results, [None, None])
+        self.assertEqual(batcher._pending, {})
+        self.assertEqual(self.brand.approved_url_lineages, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Lineage Memory Tests
+====================
+
+Saved lineage decisions across runs: which are applied to the Brand, when a
+"Low" decision becomes trusted, and when decisions expire.
+
+Run:
+    python -m pytest scraper/tests/test_lineage_memory.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.lineage_memory import (
+    LINEAGE_MEMORY_VERSION,
+    MAX_MISSED_RUNS,
+    LineageMemory,
+    load_saved_lineage_memory,
+)
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import storage
+
+DOMAIN = "shop.test"
+
+
+def new_brand():
+    return SimpleNamespace(approved_url_lineages=set(), rejected_url_lineages=set(),
+                           approved_lineages=set(), rejected_lineages=set())
+
+
+class TestLineageMemory(ExtractionsTestCase):
+
+    def start_run(self):
+        """A new run: saved memory loaded and applied to a fresh Brand."""
+        memory = load_saved_lineage_memory(DOMAIN) or LineageMemory()
+        brand = new_brand()
+        applied = memory.apply(brand)
+        return memory, brand, applied
+
+    def test_confident_decisions_applied_next_run(self):
+        memory, brand, applied = self.start_run()
+        self.assertEqual(applied, 0)
+        memory.record("url", ["grid"], ["footer"], "High")
+        memory.save(DOMAIN, brand)
+
+        _, brand, applied = self.start_run()
+        self.assertEqual(applied, 2)
+        self.assertEqual(brand.approved_url_lineages, {"grid"})
+        self.assertEqual(brand.rejected_url_lineages, {"footer"})
+
+    def test_low_decision_trusted_once_repeated(self):
+        # Run 1: heuristic decision, only in the Brand's sets
+        memory, brand, _ = self.start_run()
+        brand.approved_url_lineages.add("grid")
+        memory.save(DOMAIN, brand)
+
+        # Run 2: not trusted yet - the run makes the same decision again
+        memory, brand, applied = self.start_run()
+        self.assertEqual(applied, 0)
+        self.assertEqual(memory.entries["url"]["grid"]["confirmations"], 0)
+        brand.approved_url_lineages.add("grid")
+        memory.seen("url", ["grid"])
+        memory.save(DOMAIN, brand)
+
+        # Run 3: confirmed - applied without classification
+        memory, brand, applied = self.start_run()
+        self.assertEqual(applied, 1)
+        self.assertEqual(brand.approved_url_lineages, {"grid"})
+
+    def test_confirmation_counted_once_per_run(self):
+        memory = LineageMemory()
+        memory.record("url", ["grid"], [], "Low")
+        memory.record("url", ["grid"], [], "Low")
+        self.assertEqual(memory.entries["url"]["grid"]["confirmations"], 0)
+
+    def test_changed_decision_resets_confirmations(self):
+        memory, brand, _ = self.start_run()
+        memory.record("product", ["card"], [], "Low")
+        memory.save(DOMAIN, brand)
+
+        memory, brand, _ = self.start_run()
+        memory.record("product", [], ["card"], "Low")
+        self.assertEqual(memory.entries["product"]["card"]["confirmations"], 0)
+        self.assertFalse(memory.entries["product"]["card"]["approved"])
+
+    def test_expire_only_loaded_lineages_once(self):
+        memory, brand, _ = self.start_run()
+        memory.record("url", [], ["carousel"], "High")
+        memory.save(DOMAIN, brand)
+
+        memory, brand, _ = self.start_run()
+        memory.record("url", [], ["header"], "High")
+        expired = memory.expire("url", ["carousel", "header"], brand)
+
+        self.assertEqual(expired, {"carousel"})
+        self.assertNotIn("carousel", brand.rejected_url_lineages)
+        self.assertNotIn("carousel", memory.entries["url"])
+        self.assertIn("header", memory.entries["url"])
+        self.assertEqual(memory.expire("url", ["carousel"], brand), set())
+
+    def test_unseen_lineages_forgotten(self):
+        memory, brand, _ = self.start_run()
+        memory.record("url", ["grid"], ["footer"], "High")
+        memory.save(DOMAIN, brand)
+
+        for _ in range(MAX_MISSED_RUNS):
+            memory, brand, _ = self.start_run()
+            memory.seen("url", ["grid"])
+            memory.save(DOMAIN, brand)
+
+        memory, _, _ = self.start_run()
+        self.assertIn("grid", memory.entries["url"])
+        self.assertNotIn("footer", memory.entries["url"])
+
+    def test_other_version_dropped(self):
+        storage.update_brand_meta(DOMAIN, "lineages", {
+            "version": LINEAGE_MEMORY_VERSION + 1,
+            "url": {"grid": {"approved": True, "confidence": "High", "version": LINEAGE_MEMORY_VERSION + 1}},
+        })
+        _, brand, applied = self.start_run()
+        self.assertEqual(applied, 0)
+        self.assertEqual(brand.approved_url_lineages, set())
+
+    def test_saved_with_other_sections(self):
+        storage.update_brand_meta(DOMAIN, "products", {"wait_ms": 1200})
+        memory, brand, _ = self.start_run()
+        memory.record("url", ["grid"], [], "High")
+        memory.save(DOMAIN, brand)
+
+        meta = storage.load_brand_meta(DOMAIN)
+        self.assertEqual(meta["products"], {"wait_ms": 1200})
+        self.assertTrue(meta["lineages"]["url"]["grid"]["approved"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Tests
+========================
+
+Covers the request key, the SQLite store (TTL expiry, LRU eviction) and the
+hit path through LLMHandler - a cached answer costs no call and is counted
+in LLMUsageTracker.
+
+Run:
+    python -m pytest scraper/tests/test_llm_cache.py
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper import llm_cache
+from scraper.llm_cache import LLMResponseCache, make_key
+from scraper.tests.test_utils import ExtractionsTestCase
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+class TestMakeKey(unittest.TestCase):
+
+    def test_identical_requests_share_a_key(self):
+        schema = {"type": "object", "properties": {"b": {}, "a": {}}}
+        self.assertEqual(make_key(MODEL, "prompt", 100, schema=schema),
+                         make_key(MODEL, "prompt", 100, schema=dict(reversed(list(schema.items())))))
+
+    def test_every_part_changes_the_key(self):
+        base = make_key(MODEL, "prompt", 100)
+        variants = [
+            make_key("other-model", "prompt", 100),
+            make_key(MODEL, "prompt ", 100),
+            make_key(MODEL, "prompt", 200),
+            make_key(MODEL, "prompt", 100, temperature=0.5),
+            make_key(MODEL, "prompt", 100, schema={"type": "object"}),
+            make_key(MODEL, "prompt", 100, image_b64="aGVsbG8=", media_type="image/png"),
+        ]
+        self.assertEqual(len({base, *variants}), len(variants) + 1)
+
+    def test_media_type_ignored_without_image(self):
+        self.assertEqual(make_key(MODEL, "prompt", 100),
+                         make_key(MODEL, "prompt", 100, media_type="image/png"))
+
+
+class TestResponseCache(ExtractionsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = LLMResponseCache(self.tmp_path / "llm_cache.sqlite")
+        self.addCleanup(self.cache._conn.close)
+
+    def test_put_get(self):
+        usage = {"input_tokens": 1200, "output_tokens": 300}
+        self.cache.put("k", "url_classification", {"data": {"product_link_indices": [1, 2]}}, usage)
+
+        entry = self.cache.get("k", "url_classification")
+        self.assertEqual(entry["value"], {"data": {"product_link_indices": [1, 2]}})
+        self.assertEqual(entry["usage"], usage)
+        self.assertIsNone(self.cache.get("missing", "url_classification"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.tokens_avoided, usage)
+
+    def test_expired_entry_is_dropped(self):
+        self.cache.put("k", "gallery_discovery", {"data": {}})
+        later = llm_cache.time.time() + llm_cache.ttl_for("gallery_discovery") + 1
+        with mock.patch.object(llm_cache.time, "time", return_value=later):
+            self.assertIsNone(self.cache.get("k", "gallery_discovery"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(self.cache.stats()["bytes"], 0)
+
+    def test_unserialisable_value_not_stored(self):
+        self.cache.put("k", "op", {"data": object()})
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_least_recently_used_evicted_first(self):
+        payload = {"response": "x" * 90}
+        size = len(llm_cache.json.dumps(payload))
+        self.cache.max_bytes = size * 3
+        now = llm_cache.time.time()
+        with mock.patch.object(llm_cache.time, "time", side_effect=[now, now + 1, now + 2, now + 3, now + 4]):
+            self.cache.put("a", "op", payload)
+            self.cache.put("b", "op", payload)
+            self.cache.put("c", "op", payload)
+            self.cache.get("a", "op")         # "b" is now least recently used
+            self.cache.put("d", "op", payload)
+
+        self.assertIsNone(self.cache.get("b", "op"))
+        for key in ("a", "d"):
+            self.assertIsNotNone(self.cache.get(key, "op"))
+        self.assertLessEqual(self.cache.stats()["bytes"], self.cache.max_bytes * llm_cache.EVICT_TO)
+
+
+class TestHandlerHitPath(ExtractionsTestCase):
+
+    def setUp(self):
+        from scraper.llm_handler import LLMHandler, LLMUsageTracker
+
+        super().setUp()
+        self.cache = LLMResponseCache(self.tmp_path / "llm_cache.sqlite")
+        self.addCleanup(self.cache._conn.close)
+        patches = [
+            mock.patch.object(llm_cache, "_cache", self.cache),
+            mock.patch.dict(os.environ, {"LLM_CACHE": "1"}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        self.tracker = LLMUsageTracker
+        self.tracker.reset_all()
+        self.tracker.set_stage("urls")
+        self.addCleanup(self.tracker.reset_all)
+
+        # No API client is built - a cache hit must not need one
+        self.handler = LLMHandler.__new__(LLMHandler)
+        self.handler.model = MODEL
+        self.handler.client = object()
+
+    def test_hit_served_without_a_call(self):
+        key = make_key(MODEL, "classify these links", 8192, schema=None, temperature=0.0)
+        self.cache.put(key, "url_classification", {"response": "ok"}, {"input_tokens": 1000, "output_tokens": 100})
+
+        with mock.patch("scraper.llm_handler.get_async_client", side_effect=AssertionError("API called")):
+            result = asyncio.run(self.handler.acall("classify these links", expected_format="text",
+                                                    operation="url_classification"))
+
+        self.assertEqual(result["response"], "ok")
+        self.assertTrue(result["cached"])
+        self.assertEqual(result["usage"], {"input_tokens": 0, "output_tokens": 0})
+
+        summary = self.tracker.get_stage_summary("urls")["summary"]
+        self.assertEqual((summary["calls"], summary["cache_hits"], summary["cache_misses"]), (0, 1, 0))
+        self.assertGreater(summary["cost_avoided"], 0)
+
+    def test_miss_counted(self):
+        self.assertIsNone(self.handler._cache_get("unknown-key", "url_classification"))
+        summary = self.tracker.get_stage_summary("urls")["summary"]
+        self.assertEqual((summary["cache_hits"], summary["cache_misses"]), (0, 1))
+
+    def test_cache_disabled_per_call(self):
+        self.assertIsNone(self.handler._cache_key(False, "prompt", 100))
+        self.assertIsNotNone(self.handler._cache_key(True, "prompt", 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
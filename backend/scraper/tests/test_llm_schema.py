@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+LLM Schema Tests
+================
+
+Compiled schema paths, the response an accessor reads (learned URL pattern
+first, positional index as fallback) and the .compiled.json sidecar.
+
+Run:
+    python -m pytest scraper/tests/test_llm_schema.py
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "prod_page_v2"))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+
+try:
+    from strategies import llm_schema
+    from strategies.base import response_url_pattern, url_matches_pattern
+    from strategies.llm_schema import CompiledSchema, LlmSchemaStrategy, _compile_path, _hash_schema
+except ImportError:  # strategies package needs aiohttp
+    llm_schema = None
+
+SCHEMA = {"name": "[1].product.title", "price": "[1].product.price", "currency": "EUR"}
+
+
+def compiled(schema=SCHEMA, url_patterns=None) -> "CompiledSchema":
+    return CompiledSchema(schema, _hash_schema(schema), url_patterns or {})
+
+
+@unittest.skipIf(llm_schema is None, "aiohttp not installed")
+class TestCompilePath(unittest.TestCase):
+
+    def test_nested_keys_and_list_indices(self):
+        walk = _compile_path("product.variants.1.size".split("."))
+        data = {"product": {"variants": [{"size": "S"}, {"size": "M"}]}}
+        self.assertEqual(walk(data), "M")
+
+    def test_missing_steps_return_none(self):
+        data = {"product": {"variants": [{"size": "S"}], "name": "Coat"}}
+        self.assertIsNone(_compile_path(["product", "variants", "3"])(data))      # Out of range
+        self.assertIsNone(_compile_path(["product", "variants", "size"])(data))   # Key into a list
+        self.assertIsNone(_compile_path(["product", "name", "first"])(data))      # Into a string
+        self.assertIsNone(_compile_path(["product", "price"])(data))
+
+    def test_empty_tokens_skipped(self):
+        # "[1].images[0]" tokenizes to ["images", "0", ""]
+        walk = _compile_path("images.0.".split("."))
+        self.assertEqual(walk({"images": ["a.jpg"]}), "a.jpg")
+
+
+@unittest.skipIf(llm_schema is None, "aiohttp not installed")
+class TestUrlPattern(unittest.TestCase):
+
+    def test_star_matches_one_segment(self):
+        pattern = response_url_pattern("https://shop.test/api/products/8812/detail?lang=en")
+        self.assertEqual(pattern, "shop.test/api/products/*/detail")
+        self.assertTrue(url_matches_pattern("https://shop.test/api/products/91/detail", pattern))
+        self.assertFalse(url_matches_pattern("https://shop.test/api/products/91/x/detail", pattern))
+
+    def test_star_does_not_cross_slash(self):
+        self.assertTrue(url_matches_pattern("https://shop.test/api/a", "shop.test/api/*"))
+        self.assertFalse(url_matches_pattern("https://shop.test/api/a/b", "shop.test/api/*"))
+
+    def test_literal_characters_escaped(self):
+        self.assertFalse(url_matches_pattern("https://shopXtest/api", "shop.test/api"))
+
+
+@unittest.skipIf(llm_schema is None, "aiohttp not installed")
+class TestSelect(unittest.TestCase):
+
+    def test_positional_without_pattern(self):
+        schema = compiled()
+        responses = [("https://shop.test/api/cart", {"items": []}),
+                     ("https://shop.test/api/p/1", {"product": {"title": "Coat"}})]
+        self.assertEqual(list(schema._select(responses, 1)), [responses[1][1]])
+        self.assertEqual(list(schema._select(responses, 5)), [])
+
+    def test_pattern_matches_before_positional(self):
+        schema = compiled(url_patterns={0: "shop.test/api/p/*"})
+        responses = [("https://shop.test/api/cart", {"items": []}),
+                     ("https://shop.test/api/p/7", {"product": {"title": "Coat"}})]
+        self.assertEqual(list(schema._select(responses, 0)), [responses[1][1], responses[0][1]])
+
+    def test_positional_match_not_repeated(self):
+        schema = compiled(url_patterns={0: "shop.test/api/p/*"})
+        responses = [("https://shop.test/api/p/7", {"a": 1}), ("https://shop.test/api/p/8", {"b": 2})]
+        self.assertEqual(list(schema._select(responses, 0)), [{"a": 1}, {"b": 2}])
+
+    def test_accessor_tries_every_match(self):
+        # Two responses share the endpoint pattern; only the second holds the product
+        schema = compiled(url_patterns={0: "shop.test/api/p/*"})
+        responses = [("https://shop.test/api/p/7", {"reviews": []}),
+                     ("https://shop.test/api/p/7-details", {"product": {"title": "Coat", "price": 120}})]
+        self.assertEqual(schema.fields["name"](responses), "Coat")
+        self.assertEqual(schema.fields["price"](responses), 120)
+
+    def test_accessor_falls_back_to_positional(self):
+        schema = compiled(url_patterns={0: "shop.test/api/p/*"})
+        responses = [("https://shop.test/api/product-details", {"product": {"title": "Coat"}}),
+                     ("https://shop.test/api/p/7", {"reviews": []})]
+        self.assertEqual(schema.fields["name"](responses), "Coat")
+
+    def test_pattern_does_not_match_deeper_endpoint(self):
+        schema = compiled(url_patterns={0: "shop.test/api/*"})
+        responses = [("https://shop.test/api/p/7", {"product": {"title": "Wrong"}}),
+                     ("https://shop.test/api/7", {"product": {"title": "Coat"}})]
+        self.assertEqual(schema.fields["name"](responses), "Coat")
+
+    def test_literal_and_unindexed_paths(self):
+        schema = compiled({"currency": "EUR", "brand": "meta.brand"})
+        responses = [("https://shop.test/a", {"x": 1}), ("https://shop.test/b", {"meta": {"brand": "Kuurth"}})]
+        self.assertEqual(schema.fields["currency"](responses), "EUR")
+        self.assertEqual(schema.fields["brand"](responses), "Kuurth")
+
+
+@unittest.skipIf(llm_schema is None, "aiohttp not installed")
+class TestCompiledSidecar(ExtractionsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        patch = mock.patch.object(llm_schema, "LLMHandler", None)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.strategy = LlmSchemaStrategy(schema_dir=self.tmp_path)
+        self.sidecar = self.tmp_path / "shop_test.compiled.json"
+
+    def save(self):
+        self.strategy._save_schema("shop.test", SCHEMA, response_urls=["https://shop.test/api/p/8812?x=1"])
+
+    def reload(self) -> "CompiledSchema":
+        return LlmSchemaStrategy(schema_dir=self.tmp_path)._load_schema("shop.test")
+
+    def test_sidecar_written_with_schema(self):
+        self.save()
+        spec = json.loads(self.sidecar.read_text())
+        self.assertEqual(spec, {"schema_hash": _hash_schema(SCHEMA), "url_patterns": {"0": "shop.test/api/p/*"}})
+
+        schema = self.reload()
+        self.assertEqual(schema.url_patterns, {0: "shop.test/api/p/*"})
+
+    def test_hash_mismatch_drops_patterns(self):
+        self.save()
+        edited = dict(SCHEMA, name="[1].item.name")
+        (self.tmp_path / "shop_test.json").write_text(json.dumps(edited))
+
+        schema = self.reload()
+        self.assertEqual(schema.url_patterns, {})
+        self.assertEqual(json.loads(self.sidecar.read_text())["schema_hash"], _hash_schema(edited))
+
+    def test_missing_sidecar_rebuilt(self):
+        self.save()
+        self.sidecar.unlink()
+
+        schema = self.reload()
+        self.assertEqual(schema.url_patterns, {})
+        self.assertEqual(json.loads(self.sidecar.read_text())["schema_hash"], _hash_schema(SCHEMA))
+
+    def test_corrupt_sidecar_ignored(self):
+        self.save()
+        self.sidecar.write_text("{not json")
+        self.assertEqual(self.reload().url_patterns, {})
+
+    def test_compiled_once_per_mtime(self):
+        self.save()
+        self.assertIs(self.strategy._load_schema("shop.test"), self.strategy._load_schema("shop.test"))
+
+    def test_no_schema(self):
+        self.assertIsNone(self.strategy._load_schema("other.test"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+HTTP Navigation Parser Tests
+============================
+
+_NavLinkParser must read raw HTML into the same "indent text | href" lines
+the browser's DOM walk (get_nav_links_with_structure) produces.
+
+Run:
+    python -m pytest scraper/tests/test_nav_link_parser.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+try:
+    from scraper.navigation.static_extractor import _NavLinkParser, http_links_match
+except ImportError:  # The navigation package needs playwright / anthropic
+    _NavLinkParser = None
+
+
+def parse(html: str) -> str:
+    parser = _NavLinkParser()
+    parser.feed(html)
+    parser.close()
+    return parser.links_text()
+
+
+@unittest.skipIf(_NavLinkParser is None, "navigation dependencies not installed")
+class TestNavLinkParser(unittest.TestCase):
+
+    def test_depth_indentation(self):
+        html = """
+        <html><body>
+          <nav><ul>
+            <li><a href="/women">Women</a>
+              <ul><li><a href="/women/dresses">Dresses</a></li></ul>
+            </li>
+            <li><a href="/men">Men</a></li>
+          </ul></nav>
+        </body></html>
+        """
+        self.assertEqual(parse(html).split('\n'), [
+            'Women | /women',
+            '    Dresses | /women/dresses',
+            'Men | /men',
+        ])
+
+    def test_unclosed_list_items_are_siblings(self):
+        html = '<body><ul><li><a href="/a">A</a><li><a href="/b">B</a></ul></body>'
+        self.assertEqual(parse(html), 'A | /a\nB | /b')
+
+    def test_nested_anchor_closes_open_one(self):
+        html = '<body><div><a href="/a">A<a href="/b">B</a></div></body>'
+        self.assertEqual(parse(html), 'A | /a\nB | /b')
+
+    def test_hidden_text_and_whitespace(self):
+        html = """<body><a href="/sale">
+            Sale <script>track()</script><span>  now</span>
+        </a></body>"""
+        self.assertEqual(parse(html), 'Sale now | /sale')
+
+    def test_skips_invalid_and_duplicate_links(self):
+        html = """<body>
+            <a href="#">Top</a>
+            <a href="javascript:void(0)">Open</a>
+            <a href="/x"></a>
+            <a href="/bags">Bags</a>
+            <div><a href="/bags">Bags</a></div>
+        </body>"""
+        self.assertEqual(parse(html), 'Bags | /bags')
+
+    def test_void_and_stray_end_tags(self):
+        html = '<body><div><img src="x.png"><br></span><a href="/a">A</a></div></body>'
+        self.assertEqual(parse(html), 'A | /a')
+
+    def test_links_match_coverage(self):
+        browser = 'Women | /women\n  Dresses | /women/dresses\nMen | /men'
+        self.assertTrue(http_links_match(browser, parse(
+            '<body><a href="/women">Women</a><a href="/women/dresses">Dresses</a>'
+            '<a href="/men">Men</a><a href="/extra">Extra</a></body>')))
+        self.assertFalse(http_links_match(browser, parse('<body><a href="/women">Women</a></body>')))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Navigation Probe Tests
+======================
+
+navigation_unchanged() reuses nav.json only when the homepage still shows
+its top-level names and the same nav links. Fetches are stubbed; the HTML
+fixtures go through the real probe (skipped without BeautifulSoup).
+
+Run:
+    python -m pytest scraper/tests/test_nav_probe.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import nav_probe
+from stages.nav_probe import navigation_unchanged, probe_navigation, save_probe
+from stages.storage import load_brand_meta, save_navigation
+
+try:
+    import bs4
+except ImportError:
+    bs4 = None
+
+URL = "https://shop.test/"
+DOMAIN = "shop.test"
+
+NAV_TREE = {"category_tree": [{"name": name, "url": f"{URL}{name.lower()}"}
+                              for name in ["Women", "Men", "Kids", "Home", "Sale"]]}
+
+
+def homepage(items=None, extra_links=()) -> str:
+    items = items or [(node["name"], f"/{node['name'].lower()}") for node in NAV_TREE["category_tree"]]
+    links = "".join(f'<a href="{href}">{name}</a>' for name, href in list(items) + list(extra_links))
+    return (f'<html><body><header><nav>{links}<a href="https://other.test/x">Partner</a>'
+            f'<a href="#top">Top</a></nav></header><main><a href="/p/1">Coat</a></main></body></html>')
+
+
+@unittest.skipIf(bs4 is None, "beautifulsoup4 not installed")
+class TestNavigationUnchanged(ExtractionsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.http_html = homepage()
+        self.browser_html = None
+        self.fetch = mock.patch.object(nav_probe, "_fetch_html", side_effect=lambda url: self.http_html).start()
+        self.render = mock.patch.object(nav_probe, "_render_html", side_effect=lambda url: self.browser_html).start()
+        mock.patch("builtins.print").start()
+        self.addCleanup(mock.patch.stopall)
+
+        save_navigation(DOMAIN, NAV_TREE)
+
+    def test_unchanged_navigation_reused(self):
+        save_probe(URL, DOMAIN)
+        self.assertEqual(navigation_unchanged(URL, DOMAIN), NAV_TREE)
+
+    def test_probe_saved_per_domain(self):
+        save_probe(URL, DOMAIN)
+        probe = load_brand_meta(DOMAIN)["nav"]["probe"]
+        self.assertEqual(probe["method"], "http")
+        self.assertEqual(probe["link_count"], 5)  # Same-domain nav links only
+        self.assertEqual(probe["top_level"], ["Women", "Men", "Kids", "Home", "Sale"])
+
+    def test_changed_links_with_same_names(self):
+        save_probe(URL, DOMAIN)
+        self.http_html = homepage(extra_links=[("Gift cards", "/gift-cards")])
+        self.assertIsNone(navigation_unchanged(URL, DOMAIN))
+
+    def test_moved_link_with_same_names(self):
+        save_probe(URL, DOMAIN)
+        items = [(node["name"], f"/{node['name'].lower()}") for node in NAV_TREE["category_tree"]]
+        items[4] = ("Sale", "/outlet")
+        self.http_html = homepage(items)
+        self.assertIsNone(navigation_unchanged(URL, DOMAIN))
+
+    def test_one_rename_within_threshold(self):
+        save_probe(URL, DOMAIN)
+        items = [(node["name"], f"/{node['name'].lower()}") for node in NAV_TREE["category_tree"]]
+        items[2] = ("Children", "/kids")  # 4 of 5 = 80%
+        self.http_html = homepage(items)
+        self.assertEqual(navigation_unchanged(URL, DOMAIN), NAV_TREE)
+
+    def test_renames_below_threshold(self):
+        save_probe(URL, DOMAIN)
+        items = [(node["name"], f"/{node['name'].lower()}") for node in NAV_TREE["category_tree"]]
+        items[2] = ("Children", "/kids")
+        items[3] = ("Living", "/home")  # 3 of 5 = 60%, links unchanged
+        self.http_html = homepage(items)
+        self.assertIsNone(navigation_unchanged(URL, DOMAIN))
+
+    def test_names_matched_ignoring_case_and_spacing(self):
+        save_probe(URL, DOMAIN)
+        items = [(f"  {node['name'].upper()} ", f"/{node['name'].lower()}") for node in NAV_TREE["category_tree"]]
+        self.http_html = homepage(items)
+        self.assertEqual(navigation_unchanged(URL, DOMAIN), NAV_TREE)
+
+    def test_http_failure_falls_back_to_browser(self):
+        self.http_html = None
+        self.browser_html = homepage()
+
+        save_probe(URL, DOMAIN)
+        self.assertEqual(load_brand_meta(DOMAIN)["nav"]["probe"]["method"], "browser")
+
+        # Next run probes the way that worked, without trying HTTP first
+        self.fetch.reset_mock()
+        self.assertEqual(navigation_unchanged(URL, DOMAIN), NAV_TREE)
+        self.fetch.assert_not_called()
+
+    def test_js_rendered_menu_falls_back_to_browser(self):
+        self.http_html = "<html><body><div id='root'></div></body></html>"
+        self.browser_html = homepage()
+
+        probe = probe_navigation(URL)
+        self.assertEqual((probe["method"], probe["link_count"]), ("browser", 5))
+
+    def test_failed_probe_runs_stage_one(self):
+        save_probe(URL, DOMAIN)
+        self.http_html = None
+        self.browser_html = homepage()
+        self.assertIsNone(navigation_unchanged(URL, DOMAIN))  # Saved method was HTTP
+        self.render.assert_not_called()
+
+    def test_nothing_saved(self):
+        self.assertIsNone(navigation_unchanged(URL, DOMAIN))
+        self.fetch.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Tests
+==================
+
+AdaptiveRateLimiter's fair waiter queue, its latency-based congestion
+control, the per-domain rate memory and the rate-limit headers it honors.
+
+Run:
+    python -m pytest scraper/tests/test_rate_limiter.py
+"""
+
+import asyncio
+import sys
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages.rate_limiter import (
+    AdaptiveRateLimiter, CongestionState, RateLimitState,
+    RateLimitToken, load_rate_memory, parse_rate_limit_headers, remembered_start_rate, save_rate_memory,
+)
+
+
+def limiter(**kwargs) -> AdaptiveRateLimiter:
+    kwargs.setdefault("quiet", True)
+    return AdaptiveRateLimiter(**kwargs)
+
+
+class TestFairQueue(unittest.TestCase):
+
+    def run_waiters(self, rl: AdaptiveRateLimiter, count: int, late=None):
+        """Queue `count` waiters in order; returns the order they were granted in."""
+        granted = []
+
+        async def waiter(n):
+            async with await rl.acquire():
+                granted.append(n)
+
+        async def run():
+            tasks = []
+            for n in range(count):
+                tasks.append(asyncio.create_task(waiter(n)))
+                await asyncio.sleep(0)  # Let it reach the queue before the next one arrives
+            if late:
+                await late(tasks, waiter)
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        return granted
+
+    def test_released_in_arrival_order(self):
+        rl = limiter(initial_rate=50.0, burst_size=0)
+        self.assertEqual(self.run_waiters(rl, 8), list(range(8)))
+        self.assertEqual(rl.stats["total_requests"], 8)
+
+    def test_tokens_paced_by_rate(self):
+        rl = limiter(initial_rate=50.0, burst_size=0)
+        start = time.monotonic()
+        self.run_waiters(rl, 5)
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 50)  # ~1/rate apart
+
+    def test_late_arrival_does_not_overtake(self):
+        rl = limiter(initial_rate=20.0, burst_size=0)
+
+        async def late(tasks, waiter):
+            # Tokens appear while three waiters are queued: the newcomer still queues behind them
+            rl._tokens = 10.0
+            tasks.append(asyncio.create_task(waiter("late")))
+
+        self.assertEqual(self.run_waiters(rl, 3, late=late), [0, 1, 2, "late"])
+
+    def test_waiters_held_through_a_pause(self):
+        rl = limiter(initial_rate=100.0, burst_size=0)
+
+        async def pause(tasks, waiter):
+            rl._paused_until = time.time() + 0.2
+            rl._state = RateLimitState.PAUSED
+            rl._wakeup.set()
+
+        start = time.monotonic()
+        self.assertEqual(self.run_waiters(rl, 4, late=pause), [0, 1, 2, 3])
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(rl.state, RateLimitState.RUNNING)
+
+    def test_cancelled_waiter_skipped(self):
+        rl = limiter(initial_rate=20.0, burst_size=0)
+
+        async def run():
+            granted = []
+
+            async def waiter(n):
+                try:
+                    async with await rl.acquire():
+                        granted.append(n)
+                except asyncio.CancelledError:
+                    pass
+
+            tasks = []
+            for n in range(3):
+                tasks.append(asyncio.create_task(waiter(n)))
+                await asyncio.sleep(0)
+            tasks[1].cancel()
+            await asyncio.gather(*tasks)
+            return granted
+
+        self.assertEqual(asyncio.run(run()), [0, 2])
+        self.assertEqual(rl.stats["total_requests"], 2)
+        self.assertEqual(rl.stats["waiters"], 0)
+
+    def test_immediate_grant_without_queue(self):
+        rl = limiter(initial_rate=10.0, burst_size=3)
+        self.assertEqual(self.run_waiters(rl, 3), [0, 1, 2])
+        self.assertIsNone(rl._dispatcher)  # Burst tokens never needed the dispatcher
+
+
+class TestLatencyControl(unittest.TestCase):
+
+    def record(self, rl: AdaptiveRateLimiter, latencies, status=200):
+        async def run():
+            for latency in latencies:
+                await rl.record_outcome(status, latency=latency)
+        asyncio.run(run())
+
+    def ready(self, **kwargs) -> AdaptiveRateLimiter:
+        """Limiter free to adjust on every outcome."""
+        rl = limiter(initial_rate=10.0, max_rate=1000.0, **kwargs)
+        rl._ramp_interval = 0.0
+        rl._last_ramp_time = 0.0
+        return rl
+
+    def test_baseline_is_lowest_recent_latency(self):
+        rl = limiter()
+        self.record(rl, [0.4, 0.2, 0.3] * 3)
+        self.assertEqual(rl.base_latency, 0.2)
+        self.assertIsNone(rl.latency_ratio)  # Fewer than 10 samples
+
+        self.record(rl, [0.3])
+        self.assertAlmostEqual(rl.latency_ratio, rl.smoothed_latency / 0.2)
+
+    def test_failures_not_sampled(self):
+        rl = limiter()
+        self.record(rl, [5.0] * 3, status=500)
+        self.assertIsNone(rl.base_latency)
+
+    def test_flat_latency_ramps_fast_in_startup(self):
+        rl = self.ready()
+        self.record(rl, [0.2] * 10)
+        self.assertEqual(rl.congestion_state, CongestionState.STARTUP)
+        self.assertEqual(rl.rate, 20.0)  # 2x per interval
+
+    def test_flat_latency_ramps_normally_after_startup(self):
+        rl = self.ready(slow_start=False)
+        self.record(rl, [0.2] * 10)
+        self.assertEqual(rl.congestion_state, CongestionState.CRUISE)
+        self.assertAlmostEqual(rl.rate, 13.0)
+
+    def congested(self, latency: float) -> AdaptiveRateLimiter:
+        """Limiter with a 0.2s baseline whose next success sees `latency`."""
+        rl = self.ready()
+        for sample in [0.2] * 10 + [latency] * 4:
+            rl._record_latency(sample)
+        rl._window_successes = 10
+        self.record(rl, [latency])
+        return rl
+
+    def test_rising_latency_holds(self):
+        rl = self.congested(0.35)  # Smoothed ~0.30 → ratio ~1.5
+        self.assertEqual(rl.congestion_state, CongestionState.HOLD)
+        self.assertEqual(rl.rate, 10.0)
+
+    def test_inflated_latency_backs_off(self):
+        rl = self.congested(1.0)  # Smoothed ~0.74 → ratio ~3.7
+        self.assertEqual(rl.congestion_state, CongestionState.BACKOFF)
+        self.assertEqual(rl.stats["latency_backoffs"], 1)
+        self.assertAlmostEqual(rl.rate, 8.5)  # -15%
+        self.assertEqual(rl.stats["window_successes"], 0)
+
+    def test_backoff_once_per_interval(self):
+        rl = self.congested(1.0)
+        rl._ramp_interval = 60.0
+        rl._window_successes = 10
+        self.record(rl, [1.0] * 5)
+        self.assertEqual(rl.stats["latency_backoffs"], 1)
+        self.assertAlmostEqual(rl.rate, 8.5)
+
+    def test_rate_limit_ends_startup(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, [0.2] * 3)
+        self.record(rl, [0.0], status=429)
+        self.assertEqual(rl.congestion_state, CongestionState.CRUISE)
+
+
+class TestRateMemory(ExtractionsTestCase):
+
+    def limiter_after(self, peak_rate: float, learned_rate=None, pauses=(), rate_limited=0) -> AdaptiveRateLimiter:
+        rl = limiter(initial_rate=peak_rate)
+        rl._learned_rate = learned_rate
+        rl._pauses = list(pauses)
+        rl._total_rate_limited = rate_limited
+        return rl
+
+    def test_start_below_a_ceiling_found_by_a_429(self):
+        self.assertAlmostEqual(remembered_start_rate({"safe_rate": 10.0, "hit_limit": True}), 9.0)
+
+    def test_clean_run_rate_used_as_is(self):
+        self.assertEqual(remembered_start_rate({"safe_rate": 10.0, "hit_limit": False}), 10.0)
+
+    def test_rate_for_this_hour_preferred(self):
+        memory = {"safe_rate": 10.0, "hit_limit": True, "hours": {"14": 6.0}}
+        self.assertAlmostEqual(remembered_start_rate(memory, hour=14), 5.4)
+        self.assertAlmostEqual(remembered_start_rate(memory, hour=3), 9.0)
+
+    def test_nothing_learned(self):
+        self.assertIsNone(remembered_start_rate({}))
+
+    def test_429_sets_new_ceiling(self):
+        memory = {"safe_rate": 10.0, "hit_limit": True, "hours": {"14": 10.0}}
+        rl = self.limiter_after(peak_rate=12.0, learned_rate=7.5, pauses=[2.0, 4.0], rate_limited=2)
+        save_rate_memory("shop.test", rl, memory, hour=14)
+
+        self.assertEqual(load_rate_memory("shop.test"), {
+            "safe_rate": 7.5, "hit_limit": True, "pause": 4.0, "hours": {"14": 7.5}, "rate_limited": 2,
+        })
+
+    def test_clean_run_below_ceiling_stores_no_new_limit(self):
+        memory = {"safe_rate": 10.0, "hit_limit": True, "pause": 3.0, "hours": {"14": 10.0}}
+        save_rate_memory("shop.test", self.limiter_after(peak_rate=8.0), memory, hour=14)
+
+        saved = load_rate_memory("shop.test")
+        self.assertEqual((saved["safe_rate"], saved["hit_limit"]), (10.0, True))
+        self.assertEqual(saved["hours"], {"14": 10.0})
+        self.assertEqual(saved["pause"], 3.0)
+        self.assertAlmostEqual(remembered_start_rate(saved, hour=14), 9.0)
+
+    def test_clean_run_past_ceiling_raises_it(self):
+        memory = {"safe_rate": 10.0, "hit_limit": True, "hours": {"14": 10.0}}
+        save_rate_memory("shop.test", self.limiter_after(peak_rate=15.0), memory, hour=14)
+
+        saved = load_rate_memory("shop.test")
+        self.assertEqual((saved["safe_rate"], saved["hit_limit"]), (15.0, False))
+        self.assertEqual(remembered_start_rate(saved, hour=14), 15.0)
+
+    def test_first_clean_run(self):
+        save_rate_memory("shop.test", self.limiter_after(peak_rate=6.0), {}, hour=9)
+
+        saved = load_rate_memory("shop.test")
+        self.assertEqual(saved, {"safe_rate": 6.0, "hit_limit": False, "pause": 1.0, "hours": {"9": 6.0},
+                                 "rate_limited": 0})
+        self.assertEqual(load_rate_memory("other.test"), {})
+
+
+class TestRateLimitHeaders(unittest.TestCase):
+
+    def test_retry_after_seconds(self):
+        self.assertEqual(parse_rate_limit_headers({"Retry-After": "30"})["retry_after"], 30.0)
+        self.assertEqual(parse_rate_limit_headers({"retry-after": "-5"})["retry_after"], 0.0)
+
+    def test_retry_after_http_date(self):
+        limits = parse_rate_limit_headers({"Retry-After": formatdate(time.time() + 120, usegmt=True)})
+        self.assertAlmostEqual(limits["retry_after"], 120, delta=2)
+
+        past = parse_rate_limit_headers({"Retry-After": formatdate(time.time() - 60, usegmt=True)})
+        self.assertEqual(past["retry_after"], 0.0)
+
+    def test_unparseable_retry_after_ignored(self):
+        self.assertIsNone(parse_rate_limit_headers({"Retry-After": "soon"})["retry_after"])
+
+    def test_ratelimit_headers(self):
+        limits = parse_rate_limit_headers({"RateLimit-Remaining": "0", "RateLimit-Reset": "12"})
+        self.assertEqual((limits["remaining"], limits["reset_after"]), (0.0, 12.0))
+
+    def test_x_ratelimit_headers(self):
+        limits = parse_rate_limit_headers({"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": "7"})
+        self.assertEqual((limits["remaining"], limits["reset_after"]), (4.0, 7.0))
+
+        limits = parse_rate_limit_headers({"x-rate-limit-remaining": "9"})
+        self.assertEqual(limits["remaining"], 9.0)
+
+    def test_reset_as_epoch_timestamp(self):
+        limits = parse_rate_limit_headers({"X-RateLimit-Reset": str(int(time.time()) + 30)})
+        self.assertAlmostEqual(limits["reset_after"], 30, delta=2)
+
+    def test_structured_value_first_number(self):
+        limits = parse_rate_limit_headers({"RateLimit-Remaining": "100, 100;w=60"})
+        self.assertEqual(limits["remaining"], 100.0)
+
+    def test_cloudflare_challenge(self):
+        self.assertTrue(parse_rate_limit_headers({"cf-mitigated": "challenge"})["challenged"])
+        self.assertFalse(parse_rate_limit_headers({"CF-Ray": "8a1b"})["challenged"])
+
+    def test_no_headers(self):
+        self.assertEqual(parse_rate_limit_headers(None),
+                         {"retry_after": None, "remaining": None, "reset_after": None, "challenged": False})
+
+
+class TestHeadersReachLimiter(unittest.TestCase):
+
+    def record(self, rl, status, headers):
+        async def run():
+            await RateLimitToken(rl).record(status, headers, latency=0.1)
+        asyncio.run(run())
+
+    def test_pause_follows_retry_after(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, 429, {"Retry-After": "7"})
+        self.assertEqual(rl.state, RateLimitState.PAUSED)
+        self.assertAlmostEqual(rl._paused_until - time.time(), 7, delta=0.5)
+        self.assertEqual(rl.stats["max_pause"], 7.0)
+
+    def test_reset_used_when_retry_after_missing(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, 429, {"RateLimit-Reset": "4"})
+        self.assertAlmostEqual(rl._paused_until - time.time(), 4, delta=0.5)
+
+    def test_default_pause_without_headers(self):
+        rl = limiter(initial_rate=10.0, default_pause=2.5)
+        self.record(rl, 429, {})
+        self.assertEqual(rl.stats["max_pause"], 2.5)
+
+    def test_exhausted_quota_pauses_before_a_429(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, 200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "3"})
+        self.assertEqual(rl.state, RateLimitState.PAUSED)
+        self.assertEqual(rl.stats["total_rate_limited"], 0)
+        self.assertEqual(rl.rate, 10.0)  # No rate cut
+
+    def test_challenge_treated_as_rate_limit(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, 200, {"cf-mitigated": "challenge"})
+        self.assertEqual(rl.stats["total_rate_limited"], 1)
+
+    def test_503_only_limits_with_retry_after(self):
+        rl = limiter(initial_rate=10.0)
+        self.record(rl, 503, {})
+        self.assertEqual(rl.stats["total_rate_limited"], 0)
+        self.record(rl, 503, {"Retry-After": "2"})
+        self.assertEqual(rl.stats["total_rate_limited"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
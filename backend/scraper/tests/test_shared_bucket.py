@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Shared Token Bucket Tests
+=========================
+
+Token accounting of the per-host SQLite bucket, and the limiter leasing its
+tokens in batches instead of one database write per request.
+
+Run:
+    python -m pytest scraper/tests/test_shared_bucket.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import shared_bucket
+from stages.rate_limiter import SHARED_LEASE_MAX, AdaptiveRateLimiter
+from stages.shared_bucket import SharedTokenBucket
+
+HOST = "shop.test"
+
+
+class BucketTestCase(ExtractionsTestCase):
+
+    def bucket(self, host: str = HOST) -> SharedTokenBucket:
+        bucket = SharedTokenBucket(host, db_path=self.tmp_path / "rate_buckets.sqlite")
+        self.addCleanup(bucket.close)
+        return bucket
+
+
+class TestSharedTokenBucket(BucketTestCase):
+
+    def test_take_grants_what_is_available(self):
+        bucket = self.bucket()
+        bucket.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        now = time.time()
+
+        granted, delay, rate, paused_until = bucket.take(now, count=3)
+        self.assertEqual((granted, delay, rate, paused_until), (3, 0.0, 10.0, None))
+
+        granted, delay, _, _ = bucket.take(now, count=4)
+        self.assertEqual(granted, 2)
+        self.assertEqual(delay, 0.0)
+
+    def test_empty_bucket_waits_for_one_token(self):
+        bucket = self.bucket()
+        bucket.join(rate=10.0, tokens=0.0, max_tokens=10.0)
+        now = time.time()
+
+        granted, delay, _, _ = bucket.take(now, count=4)
+        self.assertEqual(granted, 0)
+        self.assertAlmostEqual(delay, 0.1, delta=0.01)
+
+        # Partial lease of what accrued, not a wait for all four
+        granted, _, _, _ = bucket.take(now + 0.15, count=4)
+        self.assertEqual(granted, 1)
+
+    def test_refill_capped_at_max_tokens(self):
+        bucket = self.bucket()
+        bucket.join(rate=10.0, tokens=0.0, max_tokens=6.0)
+
+        granted, _, _, _ = bucket.take(time.time() + 60, count=20)
+        self.assertEqual(granted, 6)
+
+    def test_pause_shared_and_no_tokens_accrue_during_it(self):
+        first, second = self.bucket(), self.bucket()
+        first.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        second.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        now = time.time()
+        first.pause(rate=4.0, paused_until=now + 5, tokens=1.0)
+
+        granted, delay, rate, paused_until = second.take(now, count=2)
+        self.assertEqual(granted, 0)
+        self.assertAlmostEqual(delay, 5, delta=0.1)
+        self.assertEqual(rate, 4.0)
+        self.assertEqual(paused_until, now + 5)
+
+        # One second after the pause: the 1 token left + 4 accrued since it ended
+        granted, _, _, paused_until = second.take(now + 6, count=10)
+        self.assertEqual(granted, 5)
+        self.assertIsNone(paused_until)
+
+    def test_successes_added_to_shared_window(self):
+        first, second = self.bucket(), self.bucket()
+        first.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        second.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+
+        first.take(time.time(), count=1, successes=3)
+        second.record_successes(2)
+        second.record_successes(0)
+
+        _, successes, _, _ = first.window()
+        self.assertEqual(successes, 5)
+
+    def test_rate_change_limited_per_interval(self):
+        first, second = self.bucket(), self.bucket()
+        first.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        second.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+
+        self.assertEqual(first.set_rate(13.0, 13.0, min_interval=0.0), 13.0)
+        self.assertEqual(second.set_rate(17.0, 17.0, min_interval=60.0), 13.0)
+
+    def test_stale_row_reset_on_join(self):
+        first = self.bucket()
+        first.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        first.pause(rate=2.0, paused_until=time.time() + 600, tokens=0.0)
+
+        original = shared_bucket.STALE_AFTER
+        shared_bucket.STALE_AFTER = -1.0
+        try:
+            rate = self.bucket().join(rate=8.0, tokens=5.0, max_tokens=8.0)
+        finally:
+            shared_bucket.STALE_AFTER = original
+        self.assertEqual(rate, 8.0)
+
+    def test_missing_row_rejoined(self):
+        bucket = self.bucket()
+        bucket.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+        bucket._conn.execute("DELETE FROM buckets")
+
+        window_start, successes, paused_until, rate = bucket.window()
+        self.assertEqual((successes, paused_until, rate), (0, None, 10.0))
+        self.assertEqual(bucket.set_rate(12.0, 12.0, min_interval=0.0), 12.0)
+
+        bucket._conn.execute("DELETE FROM buckets")
+        granted, _, rate, _ = bucket.take(time.time(), count=3)
+        self.assertEqual((granted, rate), (3, 10.0))
+
+        bucket._conn.execute("DELETE FROM buckets")
+        bucket.pause(rate=4.0, paused_until=time.time() + 5, tokens=0.0)
+        self.assertEqual(bucket.window()[3], 4.0)
+
+    def test_use_before_join(self):
+        with self.assertRaises(RuntimeError):
+            self.bucket().take(time.time())
+
+    def test_hosts_are_independent(self):
+        first, other = self.bucket(), self.bucket("other.test")
+        first.join(rate=10.0, tokens=0.0, max_tokens=10.0)
+        other.join(rate=10.0, tokens=5.0, max_tokens=10.0)
+
+        granted, _, _, _ = other.take(time.time(), count=5)
+        self.assertEqual(granted, 5)
+
+
+class TestLimiterLeases(BucketTestCase):
+
+    def test_tokens_leased_in_batches(self):
+        bucket = self.bucket()
+        takes = []
+        take = bucket.take
+
+        def counting_take(now, count=1, successes=0):
+            result = take(now, count, successes)
+            takes.append((count, result[0], successes))
+            return result
+
+        bucket.take = counting_take
+
+        async def run(requests):
+            limiter = AdaptiveRateLimiter(initial_rate=40.0, burst_size=40, quiet=True, shared=bucket)
+            for _ in range(requests):
+                async with await limiter.acquire() as token:
+                    await token.record(200, latency=0.01)
+            return limiter
+
+        limiter = asyncio.run(run(30))
+
+        granted = sum(granted for _, granted, _ in takes)
+        self.assertEqual(granted, 30 + limiter._leased)
+        self.assertLessEqual(len(takes), 30 / SHARED_LEASE_MAX + 1)
+        self.assertTrue(all(count <= SHARED_LEASE_MAX for count, _, _ in takes))
+
+        # Successes reach the shared window with the next lease
+        shared_successes = sum(successes for _, _, successes in takes)
+        self.assertEqual(shared_successes + limiter._unshared_successes, 30)
+
+    def test_drained_bucket_delays_one_token(self):
+        bucket = self.bucket()
+
+        async def run():
+            limiter = AdaptiveRateLimiter(initial_rate=10.0, burst_size=0, quiet=True, shared=bucket)
+            start = time.monotonic()
+            async with await limiter.acquire() as token:
+                await token.record(200, latency=0.01)
+            return time.monotonic() - start
+
+        # One token at 10/s, not a whole lease of SHARED_LEASE_S worth
+        self.assertLess(asyncio.run(run()), 0.3)
+
+    def test_shared_writes_off_the_event_loop(self):
+        bucket = self.bucket()
+        threads = []
+        for name in ("pause", "window", "record_successes", "set_rate"):
+            method = getattr(bucket, name)
+
+            def recording(*args, _method=method, _name=name):
+                threads.append((_name, threading.current_thread() is threading.main_thread()))
+                return _method(*args)
+
+            setattr(bucket, name, recording)
+
+        async def run():
+            limiter = AdaptiveRateLimiter(initial_rate=10.0, quiet=True, shared=bucket)
+            limiter._ramp_interval = 0.0
+            for _ in range(12):
+                await limiter.record_outcome(200, latency=0.01)
+            await limiter.record_outcome(429)
+            await limiter.record_outcome(200, remaining=0, reset_after=1.0)
+
+        asyncio.run(run())
+        self.assertEqual({name for name, _ in threads}, {"pause", "window", "record_successes", "set_rate"})
+        self.assertFalse(any(on_loop for _, on_loop in threads))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Async URL Extractor Tests
+=========================
+
+Stage 2 pagination over plain HTTP: the HTTP-vs-browser decision (page 1's
+raw HTML must link HTTP_COVERAGE of the products the browser found), the
+per-host bound on HTTP fetches (HTTP_CONCURRENCY in flight per host), and
+pages falling back to the browser when HTTP fails. Fetches are stubbed.
+
+Run:
+    python -m pytest scraper/tests/test_url_extractor_async.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+
+try:
+    import url_extractor_async
+    from url_extractor_async import HTTP_CONCURRENCY, HTTP_COVERAGE
+except ImportError:  # stage 2 needs playwright
+    url_extractor_async = None
+
+try:
+    import bs4
+except ImportError:
+    bs4 = None
+
+CATEGORY = "https://shop.test/women"
+PRODUCTS = [f"https://shop.test/p/{n}" for n in range(10)]
+
+
+def listing(urls) -> str:
+    links = "".join(f'<li class="tile"><a href="{url}">Product</a></li>' for url in urls)
+    return f'<html><body><nav><a href="/men">Men</a></nav><ul class="grid">{links}</ul></body></html>'
+
+
+def brand(pagination_http=None):
+    return types.SimpleNamespace(pagination_http=pagination_http)
+
+
+@unittest.skipIf(url_extractor_async is None, "playwright not installed")
+@unittest.skipIf(bs4 is None, "beautifulsoup4 not installed")
+class TestServerRendered(unittest.TestCase):
+
+    def setUp(self):
+        self.html = listing(PRODUCTS)
+        self.fetched = []
+
+        async def fetch_html(url):
+            self.fetched.append(url)
+            return self.html
+
+        mock.patch.object(url_extractor_async, "_fetch_html", fetch_html).start()
+        mock.patch("builtins.print").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def server_rendered(self, page1_urls=PRODUCTS, brand_instance=None):
+        return asyncio.run(url_extractor_async._is_server_rendered(CATEGORY, page1_urls, brand_instance))
+
+    def test_raw_html_has_page_one_products(self):
+        self.assertTrue(self.server_rendered())
+
+    def test_coverage_threshold(self):
+        covered = int(len(PRODUCTS) * HTTP_COVERAGE)
+        self.html = listing(PRODUCTS[:covered])
+        self.assertTrue(self.server_rendered())
+
+        self.html = listing(PRODUCTS[:covered - 1])
+        self.assertFalse(self.server_rendered())
+
+    def test_relative_links_resolved(self):
+        self.html = listing(url.replace("https://shop.test", "") for url in PRODUCTS)
+        self.assertTrue(self.server_rendered())
+
+    def test_js_rendered_grid(self):
+        self.html = "<html><body><div id='root'></div></body></html>"
+        self.assertFalse(self.server_rendered())
+
+    def test_fetch_failure_uses_browser(self):
+        self.html = None
+        self.assertFalse(self.server_rendered())
+
+    def test_decided_once_per_brand(self):
+        brand_instance = brand()
+        self.assertTrue(self.server_rendered(brand_instance=brand_instance))
+        self.assertTrue(brand_instance.pagination_http)
+
+        self.html = None
+        self.assertTrue(self.server_rendered(brand_instance=brand_instance))
+        self.assertEqual(self.fetched, [CATEGORY])
+
+    def test_browser_decision_kept(self):
+        self.assertFalse(self.server_rendered(brand_instance=brand(pagination_http=False)))
+        self.assertEqual(self.fetched, [])
+
+    def test_no_page_one_products(self):
+        self.assertFalse(self.server_rendered(page1_urls=[]))
+        self.assertEqual(self.fetched, [])
+
+
+class FakeResponse:
+
+    def __init__(self, url, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = f"<html>{url}</html>"
+        self.elapsed = types.SimpleNamespace(total_seconds=lambda: 0.05)
+
+
+class FakeRequests:
+    """requests stand-in tracking how many GETs are in flight per host."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.status_codes = {}
+        self.in_flight = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        host = url.split("/")[2]
+        with self.lock:
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.in_flight[host])
+        try:
+            time.sleep(self.delay)
+            if self.status_codes.get(url) == "error":
+                raise ConnectionError("connection reset")
+            return FakeResponse(url, self.status_codes.get(url, 200))
+        finally:
+            with self.lock:
+                self.in_flight[host] -= 1
+
+
+@unittest.skipIf(url_extractor_async is None, "playwright not installed")
+class TestHostBound(ExtractionsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.requests = FakeRequests()
+        mock.patch.dict(sys.modules, {"requests": self.requests}).start()
+        mock.patch("stages.shared_bucket.DEFAULT_DB_PATH", self.tmp_path / "rate_buckets.sqlite").start()
+        mock.patch.object(url_extractor_async, "HTTP_DEFAULT_RATE", 50.0).start()
+        mock.patch("builtins.print").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def fetch_all(self, urls):
+        async def run():
+            return await asyncio.gather(*(url_extractor_async._fetch_html(url) for url in urls))
+
+        return asyncio.run(run())
+
+    def test_fetches_bounded_per_host(self):
+        urls = [f"https://shop.test/women?page={n}" for n in range(HTTP_CONCURRENCY * 3)]
+        pages = self.fetch_all(urls)
+
+        self.assertEqual(pages, [f"<html>{url}</html>" for url in urls])
+        self.assertLessEqual(self.requests.peak["shop.test"], HTTP_CONCURRENCY)
+
+    def test_hosts_bounded_separately(self):
+        urls = [f"https://{host}/c?page={n}" for n in range(HTTP_CONCURRENCY * 2) for host in ("a.test", "b.test")]
+        self.fetch_all(urls)
+
+        self.assertLessEqual(self.requests.peak["a.test"], HTTP_CONCURRENCY)
+        self.assertLessEqual(self.requests.peak["b.test"], HTTP_CONCURRENCY)
+
+    def test_failed_fetches_return_none(self):
+        self.requests.status_codes = {
+            "https://shop.test/c?page=2": 404,
+            "https://shop.test/c?page=3": "error",
+        }
+        pages = self.fetch_all([f"https://shop.test/c?page={n}" for n in (2, 3, 4)])
+        self.assertEqual(pages, [None, None, "<html>https://shop.test/c?page=4</html>"])
+
+        self.fetch_all(["https://shop.test/c?page=5"])  # Slot released on failure
+
+
+@unittest.skipIf(url_extractor_async is None, "playwright not installed")
+class TestMultiPage(unittest.TestCase):
+
+    PAGES = [f"{CATEGORY}?page={n}" for n in (2, 3, 4)]
+
+    def setUp(self):
+        self.http_failures = set()
+        self.browser_pages = []
+
+        async def http_page(url, category_url, category_name, page_num, brand_instance=None):
+            if url in self.http_failures:
+                return None
+            return {"product_urls": [types.SimpleNamespace(url=f"{url}#http")]}
+
+        async def browser_page(acquire, url, category_url, category_name, page_num, brand_instance, quiet):
+            self.browser_pages.append(url)
+            return {"product_urls": [types.SimpleNamespace(url=f"{url}#browser")]}
+
+        mock.patch.object(url_extractor_async, "_generate_page_urls", return_value=self.PAGES).start()
+        mock.patch.object(url_extractor_async, "_extract_urls_from_html_page", http_page).start()
+        mock.patch.object(url_extractor_async, "_extract_urls_from_single_page", browser_page).start()
+        mock.patch("builtins.print").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def extract(self, server_rendered):
+        pagination = {"pagination_found": True, "url_pattern": "?page=X", "max_page_detected": 4}
+        return asyncio.run(url_extractor_async.extract_multi_page_urls(
+            None, CATEGORY, "Women", brand(pagination_http=server_rendered), pagination, PRODUCTS
+        ))
+
+    def test_server_rendered_pages_over_http(self):
+        result = self.extract(server_rendered=True)
+        self.assertEqual([u.url for u in result["product_urls"]], [f"{url}#http" for url in self.PAGES])
+        self.assertEqual(self.browser_pages, [])
+
+    def test_http_failure_falls_back_to_browser(self):
+        self.http_failures = {self.PAGES[1]}
+        result = self.extract(server_rendered=True)
+        self.assertEqual(self.browser_pages, [self.PAGES[1]])
+        self.assertEqual(result["pages_extracted"], 3)
+
+    def test_js_rendered_pages_use_browser(self):
+        self.extract(server_rendered=False)
+        self.assertEqual(self.browser_pages, self.PAGES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,9 +9,18 @@ import time
 import json
 import os
 import sys
+import tempfile
+import unittest
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional, Callable
 from contextlib import contextmanager
+from unittest import mock
+
+# backend/ - stages, scraper and prod_page_v2 import as packages from here
+BACKEND_DIR = Path(__file__).parent.parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
 
 
 class TestLogger:
@@ -392,4 +401,25 @@ def run_test_multiple_times(test_function: Callable, *args, **kwargs) -> List[An
     print(f"✅ Successful: {successful_runs}/{run_count}")
     print(f"❌ Failed: {run_count - successful_runs}/{run_count}")
     
-    return results
\ No newline at end of file
+    return results
+
+
+class ExtractionsTestCase(unittest.TestCase):
+    """
+    Unit test with a throwaway extractions/ directory.
+
+    stages.storage (brand_meta.json and every per-domain file) writes under
+    self.tmp_path for the duration of each test; tests put their SQLite
+    files (rate buckets, LLM cache) there too.
+    """
+
+    def setUp(self):
+        super().setUp()
+        from stages import storage
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp_path = Path(tmp.name)
+        patch = mock.patch.object(storage, "EXTRACTIONS_DIR", self.tmp_path)
+        patch.start()
+        self.addCleanup(patch.stop)
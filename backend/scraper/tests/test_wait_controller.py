@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Wait Time Controller Tests
+==========================
+
+WaitTimeController moving the page wait along WAIT_BUCKETS: up on name-only
+pages, down after a clean streak (unless the lower bucket is cooling down),
+and persisted per domain.
+
+Run:
+    python -m pytest scraper/tests/test_wait_controller.py
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from scraper.tests.test_utils import ExtractionsTestCase
+from stages import wait_controller
+from stages.storage import load_brand_meta
+from stages.wait_controller import WAIT_BUCKETS, WaitTimeController, load_saved_wait
+
+NAME_ONLY = "Name only, no price/images/description"
+
+
+def controller(**kwargs) -> WaitTimeController:
+    kwargs.setdefault("quiet", True)
+    return WaitTimeController(**kwargs)
+
+
+def record(wc: WaitTimeController, outcomes: str, wait_ms=None, error=NAME_ONLY, status_code=200):
+    """Record outcomes at the current (or given) wait: '+' success, '-' failure."""
+    for outcome in outcomes:
+        wc.record(wait_ms or wc.wait_ms, outcome == "+", None if outcome == "+" else error, status_code)
+
+
+class TestStepUp(unittest.TestCase):
+
+    def test_initial_wait_snapped_to_bucket(self):
+        self.assertEqual(controller(initial_wait=900).wait_ms, 800)
+        self.assertEqual(controller(initial_wait=10_000).wait_ms, WAIT_BUCKETS[-1])
+
+    def test_name_only_pages_step_up(self):
+        wc = controller(initial_wait=800)
+        record(wc, "++++-")
+        self.assertEqual(wc.wait_ms, 800)  # 5 samples, min_samples is 6
+        record(wc, "-")
+        self.assertEqual(wc.wait_ms, 1200)  # 2 of 6 failed > 15%
+        self.assertEqual(wc.stats["adjustments"], 1)
+
+    def test_no_name_counts_too(self):
+        wc = controller(initial_wait=800, min_samples=2)
+        record(wc, "--", error="No product name")
+        self.assertEqual(wc.wait_ms, 1200)
+
+    def test_failure_rate_below_threshold_holds(self):
+        wc = controller(initial_wait=800, success_streak=100)
+        record(wc, "+" * 19 + "-")  # 5%
+        self.assertEqual(wc.wait_ms, 800)
+
+    def test_other_failures_ignored(self):
+        wc = controller(initial_wait=800, min_samples=2)
+        record(wc, "----", status_code=429)
+        record(wc, "----", error="Timeout loading page")
+        self.assertEqual(wc.wait_ms, 800)
+        self.assertEqual(wc.stats["buckets"], {})
+
+    def test_capped_at_top_bucket(self):
+        wc = controller(initial_wait=WAIT_BUCKETS[-1], min_samples=1)
+        record(wc, "---")
+        self.assertEqual(wc.wait_ms, WAIT_BUCKETS[-1])
+
+    def test_stale_outcomes_do_not_move(self):
+        wc = controller(initial_wait=800, min_samples=1)
+        record(wc, "---", wait_ms=500)  # Started before the last adjustment
+        self.assertEqual(wc.wait_ms, 800)
+        self.assertEqual(wc.stats["buckets"][500]["samples"], 3)
+
+    def test_new_bucket_starts_clean(self):
+        wc = controller(initial_wait=800, min_samples=2)
+        record(wc, "-", wait_ms=1200)
+        record(wc, "--")
+        self.assertEqual(wc.wait_ms, 1200)
+        record(wc, "-")  # Only one sample in the fresh 1200 window
+        self.assertEqual(wc.wait_ms, 1200)
+
+
+class TestStepDown(unittest.TestCase):
+
+    def test_clean_streak_steps_down(self):
+        wc = controller(initial_wait=1200)
+        record(wc, "+" * 24)
+        self.assertEqual(wc.wait_ms, 1200)
+        record(wc, "+")
+        self.assertEqual(wc.wait_ms, 800)
+        self.assertEqual(wc.stats["streak"], 0)
+
+    def test_failure_resets_streak(self):
+        wc = controller(initial_wait=1200, min_samples=100)
+        record(wc, "+" * 20 + "-" + "+" * 20)
+        self.assertEqual(wc.wait_ms, 1200)
+
+    def test_floor_at_lowest_bucket(self):
+        wc = controller(initial_wait=WAIT_BUCKETS[0], success_streak=5)
+        record(wc, "+" * 10)
+        self.assertEqual(wc.wait_ms, WAIT_BUCKETS[0])
+
+
+class TestCooldown(unittest.TestCase):
+
+    def test_failed_bucket_not_retried_during_cooldown(self):
+        clock = [1000.0]
+        with mock.patch.object(wait_controller.time, "time", side_effect=lambda: clock[0]):
+            wc = controller(initial_wait=800, min_samples=2, success_streak=5, cooldown=60.0)
+            record(wc, "--")
+            self.assertEqual(wc.wait_ms, 1200)
+
+            clock[0] += 30
+            record(wc, "+" * 10)
+            self.assertEqual(wc.wait_ms, 1200)  # 800 failed 30s ago
+
+            clock[0] += 31
+            record(wc, "+")
+            self.assertEqual(wc.wait_ms, 800)
+
+    def test_untried_lower_bucket_has_no_cooldown(self):
+        wc = controller(initial_wait=1200, success_streak=5, cooldown=3600.0)
+        record(wc, "+" * 5)
+        self.assertEqual(wc.wait_ms, 800)
+
+
+class TestPersistence(ExtractionsTestCase):
+
+    def test_saved_per_domain(self):
+        wc = controller(initial_wait=800, min_samples=2)
+        record(wc, "--")
+        wc.save("shop.test")
+
+        self.assertEqual(load_brand_meta("shop.test")["products"]["wait_ms"], 1200)
+        self.assertEqual(load_saved_wait("shop.test"), 1200)
+        self.assertIsNone(load_saved_wait("other.test"))
+
+    def test_next_run_starts_from_saved_wait(self):
+        controller(initial_wait=3000).save("shop.test")
+        self.assertEqual(controller(initial_wait=load_saved_wait("shop.test")).wait_ms, 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,7 +19,7 @@ from playwright.sync_api import sync_playwright
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from llm_handler import LLMHandler
-from prompts import url_classification
+from lineage_batcher import classify_links, get_lineage_batcher
 
 # Thread-local storage for quiet mode
 _thread_local = threading.local()
@@ -30,12 +30,14 @@ from navigation.popup_selectors import (
     POPUP_IFRAME_SELECTORS,
     OVERLAY_REMOVAL_SELECTORS,
 )
+from navigation.popup_playbook import learn_cookies_sync, learn_popup_sync, popups_hidden_sync
 
 
-def _dismiss_popups_sync(page) -> int:
+def _dismiss_popups_sync(page, playbook=None) -> int:
     """
     Dismiss popups using direct selectors (sync version).
     Uses same selectors as navigation/llm_popup_dismiss.py for consistency.
+    What gets dismissed is recorded into `playbook` (PopupPlaybook) when given.
     """
     dismissed = 0
 
@@ -44,6 +46,7 @@ def _dismiss_popups_sync(page) -> int:
         try:
             btn = page.locator(sel).first
             if btn.count() > 0 and btn.is_visible():
+                learn_popup_sync(playbook, btn)
                 btn.click(timeout=2000)
                 page.wait_for_timeout(300)
                 _log(f"   [POPUP] Clicked: {sel}")
@@ -56,6 +59,7 @@ def _dismiss_popups_sync(page) -> int:
         try:
             iframe = page.locator(sel)
             if iframe.count() > 0 and iframe.is_visible():
+                learn_popup_sync(playbook, iframe.first)
                 page.evaluate(f"document.querySelector('{sel}')?.parentElement?.remove()")
                 _log(f"   [POPUP] Removed iframe: {sel}")
                 dismissed += 1
@@ -76,9 +80,13 @@ def _dismiss_popups_sync(page) -> int:
             if removed > 0:
                 _log(f"   [POPUP] Removed {removed} overlay elements: {selector}")
                 dismissed += removed
+                if playbook is not None:
+                    playbook.add_rule(selector)
         except:
             continue
 
+    if dismissed:
+        learn_cookies_sync(playbook, page)
     return dismissed
 
 
@@ -164,89 +172,235 @@ class URLExtractionResult:
             self.llm_usage["output_tokens"] += usage.get("output_tokens", 0)
 
 
-def _extract_links_from_current_state(page, page_url: str) -> List[Dict]:
-    """
-    Extract all links from current page state (after scrolling).
+# All links on the page with DOM lineage and carousel membership
+EXTRACT_LINKS_JS = """
+    () => {
+        const links = Array.from(document.querySelectorAll('a[href]'));
 
-    Returns:
-        List of dicts with: url, lineage, link_text, position_index, in_carousel
-    """
-    try:
-        # JavaScript to extract all links with their metadata
-        links_data = page.evaluate("""
-            () => {
-                const links = Array.from(document.querySelectorAll('a[href]'));
-
-                // Patterns that indicate carousel/slider containers
-                const carouselPatterns = [
-                    'slider', 'carousel', 'swiper', 'slick', 'glide', 'splide',
-                    'slideshow', 'marquee', 'ticker'
-                ];
-
-                // Check if element has a carousel ancestor (walk up to 15 levels)
-                function isInCarousel(element) {
-                    let current = element;
-                    for (let i = 0; i < 15 && current && current !== document.body; i++) {
-                        const tagName = (current.tagName || '').toLowerCase();
-                        const className = (typeof current.className === 'string' ? current.className : '').toLowerCase();
-
-                        for (const pattern of carouselPatterns) {
-                            if (tagName.includes(pattern) || className.includes(pattern)) {
-                                return true;
-                            }
-                        }
-                        current = current.parentElement;
+        // Patterns that indicate carousel/slider containers
+        const carouselPatterns = [
+            'slider', 'carousel', 'swiper', 'slick', 'glide', 'splide',
+            'slideshow', 'marquee', 'ticker'
+        ];
+
+        // Check if element has a carousel ancestor (walk up to 15 levels)
+        function isInCarousel(element) {
+            let current = element;
+            for (let i = 0; i < 15 && current && current !== document.body; i++) {
+                const tagName = (current.tagName || '').toLowerCase();
+                const className = (typeof current.className === 'string' ? current.className : '').toLowerCase();
+
+                for (const pattern of carouselPatterns) {
+                    if (tagName.includes(pattern) || className.includes(pattern)) {
+                        return true;
                     }
-                    return false;
                 }
+                current = current.parentElement;
+            }
+            return false;
+        }
 
-                // Function to get DOM lineage (3 generations)
-                function getLineage(element) {
-                    const parts = [];
-                    let current = element;
-
-                    for (let i = 0; i < 3 && current && current !== document.body; i++) {
-                        let identifier = current.tagName.toLowerCase();
-
-                        // Add classes (limit to 3 most relevant)
-                        if (current.className && typeof current.className === 'string') {
-                            const classes = current.className.split(' ')
-                                .filter(c => c && !c.includes(':'))  // Skip Tailwind responsive
-                                .slice(0, 3);
-                            if (classes.length > 0) {
-                                identifier += '.' + classes.join('.');
-                            }
-                        }
-
-                        parts.push(identifier);
-                        current = current.parentElement;
+        // Function to get DOM lineage (3 generations)
+        function getLineage(element) {
+            const parts = [];
+            let current = element;
+
+            for (let i = 0; i < 3 && current && current !== document.body; i++) {
+                let identifier = current.tagName.toLowerCase();
+
+                // Add classes (limit to 3 most relevant)
+                if (current.className && typeof current.className === 'string') {
+                    const classes = current.className.split(' ')
+                        .filter(c => c && !c.includes(':'))  // Skip Tailwind responsive
+                        .slice(0, 3);
+                    if (classes.length > 0) {
+                        identifier += '.' + classes.join('.');
                     }
-
-                    return parts.join(' > ');
                 }
 
-                const results = [];
+                parts.push(identifier);
+                current = current.parentElement;
+            }
 
-                links.forEach((link, index) => {
-                    const href = link.href;
+            return parts.join(' > ');
+        }
 
-                    // Skip invalid links
-                    if (!href || href.startsWith('javascript:') || href.startsWith('#') || href.startsWith('mailto:') || href.startsWith('tel:')) {
-                        return;
-                    }
+        const results = [];
 
-                    results.push({
-                        url: href,
-                        lineage: getLineage(link),
-                        link_text: (link.textContent || '').trim().substring(0, 100),
-                        position_index: index,
-                        in_carousel: isInCarousel(link)
-                    });
-                });
+        links.forEach((link, index) => {
+            const href = link.href;
 
-                return results;
+            // Skip invalid links
+            if (!href || href.startsWith('javascript:') || href.startsWith('#') || href.startsWith('mailto:') || href.startsWith('tel:')) {
+                return;
             }
-        """)
+
+            results.push({
+                url: href,
+                lineage: getLineage(link),
+                link_text: (link.textContent || '').trim().substring(0, 100),
+                position_index: index,
+                in_carousel: isInCarousel(link)
+            });
+        });
+
+        return results;
+    }
+"""
+
+
+_CAROUSEL_PATTERNS = ('slider', 'carousel', 'swiper', 'slick', 'glide', 'splide', 'slideshow', 'marquee', 'ticker')
+
+
+def _links_from_html(html: str, page_url: str) -> List[Dict]:
+    """
+    EXTRACT_LINKS_JS over raw HTML (no browser), for server-rendered pages.
+
+    Produces the same url/lineage/link_text/position_index/in_carousel dicts,
+    so lineage memory from browser-scrolled pages applies unchanged.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    def classes(tag) -> List[str]:
+        return [c for c in tag.get("class", []) if c and ':' not in c]
+
+    def lineage(tag) -> str:
+        parts = []
+        current = tag
+        for _ in range(3):
+            if current is None or current.name in (None, "body", "[document]"):
+                break
+            identifier = current.name
+            cls = classes(current)[:3]
+            if cls:
+                identifier += '.' + '.'.join(cls)
+            parts.append(identifier)
+            current = current.parent
+        return ' > '.join(parts)
+
+    def in_carousel(tag) -> bool:
+        current = tag
+        for _ in range(15):
+            if current is None or current.name in (None, "body", "[document]"):
+                return False
+            names = [current.name.lower()] + [c.lower() for c in current.get("class", [])]
+            if any(pattern in name for name in names for pattern in _CAROUSEL_PATTERNS):
+                return True
+            current = current.parent
+        return False
+
+    results = []
+    for index, link in enumerate(soup.select("a[href]")):
+        href = urljoin(page_url, link["href"].strip())
+        if href.startswith(('javascript:', '#', 'mailto:', 'tel:')):
+            continue
+        results.append({
+            "url": href,
+            "lineage": lineage(link),
+            "link_text": link.get_text().strip()[:100],
+            "position_index": index,
+            "in_carousel": in_carousel(link),
+        })
+    return results
+
+
+# Scroll settling: instead of fixed sleeps, wait until the page stops adding
+# content (no element insertions, no fetch/XHR in flight) for a quiet window.
+# The old fixed waits are kept as upper bounds. EXTRACTOR_SCROLL_SETTLE=0
+# restores the fixed waits (benchmark_scroll_settle.py compares both).
+SCROLL_SETTLE = os.environ.get('EXTRACTOR_SCROLL_SETTLE', '1') == '1'
+SETTLE_QUIET_MS = 500        # Quiet window after a scroll / click
+SETTLE_QUIET_LONG_MS = 1000  # Quiet window when the page already looked done
+
+# Installed as an init script (so fetch/XHR made during load are counted);
+# injected on demand if missing. window.__settle(quietMs, maxMs) resolves
+# with {settled, waited} once nothing changed for quietMs, or at maxMs.
+SETTLE_JS = """
+(() => {
+    if (window.__settle) return;
+    let pending = 0;
+    let lastChange = performance.now();
+    const bump = () => { lastChange = performance.now(); };
+
+    const origFetch = window.fetch;
+    if (origFetch) {
+        window.fetch = function (...args) {
+            pending++; bump();
+            return origFetch.apply(this, args).finally(() => { pending--; bump(); });
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function (...args) {
+        pending++; bump();
+        this.addEventListener('loadend', () => { pending--; bump(); }, { once: true });
+        return origSend.apply(this, args);
+    };
+
+    // Only element insertions count - text/attribute churn (timers, carousels) doesn't
+    const observe = () => new MutationObserver(mutations => {
+        for (const m of mutations) {
+            for (const node of m.addedNodes) {
+                if (node.nodeType === 1) { bump(); return; }
+            }
+        }
+    }).observe(document.documentElement, { childList: true, subtree: true });
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe);
+
+    window.__settle = (quietMs, maxMs) => new Promise(resolve => {
+        const start = performance.now();
+        const check = () => {
+            const now = performance.now();
+            if (now - start >= maxMs) return resolve({ settled: false, waited: now - start });
+            // Quiet must be measured from the call - lazy loads start after the scroll
+            if (pending <= 0 && now - Math.max(lastChange, start) >= quietMs) {
+                return resolve({ settled: true, waited: now - start });
+            }
+            setTimeout(check, 50);
+        };
+        check();
+    });
+})()
+"""
+
+_SETTLE_CALL = "([quietMs, maxMs]) => window.__settle ? window.__settle(quietMs, maxMs) : null"
+
+
+def _wait_for_settle(page, max_ms: int, quiet_ms: int = SETTLE_QUIET_MS, waits: Dict = None) -> float:
+    """
+    Wait until new content stops arriving, at most max_ms. Returns ms waited.
+
+    `waits` (discovery_info) accumulates settle_wait_ms / settle_budget_ms.
+    """
+    waited = max_ms
+    if not SCROLL_SETTLE:
+        page.wait_for_timeout(max_ms)
+    else:
+        try:
+            result = page.evaluate(_SETTLE_CALL, [quiet_ms, max_ms])
+            if result is None:
+                page.evaluate(SETTLE_JS)
+                result = page.evaluate(_SETTLE_CALL, [quiet_ms, max_ms])
+            waited = result["waited"]
+        except Exception:
+            page.wait_for_timeout(max_ms)
+    if waits is not None:
+        waits["settle_wait_ms"] = waits.get("settle_wait_ms", 0) + waited
+        waits["settle_budget_ms"] = waits.get("settle_budget_ms", 0) + max_ms
+    return waited
+
+
+def _extract_links_from_current_state(page, page_url: str) -> List[Dict]:
+    """
+    Extract all links from current page state (after scrolling).
+
+    Returns:
+        List of dicts with: url, lineage, link_text, position_index, in_carousel
+    """
+    try:
+        links_data = page.evaluate(EXTRACT_LINKS_JS)
 
         return links_data
 
@@ -264,6 +418,12 @@ def _detect_pagination_with_cached_pattern(page, page_url: str, cached_pattern:
 
     Returns same structure as _detect_post_scroll_pagination.
     """
+    bottom_links = _extract_bottom_page_links(page, page_url) if cached_pattern.get("url_pattern") else []
+    return _pagination_from_cached_pattern(bottom_links, page_url, cached_pattern)
+
+
+def _pagination_from_cached_pattern(bottom_links: List[str], page_url: str, cached_pattern: Dict) -> Dict[str, Any]:
+    """Cached-pattern pagination detection on already-extracted bottom links."""
     import re
     url_pattern = cached_pattern.get("url_pattern")
     if not url_pattern:
@@ -280,7 +440,6 @@ def _detect_pagination_with_cached_pattern(page, page_url: str, cached_pattern:
     }
 
     try:
-        bottom_links = _extract_bottom_page_links(page, page_url)
         if not bottom_links:
             return result
 
@@ -333,7 +492,9 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
         "initial_load_count": 0,
         "after_scroll_count": 0,
         "after_load_more_count": 0,
-        "pagination_detected": None
+        "pagination_detected": None,
+        "settle_wait_ms": 0,    # Time actually spent waiting for content
+        "settle_budget_ms": 0,  # What the fixed waits would have spent
     }
 
     with sync_playwright() as p:
@@ -344,18 +505,23 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
             ignore_https_errors=True,
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         )
+        context.add_init_script(SETTLE_JS)
+        playbook = brand_instance.popup_playbook if brand_instance else None
+        if playbook:
+            playbook.install_sync(context)
         page = context.new_page()
 
         try:
             # Navigate to page
             _log(f"   🌐 Loading: {page_url}")
             page.goto(page_url, wait_until="domcontentloaded", timeout=60000)  # 60s timeout for slow connections
-            page.wait_for_timeout(3000)  # Wait for async popups to load
+            _wait_for_settle(page, 3000, waits=discovery_info)  # Wait for async popups to load
 
-            # Dismiss popups that might block interactions
-            _dismiss_popups_sync(page)
-            page.wait_for_timeout(1000)  # Let popup animation complete
-            _dismiss_popups_sync(page)  # Try again in case more popups appeared
+            # Dismiss popups that might block interactions (unless the playbook hid all of them)
+            if not popups_hidden_sync(page):
+                _dismiss_popups_sync(page, playbook)
+                _wait_for_settle(page, 1000, quiet_ms=300, waits=discovery_info)  # Let popup animation complete
+                _dismiss_popups_sync(page, playbook)  # Try again in case more popups appeared
 
             # Extract initial links
             initial_links = _extract_links_from_current_state(page, page_url)
@@ -388,7 +554,7 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
                 scroll_count += 1
 
                 page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(2000)
+                _wait_for_settle(page, 2000, waits=discovery_info)
 
                 new_height = page.evaluate("document.body.scrollHeight")
 
@@ -396,7 +562,7 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
                     no_change_count += 1
                     if no_change_count >= max_no_change:
                         break
-                    page.wait_for_timeout(3000)
+                    _wait_for_settle(page, 3000, quiet_ms=SETTLE_QUIET_LONG_MS, waits=discovery_info)
                 else:
                     no_change_count = 0
 
@@ -418,7 +584,7 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
                 while click_count < 20:
                     current_height = page.evaluate("document.body.scrollHeight")
                     page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    page.wait_for_timeout(3000)
+                    _wait_for_settle(page, 3000, waits=discovery_info)
 
                     new_height = page.evaluate("document.body.scrollHeight")
 
@@ -437,7 +603,7 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
                         no_click_attempts += 1
                         if no_click_attempts >= 2:
                             break
-                        page.wait_for_timeout(3000)
+                        _wait_for_settle(page, 3000, quiet_ms=SETTLE_QUIET_LONG_MS, waits=discovery_info)
 
             # Extract final links after all loading
             final_links = _extract_links_from_current_state(page, page_url)
@@ -466,6 +632,15 @@ def _scroll_and_extract_links(page_url: str, brand_instance=None, skip_paginatio
     }
 
 
+# URL path markers of product pages (fallback classification, stale lineage memory)
+PRODUCT_URL_PATTERNS = ('/products/', '/product/', '/p/', '/item/', '/shop/')
+
+
+def _looks_like_product_url(url: str) -> bool:
+    url = url.lower()
+    return any(pattern in url for pattern in PRODUCT_URL_PATTERNS)
+
+
 def classify_product_links(
     links: List[Dict],
     page_url: str,
@@ -514,6 +689,20 @@ def classify_product_links(
         else:
             unknown_lineage_links.extend(group_links)
 
+    # Saved decisions (lineage_memory.py) no longer match the site when they leave a page without
+    # product links while rejecting links that look like products. An empty category expires nothing.
+    lineage_memory = getattr(brand_instance, 'lineage_memory', None)
+    if lineage_memory is not None:
+        lineage_memory.seen("url", lineage_groups)
+        if not known_approved_links and not unknown_lineage_links:
+            mismatched = [lineage for lineage, group_links in lineage_groups.items()
+                          if any(_looks_like_product_url(link.get("url", "")) for link in group_links)]
+            expired = lineage_memory.expire("url", mismatched, brand_instance)
+            if expired:
+                _log(f"   ♻️  {len(expired)} remembered lineages rejected product-like links - re-classifying")
+                known_rejected_links = [link for link in known_rejected_links if link.get("lineage", "unknown") not in expired]
+                unknown_lineage_links = [link for lineage in expired for link in lineage_groups[lineage]]
+
     _log(f"   ✅ Pre-approved: {len(known_approved_links)} links ({len([l for l in lineage_groups if l in approved_lineages])} lineages)")
     _log(f"   ❌ Pre-rejected: {len(known_rejected_links)} links ({len([l for l in lineage_groups if l in rejected_lineages])} lineages)")
     _log(f"   ❓ Unknown: {len(unknown_lineage_links)} links need classification")
@@ -549,32 +738,28 @@ def classify_product_links(
 
         _log(f"   🧠 Sending {len(sampled_links)} sample links to LLM for classification...")
 
-        # Call LLM
-        llm_handler = LLMHandler()
-        prompt = url_classification.get_prompt(page_url, category_name, sampled_links)
-        response = llm_handler.call(
-            prompt,
-            expected_format="json",
-            response_model=url_classification.get_response_model(),
-            operation="url_classification",
-        )
+        # Concurrent categories of the same brand share one batched LLM call
+        if brand_instance:
+            classification = get_lineage_batcher(brand_instance).classify(page_url, category_name, sampled_links)
+        else:
+            classification = classify_links([
+                {"page_url": page_url, "category_name": category_name, "links": sampled_links}
+            ])
 
-        if response.get("success"):
-            data = response.get("data", {})
-            product_indices = set(data.get("product_link_indices", []))
-            confidence = data.get("confidence", "Medium")
-            analysis = data.get("analysis", "")
+        if classification is not None:
+            decisions = classification["decisions"]
+            newly_approved_lineages = {lineage for lineage, is_product in decisions.items() if is_product}
+            newly_rejected_lineages = set(decisions) - newly_approved_lineages
 
-            _log(f"   📋 LLM classified {len(product_indices)} of {len(sampled_links)} as products (confidence: {confidence})")
-            _log(f"   📝 Analysis: {analysis[:200]}...")
+            _log(f"   📋 LLM classified {len(newly_approved_lineages)} of {len(decisions)} lineages as products "
+                 f"(confidence: {classification['confidence']})")
+            if classification.get("batched", 1) > 1:
+                _log(f"   🧺 Batched with {classification['batched'] - 1} other categories")
+            _log(f"   📝 Analysis: {classification['analysis'][:200]}...")
 
-            # Map indices back to lineages
-            for i, link in enumerate(sampled_links):
-                lineage = link.get("lineage", "unknown")
-                if i in product_indices:
-                    newly_approved_lineages.add(lineage)
-                else:
-                    newly_rejected_lineages.add(lineage)
+            if lineage_memory is not None:
+                lineage_memory.record("url", newly_approved_lineages, newly_rejected_lineages,
+                                      classification["confidence"])
 
             # Apply classification to ALL links with matching lineages
             for link in unknown_lineage_links:
@@ -582,13 +767,13 @@ def classify_product_links(
                 if lineage in newly_approved_lineages:
                     newly_approved_links.append(link)
         else:
-            _log(f"   ❌ LLM classification failed: {response.get('error', 'Unknown error')}")
+            _log("   ❌ LLM classification failed")
             # Fallback: use URL heuristics
             _log(f"   🔄 Using URL heuristics as fallback...")
             for link in unknown_lineage_links:
                 url = link.get("url", "")
                 # Common product URL patterns
-                if any(pattern in url.lower() for pattern in ['/products/', '/product/', '/p/', '/item/', '/shop/']):
+                if _looks_like_product_url(url):
                     newly_approved_links.append(link)
                     newly_approved_lineages.add(link.get("lineage", "unknown"))
 
@@ -651,6 +836,63 @@ def classify_product_links(
     }
 
 
+def _to_product_urls(
+    product_links: List[Dict],
+    discovery_info: Dict,
+    category_url: str,
+    category_name: str,
+    page_num: int
+) -> List[ProductURL]:
+    """Convert classified product links to ProductURL objects."""
+    source_page = f"page_{page_num}"
+    discovery_method = "scroll" if discovery_info.get("after_scroll_count", 0) > discovery_info.get("initial_load_count", 0) else "initial_load"
+    return [
+        ProductURL(
+            url=link.get("url", ""),
+            source_page=source_page,
+            category_url=category_url,
+            category_name=category_name,
+            lineage=link.get("lineage", "unknown"),
+            discovery_method=discovery_method,
+            link_text=link.get("link_text", ""),
+            position_index=link.get("position_index", 0)
+        )
+        for link in product_links
+    ]
+
+
+def _should_continue_sequential(pagination_result: Dict) -> bool:
+    """
+    Whether to keep walking pages one at a time past the generated ones.
+
+    Handles:
+    - next_page_url only (no max detected) - classic next/prev button case
+    - pagination_type == "next_button" - LLM explicitly identified next button
+    - max_page_detected <= 2 - likely only seeing adjacent page, not full numbered pagination
+    """
+    max_page = pagination_result.get("max_page_detected")
+    pagination_type = pagination_result.get("pagination_type", "page_links")
+    return bool(pagination_result.get("url_pattern")) and (
+        (not max_page and pagination_result.get("next_page_url")) or
+        pagination_type == "next_button" or
+        (max_page is not None and max_page <= 2)
+    )
+
+
+def _sequential_page_url(base_url: str, url_pattern: str, page_num: int) -> str:
+    """URL of page `page_num` of a category, from its pagination url_pattern."""
+    if "?page=X" in url_pattern or "?page=" in url_pattern:
+        return base_url.split("?")[0] + f"?page={page_num}"
+    elif "/page/X/" in url_pattern or "/page/" in url_pattern:
+        return base_url.rstrip("/") + f"/page/{page_num}/"
+    elif "/page/X" in url_pattern:
+        return base_url.rstrip("/") + f"/page/{page_num}"
+    elif "?p=X" in url_pattern or "?p=" in url_pattern:
+        return base_url.split("?")[0] + f"?p={page_num}"
+    else:
+        return base_url + url_pattern.replace("X", str(page_num))
+
+
 def _extract_urls_from_single_page(
     page_url: str,
     category_url: str,
@@ -678,22 +920,7 @@ def _extract_urls_from_single_page(
         product_links = classification.get("product_links", [])
         stats = classification.get("stats", {})
 
-        # Convert to ProductURL objects
-        source_page = f"page_{page_num}"
-        product_urls = []
-
-        for link in product_links:
-            product_url = ProductURL(
-                url=link.get("url", ""),
-                source_page=source_page,
-                category_url=category_url,
-                category_name=category_name,
-                lineage=link.get("lineage", "unknown"),
-                discovery_method="scroll" if discovery_info.get("after_scroll_count", 0) > discovery_info.get("initial_load_count", 0) else "initial_load",
-                link_text=link.get("link_text", ""),
-                position_index=link.get("position_index", 0)
-            )
-            product_urls.append(product_url)
+        product_urls = _to_product_urls(product_links, discovery_info, category_url, category_name, page_num)
 
         extraction_time = time.time() - start_time
 
@@ -794,79 +1021,56 @@ def extract_multi_page_urls(
                 })
 
     # Sequential discovery: continue extracting pages beyond what we already processed.
-    # This handles:
-    # - next_page_url only (no max detected) - classic next/prev button case
-    # - pagination_type == "next_button" - LLM explicitly identified next button
-    # - max_page_detected <= 2 - likely only seeing adjacent page, not full numbered pagination
-    max_page = pagination_result.get("max_page_detected")
-    pagination_type = pagination_result.get("pagination_type", "page_links")
-    should_continue_sequential = (
-        (not max_page and pagination_result.get("next_page_url")) or
-        pagination_type == "next_button" or
-        (max_page is not None and max_page <= 2)
-    )
-    if should_continue_sequential and pagination_result.get("url_pattern"):
+    if _should_continue_sequential(pagination_result):
         url_pattern = pagination_result.get("url_pattern")
-        if url_pattern:
-            import re
-            # Find the highest page number we just processed
-            current_page_num = 2  # We started at page 2
-            for stat in per_page_stats:
-                if stat.get("page_num", 0) > current_page_num:
-                    current_page_num = stat["page_num"]
-
-            # Continue sequentially: load next page, extract URLs, check ONLY that page for more pages
-            consecutive_empty = 0
-            safety_limit = current_page_num + 50
-            current_page_num += 1
+        # Find the highest page number we just processed
+        current_page_num = 2  # We started at page 2
+        for stat in per_page_stats:
+            if stat.get("page_num", 0) > current_page_num:
+                current_page_num = stat["page_num"]
 
-            while current_page_num <= safety_limit and consecutive_empty < 3:
-                # Generate URL for this page
-                if "?page=X" in url_pattern or "?page=" in url_pattern:
-                    next_url = base_url.split("?")[0] + f"?page={current_page_num}"
-                elif "/page/X/" in url_pattern or "/page/" in url_pattern:
-                    next_url = base_url.rstrip("/") + f"/page/{current_page_num}/"
-                elif "/page/X" in url_pattern:
-                    next_url = base_url.rstrip("/") + f"/page/{current_page_num}"
-                elif "?p=X" in url_pattern or "?p=" in url_pattern:
-                    next_url = base_url.split("?")[0] + f"?p={current_page_num}"
-                else:
-                    next_url = base_url + url_pattern.replace("X", str(current_page_num))
+        # Continue sequentially: load next page, extract URLs, check ONLY that page for more pages
+        consecutive_empty = 0
+        safety_limit = current_page_num + 50
+        current_page_num += 1
 
-                _log(f"   🔄 Sequential discovery: page {current_page_num} ({next_url})")
+        while current_page_num <= safety_limit and consecutive_empty < 3:
+            next_url = _sequential_page_url(base_url, url_pattern, current_page_num)
 
-                try:
-                    page_result = _extract_urls_from_single_page(
-                        next_url, base_url, category_name, current_page_num, brand_instance, True
-                    )
-                    urls_found = page_result.get("product_urls", [])
-
-                    if urls_found:
-                        all_urls.extend(urls_found)
-                        consecutive_empty = 0
-                        _log(f"   ✅ Page {current_page_num}: {len(urls_found)} product URLs")
-                    else:
-                        consecutive_empty += 1
-                        _log(f"   📄 Page {current_page_num}: 0 product URLs (empty #{consecutive_empty})")
+            _log(f"   🔄 Sequential discovery: page {current_page_num} ({next_url})")
 
-                    per_page_stats.append({
-                        "page_num": current_page_num,
-                        "url": next_url,
-                        "urls_found": len(urls_found),
-                        "extraction_time": page_result.get("extraction_time", 0)
-                    })
+            try:
+                page_result = _extract_urls_from_single_page(
+                    next_url, base_url, category_name, current_page_num, brand_instance, True
+                )
+                urls_found = page_result.get("product_urls", [])
 
-                except Exception as e:
+                if urls_found:
+                    all_urls.extend(urls_found)
+                    consecutive_empty = 0
+                    _log(f"   ✅ Page {current_page_num}: {len(urls_found)} product URLs")
+                else:
                     consecutive_empty += 1
-                    _log(f"   ❌ Page {current_page_num} failed: {e}")
-                    per_page_stats.append({
-                        "page_num": current_page_num,
-                        "url": next_url,
-                        "urls_found": 0,
-                        "error": str(e)
-                    })
+                    _log(f"   📄 Page {current_page_num}: 0 product URLs (empty #{consecutive_empty})")
+
+                per_page_stats.append({
+                    "page_num": current_page_num,
+                    "url": next_url,
+                    "urls_found": len(urls_found),
+                    "extraction_time": page_result.get("extraction_time", 0)
+                })
+
+            except Exception as e:
+                consecutive_empty += 1
+                _log(f"   ❌ Page {current_page_num} failed: {e}")
+                per_page_stats.append({
+                    "page_num": current_page_num,
+                    "url": next_url,
+                    "urls_found": 0,
+                    "error": str(e)
+                })
 
-                current_page_num += 1
+            current_page_num += 1
 
     total_time = time.time() - start_time
 
@@ -883,6 +1087,29 @@ def extract_multi_page_urls(
     }
 
 
+def _cache_pagination_pattern(brand_instance, pagination_detected: Dict):
+    """Cache a detected pagination pattern on the brand for cross-category reuse."""
+    if brand_instance and pagination_detected.get("url_pattern"):
+        with brand_instance._pagination_lock:
+            if not brand_instance.pagination_pattern:
+                brand_instance.pagination_pattern = {
+                    "url_pattern": pagination_detected["url_pattern"],
+                    "pagination_type": pagination_detected.get("pagination_type", "page_links"),
+                }
+                _log(f"   💾 Cached pagination pattern: {brand_instance.pagination_pattern['url_pattern']}")
+
+
+def _dedupe_product_urls(product_urls: List[ProductURL]) -> List[ProductURL]:
+    """Drop repeated URLs, keeping the first occurrence."""
+    seen = set()
+    unique_urls = []
+    for url in product_urls:
+        if url.url not in seen:
+            seen.add(url.url)
+            unique_urls.append(url)
+    return unique_urls
+
+
 def extract_urls_from_category(
     category_url: str,
     brand_instance=None,
@@ -934,15 +1161,7 @@ def extract_urls_from_category(
         if pagination_detected and pagination_detected.get("pagination_found"):
             _log(f"\n   📖 Pagination detected, extracting additional pages...")
 
-            # Cache pagination pattern on brand for cross-category reuse
-            if brand_instance and pagination_detected.get("url_pattern"):
-                with brand_instance._pagination_lock:
-                    if not brand_instance.pagination_pattern:
-                        brand_instance.pagination_pattern = {
-                            "url_pattern": pagination_detected["url_pattern"],
-                            "pagination_type": pagination_detected.get("pagination_type", "page_links"),
-                        }
-                        _log(f"   💾 Cached pagination pattern: {brand_instance.pagination_pattern['url_pattern']}")
+            _cache_pagination_pattern(brand_instance, pagination_detected)
 
             multi_result = extract_multi_page_urls(
                 category_url, category_name, brand_instance, pagination_detected
@@ -952,14 +1171,7 @@ def extract_urls_from_category(
             result.product_urls.extend(additional_urls)
             result.pages_processed = 1 + multi_result.get("pages_extracted", 0)
 
-        # Deduplicate URLs
-        seen = set()
-        unique_urls = []
-        for url in result.product_urls:
-            if url.url not in seen:
-                seen.add(url.url)
-                unique_urls.append(url)
-        result.product_urls = unique_urls
+        result.product_urls = _dedupe_product_urls(result.product_urls)
 
         result.extraction_time = time.time() - start_time
 
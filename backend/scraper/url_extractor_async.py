@@ -0,0 +1,741 @@
+"""
+Async URL Extractor - Stage 2 on a shared browser pool.
+
+THE PROBLEM:
+    url_extractor._scroll_and_extract_links starts a new sync_playwright()
+    Chromium for every category page (paginated pages included), inside
+    ThreadPoolExecutor workers:
+    - 100 categories × 3 pages = 300 browser launches at 1-3s each
+    - Each worker thread owns a whole Chromium while it scrolls
+    - Cookies/consent state are lost between pages, so every page
+      re-dismisses the same popups
+
+THE SOLUTION:
+    Run stage 2 as coroutines on a BrowserPool (prod_page_v2/browser_pool.py):
+
+        categories (coroutines) ──► acquire() ──► page on a pooled browser
+                                                  (context reused → cookies kept)
+
+    - Browsers are launched once per run, pages are opened per category page
+    - A page is held only while loading/scrolling - link classification and
+      pagination analysis (LLM calls) run in a worker thread after release
+    - Paginated pages of a category are gathered concurrently; the pool
+      size is the concurrency limit. With a known url_pattern but no last
+      page, pages are fetched in waves until one adds nothing new
+    - Server-rendered categories skip the browser for pages 2+ (plain HTTP +
+      _links_from_html, same link/lineage format). HTTP fetches of a host are
+      bounded to HTTP_CONCURRENCY at once and paced by an AdaptiveRateLimiter
+      on the host's shared token bucket (the one stage 3 uses), starting
+      from the rate remembered for the domain
+
+    Same scrolling/load-more/pagination logic and result types as
+    url_extractor (URLExtractionResult, ProductURL). The modal bypass engine
+    is sync-only, so load-more clicks here rely on popup dismissal alone.
+
+USAGE:
+    pool = BrowserPool(size=4, init_scripts=[SETTLE_JS])
+    await pool.start()
+    result = await extract_urls_from_category_async(url, pool.acquire, brand)
+    await pool.shutdown()
+
+    `acquire` is any callable returning an async context manager that yields
+    a Playwright page - streaming wraps pool.acquire with a governor slot.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+import url_extractor
+from url_extractor import (
+    _thread_local,
+    _log,
+    EXTRACT_LINKS_JS,
+    SETTLE_JS,
+    SETTLE_QUIET_MS,
+    SETTLE_QUIET_LONG_MS,
+    _SETTLE_CALL,
+    POPUP_CLOSE_SELECTORS,
+    POPUP_IFRAME_SELECTORS,
+    OVERLAY_REMOVAL_SELECTORS,
+    URLExtractionResult,
+    classify_product_links,
+    _cache_pagination_pattern,
+    _dedupe_product_urls,
+    _links_from_html,
+    _pagination_from_cached_pattern,
+    _sequential_page_url,
+    _should_continue_sequential,
+    _to_product_urls,
+)
+from navigation.popup_playbook import learn_cookies, learn_popup, popups_hidden
+from page_extractor import (
+    BOTTOM_LINKS_JS,
+    LOAD_MORE_SELECTORS,
+    PAGINATION_TRIGGER_SELECTORS,
+    extract_category_name,
+    _detect_pagination_from_links,
+    _generate_page_urls,
+    _same_domain_links,
+)
+
+
+# Pages fetched at once while the last page number is unknown
+PAGINATION_WAVE = 4
+
+# Share of page 1's product URLs its raw HTML must contain to skip the browser
+HTTP_COVERAGE = 0.8
+
+# HTTP page fetches in flight per host (the browser path is bounded by the pool)
+HTTP_CONCURRENCY = PAGINATION_WAVE
+
+# Starting rate of a host's HTTP fetches when none is remembered (req/s)
+HTTP_DEFAULT_RATE = 5.0
+
+HTTP_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+async def _to_thread(func, *args):
+    """Run blocking work (LLM calls) in a worker thread, keeping quiet mode."""
+    quiet = getattr(_thread_local, 'quiet', False)
+
+    def call():
+        _thread_local.quiet = quiet
+        return func(*args)
+
+    return await asyncio.to_thread(call)
+
+
+async def _wait_for_settle(page, max_ms: int, quiet_ms: int = SETTLE_QUIET_MS, waits: Dict = None) -> float:
+    """Async url_extractor._wait_for_settle: wait for new content to stop, at most max_ms."""
+    waited = max_ms
+    if not url_extractor.SCROLL_SETTLE:
+        await page.wait_for_timeout(max_ms)
+    else:
+        try:
+            result = await page.evaluate(_SETTLE_CALL, [quiet_ms, max_ms])
+            if result is None:
+                await page.evaluate(SETTLE_JS)
+                result = await page.evaluate(_SETTLE_CALL, [quiet_ms, max_ms])
+            waited = result["waited"]
+        except Exception:
+            await page.wait_for_timeout(max_ms)
+    if waits is not None:
+        waits["settle_wait_ms"] = waits.get("settle_wait_ms", 0) + waited
+        waits["settle_budget_ms"] = waits.get("settle_budget_ms", 0) + max_ms
+    return waited
+
+
+async def _dismiss_popups(page, playbook=None) -> int:
+    """Dismiss popups using direct selectors (async version of _dismiss_popups_sync)."""
+    dismissed = 0
+
+    for sel in POPUP_CLOSE_SELECTORS:
+        try:
+            btn = page.locator(sel).first
+            if await btn.count() > 0 and await btn.is_visible():
+                await learn_popup(playbook, btn)
+                await btn.click(timeout=2000)
+                await page.wait_for_timeout(300)
+                _log(f"   [POPUP] Clicked: {sel}")
+                dismissed += 1
+        except Exception:
+            continue
+
+    for sel in POPUP_IFRAME_SELECTORS:
+        try:
+            iframe = page.locator(sel)
+            if await iframe.count() > 0 and await iframe.is_visible():
+                await learn_popup(playbook, iframe.first)
+                await page.evaluate("(sel) => document.querySelector(sel)?.parentElement?.remove()", sel)
+                _log(f"   [POPUP] Removed iframe: {sel}")
+                dismissed += 1
+        except Exception:
+            continue
+
+    for selector in OVERLAY_REMOVAL_SELECTORS:
+        try:
+            removed = await page.evaluate("""
+                (selector) => {
+                    const els = document.querySelectorAll(selector);
+                    els.forEach(el => el.remove());
+                    return els.length;
+                }
+            """, selector)
+            if removed > 0:
+                _log(f"   [POPUP] Removed {removed} overlay elements: {selector}")
+                dismissed += removed
+                if playbook is not None:
+                    playbook.add_rule(selector)
+        except Exception:
+            continue
+
+    if dismissed:
+        await learn_cookies(playbook, page)
+    return dismissed
+
+
+async def _extract_links(page) -> List[Dict]:
+    """All links in the current page state (see url_extractor.EXTRACT_LINKS_JS)."""
+    try:
+        return await page.evaluate(EXTRACT_LINKS_JS)
+    except Exception as e:
+        _log(f"   ❌ Error extracting links: {e}")
+        return []
+
+
+async def _extract_bottom_links(page, page_url: str) -> List[str]:
+    """Same-domain links from the bottom 30% of the page."""
+    try:
+        return _same_domain_links(await page.evaluate(BOTTOM_LINKS_JS), page_url)
+    except Exception as e:
+        _log(f"   ⚠️  Error extracting bottom links: {e}")
+        return []
+
+
+async def _detect_pagination_element(page) -> Optional[str]:
+    """First visible pagination/infinite-scroll element selector, or None."""
+    for selector in PAGINATION_TRIGGER_SELECTORS:
+        try:
+            elements = page.locator(selector)
+            if await elements.count() > 0 and await elements.last.is_visible():
+                return selector
+        except Exception:
+            continue
+    return None
+
+
+async def _scroll_using_pagination_element(page, pagination_selector: str, waits: Dict = None):
+    """Keep scrolling to the pagination element until it stops moving."""
+    try:
+        scroll_count = 0
+        last_pagination_position = None
+        stable_count = 0
+        max_stable_attempts = 2
+
+        _log(f"   🎯 Using pagination element as scroll target: {pagination_selector}")
+
+        while scroll_count <= 50:
+            scroll_count += 1
+
+            pagination_element = page.locator(pagination_selector).last
+            if not await pagination_element.is_visible():
+                _log(f"   ❌ Pagination element no longer visible after {scroll_count} scrolls")
+                break
+
+            box = await pagination_element.bounding_box()
+            if not box:
+                _log(f"   ❌ Cannot get pagination element position after {scroll_count} scrolls")
+                break
+
+            current_pagination_y = box['y'] + box['height']
+            if last_pagination_position is not None:
+                if abs(current_pagination_y - last_pagination_position) < 10:
+                    stable_count += 1
+                    if stable_count >= max_stable_attempts:
+                        _log(f"   ✅ Pagination element stopped moving after {scroll_count} scrolls")
+                        break
+                    # Scroll up to re-trigger lazy loading instead of just waiting
+                    await page.evaluate("window.scrollBy(0, -500)")
+                    await page.wait_for_timeout(500)
+                else:
+                    stable_count = 0
+
+            await pagination_element.scroll_into_view_if_needed()
+            await _wait_for_settle(page, 2000, waits=waits)  # Wait for content to load and render
+            last_pagination_position = current_pagination_y
+
+    except Exception as e:
+        _log(f"   ❌ Error in pagination scrolling: {e}")
+
+
+async def _click_load_more_button(page, selector: str) -> bool:
+    """Click the load more button if it is still there and enabled."""
+    try:
+        button = page.locator(selector)
+        if not await button.count() or not await button.is_visible():
+            _log(f"   ⚠️  Load more button no longer visible: {selector}")
+            return False
+        if await button.is_disabled():
+            _log(f"   ⚠️  Load more button is disabled: {selector}")
+            return False
+        await button.click(timeout=5000)
+        _log("   ✅ Load more button clicked successfully")
+        return True
+    except Exception as e:
+        _log(f"   ❌ Failed to click load more button: {e}")
+        return False
+
+
+async def _handle_load_more_button(page, brand_instance) -> bool:
+    """
+    Detect (first time) or click (stored selector) the load more button.
+
+    Shares the brand's load-more state with the sync path
+    (page_extractor._handle_load_more_button).
+    """
+    if not brand_instance or brand_instance.load_more_detected is False:
+        return False
+
+    if brand_instance.load_more_detected:
+        return await _click_load_more_button(page, brand_instance.load_more_button_selector)
+
+    _log("   🔍 First-time load more detection...")
+    detected_selector = None
+    for selector in LOAD_MORE_SELECTORS:
+        try:
+            elements = page.locator(selector)
+            if await elements.count() > 0 and await elements.first.is_visible():
+                detected_selector = selector
+                _log(f"   ✅ Load more button found: {selector}")
+                break
+        except Exception:
+            continue
+
+    if not detected_selector:
+        brand_instance.mark_no_load_more()
+        return False
+
+    if await _click_load_more_button(page, detected_selector):
+        if brand_instance.load_more_detected is None:
+            brand_instance.save_load_more_info(detected_selector, {"modals_detected": 0})
+        return True
+
+    if brand_instance.load_more_detected is None:
+        _log("   ⚠️  Load more button detection failed - selector matches but not clickable")
+        brand_instance.mark_no_load_more()
+    return False
+
+
+async def _scroll_and_extract_links(
+    acquire: Callable,
+    page_url: str,
+    brand_instance=None,
+    skip_pagination_detection: bool = False
+) -> Dict[str, Any]:
+    """
+    Scroll page fully and extract all links (async port of url_extractor's).
+
+    The page is released before pagination analysis, which may call the LLM.
+
+    Returns:
+        Dict with: links, discovery_info
+    """
+    discovery_info = {
+        "initial_load_count": 0,
+        "after_scroll_count": 0,
+        "after_load_more_count": 0,
+        "pagination_detected": None,
+        "settle_wait_ms": 0,
+        "settle_budget_ms": 0,
+    }
+    bottom_links: List[str] = []
+
+    async with acquire() as page:
+        _log(f"   🌐 Loading: {page_url}")
+        await page.goto(page_url, wait_until="domcontentloaded", timeout=60000)
+        await _wait_for_settle(page, 3000, waits=discovery_info)  # Wait for async popups to load
+
+        # Playbook installed on the context: known popups never rendered - dismiss (and learn) any others
+        if not await popups_hidden(page):
+            playbook = brand_instance.popup_playbook if brand_instance else None
+            await _dismiss_popups(page, playbook)
+            await _wait_for_settle(page, 1000, quiet_ms=300, waits=discovery_info)  # Let popup animation complete
+            await _dismiss_popups(page, playbook)
+
+        initial_links = await _extract_links(page)
+        discovery_info["initial_load_count"] = len(initial_links)
+        _log(f"   📊 Initial load: {len(initial_links)} links found")
+
+        pagination_element = await _detect_pagination_element(page)
+        if pagination_element:
+            _log(f"   🎯 Pagination element detected: {pagination_element}")
+            await _scroll_using_pagination_element(page, pagination_element, discovery_info)
+
+        # Height-based scrolling
+        no_change_count = 0
+        max_no_change = 1 if brand_instance and brand_instance.load_more_loading_mechanism else 2
+        while True:
+            current_height = await page.evaluate("document.body.scrollHeight")
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await _wait_for_settle(page, 2000, waits=discovery_info)
+            new_height = await page.evaluate("document.body.scrollHeight")
+
+            if new_height == current_height:
+                no_change_count += 1
+                if no_change_count >= max_no_change:
+                    break
+                await _wait_for_settle(page, 3000, quiet_ms=SETTLE_QUIET_LONG_MS, waits=discovery_info)
+            else:
+                no_change_count = 0
+
+        after_scroll_links = await _extract_links(page)
+        discovery_info["after_scroll_count"] = len(after_scroll_links)
+        _log(f"   📊 After scrolling: {len(after_scroll_links)} links found")
+
+        # Load more button handling
+        if await _handle_load_more_button(page, brand_instance):
+            _log("   🎯 Load more button found, chasing until exhausted...")
+            click_count = 1
+            no_click_attempts = 0
+            no_height_change = 0
+
+            while click_count < 20:
+                current_height = await page.evaluate("document.body.scrollHeight")
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await _wait_for_settle(page, 3000, waits=discovery_info)
+                new_height = await page.evaluate("document.body.scrollHeight")
+
+                if new_height == current_height:
+                    no_height_change += 1
+                    if no_height_change >= 2:
+                        break
+                else:
+                    no_height_change = 0
+
+                if await _handle_load_more_button(page, brand_instance):
+                    click_count += 1
+                    no_click_attempts = 0
+                else:
+                    no_click_attempts += 1
+                    if no_click_attempts >= 2:
+                        break
+                    await _wait_for_settle(page, 3000, quiet_ms=SETTLE_QUIET_LONG_MS, waits=discovery_info)
+
+        all_links = await _extract_links(page)
+        discovery_info["after_load_more_count"] = len(all_links)
+        _log(f"   📊 After load more: {len(all_links)} links found")
+
+        if not skip_pagination_detection:
+            bottom_links = await _extract_bottom_links(page, page_url)
+
+    # Page is back in the pool - pagination analysis may take an LLM round trip
+    if not skip_pagination_detection:
+        cached = getattr(brand_instance, 'pagination_pattern', None) if brand_instance else None
+        if cached:
+            _log(f"   ⚡ Using cached pagination pattern from brand: {cached.get('url_pattern')}")
+            discovery_info["pagination_detected"] = _pagination_from_cached_pattern(bottom_links, page_url, cached)
+        else:
+            _log("   🔍 More Links: Detecting post-scroll pagination patterns...")
+            discovery_info["pagination_detected"] = await _to_thread(_detect_pagination_from_links, bottom_links, page_url)
+
+    return {
+        "links": all_links,
+        "discovery_info": discovery_info
+    }
+
+
+async def _extract_urls_from_single_page(
+    acquire: Callable,
+    page_url: str,
+    category_url: str,
+    category_name: str,
+    page_num: int,
+    brand_instance=None,
+    skip_pagination_detection: bool = False
+) -> Dict[str, Any]:
+    """
+    Extract product URLs from a single page.
+
+    Returns:
+        Dict with: product_urls, pagination_detected, extraction_time
+    """
+    start_time = time.time()
+
+    try:
+        result = await _scroll_and_extract_links(acquire, page_url, brand_instance, skip_pagination_detection)
+        links = result.get("links", [])
+        discovery_info = result.get("discovery_info", {})
+
+        classification = await _to_thread(classify_product_links, links, page_url, category_name, brand_instance)
+        product_urls = _to_product_urls(
+            classification.get("product_links", []), discovery_info, category_url, category_name, page_num
+        )
+
+        return {
+            "product_urls": product_urls,
+            "pagination_detected": discovery_info.get("pagination_detected") if not skip_pagination_detection else None,
+            "extraction_time": time.time() - start_time,
+            "stats": classification.get("stats", {}),
+            "discovery_info": discovery_info
+        }
+
+    except Exception as e:
+        _log(f"   ❌ Error extracting URLs from {page_url}: {e}")
+        return {
+            "product_urls": [],
+            "pagination_detected": None,
+            "extraction_time": time.time() - start_time,
+            "error": str(e)
+        }
+
+
+# event loop -> {host: (semaphore, limiter)} - asyncio primitives belong to one loop
+_http_limits: "WeakKeyDictionary" = WeakKeyDictionary()
+
+
+def _host_limits(url: str) -> Tuple[asyncio.Semaphore, Any]:
+    """Concurrency bound and rate limiter of the url's host, on the running loop."""
+    from stages.rate_limiter import AdaptiveRateLimiter, load_rate_memory, remembered_start_rate
+    from stages.shared_bucket import SharedTokenBucket
+
+    host = urlparse(url).netloc.replace('www.', '')
+    limits = _http_limits.setdefault(asyncio.get_running_loop(), {})
+    if host not in limits:
+        memory = load_rate_memory(host)
+        remembered = remembered_start_rate(memory)
+        limiter = AdaptiveRateLimiter(
+            initial_rate=remembered or HTTP_DEFAULT_RATE,
+            max_rate=50.0,
+            min_rate=1.0,
+            burst_size=HTTP_CONCURRENCY,
+            default_pause=memory.get("pause", 1.0),
+            slow_start=remembered is None,
+            shared=SharedTokenBucket(host),
+        )
+        limits[host] = (asyncio.Semaphore(HTTP_CONCURRENCY), limiter)
+    return limits[host]
+
+
+async def _fetch_html(url: str) -> Optional[str]:
+    """
+    Raw HTML of a page over plain HTTP, or None if it can't be fetched.
+
+    Holds one of the host's HTTP_CONCURRENCY slots and a rate limiter token;
+    the response status and headers are fed back to the limiter.
+    """
+    import requests
+
+    def get():
+        return requests.get(url, headers={"User-Agent": HTTP_USER_AGENT}, timeout=30)
+
+    try:
+        slots, limiter = _host_limits(url)
+        async with slots:
+            async with await limiter.acquire() as token:
+                response = await asyncio.to_thread(get)
+                await token.record(response.status_code, dict(response.headers),
+                                   latency=response.elapsed.total_seconds())
+        return response.text if response.status_code == 200 else None
+    except Exception as e:
+        _log(f"   ⚠️  HTTP fetch failed for {url}: {e}")
+        return None
+
+
+async def _extract_urls_from_html_page(
+    page_url: str,
+    category_url: str,
+    category_name: str,
+    page_num: int,
+    brand_instance=None
+) -> Optional[Dict[str, Any]]:
+    """
+    Extract product URLs from a server-rendered page without a browser.
+
+    Returns the same dict as _extract_urls_from_single_page, or None if the
+    page couldn't be fetched (caller falls back to the browser).
+    """
+    start_time = time.time()
+    html = await _fetch_html(page_url)
+    if html is None:
+        return None
+
+    links = _links_from_html(html, page_url)
+    classification = await _to_thread(classify_product_links, links, page_url, category_name, brand_instance)
+    discovery_info = {"initial_load_count": len(links), "after_scroll_count": len(links), "http_only": True}
+    return {
+        "product_urls": _to_product_urls(
+            classification.get("product_links", []), discovery_info, category_url, category_name, page_num
+        ),
+        "pagination_detected": None,
+        "extraction_time": time.time() - start_time,
+        "stats": classification.get("stats", {}),
+        "discovery_info": discovery_info
+    }
+
+
+async def _is_server_rendered(category_url: str, page1_urls: List[str], brand_instance=None) -> bool:
+    """
+    Whether category pages render their products server-side.
+
+    True when page 1's raw HTML already links at least HTTP_COVERAGE of the
+    product URLs the browser found after scrolling. Decided once per brand.
+    """
+    decided = getattr(brand_instance, 'pagination_http', None) if brand_instance else None
+    if decided is not None:
+        return decided
+    if not page1_urls:
+        return False
+
+    html = await _fetch_html(category_url)
+    found = {link["url"] for link in _links_from_html(html, category_url)} if html else set()
+    expected = set(page1_urls)
+    coverage = len(expected & found) / len(expected)
+    server_rendered = coverage >= HTTP_COVERAGE
+    _log(f"   {'⚡' if server_rendered else '🌐'} Raw HTML has {coverage:.0%} of page 1 products - "
+         f"{'HTTP-only' if server_rendered else 'browser'} for pages 2+")
+
+    if brand_instance:
+        brand_instance.pagination_http = server_rendered
+    return server_rendered
+
+
+async def extract_multi_page_urls(
+    acquire: Callable,
+    base_url: str,
+    category_name: str,
+    brand_instance=None,
+    pagination_result: Dict = None,
+    page1_urls: List[str] = None
+) -> Dict[str, Any]:
+    """
+    Extract URLs from pages 2..N concurrently.
+
+    - Known last page: all pages at once (the pool bounds browser loads,
+      _fetch_html bounds and rate-limits HTTP fetches per host)
+    - Unknown last page: waves of PAGINATION_WAVE pages from the url_pattern,
+      stopping at the first page that adds no new product URLs
+    - Server-rendered categories (page 1's raw HTML has its products) are
+      fetched over plain HTTP; a page that fails over HTTP uses the browser
+
+    Returns:
+        Dict with: product_urls, pages_extracted, per_page_stats, total_time
+    """
+    if not pagination_result or not pagination_result.get("pagination_found"):
+        return {"product_urls": [], "pages_extracted": 0, "stats": {}}
+
+    page_urls = _generate_page_urls(base_url, pagination_result)
+    if not page_urls:
+        _log("   📄 No additional pages to extract")
+        return {"product_urls": [], "pages_extracted": 0, "stats": {}}
+
+    _log(f"   📊 Extracting URLs from {len(page_urls)} additional pages")
+    start_time = time.time()
+    all_urls = []
+    per_page_stats = []
+    seen = set(page1_urls or [])
+
+    use_http = await _is_server_rendered(base_url, page1_urls or [], brand_instance)
+
+    async def extract_page(url: str, page_num: int) -> Dict:
+        if use_http:
+            result = await _extract_urls_from_html_page(url, base_url, category_name, page_num, brand_instance)
+            if result is not None:
+                return result
+        return await _extract_urls_from_single_page(acquire, url, base_url, category_name, page_num, brand_instance, True)
+
+    def record(page_num: int, url: str, result: Dict) -> int:
+        """Store one page's result. Returns how many URLs it added."""
+        urls_found = result.get("product_urls", [])
+        new_urls = {u.url for u in urls_found} - seen
+        seen.update(new_urls)
+        all_urls.extend(urls_found)
+        stat = {"page_num": page_num, "url": url, "urls_found": len(urls_found)}
+        if result.get("error"):
+            stat["error"] = result["error"]
+        else:
+            stat["extraction_time"] = result.get("extraction_time", 0)
+        per_page_stats.append(stat)
+        _log(f"   {'✅' if new_urls else '📄'} Page {page_num}: {len(urls_found)} product URLs ({len(new_urls)} new)")
+        return len(new_urls)
+
+    results = await asyncio.gather(*(extract_page(url, i + 2) for i, url in enumerate(page_urls)))
+    for i, (url, result) in enumerate(zip(page_urls, results)):
+        record(i + 2, url, result)
+
+    # Last page unknown: walk the url_pattern in concurrent waves
+    if _should_continue_sequential(pagination_result):
+        url_pattern = pagination_result.get("url_pattern")
+        next_page = max([2] + [stat["page_num"] for stat in per_page_stats]) + 1
+        safety_limit = next_page + 50
+        errors = 0
+        exhausted = False
+
+        while not exhausted and next_page <= safety_limit and errors < 3:
+            wave = list(range(next_page, min(next_page + PAGINATION_WAVE, safety_limit + 1)))
+            wave_urls = [_sequential_page_url(base_url, url_pattern, n) for n in wave]
+            _log(f"   🔄 Pagination wave: pages {wave[0]}-{wave[-1]}")
+            results = await asyncio.gather(*(extract_page(url, n) for url, n in zip(wave_urls, wave)))
+
+            # In page order: the first page with nothing new is past the end
+            for page_num, url, result in zip(wave, wave_urls, results):
+                if result.get("error"):
+                    errors += 1
+                    record(page_num, url, result)
+                elif not record(page_num, url, result):
+                    exhausted = True
+                    break
+            next_page += len(wave)
+
+    total_time = time.time() - start_time
+    _log(f"   📊 Multi-page extraction complete: {len(per_page_stats)} pages, {len(all_urls)} URLs, "
+         f"{total_time:.2f}s{' (HTTP-only)' if use_http else ''}")
+
+    return {
+        "product_urls": all_urls,
+        "pages_extracted": len(per_page_stats),
+        "per_page_stats": per_page_stats,
+        "total_time": total_time
+    }
+
+
+async def extract_urls_from_category_async(
+    category_url: str,
+    acquire: Callable,
+    brand_instance=None,
+    quiet: bool = False
+) -> URLExtractionResult:
+    """
+    Extract all product URLs from a single category on pooled pages.
+
+    Async counterpart of url_extractor.extract_urls_from_category.
+
+    Args:
+        category_url: URL of the category page
+        acquire: Callable returning an async context manager that yields a page
+                 (e.g. BrowserPool.acquire)
+        brand_instance: Optional brand instance for shared state
+        quiet: If True, suppress all log output
+    """
+    _thread_local.quiet = quiet
+
+    start_time = time.time()
+    category_name = extract_category_name(category_url)
+    _log(f"\n📁 Extracting URLs from: {category_name} ({category_url})")
+
+    result = URLExtractionResult(category_url=category_url, category_name=category_name)
+
+    try:
+        page1_result = await _extract_urls_from_single_page(
+            acquire, category_url, category_url, category_name, 1, brand_instance
+        )
+        result.product_urls.extend(page1_result.get("product_urls", []))
+        result.llm_filtering_stats = page1_result.get("stats", {})
+        result.discovery_info = page1_result.get("discovery_info", {})
+        if page1_result.get("error"):
+            result.errors.append(f"Page 1: {page1_result['error']}")
+
+        pagination_detected = page1_result.get("pagination_detected")
+        if pagination_detected and pagination_detected.get("pagination_found"):
+            _log("\n   📖 Pagination detected, extracting additional pages...")
+            _cache_pagination_pattern(brand_instance, pagination_detected)
+
+            multi_result = await extract_multi_page_urls(
+                acquire, category_url, category_name, brand_instance, pagination_detected,
+                page1_urls=[u.url for u in page1_result.get("product_urls", [])]
+            )
+            result.product_urls.extend(multi_result.get("product_urls", []))
+            result.pages_processed = 1 + multi_result.get("pages_extracted", 0)
+
+        result.product_urls = _dedupe_product_urls(result.product_urls)
+        result.extraction_time = time.time() - start_time
+        _log(f"\n   ✅ Category complete: {len(result.product_urls)} unique product URLs ({result.extraction_time:.2f}s)")
+
+    except Exception as e:
+        result.errors.append(str(e))
+        result.extraction_time = time.time() - start_time
+        _log(f"   ❌ Category extraction failed: {e}")
+
+    return result
@@ -0,0 +1,272 @@
+"""
+Concurrency Tuner - Finds the product-page concurrency where throughput stops paying.
+
+THE PROBLEM:
+    product_concurrency=15 and pool_size=min(15, ...) are hand-tuned guesses.
+    Too few browsers and a fast site is underused; too many and pages just
+    get slower (CPU/RAM contention, server-side queueing) with no gain in
+    pages/second - or the host starts swapping.
+
+THE SOLUTION:
+    Hill-climb the browser pool size using Little's law (N = X × R):
+
+        X = completed pages / second     (throughput)
+        R = seconds a page holds a slot  (latency)
+        N = X × R                        (slots actually in use)
+
+    Every epoch:
+    - Over CPU/RAM budget              → shrink by one step (CPU measured
+                                         over the epoch, from /proc/stat)
+    - N well below the pool size       → slots aren't the bottleneck
+                                         (rate limiter / queue) → hold
+    - Last step up raised X ≥ 5%       → step up again
+    - Last step up didn't raise X      → past the knee: step back, settle
+    - Settled for a while              → probe one step up again (sites change)
+
+    The settled size is persisted per domain (brand_meta.json →
+    products.concurrency) and the next run starts there.
+
+USAGE:
+    tuner = ConcurrencyTuner(initial=8, max_limit=24)
+    task = asyncio.create_task(tuner.run(browser_pool))
+    ... each extraction: tuner.record(seconds_in_slot)
+    tuner.stop(); await task
+    tuner.save(domain)
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+
+from stages import resources
+
+
+def _ts() -> str:
+    """Timestamp prefix for log messages."""
+    return datetime.now().strftime("%H:%M:%S")
+
+
+# Hard ceiling on browsers for one product stage
+TUNER_MAX_CONCURRENCY = 30
+
+
+class TunerState(Enum):
+    PROBING = "probing"    # Stepping up while throughput keeps improving
+    SETTLED = "settled"    # At the knee
+    HOLDING = "holding"    # Slots underused - bottleneck is elsewhere
+    SHEDDING = "shedding"  # Over CPU/RAM budget
+
+
+def load_saved_concurrency(domain: str) -> Optional[int]:
+    """Concurrency settled on in a previous run, or None."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    value = meta.get("products", {}).get("concurrency")
+    return int(value) if value else None
+
+
+class ConcurrencyTuner:
+    """
+    Online search for the knee of the throughput/concurrency curve.
+
+    Args:
+        initial: Starting pool size
+        min_limit: Never go below this many browsers
+        max_limit: Never go above this many browsers
+        epoch: Seconds between decisions
+        step: Browsers added/removed per decision
+        gain_threshold: Throughput gain a step up must produce to keep climbing
+        reprobe_epochs: Settled epochs before probing upward again
+        governor: ResourceGovernor that must grant pool growth (optional)
+        quiet: Suppress print output (for dashboard mode)
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 2,
+        max_limit: int = TUNER_MAX_CONCURRENCY,
+        epoch: float = 10.0,
+        step: int = 2,
+        gain_threshold: float = 0.05,
+        reprobe_epochs: int = 6,
+        governor=None,
+        quiet: bool = False,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.epoch = epoch
+        self.step = step
+        self.gain_threshold = gain_threshold
+        self.reprobe_epochs = reprobe_epochs
+        self.governor = governor
+        self.quiet = quiet
+
+        self.initial = max(min_limit, min(self.max_limit, initial))
+        self._limit = self.initial
+        self._state = TunerState.PROBING
+
+        # Current epoch
+        self._epoch_start = time.time()
+        self._cpu_mark = resources.cpu_times()  # CPU is judged per epoch, not on the 1-min load average
+        self._latencies: List[float] = []
+
+        # Previous epoch at a different limit: (limit, throughput)
+        self._previous: Optional[tuple] = None
+        self._settled_epochs = 0
+        self._best: Dict[int, float] = {}  # limit -> best throughput seen
+        self._adjustments: List[Dict] = []
+        self._running = False
+
+    def _log(self, msg: str):
+        if not self.quiet:
+            print(msg)
+
+    @property
+    def limit(self) -> int:
+        """Current target pool size."""
+        return self._limit
+
+    @property
+    def state(self) -> TunerState:
+        return self._state
+
+    @property
+    def stats(self) -> Dict:
+        return {
+            "limit": self._limit,
+            "initial": self.initial,
+            "state": self._state.value,
+            "adjustments": len(self._adjustments),
+            "best_throughput": {k: round(v, 2) for k, v in sorted(self._best.items())},
+        }
+
+    def record(self, latency: float):
+        """Record one finished extraction and how long it held a browser (s)."""
+        self._latencies.append(latency)
+
+    def stop(self):
+        self._running = False
+
+    async def run(self, pool):
+        """
+        Decide every epoch and resize `pool` (a BrowserPool) to the new limit.
+
+        An epoch that fails (a browser that won't launch, a governor error) is
+        logged and skipped - the tuner keeps running, and the caller's
+        cleanup never sees its error.
+        """
+        self._running = True
+        while self._running:
+            await asyncio.sleep(1.0)
+            if time.time() - self._epoch_start < self.epoch:
+                continue
+            try:
+                await self._epoch(pool)
+            except Exception as e:
+                self._log(f"[{_ts()}] [ConcurrencyTuner] Epoch failed, keeping {pool.size} browsers: {e}")
+
+    async def _epoch(self, pool):
+        new_limit = self._decide()
+        if self.governor:
+            granted = self.governor.request_product_browsers(new_limit)
+            if granted != new_limit:
+                # Stage 2 holds the rest of the browser budget for now
+                new_limit = self._set(granted, "capped by resource governor")
+        if new_limit != pool.size:
+            await pool.resize(new_limit)
+
+    def _decide(self) -> int:
+        """Close the current epoch and pick the next limit."""
+        now = time.time()
+        duration = now - self._epoch_start
+        samples = self._latencies
+
+        # Not enough completions to judge this epoch - keep collecting
+        if len(samples) < max(5, self._limit):
+            return self._limit
+
+        throughput = len(samples) / duration
+        latency = sum(samples) / len(samples)
+        in_use = throughput * latency  # Little's law
+        self._best[self._limit] = max(self._best.get(self._limit, 0.0), throughput)
+
+        over = resources.over_budget(cpu_since=self._cpu_mark)
+        self._epoch_start = now
+        self._cpu_mark = resources.cpu_times()
+        self._latencies = []
+
+        if over:
+            self._state = TunerState.SHEDDING
+            return self._set(self._limit - self.step, over)
+
+        if in_use < 0.6 * self._limit:
+            # Browsers sit idle - rate limiter or URL queue is the bottleneck
+            self._state = TunerState.HOLDING
+            self._previous = None
+            return self._limit
+
+        if self._state == TunerState.SETTLED:
+            self._settled_epochs += 1
+            if self._settled_epochs < self.reprobe_epochs:
+                return self._limit
+            self._state = TunerState.PROBING
+
+        if self._state in (TunerState.HOLDING, TunerState.SHEDDING):
+            self._state = TunerState.PROBING
+
+        previous = self._previous
+        if previous and self._limit > previous[0]:
+            prev_limit, prev_throughput = previous
+            gain = throughput / prev_throughput - 1 if prev_throughput else 1.0
+            if gain < self.gain_threshold:
+                # Past the knee - more browsers, no more pages/second
+                self._state = TunerState.SETTLED
+                self._settled_epochs = 0
+                self._previous = None
+                return self._set(prev_limit, f"+{self._limit - prev_limit} browsers gave {gain:+.0%} throughput")
+
+        self._previous = (self._limit, throughput)
+        return self._grow(throughput, latency)
+
+    def _grow(self, throughput: float, latency: float) -> int:
+        if self._limit >= self.max_limit:
+            self._state = TunerState.SETTLED
+            self._settled_epochs = 0
+            return self._limit
+
+        affordable = resources.affordable_browsers()
+        step = self.step if affordable is None else min(self.step, affordable)
+        if step <= 0:
+            self._state = TunerState.SETTLED
+            self._settled_epochs = 0
+            return self._limit
+
+        return self._set(self._limit + step, f"{throughput:.2f} pages/s at {latency:.1f}s/page")
+
+    def _set(self, limit: int, reason: str) -> int:
+        limit = max(self.min_limit, min(self.max_limit, limit))
+        if limit != self._limit:
+            self._adjustments.append({"time": time.time(), "old": self._limit, "new": limit, "reason": reason})
+            self._log(f"[{_ts()}] [ConcurrencyTuner] {self._limit} → {limit} browsers ({reason})")
+            self._limit = limit
+        return limit
+
+    def settled_limit(self) -> int:
+        """
+        Limit worth starting from next time: the smallest one whose
+        throughput was within gain_threshold of the best seen.
+        """
+        if not self._best:
+            return self._limit
+        top = max(self._best.values())
+        return min(k for k, x in self._best.items() if x >= top * (1 - self.gain_threshold))
+
+    def save(self, domain: str):
+        """Persist the settled concurrency for the next run of this domain."""
+        from stages.storage import update_brand_meta
+
+        update_brand_meta(domain, "products", {"concurrency": self.settled_limit()})
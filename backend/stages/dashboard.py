@@ -30,11 +30,14 @@ class Dashboard:
 
     WIDTH = 62
 
-    def __init__(self, domain: str, progress: Dict, rate_limiter, browser_pool):
+    def __init__(self, domain: str, progress: Dict, rate_limiter, browser_pool, wait_controller=None, tuner=None, governor=None):
         self.domain = domain
         self.progress = progress
         self.rate_limiter = rate_limiter
         self.browser_pool = browser_pool
+        self.wait_controller = wait_controller
+        self.tuner = tuner
+        self.governor = governor
 
         self._running = False
         self._recent: deque = deque(maxlen=8)  # (slug, success, error)
@@ -120,15 +123,37 @@ class Dashboard:
         label = {"up": "(ramping)", "down": "(throttled)", "stable": ""}[self._rate_direction]
         rate_line = f"  Rate       {rate:.1f} req/s  {arrow} {label}"
 
+        # Latency-based congestion control
+        smoothed = getattr(self.rate_limiter, "smoothed_latency", None)
+        if smoothed:
+            congestion = self.rate_limiter.congestion_state.value
+            ratio = self.rate_limiter.latency_ratio
+            ratio_str = f"{ratio:.2f}x base" if ratio else "measuring"
+            latency_line = f"  Latency    {smoothed*1000:.0f}ms ({ratio_str})  {congestion}"
+        else:
+            latency_line = "  Latency    --"
+
         # Browsers
         try:
             free = self.browser_pool._available.qsize()
             total_b = self.browser_pool.size
             busy = total_b - free
             browser_line = f"  Browsers   {busy}/{total_b} busy"
+            if self.tuner:
+                browser_line += f"  ({self.tuner.state.value})"
         except Exception:
             browser_line = "  Browsers   --"
 
+        # Browser budget split between stage 2 and stage 3
+        budget_line = None
+        if self.governor:
+            g = self.governor.stats
+            budget_line = (f"  Budget     {g['url_browsers']} url + {g['product_browsers']} product"
+                           f" / {g['budget']}  (favoring {g['favoring']})")
+
+        # Page wait
+        wait_line = f"  Wait       {self.wait_controller.wait_ms}ms" if self.wait_controller else None
+
         # Throughput
         if elapsed > 0:
             overall = completed / elapsed
@@ -168,7 +193,14 @@ class Dashboard:
             v + counts.ljust(W) + v,
             v + "".ljust(W) + v,
             v + rate_line.ljust(W) + v,
+            v + latency_line.ljust(W) + v,
             v + browser_line.ljust(W) + v,
+        ]
+        if budget_line:
+            lines.append(v + budget_line.ljust(W) + v)
+        if wait_line:
+            lines.append(v + wait_line.ljust(W) + v)
+        lines += [
             v + tp_line.ljust(W) + v,
             v + eta_line.ljust(W) + v,
             v + "".ljust(W) + v,
@@ -0,0 +1,179 @@
+"""
+Resource Governor - One browser budget shared by the URL and product stages.
+
+THE PROBLEM:
+    In streaming mode both stages run at once:
+    - Stage 2: a pool of max_url_workers browsers scrolling category pages
+    - Stage 3: a BrowserPool of up to 15+ async browsers
+    Nothing coordinates them, so the host regularly runs 20+ Chromiums and swaps.
+
+THE SOLUTION:
+    A single governor owns the browser budget (sized from free RAM) and
+    splits it between the stages as the run progresses:
+
+        early run      backlog small   → stage 2 gets its url_workers slots,
+                                          stage 3 gets the rest
+        backlog deep   ≥ FAVOR_BACKLOG → stage 2 drops to 1 slot,
+                                          stage 3 can grow into the freed slots
+        URLs done                      → stage 3 gets the whole budget
+
+    Stage 2 takes a slot per page load (blocking while over its share).
+    Stage 3 asks for browsers when its pool grows and gets what's left.
+    Over the CPU/RAM budget (resources.over_budget), stage 2 is held to one
+    slot and stage 3 requests aren't granted beyond what it already has.
+
+    Thread-safe: stage 2 runs in worker threads, stage 3 in its own event loop.
+
+USAGE:
+    governor = ResourceGovernor(url_workers=4)
+
+    # Stage 2 (any thread - async callers use asyncio.to_thread)
+    governor.acquire_url_slot()
+    ... load and scroll one category page ...
+    governor.release_url_slot()
+    pool_size = governor.url_share()        # resize stage 2's pool to follow it
+    governor.urls_done()
+
+    # Stage 3 (async)
+    pool_size = governor.request_product_browsers(15)
+    governor.report_backlog(queued - completed)
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from stages import resources
+
+
+# Queued-but-unextracted products at which stage 3 is favored
+FAVOR_BACKLOG = 100
+
+# Budget when free RAM can't be read (url workers + a typical product pool)
+DEFAULT_PRODUCT_BROWSERS = 15
+
+
+class ResourceGovernor:
+    """
+    Splits a global browser budget between stage 2 (URLs) and stage 3 (products).
+
+    Args:
+        url_workers: Stage 2's slots while it isn't being squeezed
+        budget: Total browsers for both stages (default: what free RAM allows)
+        favor_backlog: Product backlog at which stage 3 takes priority
+    """
+
+    def __init__(
+        self,
+        url_workers: int = 4,
+        budget: Optional[int] = None,
+        favor_backlog: int = FAVOR_BACKLOG,
+    ):
+        if budget is None:
+            affordable = resources.affordable_browsers()
+            budget = affordable if affordable is not None else url_workers + DEFAULT_PRODUCT_BROWSERS
+        self.budget = max(2, budget)
+        self.url_workers = url_workers
+        self.favor_backlog = favor_backlog
+
+        self._cond = threading.Condition()
+        self._url_in_use = 0
+        self._product_browsers = 0
+        self._backlog = 0
+        self._urls_done = False
+
+    @property
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "budget": self.budget,
+                "url_browsers": self._url_in_use,
+                "url_share": self._url_share(),
+                "product_browsers": self._product_browsers,
+                "backlog": self._backlog,
+                "favoring": "products" if self._favor_products() else "urls",
+            }
+
+    # -----------------------------------------------------------------
+    # Policy (call with self._cond held)
+    # -----------------------------------------------------------------
+
+    def _favor_products(self) -> bool:
+        return self._urls_done or self._backlog >= self.favor_backlog
+
+    def _url_share(self) -> int:
+        """Slots stage 2 may hold right now."""
+        if self._urls_done:
+            return 0
+        share = 1 if self._favor_products() or resources.over_budget() else self.url_workers
+        # Never less than one - stage 2 must always make progress
+        return max(1, min(share, self.budget - self._product_browsers))
+
+    def _product_share(self) -> int:
+        """Browsers stage 3 may hold right now."""
+        reserved = max(self._url_in_use, self._url_share())
+        return max(1, self.budget - reserved)
+
+    # -----------------------------------------------------------------
+    # Stage 2
+    # -----------------------------------------------------------------
+
+    def acquire_url_slot(self):
+        """Take one stage 2 browser slot (blocks while over share)."""
+        with self._cond:
+            while self._url_in_use >= self._url_share():
+                self._cond.wait(timeout=1.0)  # Re-check: over_budget() can change without a notify
+            self._url_in_use += 1
+
+    def release_url_slot(self):
+        with self._cond:
+            self._url_in_use -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def url_slot(self):
+        """Hold one browser slot for a category page extraction."""
+        self.acquire_url_slot()
+        try:
+            yield
+        finally:
+            self.release_url_slot()
+
+    def url_share(self) -> int:
+        """Slots stage 2 may hold right now - what its browser pool should be sized to."""
+        with self._cond:
+            return self._url_share()
+
+    def urls_done(self):
+        """Stage 2 finished - its whole share goes to stage 3."""
+        with self._cond:
+            self._urls_done = True
+            self._cond.notify_all()
+
+    # -----------------------------------------------------------------
+    # Stage 3
+    # -----------------------------------------------------------------
+
+    def request_product_browsers(self, wanted: int) -> int:
+        """
+        Ask for `wanted` pool browsers in total. Returns how many stage 3 may have.
+
+        Shrinking is always granted. Growth is capped by what stage 2 is
+        holding or entitled to, and refused while the host is over budget.
+        """
+        with self._cond:
+            if wanted > self._product_browsers and resources.over_budget():
+                granted = max(1, self._product_browsers)
+            else:
+                granted = max(1, min(wanted, self._product_share()))
+            self._product_browsers = granted
+            self._cond.notify_all()
+            return granted
+
+    def report_backlog(self, backlog: int):
+        """Products queued but not yet extracted."""
+        with self._cond:
+            was_favoring = self._favor_products()
+            self._backlog = backlog
+            if was_favoring != self._favor_products():
+                self._cond.notify_all()
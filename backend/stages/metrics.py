@@ -142,9 +142,25 @@ def format_llm_table(operations: List[Dict]) -> str:
 
     lines.append(f"  {'TOTAL'.ljust(25)}  {str(total_calls).rjust(6)}  {str(total_input).rjust(10)}  {str(total_output).rjust(11)}  ${total_cost:.4f}".rjust(9))
 
+    cache_line = format_cache_line(operations)
+    if cache_line:
+        lines.append("")
+        lines.append(cache_line)
+
     return "\n".join(lines)
 
 
+def format_cache_line(operations: List[Dict]) -> str:
+    """One-line LLM response cache summary, or "" if no lookups were made."""
+    hits = sum(op.get("cache_hits", 0) for op in operations)
+    misses = sum(op.get("cache_misses", 0) for op in operations)
+    if not hits and not misses:
+        return ""
+    avoided = sum(op.get("cost_avoided", 0) for op in operations)
+    hit_rate = hits / (hits + misses) * 100
+    return f"LLM CACHE: {hits} hits / {misses} misses ({hit_rate:.0f}%), ${avoided:.4f} avoided"
+
+
 def format_category_table(categories: List[Dict]) -> str:
     """Format per-category breakdown as a table."""
     lines = []
@@ -241,6 +257,8 @@ def format_totals(stages: Dict[str, Dict]) -> str:
     total_output = 0
     total_cost = 0
     total_products = 0
+    total_hits = 0
+    total_avoided = 0
 
     for stage_data in stages.values():
         total_duration += stage_data.get("duration", 0)
@@ -249,6 +267,8 @@ def format_totals(stages: Dict[str, Dict]) -> str:
         total_input += summary.get("input_tokens", 0)
         total_output += summary.get("output_tokens", 0)
         total_cost += summary.get("cost", 0)
+        total_hits += summary.get("cache_hits", 0)
+        total_avoided += summary.get("cost_avoided", 0)
         total_products = max(total_products, stage_data.get("products", 0))
 
     minutes = total_duration / 60
@@ -262,6 +282,9 @@ def format_totals(stages: Dict[str, Dict]) -> str:
     lines.append(f"  {'Total Output Tokens'.ljust(31)}  {total_output:,}")
     lines.append(f"  {'Total LLM Cost'.ljust(31)}  ${total_cost:.4f}")
     lines.append(f"  {'Cost per Product'.ljust(31)}  ${cost_per_product:.4f}")
+    if total_hits:
+        lines.append(f"  {'LLM Cache Hits'.ljust(31)}  {total_hits}")
+        lines.append(f"  {'LLM Cost Avoided'.ljust(31)}  ${total_avoided:.4f}")
     lines.append("=" * 80)
 
     return "\n".join(lines)
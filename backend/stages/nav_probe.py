@@ -0,0 +1,180 @@
+"""
+Navigation Probe - Skip Stage 1 when the homepage navigation hasn't changed.
+
+THE PROBLEM:
+    A full scrape always re-runs extract_navigation(): minutes of browser
+    exploration and LLM calls, even though most brands change their menu a
+    few times a year. fingerprint_matches() / get_top_level_names() existed
+    for this, but nothing ever compared a fresh fingerprint to nav.json.
+
+THE SOLUTION:
+    A cheap probe of the homepage - one HTTP fetch, or one page load (no
+    clicks, no LLM) for sites whose HTML is empty until JS runs - yields:
+    - which of nav.json's top-level names appear on the page
+    - a hash of the set of same-domain links inside header/nav containers
+
+    After every Stage 1 run the probe is stored in brand_meta.json
+    (nav.probe). Next time, when the top-level names still match and the nav
+    link hash is identical, nav.json is reused and the run goes straight to
+    Stages 2+3. Any doubt (probe failed, names missing, links changed) means
+    Stage 1 runs as usual.
+
+USAGE:
+    nav_tree = navigation_unchanged(url, domain)    # None → run Stage 1
+    ...
+    save_probe(url, domain)                         # after Stage 1 saved nav.json
+"""
+
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+
+# Where top-level nav lives in the homepage HTML
+NAV_CONTAINERS = 'header, nav, [role="navigation"], [role="menubar"], [role="menu"]'
+
+# Share of nav.json's top-level names that must still be on the page
+FINGERPRINT_THRESHOLD = 0.8
+
+HTTP_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def _ts() -> str:
+    """Timestamp prefix for log messages."""
+    return datetime.now().strftime("%H:%M:%S")
+
+
+def _fetch_html(url: str) -> Optional[str]:
+    """Homepage HTML over plain HTTP, or None."""
+    import requests
+
+    try:
+        response = requests.get(url, headers={"User-Agent": HTTP_USER_AGENT}, timeout=20)
+        return response.text if response.status_code == 200 else None
+    except Exception as e:
+        print(f"[{_ts()}] [NavProbe] HTTP fetch failed: {e}")
+        return None
+
+
+def _render_html(url: str) -> Optional[str]:
+    """Homepage HTML after one page load in a headless browser, or None."""
+    from playwright.async_api import async_playwright
+
+    async def render():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                page = await browser.new_page(viewport={'width': 768, 'height': 900})
+                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                await page.wait_for_timeout(2000)
+                return await page.content()
+            finally:
+                await browser.close()
+
+    try:
+        return asyncio.run(render())
+    except Exception as e:
+        print(f"[{_ts()}] [NavProbe] Page load failed: {e}")
+        return None
+
+
+def _probe_html(html: str, url: str) -> dict:
+    """Nav link set and visible texts of a homepage."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    containers = soup.select(NAV_CONTAINERS) or [soup]
+    host = urlparse(url).netloc.replace('www.', '')
+
+    paths = set()
+    texts = set()
+    for container in containers:
+        for a in container.find_all('a', href=True):
+            href = a['href'].strip()
+            if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                continue
+            parsed = urlparse(urljoin(url, href))
+            if parsed.netloc.replace('www.', '') != host:
+                continue
+            paths.add(parsed.path.rstrip('/') or '/')
+        texts.update(' '.join(s.split()).lower() for s in container.stripped_strings)
+
+    link_hash = hashlib.sha1('\n'.join(sorted(paths)).encode()).hexdigest()[:16]
+    return {"link_hash": link_hash, "link_count": len(paths), "texts": texts}
+
+
+def probe_navigation(url: str, method: str = None) -> Optional[dict]:
+    """
+    Probe the homepage navigation.
+
+    Args:
+        url: Homepage URL
+        method: "http" or "browser"; None tries HTTP and falls back to a page
+            load when the HTML has no nav links (JS-rendered menus)
+
+    Returns:
+        {'method', 'link_hash', 'link_count', 'texts'} or None if the page
+        couldn't be fetched
+    """
+    if method in (None, "http"):
+        html = _fetch_html(url)
+        if html:
+            probe = _probe_html(html, url)
+            if probe["link_count"] or method == "http":
+                return {"method": "http", **probe}
+
+    if method in (None, "browser"):
+        html = _render_html(url)
+        if html:
+            return {"method": "browser", **_probe_html(html, url)}
+
+    return None
+
+
+def save_probe(url: str, domain: str):
+    """Store the probe of the navigation Stage 1 just extracted."""
+    from stages.storage import get_top_level_names, load_navigation, update_brand_meta
+
+    nav_tree = load_navigation(domain)
+    probe = probe_navigation(url)
+    if not nav_tree or not probe:
+        return
+
+    update_brand_meta(domain, "nav", {"probe": {
+        "method": probe["method"],
+        "link_hash": probe["link_hash"],
+        "link_count": probe["link_count"],
+        "top_level": get_top_level_names(nav_tree),
+    }})
+    print(f"[{_ts()}] [NavProbe] Saved probe ({probe['method']}, {probe['link_count']} nav links)")
+
+
+def navigation_unchanged(url: str, domain: str) -> Optional[dict]:
+    """
+    Saved nav.json if the homepage navigation still matches its probe, else None.
+    """
+    from stages.storage import fingerprint_matches, get_top_level_names, load_brand_meta, load_navigation
+
+    saved = (load_brand_meta(domain) or {}).get("nav", {}).get("probe")
+    nav_tree = load_navigation(domain)
+    if not saved or not nav_tree:
+        return None
+
+    probe = probe_navigation(url, method=saved["method"])
+    if not probe:
+        print(f"[{_ts()}] [NavProbe] Probe failed - running Stage 1")
+        return None
+
+    old_names = get_top_level_names(nav_tree)
+    new_names = [name for name in old_names if ' '.join(name.split()).lower() in probe["texts"]]
+    names_match = fingerprint_matches(old_names, new_names, threshold=FINGERPRINT_THRESHOLD)
+    links_match = probe["link_hash"] == saved["link_hash"]
+
+    print(f"[{_ts()}] [NavProbe] Top-level {len(new_names)}/{len(old_names)} present, "
+          f"nav links {probe['link_count']} ({'same' if links_match else 'changed'})")
+
+    if names_match and links_match:
+        return nav_tree
+    return None
@@ -3,6 +3,10 @@ Stage 1: Navigation Extraction
 
 Extracts the category tree from a website using both static and dynamic methods.
 Picks the better result (more categories).
+
+When the static (browser) result wins and the same links are in the raw HTML,
+the domain is switched to "static_http": later runs fetch the homepage over
+HTTP and skip the browser entirely.
 """
 
 import asyncio
@@ -19,30 +23,34 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "scraper" / "navigation"))
 
 from stages.storage import (
     get_domain, save_navigation, count_categories,
-    load_brand_meta, save_brand_meta
+    load_brand_meta, update_brand_meta
 )
 from stages.metrics import update_stage_metrics, calculate_cost, set_current_stage, get_stage_metrics_from_tracker
+from stages.nav_probe import navigation_unchanged, save_probe
 
 # Pre-import navigation modules to avoid deadlocks when running in parallel threads
 # (Both static and dynamic extractors use these, and importing during threading causes locks)
 from static_extractor import extract_tree as static_extract_tree
+from static_extractor import extract_tree_http, get_nav_links_http, http_links_match
 from step_explorer import explore as step_explore
+from scraper.navigation.menu.replay import ReplayPlan, load_saved_plan
+from scraper.navigation.popup_playbook import PopupPlaybook, load_saved_playbook
 from build_tree import dedupe_parent_child_links, strip_homepage_nodes
 
 
-def run_static_extractor(url: str) -> dict:
+def run_static_extractor(url: str, playbook: PopupPlaybook = None) -> dict:
     """Run static extractor synchronously."""
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(static_extract_tree(url))
+        result = loop.run_until_complete(static_extract_tree(url, playbook=playbook))
         loop.close()
 
         # Handle both old (tree, links) and new (tree, links, llm_usage) return formats
         if len(result) >= 3:
-            tree, _, llm_usage = result
+            tree, links_text, llm_usage = result
         else:
-            tree, _ = result
+            tree, links_text = result
             llm_usage = {"input_tokens": 0, "output_tokens": 0}
 
         if tree:
@@ -50,7 +58,8 @@ def run_static_extractor(url: str) -> dict:
                 "category_tree": tree,
                 "category_count": count_tree(tree),
                 "method": "static",
-                "llm_usage": llm_usage
+                "llm_usage": llm_usage,
+                "links_text": links_text,
             }
     except Exception as e:
         print(f"Static extractor failed: {e}")
@@ -58,6 +67,32 @@ def run_static_extractor(url: str) -> dict:
     return None
 
 
+def run_http_static_extractor(url: str) -> dict:
+    """Run static extractor over plain HTTP (no browser)."""
+    try:
+        tree, _, llm_usage = extract_tree_http(url)
+        if tree:
+            return {
+                "category_tree": tree,
+                "category_count": count_tree(tree),
+                "method": "static_http",
+                "llm_usage": llm_usage
+            }
+    except Exception as e:
+        print(f"HTTP static extractor failed: {e}")
+
+    return None
+
+
+def verify_http_extraction(url: str, browser_links: str) -> bool:
+    """True if the raw HTML has the links the browser static extractor used."""
+    if not browser_links:
+        return False
+    print("\nChecking whether the menu is server-rendered...")
+    http_links = get_nav_links_http(url)
+    return bool(http_links) and http_links_match(browser_links, http_links)
+
+
 def convert_dynamic_to_standard(node: dict) -> list:
     """
     Convert dynamic tree format to standard format.
@@ -110,12 +145,12 @@ def convert_dynamic_to_standard(node: dict) -> list:
     return result
 
 
-def run_dynamic_extractor(url: str) -> dict:
+def run_dynamic_extractor(url: str, replay_plan: ReplayPlan = None, playbook: PopupPlaybook = None) -> dict:
     """Run dynamic extractor (step_explorer) synchronously."""
     try:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        tree, stats = loop.run_until_complete(step_explore(url))
+        tree, stats = loop.run_until_complete(step_explore(url, replay_plan=replay_plan, playbook=playbook))
         loop.close()
 
         if tree:
@@ -133,7 +168,9 @@ def run_dynamic_extractor(url: str) -> dict:
                 "category_tree": standard_tree,
                 "category_count": count_tree(standard_tree),
                 "method": "dynamic",
-                "llm_usage": llm_usage
+                "llm_usage": llm_usage,
+                "replay_plan": stats.get("replay_plan"),
+                "replayed": stats.get("replayed", False),
             }
     except Exception as e:
         print(f"Dynamic extractor failed: {e}")
@@ -165,14 +202,17 @@ def count_tree(tree) -> int:
     return count
 
 
-def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict:
+def extract_navigation(url: str, timeout: int = 120, mode: str = "both",
+                       reuse_if_unchanged: bool = False) -> dict:
     """
     Extract navigation tree using static and/or dynamic methods.
 
     Args:
         url: Website URL
         timeout: Max time per extractor in seconds
-        mode: "static", "dynamic", or "both" (default)
+        mode: "static", "static_http", "dynamic", or "both" (default)
+        reuse_if_unchanged: Probe the homepage first and return the saved
+            nav.json without extracting when its navigation hasn't changed
 
     Returns:
         Navigation tree dict with category_tree, category_count, method
@@ -181,6 +221,13 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
     clean_domain = domain.replace('.', '_')
     stage_start_time = time.time()
 
+    if reuse_if_unchanged:
+        saved_nav = navigation_unchanged(url, clean_domain)
+        if saved_nav:
+            print(f"\n[CACHE] Navigation unchanged - reusing nav.json "
+                  f"({saved_nav.get('category_count', 0)} categories, {time.time() - stage_start_time:.1f}s probe)")
+            return saved_nav
+
     # Set the current stage for LLM tracking
     set_current_stage("navigation")
 
@@ -201,6 +248,18 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
     print(f"Mode: {mode}" + (f" (cached: {cached_method})" if cached_method else ""))
     print(f"{'='*60}\n")
 
+    # Replay plan from a previous dynamic run (menu button, tabs, LLM decisions)
+    replay_plan = load_saved_plan(clean_domain)
+    if replay_plan:
+        print(f"[CACHE] Found nav replay plan (menu: {replay_plan.menu_button['selector']})")
+
+    # Popup playbook: known popups hidden on every context instead of dismissed per page
+    playbook = load_saved_playbook(clean_domain)
+    if playbook:
+        print(f"[CACHE] Found popup playbook ({len(playbook.rules)} rules, {len(playbook.cookies)} cookies)")
+    else:
+        playbook = PopupPlaybook()
+
     static_result = None
     dynamic_result = None
 
@@ -210,11 +269,26 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
         effective_mode = cached_method
         print(f"Using cached method: {cached_method}")
 
-    if effective_mode == "static":
+    if effective_mode == "static_http":
+        # Verified on an earlier run: links are in the HTML, no browser needed
+        print("Running static extractor over HTTP...")
+        static_result = run_http_static_extractor(url)
+        if static_result:
+            print(f"  Static (HTTP): {static_result['category_count']} categories")
+        else:
+            # Site changed (e.g. menu now rendered by JS) - back to the browser
+            print("  Static (HTTP): failed - falling back to browser")
+            static_result = run_static_extractor(url, playbook)
+            if static_result:
+                print(f"  Static: {static_result['category_count']} categories")
+            else:
+                print("  Static: failed")
+
+    elif effective_mode == "static":
         # Run only static extractor
         print("Running static extractor only...")
         try:
-            static_result = run_static_extractor(url)
+            static_result = run_static_extractor(url, playbook)
             if static_result:
                 print(f"  Static: {static_result['category_count']} categories")
             else:
@@ -226,7 +300,7 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
         # Run only dynamic extractor
         print("Running dynamic extractor only...")
         try:
-            dynamic_result = run_dynamic_extractor(url)
+            dynamic_result = run_dynamic_extractor(url, replay_plan, playbook)
             if dynamic_result:
                 print(f"  Dynamic: {dynamic_result['category_count']} categories")
             else:
@@ -239,8 +313,8 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
         with ThreadPoolExecutor(max_workers=2) as executor:
             print("Running static and dynamic extractors in parallel...")
 
-            static_future = executor.submit(run_static_extractor, url)
-            dynamic_future = executor.submit(run_dynamic_extractor, url)
+            static_future = executor.submit(run_static_extractor, url, playbook)
+            dynamic_future = executor.submit(run_dynamic_extractor, url, replay_plan, playbook)
 
             # Get static result
             try:
@@ -266,6 +340,21 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
             except Exception as e:
                 print(f"  Dynamic: error - {e}")
 
+    # Save the dynamic run's replay plan whether or not it wins - a later
+    # "dynamic" run for this domain replays it instead of re-asking the LLM
+    if dynamic_result and dynamic_result.get("replay_plan"):
+        plan = ReplayPlan.from_dict(dynamic_result.pop("replay_plan"))
+        if plan.replayable:
+            plan.save(clean_domain)
+            print("[CACHE] Saved nav replay plan" + (" (replayed)" if dynamic_result.get("replayed") else ""))
+
+    # Popups dismissed this run are hidden on every context from now on (Stages 1-3)
+    if playbook.changed:
+        try:
+            playbook.save(clean_domain)
+        except Exception as e:
+            print(f"[CACHE] Could not save popup playbook: {e}")
+
     # Pick better result
     # Prefer static when it found results — its LLM pass with screenshot filters
     # out non-product links (e.g. social media, music, video) more reliably than
@@ -295,19 +384,32 @@ def extract_navigation(url: str, timeout: int = 120, mode: str = "both") -> dict
         result["category_tree"] = strip_homepage_nodes(tree, url)
         result["category_count"] = count_tree(result["category_tree"])
 
+    # Browser static won - if the raw HTML has the same links, later runs
+    # can use the HTTP path (one-time check, no LLM)
+    winning_method = result.get("method", "unknown")
+    browser_links = result.pop("links_text", None)
+    if static_result:
+        static_result.pop("links_text", None)
+    if winning_method == "static" and mode == "both":
+        try:
+            if verify_http_extraction(url, browser_links):
+                winning_method = "static_http"
+        except Exception as e:
+            print(f"  HTTP check failed: {e}")
+
     # Save brand metadata for future runs (remember which method won)
-    new_meta = {
-        "nav": {
-            "winning_method": result.get("method", "unknown"),
-        },
-        "last_updated": datetime.now().isoformat()
-    }
-    save_brand_meta(clean_domain, new_meta)
-    print(f"\n[CACHE] Saved winning method: {result.get('method')}")
+    update_brand_meta(clean_domain, "nav", {"winning_method": winning_method})
+    print(f"\n[CACHE] Saved winning method: {winning_method}")
 
     # Save results
     json_path, txt_path = save_navigation(domain, result)
 
+    # Fingerprint this navigation so the next full scrape can skip Stage 1
+    try:
+        save_probe(url, clean_domain)
+    except Exception as e:
+        print(f"[CACHE] Could not save nav probe: {e}")
+
     # Calculate timing and get LLM usage from tracker
     stage_duration = time.time() - stage_start_time
 
@@ -368,8 +470,9 @@ async def extract_navigation_async(url: str, timeout: int = 120, mode: str = "bo
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python navigation.py <url> [--static|--dynamic]")
+        print("Usage: python navigation.py <url> [--static|--http|--dynamic]")
         print("  --static   Run only static extractor")
+        print("  --http     Run only static extractor over HTTP (no browser)")
         print("  --dynamic  Run only dynamic extractor")
         print("  (default)  Run both and pick better result")
         sys.exit(1)
@@ -380,6 +483,8 @@ if __name__ == "__main__":
     mode = "both"
     if "--static" in sys.argv:
         mode = "static"
+    elif "--http" in sys.argv:
+        mode = "static_http"
     elif "--dynamic" in sys.argv:
         mode = "dynamic"
 
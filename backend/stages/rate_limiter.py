@@ -48,12 +48,76 @@ from typing import Optional, Dict, List, Callable, Any
 from collections import deque
 from enum import Enum
 
+from stages.shared_bucket import SharedTokenBucket
+
+
+# Shared-bucket leases: tokens taken per database write (~this many seconds
+# of the current rate, capped so idle leases don't starve other processes)
+SHARED_LEASE_S = 0.25
+SHARED_LEASE_MAX = 10
+
 
 def _ts() -> str:
     """Timestamp prefix for log messages."""
     return datetime.now().strftime("%H:%M:%S")
 
 
+def _header_number(headers: Dict[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # "100, 100;w=60" style values: first number wins
+            return float(str(value).split(",")[0].split(";")[0].strip())
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rate_limit_headers(headers: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Read what the server says about its rate limit.
+
+    Understands:
+        Retry-After                          seconds or HTTP-date
+        X-RateLimit-Remaining / -Reset       (also X-Rate-Limit-*, RateLimit-*)
+            Reset as epoch seconds or seconds from now
+        cf-mitigated: challenge              Cloudflare challenged the request
+
+    Returns:
+        {"retry_after", "remaining", "reset_after", "challenged"}
+        (seconds as floats, None when absent)
+    """
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    now = time.time()
+
+    retry_after = None
+    if "retry-after" in headers:
+        value = str(headers["retry-after"]).strip()
+        try:
+            retry_after = max(0.0, float(value))
+        except ValueError:
+            from email.utils import parsedate_to_datetime
+            try:
+                retry_after = max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+
+    remaining = _header_number(headers, "x-ratelimit-remaining", "x-rate-limit-remaining", "ratelimit-remaining")
+
+    reset_after = _header_number(headers, "x-ratelimit-reset", "x-rate-limit-reset", "ratelimit-reset")
+    if reset_after is not None and reset_after > 1e9:
+        reset_after = max(0.0, reset_after - now)  # Epoch timestamp
+
+    return {
+        "retry_after": retry_after,
+        "remaining": remaining,
+        "reset_after": reset_after,
+        "challenged": str(headers.get("cf-mitigated", "")).lower() == "challenge",
+    }
+
+
 class RateLimitState(Enum):
     """Current state of the rate limiter."""
     CALIBRATING = "calibrating"  # Still learning the rate limit
@@ -61,6 +125,14 @@ class RateLimitState(Enum):
     PAUSED = "paused"            # Hit limit, waiting to resume
 
 
+class CongestionState(Enum):
+    """What the latency-based controller is doing with the rate."""
+    STARTUP = "startup"  # Latency flat, no congestion seen yet → ramp fast
+    CRUISE = "cruise"    # Latency flat after congestion → ramp normally
+    HOLD = "hold"        # Latency rising → stop ramping
+    BACKOFF = "backoff"  # Latency inflated → reduce rate before the site throttles
+
+
 @dataclass
 class RequestOutcome:
     """Record of a single request outcome."""
@@ -69,6 +141,8 @@ class RequestOutcome:
     status_code: int
     latency: float = 0.0
     retry_after: Optional[float] = None  # From Retry-After header
+    remaining: Optional[float] = None  # From X-RateLimit-Remaining / RateLimit-Remaining
+    reset_after: Optional[float] = None  # Seconds until the quota resets (X-RateLimit-Reset / RateLimit-Reset)
 
 
 class AdaptiveRateLimiter:
@@ -97,6 +171,22 @@ class AdaptiveRateLimiter:
 
        Example: 15 successes in 1.5 seconds = 10 req/s limit
 
+    LATENCY (DELAY-BASED CONGESTION CONTROL):
+       A 429 is the last signal a site gives. Before that, pages get slower.
+       Like TCP Vegas/BBR we compare smoothed page latency against the
+       lowest latency seen recently (the uncongested baseline):
+       - ratio < 1.25 → flat: ramp (2x per interval in STARTUP, 30% in CRUISE)
+       - ratio < 2.0  → rising: HOLD the rate
+       - ratio ≥ 2.0  → inflated: BACKOFF 15% per interval
+       The first backoff or 429 ends STARTUP.
+
+    4. FAIR QUEUE
+       Waiters queue in arrival order and a single dispatcher releases
+       exactly one per token, at the moment the bucket allows it:
+       - No thundering herd when a pause ends
+       - Late arrivals can't overtake earlier ones
+       - No sleep-and-retry polling
+
     Args:
         initial_rate: Starting rate in requests/second (default: 10)
         max_rate: Maximum rate to ever attempt (default: 100)
@@ -110,12 +200,16 @@ class AdaptiveRateLimiter:
         min_rate: float = 1.0,
         burst_size: int = 5,  # Allow small bursts
         quiet: bool = False,  # Suppress print output (for dashboard mode)
+        default_pause: float = 1.0,  # Pause on 429 without Retry-After (s)
+        slow_start: bool = True,  # Ramp fast until the first congestion signal
+        shared: Optional[SharedTokenBucket] = None,  # Host-wide bucket shared with other processes
     ):
         self.initial_rate = initial_rate
         self.max_rate = max_rate
         self.min_rate = min_rate
         self.quiet = quiet
         self.burst_size = burst_size
+        self.default_pause = default_pause
 
         # Token bucket state
         self._rate = initial_rate  # Current rate (tokens/second)
@@ -139,20 +233,53 @@ class AdaptiveRateLimiter:
         self._ramp_interval = 5.0  # Try ramping every 5 seconds
         self._ramp_factor = 1.30  # Increase by 30% each ramp
         self._ramp_cooldown = 10.0  # Wait 10s after a 429 before ramping again
+        self._startup_factor = 2.0  # Ramp factor while latency is flat and nothing has pushed back yet
+
+        # Latency-based congestion control
+        # (no STARTUP when starting from a remembered rate - we're already near the ceiling)
+        self._congestion = CongestionState.STARTUP if slow_start else CongestionState.CRUISE
+        self._latencies: deque = deque(maxlen=100)  # Recent successful page latencies (s)
+        self._smoothed_latency: Optional[float] = None  # EWMA of page latency
+        self._latency_alpha = 0.2  # EWMA weight of each new sample
+        self._min_latency_samples = 10  # Samples before latency drives decisions
+        self._hold_ratio = 1.25  # Smoothed/base above this → stop ramping
+        self._backoff_ratio = 2.0  # Smoothed/base above this → back off
+        self._backoff_factor = 0.85  # Rate multiplier per latency backoff
+        self._latency_backoffs = 0
 
         # Lock for thread-safe updates
         self._lock = asyncio.Lock()
 
+        # Shared bucket: tokens, pauses and rate come from the host's shared row
+        self._shared = shared
+        self._leased = 0  # Tokens leased from the shared row, not yet handed out
+        self._unshared_successes = 0  # Successes not yet added to the shared window
+        if shared:
+            self._rate = shared.join(self._rate, self._tokens, self._max_tokens)
+
+        # Fair waiter queue: futures in arrival order, released by one dispatcher task
+        self._waiters: deque = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()  # Rate or pause changed - recompute next grant
+
         # Stats
         self._total_requests = 0
         self._total_rate_limited = 0
         self._rate_adjustments: List[Dict] = []  # History of rate changes
+        self._learned_rate: Optional[float] = None  # Safe rate from the latest 429
+        self._peak_rate = initial_rate  # Highest rate reached
+        self._pauses: List[float] = []  # Pause durations applied on 429s
 
     def _log(self, msg: str):
         """Print unless in quiet mode (dashboard active)."""
         if not self.quiet:
             print(msg)
 
+    def close(self):
+        """Release the shared bucket connection (if any)."""
+        if self._shared:
+            self._shared.close()
+
     @property
     def rate(self) -> float:
         """Current rate in requests/second."""
@@ -163,6 +290,34 @@ class AdaptiveRateLimiter:
         """Current state of the limiter."""
         return self._state
 
+    @property
+    def learned_rate(self) -> Optional[float]:
+        """Safe rate calculated at the most recent 429 (None if never limited)."""
+        return self._learned_rate
+
+    @property
+    def congestion_state(self) -> CongestionState:
+        """Current state of the latency-based controller."""
+        return self._congestion
+
+    @property
+    def base_latency(self) -> Optional[float]:
+        """Lowest recent page latency (s) - the uncongested baseline."""
+        return min(self._latencies) if self._latencies else None
+
+    @property
+    def smoothed_latency(self) -> Optional[float]:
+        """Smoothed page latency (s)."""
+        return self._smoothed_latency
+
+    @property
+    def latency_ratio(self) -> Optional[float]:
+        """Smoothed latency / baseline, or None until enough samples."""
+        base = self.base_latency
+        if len(self._latencies) < self._min_latency_samples or not base or not self._smoothed_latency:
+            return None
+        return self._smoothed_latency / base
+
     @property
     def stats(self) -> Dict:
         """Current statistics."""
@@ -170,11 +325,20 @@ class AdaptiveRateLimiter:
             "rate": self._rate,
             "state": self._state.value,
             "tokens_available": self._tokens,
+            "waiters": len(self._waiters),
             "total_requests": self._total_requests,
             "total_rate_limited": self._total_rate_limited,
             "window_successes": self._window_successes,
             "window_failures": self._window_failures,
             "rate_adjustments": len(self._rate_adjustments),
+            "congestion_state": self._congestion.value,
+            "base_latency": self.base_latency,
+            "smoothed_latency": self._smoothed_latency,
+            "latency_ratio": self.latency_ratio,
+            "latency_backoffs": self._latency_backoffs,
+            "learned_rate": self._learned_rate,
+            "peak_rate": self._peak_rate,
+            "max_pause": max(self._pauses) if self._pauses else None,
         }
 
     async def acquire(self) -> 'RateLimitToken':
@@ -201,92 +365,146 @@ class AdaptiveRateLimiter:
 
         TOKEN BUCKET MECHANICS:
             - Tokens refill at `self._rate` per second
-            - We calculate how many tokens have been added since last check
-            - If tokens available, take one and proceed
-            - If not, calculate wait time and sleep
+            - If nobody is queued and a token is available, take it now
+            - Otherwise join the FIFO waiter queue; the dispatcher hands out
+              exactly one token per waiter, in arrival order, at the instant
+              the bucket (and any pause) allows it
 
         Args:
             timeout: Maximum time to wait for a token (prevents infinite waits)
         """
-        start_wait = time.time()
-
-        while True:
-            # Timeout check - prevent infinite waits
-            elapsed_wait = time.time() - start_wait
-            if elapsed_wait > timeout:
-                self._log(f"[{_ts()}] [RateLimiter] WARNING: Token wait timeout ({timeout}s), forcing through")
-                self._log(f"    State: rate={self._rate:.2f}/s, tokens={self._tokens:.2f}, paused={self._paused_until is not None}")
-                self._total_requests += 1
-                return
-
-            # Periodic warning for long waits
-            if elapsed_wait > 30 and int(elapsed_wait) % 10 == 0:
-                self._log(f"[{_ts()}] [RateLimiter] Long wait: {elapsed_wait:.0f}s, rate={self._rate:.2f}/s, tokens={self._tokens:.2f}")
+        async with self._lock:
+            now = time.time()
+            if not self._waiters and await self._take_token(now) <= 0:
+                return  # Got a token without queueing
+
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            if self._dispatcher is None or self._dispatcher.done():
+                self._dispatcher = asyncio.create_task(self._dispatch())
+
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            # Timeout - prevent infinite waits (dispatcher skips cancelled waiters)
+            self._log(f"[{_ts()}] [RateLimiter] WARNING: Token wait timeout ({timeout}s), forcing through")
+            self._log(f"    State: rate={self._rate:.2f}/s, tokens={self._tokens:.2f}, paused={self._paused_until is not None}")
+            self._total_requests += 1
+
+    def _lease_size(self) -> int:
+        """Tokens to lease from the shared row at once: ~SHARED_LEASE_S of the current rate."""
+        return max(1, min(SHARED_LEASE_MAX, int(self._rate * SHARED_LEASE_S)))
+
+    async def _take_token(self, now: float) -> float:
+        """
+        Take a token if one is available (returns 0), else return the
+        seconds until one will be.
+
+        Clears an expired pause and refills the bucket. With a shared bucket
+        the token comes from the host's shared row, and a pause or lower rate
+        set there by another limiter is adopted. Shared tokens are leased a
+        few at a time in a worker thread, so the database write (and its busy
+        wait under contention) never blocks the event loop.
+        Called while holding the lock.
+        """
+        if self._paused_until:
+            if self._paused_until > now:
+                return self._paused_until - now
+            # Pause is over - no tokens accrue during a pause, so resume
+            # with the small burst _handle_rate_limit left in the bucket
+            self._last_refill = max(self._last_refill, self._paused_until)
+            self._paused_until = None
+            self._state = RateLimitState.RUNNING
+
+        if self._shared:
+            if self._leased <= 0:
+                successes, self._unshared_successes = self._unshared_successes, 0
+                granted, delay, shared_rate, shared_pause = await asyncio.to_thread(
+                    self._shared.take, now, self._lease_size(), successes
+                )
+                if shared_pause and shared_pause > now:
+                    if not self._paused_until or shared_pause > self._paused_until:
+                        self._log(f"[{_ts()}] [RateLimiter] Shared pause for {self._shared.host}: "
+                                  f"{shared_pause - now:.1f}s (rate {shared_rate:.1f} req/s)")
+                    self._paused_until = shared_pause
+                    self._state = RateLimitState.PAUSED
+                self._rate = shared_rate
+                if not granted:
+                    return delay
+                self._leased = granted
+            self._leased -= 1
+            self._total_requests += 1
+            return 0.0
+
+        # Refill tokens based on elapsed time
+        elapsed = now - self._last_refill
+        self._tokens = min(self._max_tokens, self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self._total_requests += 1
+            return 0.0
+        return (1.0 - self._tokens) / self._rate
+
+    async def _dispatch(self):
+        """
+        Release queued waiters one token at a time, oldest first.
 
+        Sleeps until the computed grant instant instead of polling. Rate
+        changes and pauses set `_wakeup` so the instant is recomputed.
+        Exits when the queue is empty (restarted by the next waiter).
+        """
+        while self._waiters:
             async with self._lock:
-                # First check: are we paused?
-                if self._paused_until:
-                    wait_time = self._paused_until - time.time()
-                    if wait_time > 0:
-                        # Release lock while waiting
-                        pass
-                    else:
-                        # Pause is over
-                        self._paused_until = None
-                        self._state = RateLimitState.RUNNING
-                        wait_time = 0
-                else:
-                    wait_time = 0
-
-            if wait_time > 0:
-                await asyncio.sleep(min(wait_time, 5.0))  # Cap individual waits at 5s
-                continue
+                # Drop waiters that timed out or were cancelled
+                while self._waiters and self._waiters[0].done():
+                    self._waiters.popleft()
+                if not self._waiters:
+                    break
+
+                delay = await self._take_token(time.time())
+                if delay <= 0:
+                    self._waiters.popleft().set_result(None)
+                    continue
+                self._wakeup.clear()
 
-            async with self._lock:
-                # Refill tokens based on elapsed time
-                now = time.time()
-                elapsed = now - self._last_refill
-                tokens_to_add = elapsed * self._rate
-                self._tokens = min(self._max_tokens, self._tokens + tokens_to_add)
-                self._last_refill = now
-
-                # Try to take a token
-                if self._tokens >= 1.0:
-                    self._tokens -= 1.0
-                    self._total_requests += 1
-                    return  # Got a token!
-
-                # No token available - calculate wait time
-                tokens_needed = 1.0 - self._tokens
-                wait_time = tokens_needed / self._rate
-
-            # Wait outside the lock (cap at 5s to allow timeout checks)
-            await asyncio.sleep(min(wait_time, 5.0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
 
     async def record_outcome(
         self,
         status_code: int,
         latency: float = 0.0,
-        retry_after: Optional[float] = None
+        retry_after: Optional[float] = None,
+        remaining: Optional[float] = None,
+        reset_after: Optional[float] = None,
     ):
         """
         Record the outcome of a request.
 
         This is where the magic happens:
         - On success (2xx): increment success counter
-        - On rate limit (429): PAUSE ALL, calculate rate, adjust
+        - On rate limit (429, or 503 with Retry-After): PAUSE ALL, calculate rate, adjust
+        - On quota exhausted (Remaining: 0): pause until the reset, before any 429
 
         Args:
             status_code: HTTP status code
             latency: Request duration in seconds
             retry_after: Value from Retry-After header (if present)
+            remaining: Requests left in the server's quota window (if advertised)
+            reset_after: Seconds until the server's quota resets (if advertised)
         """
         outcome = RequestOutcome(
             timestamp=time.time(),
             success=200 <= status_code < 400,
             status_code=status_code,
             latency=latency,
-            retry_after=retry_after
+            retry_after=retry_after,
+            remaining=remaining,
+            reset_after=reset_after,
         )
 
         async with self._lock:
@@ -294,14 +512,42 @@ class AdaptiveRateLimiter:
 
             if outcome.success:
                 self._window_successes += 1
-                self._try_ramp_up()
+                if self._shared:
+                    self._unshared_successes += 1  # Added to the shared window with the next lease
+                if latency > 0:
+                    self._record_latency(latency)
+                if remaining is not None and remaining <= 0 and reset_after:
+                    await self._pause_for_quota(reset_after)
+                else:
+                    await self._try_ramp_up()
             else:
                 self._window_failures += 1
 
-                if status_code == 429:
+                if status_code == 429 or (status_code == 503 and retry_after is not None):
                     self._total_rate_limited += 1
+                    if retry_after is None and reset_after:
+                        outcome.retry_after = reset_after  # Server said when the quota resets
                     await self._handle_rate_limit(outcome)
 
+    async def _pause_for_quota(self, reset_after: float):
+        """
+        The server says its quota is used up: pause everyone until it resets.
+
+        No rate cut - we didn't get blocked, the window just ran out.
+        Called while holding the lock.
+        """
+        until = time.time() + reset_after
+        if self._paused_until and self._paused_until >= until:
+            return
+        self._log(f"[{_ts()}] [RateLimiter] Quota exhausted, pausing {reset_after:.1f}s until reset")
+        self._paused_until = until
+        self._state = RateLimitState.PAUSED
+        self._pauses.append(reset_after)
+        self._leased = 0
+        if self._shared:
+            await asyncio.to_thread(self._shared.pause, self._rate, until, self._tokens)
+        self._wakeup.set()
+
     async def _handle_rate_limit(self, outcome: RequestOutcome):
         """
         Handle a 429 rate limit response.
@@ -314,12 +560,35 @@ class AdaptiveRateLimiter:
         3. Set new rate
         4. Reset tracking window
         """
+        window_start, window_successes = self._window_start, self._window_successes
+
+        self._leased = 0  # Leased before the 429 - not safe to spend after the pause
+
+        if self._shared:
+            # Measure across every limiter sharing this host
+            successes, self._unshared_successes = self._unshared_successes, 0
+            await asyncio.to_thread(self._shared.record_successes, successes)
+            window_start, window_successes, shared_pause, shared_rate = await asyncio.to_thread(self._shared.window)
+            if shared_pause and shared_pause > time.time():
+                # Another limiter already handled this 429 burst - join its pause
+                self._rate = shared_rate
+                self._learned_rate = shared_rate
+                self._paused_until = shared_pause
+                self._state = RateLimitState.PAUSED
+                self._last_429_time = time.time()
+                self._congestion = CongestionState.CRUISE
+                self._window_start = time.time()
+                self._window_successes = 0
+                self._window_failures = 0
+                self._wakeup.set()
+                return
+
         # Calculate the rate we were achieving before hitting limit
-        window_duration = time.time() - self._window_start
+        window_duration = time.time() - window_start
 
-        if window_duration > 0 and self._window_successes > 0:
+        if window_duration > 0 and window_successes > 0:
             # Actual rate = successes / time
-            measured_rate = self._window_successes / window_duration
+            measured_rate = window_successes / window_duration
 
             # The limit is slightly below what we achieved
             # Use 90% of measured rate as safe rate
@@ -332,7 +601,7 @@ class AdaptiveRateLimiter:
                 "old_rate": self._rate,
                 "new_rate": new_rate,
                 "measured_rate": measured_rate,
-                "window_successes": self._window_successes,
+                "window_successes": window_successes,
                 "window_duration": window_duration,
                 "retry_after": outcome.retry_after
             })
@@ -347,6 +616,7 @@ class AdaptiveRateLimiter:
             new_rate = max(self.min_rate, self._rate * 0.5)
             self._log(f"\n[{_ts()}] [RateLimiter] 429 detected! Reducing rate {self._rate:.1f} → {new_rate:.1f}")
             self._rate = new_rate
+        self._learned_rate = self._rate
 
         # Determine pause duration
         if outcome.retry_after:
@@ -354,13 +624,15 @@ class AdaptiveRateLimiter:
             pause_duration = outcome.retry_after
             self._log(f"    Retry-After: {pause_duration}s")
         else:
-            # Default: pause for 1 second
-            pause_duration = 1.0
+            # Default: pause for 1 second (or what this domain needed last time)
+            pause_duration = self.default_pause
+        self._pauses.append(pause_duration)
 
         # Pause all workers
         self._paused_until = time.time() + pause_duration
         self._state = RateLimitState.PAUSED
         self._last_429_time = time.time()  # Track for ramp-up cooldown
+        self._congestion = CongestionState.CRUISE  # A 429 ends startup
 
         # Reset tracking window
         self._window_start = time.time()
@@ -371,21 +643,36 @@ class AdaptiveRateLimiter:
         # Note: _last_refill should be NOW, not future (else elapsed becomes negative!)
         self._tokens = min(3, self.burst_size)  # Small burst to get going
         self._last_refill = time.time()
+        if self._shared:
+            await asyncio.to_thread(self._shared.pause, self._rate, self._paused_until, self._tokens)
+        self._wakeup.set()
+
+    def _record_latency(self, latency: float):
+        """Add a successful request's latency to the baseline window and EWMA."""
+        self._latencies.append(latency)
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency += self._latency_alpha * (latency - self._smoothed_latency)
 
-    def _try_ramp_up(self):
+    async def _try_ramp_up(self):
         """
-        Try to increase rate if things have been smooth.
+        Adjust rate if things have been smooth (or latency says otherwise).
 
         Called on every success (while holding lock).
-        Only ramps if:
-        - Enough time since last ramp attempt
+        Only acts if:
+        - Enough time since last adjustment
         - Enough time since last 429
         - We have enough successes to be confident
-        - We haven't hit max rate
+
+        Then, by latency ratio (smoothed / baseline):
+        - Inflated → back off before the site starts throttling
+        - Rising → hold
+        - Flat (or not enough samples yet) → ramp, faster during STARTUP
         """
         now = time.time()
 
-        # Don't ramp too frequently
+        # Don't adjust too frequently
         if now - self._last_ramp_time < self._ramp_interval:
             return
 
@@ -397,19 +684,61 @@ class AdaptiveRateLimiter:
         if self._window_successes < 10:
             return
 
+        ratio = self.latency_ratio
+
+        if ratio is not None and ratio >= self._backoff_ratio:
+            old_rate = self._rate
+            self._rate = max(self.min_rate, self._rate * self._backoff_factor)
+            if self._shared:
+                self._rate = await asyncio.to_thread(
+                    self._shared.set_rate, self._rate, self._max_tokens, self._ramp_interval
+                )
+            self._congestion = CongestionState.BACKOFF
+            self._latency_backoffs += 1
+            self._last_ramp_time = now
+            self._rate_adjustments.append({
+                "time": now,
+                "old_rate": old_rate,
+                "new_rate": self._rate,
+                "latency_ratio": ratio,
+            })
+            self._log(f"[{_ts()}] [RateLimiter] Latency inflated ({ratio:.1f}x baseline): "
+                      f"{old_rate:.1f} → {self._rate:.1f} req/s")
+            self._window_start = now
+            self._window_successes = 0
+            self._window_failures = 0
+            self._wakeup.set()
+            return
+
+        if ratio is not None and ratio >= self._hold_ratio:
+            self._congestion = CongestionState.HOLD
+            return
+
+        if self._congestion != CongestionState.STARTUP:
+            self._congestion = CongestionState.CRUISE
+
         # Already at max
         if self._rate >= self.max_rate:
             return
 
         # Ramp up!
+        factor = self._startup_factor if self._congestion == CongestionState.STARTUP else self._ramp_factor
         old_rate = self._rate
         successes_at_ramp = self._window_successes
-        self._rate = min(self.max_rate, self._rate * self._ramp_factor)
+        self._rate = min(self.max_rate, self._rate * factor)
         self._max_tokens = max(self._max_tokens, self._rate)  # Grow bucket with rate
+        if self._shared:
+            # One ramp per interval per host, not per limiter
+            self._rate = await asyncio.to_thread(
+                self._shared.set_rate, self._rate, self._max_tokens, self._ramp_interval
+            )
+        self._peak_rate = max(self._peak_rate, self._rate)
         self._last_ramp_time = now
+        self._wakeup.set()
 
-        self._log(f"[{_ts()}] [RateLimiter] Ramping up: {old_rate:.1f} → {self._rate:.1f} req/s "
-                 f"({successes_at_ramp} successes, 0 rejections)")
+        latency_note = f", latency {ratio:.2f}x baseline" if ratio is not None else ""
+        self._log(f"[{_ts()}] [RateLimiter] Ramping up ({self._congestion.value}): {old_rate:.1f} → {self._rate:.1f} req/s "
+                 f"({successes_at_ramp} successes, 0 rejections{latency_note})")
 
         # Reset window to measure at new rate
         self._window_start = now
@@ -444,28 +773,110 @@ class RateLimitToken:
     async def record(
         self,
         status_code: int,
-        headers: Dict[str, str] = None
+        headers: Dict[str, str] = None,
+        latency: Optional[float] = None,
     ):
         """
         Record the outcome of this request.
 
         Args:
             status_code: HTTP status code
-            headers: Response headers (to extract Retry-After)
+            headers: Response headers (Retry-After, X-RateLimit-*, cf-mitigated)
+            latency: Measured page latency (s). Defaults to time since the
+                token was granted, which includes browser-pool wait and
+                extraction, so pass the real page latency when you have it.
         """
-        headers = headers or {}
-        latency = time.time() - self.start_time if self.start_time else 0
+        if latency is None:
+            latency = time.time() - self.start_time if self.start_time else 0
 
-        # Extract Retry-After if present
-        retry_after = None
-        if 'Retry-After' in headers:
-            try:
-                retry_after = float(headers['Retry-After'])
-            except ValueError:
-                pass
+        limits = parse_rate_limit_headers(headers)
+
+        # A Cloudflare challenge is a block, whatever the status says
+        if limits["challenged"] and status_code < 400:
+            status_code = 429
 
         await self.limiter.record_outcome(
             status_code=status_code,
             latency=latency,
-            retry_after=retry_after
+            retry_after=limits["retry_after"],
+            remaining=limits["remaining"],
+            reset_after=limits["reset_after"],
         )
+
+
+# =============================================================================
+# PER-DOMAIN RATE MEMORY
+# =============================================================================
+# Every run used to start at product_concurrency req/s and rediscover the
+# site's limit the hard way (first 429 → global pause). What we learn is kept
+# in brand_meta.json under "rate":
+#
+#   {
+#     "safe_rate": 8.4,        # last safe rate (from a 429, or the peak of a clean run)
+#     "hit_limit": true,       # safe_rate came from a real 429
+#     "pause": 2.0,            # pause that worked on this site (Retry-After or default)
+#     "hours": {"14": 6.1},    # safe rate by local hour of day (sites throttle harder at peak)
+#     "rate_limited": 3,       # 429s in the last run
+#   }
+#
+# The next run starts just below the remembered ceiling for the current hour.
+# =============================================================================
+
+# Start this fraction below a ceiling that was found by hitting a 429
+REMEMBERED_RATE_MARGIN = 0.9
+
+
+def load_rate_memory(domain: str) -> Dict[str, Any]:
+    """Rate memory from previous runs ({} if none)."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    return meta.get("rate", {})
+
+
+def remembered_start_rate(memory: Dict[str, Any], hour: Optional[int] = None) -> Optional[float]:
+    """
+    Starting rate from rate memory, or None if nothing was learned yet.
+
+    Uses the safe rate for this hour of day when there is one.
+    """
+    hour = datetime.now().hour if hour is None else hour
+    rate = memory.get("hours", {}).get(str(hour)) or memory.get("safe_rate")
+    if not rate:
+        return None
+    return rate * REMEMBERED_RATE_MARGIN if memory.get("hit_limit") else rate
+
+
+def save_rate_memory(domain: str, limiter: AdaptiveRateLimiter, memory: Dict[str, Any], hour: Optional[int] = None):
+    """
+    Merge what this run learned into the domain's rate memory.
+
+    A 429 this run sets a new ceiling. A clean run raises the safe rate to the
+    peak reached, and only keeps hit_limit if it never got past the old ceiling.
+    """
+    from stages.storage import update_brand_meta
+
+    hour = datetime.now().hour if hour is None else hour
+    stats = limiter.stats
+    hours = dict(memory.get("hours", {}))
+    learned = stats["learned_rate"]
+
+    if learned:
+        safe_rate, hit_limit = learned, True
+    else:
+        previous = memory.get("safe_rate") or 0
+        safe_rate = max(previous, stats["peak_rate"])
+        hit_limit = bool(memory.get("hit_limit")) and safe_rate <= previous
+
+    if learned or str(hour) not in hours or safe_rate > hours[str(hour)]:
+        hours[str(hour)] = round(safe_rate, 2)
+
+    pause = stats["max_pause"] or memory.get("pause", limiter.default_pause)
+
+    update_brand_meta(domain, "rate", {
+        "safe_rate": round(safe_rate, 2),
+        "hit_limit": hit_limit,
+        "pause": pause,
+        "hours": hours,
+        "rate_limited": stats["total_rate_limited"],
+    })
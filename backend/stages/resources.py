@@ -0,0 +1,102 @@
+"""
+Host resource readings for concurrency decisions.
+
+Stdlib only (no psutil):
+    - Available RAM from /proc/meminfo (Linux) or sysconf
+    - CPU busy share over an interval from /proc/stat deltas (Linux) -
+      callers deciding every few seconds measure their own window
+    - CPU load as 1-minute load average per core, when /proc/stat isn't there
+
+Both return None when the platform doesn't expose them; callers treat
+None as "no constraint".
+"""
+
+import os
+from typing import Optional, Tuple
+
+
+# Approximate RAM per headless Chromium with one product page open
+# (benchmark_browsers.py: 10 browsers ≈ 1.5GB)
+BROWSER_MEMORY_MB = 150
+
+# RAM kept free for the OS, Python and everything else
+MEMORY_RESERVE_MB = 1024
+
+# Above this load per core, don't add browsers
+CPU_BUDGET = 0.85
+
+
+def available_memory_mb() -> Optional[float]:
+    """Memory available for new processes, in MB."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def cpu_load() -> Optional[float]:
+    """1-minute load average divided by core count (1.0 = all cores busy)."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (OSError, AttributeError):
+        return None
+
+
+def cpu_times() -> Optional[Tuple[int, int]]:
+    """(busy, total) CPU time of all cores so far, in clock ticks (Linux /proc/stat)."""
+    try:
+        with open("/proc/stat") as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    if len(fields) < 5 or fields[0] != "cpu":
+        return None
+    # user nice system idle iowait irq softirq steal (guest time is already in user)
+    ticks = [int(value) for value in fields[1:9]]
+    idle = ticks[3] + (ticks[4] if len(ticks) > 4 else 0)
+    return sum(ticks) - idle, sum(ticks)
+
+
+def cpu_busy(since: Optional[Tuple[int, int]]) -> Optional[float]:
+    """Share of CPU time spent busy since a cpu_times() reading (1.0 = all cores busy)."""
+    now = cpu_times()
+    if since is None or now is None or now[1] <= since[1]:
+        return None
+    return (now[0] - since[0]) / (now[1] - since[1])
+
+
+def affordable_browsers(reserve_mb: float = MEMORY_RESERVE_MB) -> Optional[int]:
+    """How many more browsers fit in free RAM (None if unknown)."""
+    available = available_memory_mb()
+    if available is None:
+        return None
+    return max(0, int((available - reserve_mb) // BROWSER_MEMORY_MB))
+
+
+def over_budget(cpu_since: Optional[Tuple[int, int]] = None) -> Optional[str]:
+    """
+    Reason the host is over its CPU/RAM budget, or None if fine.
+
+    With `cpu_since` (a cpu_times() reading), CPU is judged on the time since
+    then - not on the 1-minute load average, which still carries load from
+    before the caller's last change.
+    """
+    busy = cpu_busy(cpu_since)
+    if busy is not None:
+        if busy > CPU_BUDGET:
+            return f"CPU {busy:.0%} busy"
+    else:
+        load = cpu_load()
+        if load is not None and load > CPU_BUDGET:
+            return f"CPU load {load:.2f}/core"
+    available = available_memory_mb()
+    if available is not None and available < MEMORY_RESERVE_MB:
+        return f"{available:.0f}MB RAM free"
+    return None
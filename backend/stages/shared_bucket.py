@@ -0,0 +1,259 @@
+"""
+Shared Token Bucket - One rate limit per target host, across processes.
+
+THE PROBLEM:
+    Every AdaptiveRateLimiter has its own bucket. Two pipelines scraping the
+    same site (or a rescrape started while another is running) each send at
+    "their" rate, together exceed the site's limit, and both get a cascade
+    of 429s. A 429 seen by one never pauses the other.
+
+THE SOLUTION:
+    Keep the bucket for each host in a small SQLite database that every
+    limiter on the machine consults:
+
+    ┌──────────────┐   ┌──────────────┐   ┌──────────────┐
+    │  Pipeline A  │   │  Pipeline B  │   │  Worker C    │
+    │  (limiter)   │   │  (limiter)   │   │  (limiter)   │
+    └──────┬───────┘   └──────┬───────┘   └──────┬───────┘
+           └──────────────────┼──────────────────┘
+                              ▼
+                 rate_buckets.sqlite  (row per host)
+                 tokens · rate · paused_until · window
+
+    - Tokens are leased from the shared row in small batches (BEGIN IMMEDIATE
+      = one writer at a time) and handed out locally, so the database is
+      written once per lease, not once per request - and off the event loop
+    - A 429 writes paused_until → every limiter sees the pause on its next lease
+    - The first limiter to see a 429 measures the shared window and sets the
+      new rate; others arriving during the pause adopt it instead of cutting again
+    - Ramp-ups are rate-limited per host, so N limiters don't ramp N times faster
+
+    Rows idle for longer than STALE_AFTER are reset by the next limiter that
+    joins, so a finished run's state doesn't leak into the next one. A row
+    that disappears under a running limiter (database deleted or reset) is
+    re-created from the limiter's join arguments.
+
+    SQLite locking needs a local filesystem; it does not span machines.
+
+USAGE:
+    bucket = SharedTokenBucket("kuurth.com")
+    limiter = AdaptiveRateLimiter(initial_rate=10, shared=bucket)
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+# Default location, next to the per-domain extraction folders
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "extractions" / "rate_buckets.sqlite"
+
+# A host row untouched for this long belongs to a finished run
+STALE_AFTER = 60.0
+
+
+class SharedTokenBucket:
+    """
+    Token bucket for one host, stored in SQLite and shared by all limiters.
+
+    Args:
+        host: Target host (e.g. "kuurth.com") - the bucket key
+        db_path: SQLite file (default: extractions/rate_buckets.sqlite)
+    """
+
+    def __init__(self, host: str, db_path: Optional[Path] = None):
+        self.host = host
+        self.db_path = Path(db_path or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Every call runs in a worker thread - one transaction at a time
+        self._lock = threading.Lock()
+
+        # (rate, tokens, max_tokens) from join() - re-creates a missing row
+        self._join_args: Optional[Tuple[float, float, float]] = None
+
+        # Autocommit mode; every operation opens its own IMMEDIATE transaction
+        self._conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                max_tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                last_refill REAL NOT NULL,
+                paused_until REAL,
+                window_start REAL NOT NULL,
+                window_successes INTEGER NOT NULL DEFAULT 0,
+                rate_changed REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def _row(self) -> Optional[dict]:
+        cur = self._conn.execute(
+            "SELECT tokens, max_tokens, rate, last_refill, paused_until, window_start, "
+            "window_successes, rate_changed, updated FROM buckets WHERE host = ?",
+            (self.host,),
+        )
+        row = cur.fetchone()
+        if not row:
+            return None
+        keys = ["tokens", "max_tokens", "rate", "last_refill", "paused_until", "window_start",
+                "window_successes", "rate_changed", "updated"]
+        return dict(zip(keys, row))
+
+    def _new_row(self, now: float, rate: float, tokens: float, max_tokens: float) -> dict:
+        return {
+            "tokens": tokens, "max_tokens": max_tokens, "rate": rate, "last_refill": now,
+            "paused_until": None, "window_start": now, "window_successes": 0, "rate_changed": now,
+        }
+
+    def _joined_row(self, now: float) -> dict:
+        """The host row, re-joined with the original join() arguments if it went missing."""
+        row = self._row()
+        if row is None:
+            if self._join_args is None:
+                raise RuntimeError(f"SharedTokenBucket for {self.host} used before join()")
+            row = self._new_row(now, *self._join_args)
+        return row
+
+    def _write(self, row: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO buckets (host, tokens, max_tokens, rate, last_refill, paused_until, "
+            "window_start, window_successes, rate_changed, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self.host, row["tokens"], row["max_tokens"], row["rate"], row["last_refill"], row["paused_until"],
+             row["window_start"], row["window_successes"], row["rate_changed"], time.time()),
+        )
+
+    def join(self, rate: float, tokens: float, max_tokens: float) -> float:
+        """
+        Register a limiter. Creates (or resets a stale) host row.
+
+        Returns the shared rate - the joining limiter should adopt it.
+        """
+        now = time.time()
+        with self._lock:
+            self._join_args = (rate, tokens, max_tokens)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._row()
+                if not row or now - row["updated"] > STALE_AFTER:
+                    row = self._new_row(now, rate, tokens, max_tokens)
+                else:
+                    row["max_tokens"] = max(row["max_tokens"], max_tokens)
+                self._write(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row["rate"]
+
+    def take(self, now: float, count: int = 1, successes: int = 0) -> Tuple[int, float, float, Optional[float]]:
+        """
+        Lease up to `count` tokens - as many as are available, even if
+        that is fewer than asked for.
+
+        Args:
+            now: Current time (time.time())
+            count: Tokens wanted
+            successes: Successes counted locally since the last take, added
+                to the shared measurement window in the same transaction
+
+        Returns:
+            (granted, delay, rate, paused_until) - when nothing was granted,
+            delay is the seconds until the next token (or the pause's end)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._joined_row(now)
+                row["window_successes"] += successes
+                granted, delay = 0, 0.0
+                paused_until = row["paused_until"]
+                if paused_until and paused_until > now:
+                    delay = paused_until - now
+                else:
+                    if paused_until:
+                        # No tokens accrue during a pause
+                        row["last_refill"] = max(row["last_refill"], paused_until)
+                        row["paused_until"] = paused_until = None
+                    elapsed = max(0.0, now - row["last_refill"])
+                    row["tokens"] = min(row["max_tokens"], row["tokens"] + elapsed * row["rate"])
+                    row["last_refill"] = now
+                    granted = min(count, int(row["tokens"]))
+                    row["tokens"] -= granted
+                    if not granted:
+                        # Come back for the first token; the next take leases whatever has accrued
+                        delay = (1.0 - row["tokens"]) / row["rate"]
+                self._write(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return granted, delay, row["rate"], paused_until
+
+    def record_successes(self, count: int):
+        """Add successes to the shared measurement window."""
+        if count <= 0:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE buckets SET window_successes = window_successes + ?, updated = ? WHERE host = ?",
+                (count, time.time(), self.host),
+            )
+
+    def window(self) -> Tuple[float, int, Optional[float], float]:
+        """Shared (window_start, window_successes, paused_until, rate)."""
+        with self._lock:
+            row = self._joined_row(time.time())
+        return row["window_start"], row["window_successes"], row["paused_until"], row["rate"]
+
+    def pause(self, rate: float, paused_until: float, tokens: float):
+        """Publish a 429: pause every limiter, set the new rate, restart the window."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._joined_row(now)
+                row["rate"] = rate
+                row["paused_until"] = max(paused_until, row["paused_until"] or 0)
+                row["tokens"] = tokens
+                row["last_refill"] = now
+                row["window_start"] = now
+                row["window_successes"] = 0
+                row["rate_changed"] = now
+                self._write(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def set_rate(self, rate: float, max_tokens: float, min_interval: float) -> float:
+        """
+        Publish a rate change unless another limiter changed it within
+        `min_interval` seconds. Returns the rate now in effect.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._joined_row(now)
+                if now - row["rate_changed"] >= min_interval:
+                    row["rate"] = rate
+                    row["max_tokens"] = max(row["max_tokens"], max_tokens)
+                    row["window_start"] = now
+                    row["window_successes"] = 0
+                    row["rate_changed"] = now
+                    self._write(row)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row["rate"]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
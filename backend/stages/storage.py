@@ -4,8 +4,14 @@ Storage utilities for pipeline stages.
 Handles save/load operations and path management.
 """
 
+import fcntl
 import json
+import os
 import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlparse
 from typing import Optional
@@ -325,17 +331,62 @@ def save_product(domain: str, product: dict, category_path: str, source_url: str
 # Brand Metadata (for caching nav method, etc.)
 # ============================================================
 
+# Serializes brand_meta.json read-modify-writes between threads (the file lock covers processes)
+_brand_meta_lock = threading.Lock()
+
+
+@contextmanager
+def _brand_meta_locked(domain: str):
+    """Hold the domain's brand_meta lock - this process's threads and other processes."""
+    lock_path = ensure_domain_dir(domain) / ".brand_meta.lock"
+    with _brand_meta_lock, open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
 def save_brand_meta(domain: str, meta: dict):
-    """Save brand metadata (nav method, fingerprint, etc.)."""
+    """
+    Save brand metadata (nav method, fingerprint, etc.).
+
+    Written to a temp file in the same directory and renamed over the old
+    one, so a crash mid-write never leaves a truncated brand_meta.json.
+    """
     domain_dir = ensure_domain_dir(domain)
     meta_path = domain_dir / "brand_meta.json"
 
-    with open(meta_path, 'w') as f:
-        json.dump(meta, f, indent=2)
+    fd, tmp_path = tempfile.mkstemp(dir=domain_dir, prefix=".brand_meta.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, meta_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
     return meta_path
 
 
+def update_brand_meta(domain: str, section: str, values: dict):
+    """
+    Merge `values` into one section of brand_meta.json.
+
+    Other sections (nav, products, ...) are written by different stages,
+    so each stage only touches its own keys. The read-modify-write holds
+    the brand_meta lock, so concurrent writers never drop each other's keys.
+    """
+    with _brand_meta_locked(domain):
+        meta = load_brand_meta(domain) or {}
+        meta.setdefault(section, {}).update(values)
+        meta["last_updated"] = datetime.now().isoformat()
+        return save_brand_meta(domain, meta)
+
+
 def load_brand_meta(domain: str) -> Optional[dict]:
     """Load brand metadata."""
     domain_dir = get_domain_dir(domain)
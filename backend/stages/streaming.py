@@ -1,7 +1,7 @@
 """
 Streaming Pipeline Orchestrator
 
-Bridges URL extraction (ThreadPoolExecutor) with Product extraction (asyncio)
+Bridges URL extraction (pooled, own event loop) with Product extraction (asyncio)
 for streaming pipeline execution. Products start extracting as soon as URLs
 become available, rather than waiting for all URL extraction to complete.
 """
@@ -15,13 +15,16 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional, Set, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent))  # stages/
 sys.path.insert(0, str(Path(__file__).parent.parent / "scraper"))
 sys.path.insert(0, str(Path(__file__).parent.parent / "prod_page_v2"))
 
+# Discovery sample: 1 discovery URL + up to 5 verification URLs, taken from
+# whatever category arrives first. Discovery starts as soon as 2 are available.
+MIN_DISCOVERY_URLS = 2
+DISCOVERY_SAMPLE_SIZE = 6
 
 @dataclass
 class URLBatch:
@@ -76,7 +79,7 @@ class StreamingOrchestrator:
             urls_tree: URLs tree from Stage 2 (urls.json content) - uses existing URLs
                        Provide either nav_tree OR urls_tree, not both.
             max_url_workers: Max parallel URL extraction workers (only used with nav_tree)
-            product_concurrency: Max concurrent product extractions
+            product_concurrency: Starting concurrent product extractions (autotuned during the run)
             product_callback: Optional callable(product_dict, category_path) called after each product is saved
         """
         if not nav_tree and not urls_tree:
@@ -88,6 +91,10 @@ class StreamingOrchestrator:
         self.skip_url_extraction = urls_tree is not None
         self.max_url_workers = max_url_workers
         self.product_concurrency = product_concurrency
+
+        # One browser budget for stage 2 and stage 3 (they run at the same time)
+        from stages.governor import ResourceGovernor
+        self.governor = ResourceGovernor(url_workers=max_url_workers)
         self.product_callback = product_callback
 
         # Shared queue (thread-safe)
@@ -151,6 +158,9 @@ class StreamingOrchestrator:
                 self.errors.append(f"URL producer error: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            # Stage 2's browser share goes to stage 3
+            self.governor.urls_done()
 
         # Wait for consumer to finish
         consumer_thread.join(timeout=600)  # 10 min timeout
@@ -187,9 +197,12 @@ class StreamingOrchestrator:
         """
         Extract URLs from categories and feed them to the queue.
 
-        Runs in main thread with ThreadPoolExecutor for parallel category extraction.
+        Runs in main thread; categories extract concurrently on a shared browser pool.
         """
-        from stages.urls import get_leaf_categories_with_stats, extract_urls_from_category, clean_redundant_parent_urls, dedupe_urls_by_path
+        from stages.urls import (
+            get_leaf_categories_with_stats, extract_categories_pooled, clean_redundant_parent_urls, dedupe_urls_by_path,
+            attach_popup_playbook, save_popup_playbook, attach_lineage_memory, save_lineage_memory,
+        )
         from stages.storage import ensure_domain_dir
         from stages.metrics import update_stage_metrics, calculate_cost, set_current_stage, get_stage_metrics_from_tracker
         from scraper.llm_handler import LLMHandler
@@ -226,98 +239,91 @@ class StreamingOrchestrator:
         # Create brand instance for shared state (lineage caching)
         domain_with_dots = self.domain.replace('_', '.')
         brand = Brand(url=f"https://{domain_with_dots}/")
+        attach_popup_playbook(brand, self.domain)
+        attach_lineage_memory(brand, self.domain)
 
         # Track dedup stats and raw URLs
         all_raw_urls = []
         dedup_stats = {"total_raw": 0, "total_deduped": 0, "total_removed": 0}
 
         # Track discovery phase
-        discovery_needed = 2
         discovery_lock = threading.Lock()
 
-        with ThreadPoolExecutor(max_workers=self.max_url_workers) as executor:
-            futures = {
-                executor.submit(
-                    extract_urls_from_category,
-                    leaf["url"],
-                    leaf["name"],
-                    brand
-                ): leaf
-                for leaf in leaves
-            }
+        # All categories share one browser pool; each page load also holds a governor slot
+        completed = 0
+        for leaf, result in extract_categories_pooled(
+            leaves, brand, workers=self.max_url_workers, governor=self.governor
+        ):
+            completed += 1
 
-            completed = 0
-            for future in as_completed(futures):
-                leaf = futures[future]
-                completed += 1
+            try:
+                raw_urls = result.get("urls", [])
+
+                if not raw_urls:
+                    print(f"  [{completed}/{len(leaves)}] {leaf['name']}: 0 URLs")
+                    continue
+
+                # Track raw URLs for full_urls.txt
+                all_raw_urls.extend(raw_urls)
+
+                # Dedupe URLs by path (removes color variants, etc.)
+                urls, raw_count, removed_count = dedupe_urls_by_path(raw_urls)
+                dedup_stats["total_raw"] += raw_count
+                dedup_stats["total_deduped"] += len(urls)
+                dedup_stats["total_removed"] += removed_count
+
+                dedup_note = f" (deduped from {raw_count})" if removed_count > 0 else ""
+                print(f"  [{completed}/{len(leaves)}] {leaf['name']}: {len(urls)} URLs{dedup_note}")
+
+                # Convert path to filesystem-safe format
+                # Fix doubled nav names ("Best sellers Best sellers" → "Best sellers")
+                path_parts = leaf["path"].split("/")
+                clean_parts = []
+                for part in path_parts:
+                    words = part.split()
+                    half = len(words) // 2
+                    if half > 0 and words[:half] == words[half:]:
+                        part = " ".join(words[:half])
+                    clean_parts.append(part)
+                category_path = "/".join(clean_parts).lower().replace(" ", "-")
+                category_path = ''.join(c for c in category_path if c.isalnum() or c in '-/')
+
+                # Discovery phase: sample up to DISCOVERY_SAMPLE_SIZE URLs
+                with discovery_lock:
+                    if not self.discovery_complete.is_set():
+                        for url in urls[:DISCOVERY_SAMPLE_SIZE - len(self.discovery_urls)]:
+                            self.discovery_urls.append((url, category_path))
+
+                        if len(self.discovery_urls) >= MIN_DISCOVERY_URLS:
+                            print(f"\n[Discovery] Got {len(self.discovery_urls)} URLs for discovery")
+                            self.discovery_complete.set()
 
-                try:
-                    result = future.result()
-                    raw_urls = result.get("urls", [])
+                # Put batch in queue
+                batch = URLBatch(
+                    urls=urls,
+                    category_path=category_path,
+                    category_name=leaf["name"],
+                    category_url=leaf["url"]
+                )
+                self.url_queue.put(batch)
 
-                    if not raw_urls:
-                        print(f"  [{completed}/{len(leaves)}] {leaf['name']}: 0 URLs")
-                        continue
+                with self._stats_lock:
+                    self.urls_produced += len(urls)
+                    # Track URLs for urls.json
+                    self.category_urls[category_path] = {
+                        "name": leaf["name"],
+                        "url": leaf["url"],
+                        "path": leaf["path"],
+                        "products": urls
+                    }
+
+            except Exception as e:
+                print(f"  [{completed}/{len(leaves)}] {leaf['name']}: ERROR - {e}")
+                with self._stats_lock:
+                    self.errors.append(f"Category {leaf['name']}: {e}")
 
-                    # Track raw URLs for full_urls.txt
-                    all_raw_urls.extend(raw_urls)
-
-                    # Dedupe URLs by path (removes color variants, etc.)
-                    urls, raw_count, removed_count = dedupe_urls_by_path(raw_urls)
-                    dedup_stats["total_raw"] += raw_count
-                    dedup_stats["total_deduped"] += len(urls)
-                    dedup_stats["total_removed"] += removed_count
-
-                    dedup_note = f" (deduped from {raw_count})" if removed_count > 0 else ""
-                    print(f"  [{completed}/{len(leaves)}] {leaf['name']}: {len(urls)} URLs{dedup_note}")
-
-                    # Convert path to filesystem-safe format
-                    # Fix doubled nav names ("Best sellers Best sellers" → "Best sellers")
-                    path_parts = leaf["path"].split("/")
-                    clean_parts = []
-                    for part in path_parts:
-                        words = part.split()
-                        half = len(words) // 2
-                        if half > 0 and words[:half] == words[half:]:
-                            part = " ".join(words[:half])
-                        clean_parts.append(part)
-                    category_path = "/".join(clean_parts).lower().replace(" ", "-")
-                    category_path = ''.join(c for c in category_path if c.isalnum() or c in '-/')
-
-                    # Discovery phase: collect first 2 URLs
-                    with discovery_lock:
-                        if len(self.discovery_urls) < discovery_needed:
-                            for url in urls:
-                                if len(self.discovery_urls) < discovery_needed:
-                                    self.discovery_urls.append((url, category_path))
-
-                            if len(self.discovery_urls) >= discovery_needed:
-                                print(f"\n[Discovery] Got {len(self.discovery_urls)} URLs for discovery")
-                                self.discovery_complete.set()
-
-                    # Put batch in queue
-                    batch = URLBatch(
-                        urls=urls,
-                        category_path=category_path,
-                        category_name=leaf["name"],
-                        category_url=leaf["url"]
-                    )
-                    self.url_queue.put(batch)
-
-                    with self._stats_lock:
-                        self.urls_produced += len(urls)
-                        # Track URLs for urls.json
-                        self.category_urls[category_path] = {
-                            "name": leaf["name"],
-                            "url": leaf["url"],
-                            "path": leaf["path"],
-                            "products": urls
-                        }
-
-                except Exception as e:
-                    print(f"  [{completed}/{len(leaves)}] {leaf['name']}: ERROR - {e}")
-                    with self._stats_lock:
-                        self.errors.append(f"Category {leaf['name']}: {e}")
+        save_popup_playbook(brand, self.domain)
+        save_lineage_memory(brand, self.domain)
 
         # Save full_urls.txt (all raw URLs before dedup)
         domain_dir = ensure_domain_dir(self.domain)
@@ -424,14 +430,12 @@ class StreamingOrchestrator:
             category_path = ''.join(c for c in category_path if c.isalnum() or c in '-/')
 
             if products:
-                # Discovery phase: collect first 2 URLs
-                discovery_needed = 2
-                if len(self.discovery_urls) < discovery_needed:
-                    for prod_url in products:
-                        if len(self.discovery_urls) < discovery_needed:
-                            self.discovery_urls.append((prod_url, category_path))
-
-                    if len(self.discovery_urls) >= discovery_needed:
+                # Discovery phase: sample up to DISCOVERY_SAMPLE_SIZE URLs
+                if not self.discovery_complete.is_set():
+                    for prod_url in products[:DISCOVERY_SAMPLE_SIZE - len(self.discovery_urls)]:
+                        self.discovery_urls.append((prod_url, category_path))
+
+                    if len(self.discovery_urls) >= MIN_DISCOVERY_URLS:
                         print(f"\n[Discovery] Got {len(self.discovery_urls)} URLs for discovery")
                         self.discovery_complete.set()
 
@@ -508,8 +512,13 @@ class StreamingOrchestrator:
         """
         from prod_page_v2.extractor import ProductExtractor
         from prod_page_v2.browser_pool import BrowserPool
+        from navigation.popup_playbook import load_saved_playbook
         from stages.storage import save_product
-        from stages.rate_limiter import AdaptiveRateLimiter
+        from stages.rate_limiter import AdaptiveRateLimiter, load_rate_memory, remembered_start_rate, save_rate_memory
+        from stages.shared_bucket import SharedTokenBucket
+        from stages.concurrency_tuner import ConcurrencyTuner, TUNER_MAX_CONCURRENCY, load_saved_concurrency
+        from stages.resources import affordable_browsers
+        from stages.wait_controller import WaitTimeController, load_saved_wait
         from stages.dashboard import Dashboard
         from stages.metrics import update_stage_metrics, calculate_cost, set_current_stage, get_stage_metrics_from_tracker
         from scraper.llm_handler import LLMHandler
@@ -521,11 +530,11 @@ class StreamingOrchestrator:
 
         print("[Product Consumer] Waiting for discovery URLs...")
 
-        # Wait for discovery phase (first 2 URLs)
+        # Wait for discovery phase (first sampled URLs)
         while not self.discovery_complete.is_set():
             await asyncio.sleep(0.01)
 
-        if len(self.discovery_urls) < 2:
+        if len(self.discovery_urls) < MIN_DISCOVERY_URLS:
             print("[Product Consumer] Not enough URLs for discovery, exiting")
             return
 
@@ -543,13 +552,21 @@ class StreamingOrchestrator:
                 self.errors.append("Discovery failed")
             return
 
-        print(f"[Product Consumer] Discovery complete. Calibrating wait time...")
-
-        # Calibrate wait time: find minimum ms that still extracts correctly
-        # This runs ONCE per domain and saves seconds per page for the entire run
+        # Starting wait time: reuse the wait learned on the last run, otherwise
+        # calibrate on one URL (minimum ms that still extracts correctly).
+        # WaitTimeController keeps adjusting it from live outcomes during the run.
         calibration_url = discovery_url_list[0]
-        optimal_wait = await extractor.calibrate_wait_time(calibration_url, self.config)
-        print(f"[Product Consumer] Optimal wait time: {optimal_wait}ms")
+        saved_wait = load_saved_wait(self.domain)
+        if saved_wait:
+            optimal_wait = saved_wait
+            wait_source = "saved"
+            print(f"[Product Consumer] Discovery complete. Using saved wait time: {optimal_wait}ms")
+        else:
+            print(f"[Product Consumer] Discovery complete. Calibrating wait time...")
+            optimal_wait = await extractor.calibrate_wait_time(calibration_url, self.config)
+            wait_source = "calibrated"
+            print(f"[Product Consumer] Optimal wait time: {optimal_wait}ms")
+        wait_controller = WaitTimeController(initial_wait=optimal_wait, quiet=True)
 
         # Discover gallery selector: LLM finds CSS selector for image carousel
         # One LLM call, then pure DOM queries for all products
@@ -571,14 +588,25 @@ class StreamingOrchestrator:
         # - Pages created/destroyed per request (prevents memory leaks)
         # - Browsers recycled every N pages (resets accumulated garbage)
         #
-        # Pool size should be >= rate limiter's max concurrency
-        # (otherwise pool becomes the bottleneck, not rate limiting)
+        # The pool starts at the concurrency settled on last run (or
+        # product_concurrency) and ConcurrencyTuner resizes it online, up to
+        # what free RAM allows.
         # =================================================================
-        pool_size = min(15, self.product_concurrency)  # Don't need more browsers than concurrency
+        saved_concurrency = load_saved_concurrency(self.domain)
+        pool_size = saved_concurrency or min(15, self.product_concurrency)
+        affordable = affordable_browsers()
+        max_concurrency = TUNER_MAX_CONCURRENCY if affordable is None else min(TUNER_MAX_CONCURRENCY, affordable)
+        pool_size = max(2, min(pool_size, max_concurrency))
+        pool_size = self.governor.request_product_browsers(pool_size)  # Stage 2 may be holding part of the budget
+        tuner = ConcurrencyTuner(
+            initial=pool_size, max_limit=max(pool_size, max_concurrency),
+            governor=self.governor, quiet=True,
+        )
         browser_pool = BrowserPool(
             size=pool_size,
             pages_per_recycle=50,  # Restart browser every 50 pages to prevent memory leaks
-            headless=True
+            headless=True,
+            playbook=load_saved_playbook(self.domain),  # Popups learned in Stages 1-2 never render
         )
 
         # =================================================================
@@ -589,41 +617,40 @@ class StreamingOrchestrator:
         # - On ANY 429: pauses ALL workers, calculates actual rate
         # - Resumes at calculated safe rate
         # - No wasted 429s from independent learning
+        # - Starts just below the rate learned on previous runs (if any)
+        # - Bucket is shared per host with any other pipeline scraping the
+        #   same site (their 429s pause us too)
         # =================================================================
+        rate_memory = load_rate_memory(self.domain)
+        remembered_rate = remembered_start_rate(rate_memory)
         rate_limiter = AdaptiveRateLimiter(
-            initial_rate=float(self.product_concurrency),  # Start at N req/s
+            initial_rate=min(50.0, max(2.0, remembered_rate or float(self.product_concurrency))),  # Start at N req/s
             max_rate=50.0,
             min_rate=2.0,  # Don't go below 2 req/s (prevents worker starvation)
             burst_size=pool_size,  # Allow all workers to start after pause
             quiet=True,  # Dashboard handles display
+            default_pause=rate_memory.get("pause", 1.0),
+            slow_start=remembered_rate is None,
+            shared=SharedTokenBucket(domain_with_dots),
         )
 
         # These print before dashboard starts — keep them
-        print(f"[Product Consumer] Browser pool: {pool_size} browsers")
-        print(f"[Product Consumer] Rate limiter: starting at {rate_limiter.rate:.1f} req/s")
-        print(f"[Product Consumer] Wait time: {optimal_wait}ms (calibrated)")
+        concurrency_source = "saved" if saved_concurrency else "default"
+        print(f"[Product Consumer] Browser pool: {pool_size} browsers ({concurrency_source}, autotuned up to {tuner.max_limit})")
+        rate_source = "remembered" if remembered_rate else "default"
+        print(f"[Product Consumer] Rate limiter: starting at {rate_limiter.rate:.1f} req/s ({rate_source})")
+        print(f"[Product Consumer] Wait time: {wait_controller.wait_ms}ms ({wait_source}, adjusts online)")
         print(f"[Product Consumer] Dashboard active — noisy logs suppressed")
 
         # Start browser pool
         await browser_pool.start()
+        tuner_task = asyncio.create_task(tuner.run(browser_pool))
 
         try:
-            # Extract and save discovery products (not using pool yet - these were already loaded)
-            for url, category_path in self.discovery_urls:
-                result = await extractor.extract_single(url, self.config)
-                with self._stats_lock:
-                    self.products_extracted += 1
-                if result.success and result.product:
-                    product_dict = self._product_to_dict(result.product, url)
-                    save_product(self.domain, product_dict, category_path, source_url=url)
-                    if self.product_callback:
-                        self.product_callback(product_dict, category_path, "")
-                    with self._stats_lock:
-                        self.products_successful += 1
-                processed_urls.add(url)
-
+            # Discovery products are not re-extracted here one by one: they are in
+            # the queued batches and go through the pool like every other URL.
             discovery_end_time = time.time()
-            print(f"[Product Consumer] Discovery products saved. Processing queue...")
+            print(f"[Product Consumer] Discovery complete. Processing queue...")
 
             pending_tasks: Set[asyncio.Task] = set()
             MAX_RETRIES = 3  # Retry configuration
@@ -646,6 +673,9 @@ class StreamingOrchestrator:
                 progress=progress,
                 rate_limiter=rate_limiter,
                 browser_pool=browser_pool,
+                wait_controller=wait_controller,
+                tuner=tuner,
+                governor=self.governor,
             )
             dashboard_task = asyncio.create_task(dashboard.run())
 
@@ -656,9 +686,9 @@ class StreamingOrchestrator:
                 progress["last_log_completed"] = progress["completed"]
 
             # Wait time escalation for retries:
-            # attempt 0 → calibrated wait (e.g. 500ms)
-            # attempt 1 → 2x calibrated (e.g. 1000ms)
-            # attempt 2 → 4x calibrated, capped at 5000ms
+            # attempt 0 → controller's current wait (e.g. 500ms)
+            # attempt 1 → 2x current (e.g. 1000ms)
+            # attempt 2 → 4x current, capped at 5000ms
             RETRY_WAIT_MULTIPLIERS = [1, 2, 4]
 
             # Track extracted product slugs to skip duplicates across categories
@@ -688,35 +718,52 @@ class StreamingOrchestrator:
 
                 progress["in_flight"] += 1
 
+                rate_limited = False  # Last attempt paused the limiter (429 / 503 + Retry-After)
+
                 for attempt in range(max_retries):
-                    # Backoff before retry (not on first attempt)
+                    # Backoff before retry (not on first attempt). After a 429/503 the
+                    # rate limiter is already paused for as long as the server asked,
+                    # so don't add a fixed backoff on top.
                     if attempt > 0:
-                        backoff = 2 ** (attempt - 1)  # 1s, 2s for attempts 2, 3
-                        await asyncio.sleep(backoff)
+                        if not rate_limited:
+                            backoff = 2 ** (attempt - 1)  # 1s, 2s for attempts 2, 3
+                            await asyncio.sleep(backoff)
                         with self._stats_lock:
                             self.products_retried += 1
 
                     # Escalate wait time on retries
                     multiplier = RETRY_WAIT_MULTIPLIERS[min(attempt, len(RETRY_WAIT_MULTIPLIERS) - 1)]
-                    attempt_wait = min(optimal_wait * multiplier, 5000)
+                    attempt_wait = min(wait_controller.wait_ms * multiplier, 5000)
 
                     async with await rate_limiter.acquire() as token:
                         try:
                             async with browser_pool.acquire() as page:
+                                slot_start = time.time()
                                 result = await extractor.extract_single_pooled(
                                     url, page, self.config,
                                     wait_time=attempt_wait,
                                     gallery_selector=gallery_selector,
                                 )
+                                tuner.record(time.time() - slot_start)
 
                             # Fix 4: Use real HTTP status for rate limiter
                             actual_status = result.status_code or 200
+                            rate_limited = actual_status == 429 or (
+                                actual_status == 503 and any(k.lower() == "retry-after" for k in result.headers)
+                            )
+
+                            # Only first attempts tell us about the base wait
+                            if attempt == 0:
+                                wait_controller.record(
+                                    attempt_wait, result.success and bool(result.product),
+                                    result.error, result.status_code or 0,
+                                )
 
                             # Check if extraction succeeded
                             if result.success and result.product:
                                 # SUCCESS — mark slug as seen so we skip duplicates
                                 seen_product_slugs.add(slug)
-                                await token.record(actual_status)
+                                await token.record(actual_status, headers=result.headers, latency=result.latency)
 
                                 with self._stats_lock:
                                     self.products_extracted += 1
@@ -739,9 +786,10 @@ class StreamingOrchestrator:
                                 last_error = result.error or "No product extracted"
                                 # If error mentions rate limit, tell the rate limiter
                                 if last_error and "rate" in last_error.lower():
-                                    await token.record(429)
+                                    rate_limited = True
+                                    await token.record(429, headers=result.headers, latency=result.latency)
                                 else:
-                                    await token.record(actual_status if actual_status >= 400 else 500)
+                                    await token.record(actual_status if actual_status >= 400 else 500, headers=result.headers, latency=result.latency)
                                 # Continue to retry
 
                         except Exception as e:
@@ -818,6 +866,9 @@ class StreamingOrchestrator:
                 done_tasks = {t for t in pending_tasks if t.done()}
                 pending_tasks -= done_tasks
 
+                # Deep backlog → governor shifts browsers from stage 2 to stage 3
+                self.governor.report_backlog(progress["total_queued"] - progress["completed"])
+
                 # Let other tasks run
                 if pending_tasks or not queue_exhausted:
                     await asyncio.sleep(0.01)
@@ -833,16 +884,30 @@ class StreamingOrchestrator:
             # Always shut down browser pool, even if extraction failed.
             # This closes all browser processes and frees memory.
             # =================================================================
-            await browser_pool.shutdown()
-            dashboard.stop()
+            tuner.stop()
             try:
-                await dashboard_task
-            except Exception:
-                pass  # Dashboard errors shouldn't block metrics/cleanup
+                await tuner_task
+            except Exception as e:
+                print(f"[Product Consumer] Concurrency tuner failed: {e}")
+            finally:
+                try:
+                    await browser_pool.shutdown()
+                finally:
+                    dashboard.stop()
+                    try:
+                        await dashboard_task
+                    except Exception:
+                        pass  # Dashboard errors shouldn't block metrics/cleanup
 
         # Print final stats
         rate_stats = rate_limiter.stats
         pool_stats = browser_pool.stats
+        wait_stats = wait_controller.stats
+        wait_controller.save(self.domain)
+        tuner_stats = tuner.stats
+        tuner.save(self.domain)
+        save_rate_memory(self.domain, rate_limiter, rate_memory)
+        rate_limiter.close()
         failed_count = self.products_extracted - self.products_successful
 
         print(f"\n[Product Consumer] Complete!")
@@ -852,7 +917,13 @@ class StreamingOrchestrator:
         if self.products_retried > 0:
             print(f"    Retries: {self.products_retried} total retry attempts")
         print(f"    Rate limiter: final rate {rate_stats['rate']:.1f} req/s, {rate_stats['total_rate_limited']} rate limited")
+        if rate_stats['base_latency']:
+            print(f"    Congestion: {rate_stats['congestion_state']}, latency {rate_stats['smoothed_latency']*1000:.0f}ms "
+                  f"(base {rate_stats['base_latency']*1000:.0f}ms), {rate_stats['latency_backoffs']} latency backoffs")
         print(f"    Browser pool: {pool_stats['total_pages_served']} pages, {pool_stats['total_recycles']} browser recycles")
+        print(f"    Concurrency: {tuner_stats['initial']} → {tuner_stats['limit']} browsers ({tuner_stats['state']}), "
+              f"saved {tuner.settled_limit()}")
+        print(f"    Wait time: {optimal_wait}ms → {wait_stats['wait_ms']}ms ({wait_stats['adjustments']} adjustments)")
 
         # Save Stage 3 metrics
         stage_duration = time.time() - product_stage_start
@@ -895,9 +966,17 @@ class StreamingOrchestrator:
                 "Products Successful": self.products_successful,
                 "Retries": self.products_retried,
                 "Rate Limited": rate_stats['total_rate_limited'],
+                "Starting Rate": f"{rate_limiter.initial_rate:.1f} req/s ({rate_source})",
                 "Final Rate": f"{rate_stats['rate']:.1f} req/s",
+                "Congestion State": rate_stats['congestion_state'],
+                "Latency Backoffs": rate_stats['latency_backoffs'],
+                "Page Latency": (f"{rate_stats['smoothed_latency']*1000:.0f}ms (base {rate_stats['base_latency']*1000:.0f}ms)"
+                                 if rate_stats['base_latency'] else "--"),
                 "Browser Pages Served": pool_stats['total_pages_served'],
                 "Browser Recycles": pool_stats['total_recycles'],
+                "Concurrency": f"{tuner_stats['initial']} → {tuner_stats['limit']} ({tuner_stats['state']}, {concurrency_source})",
+                "Wait Time": f"{optimal_wait}ms → {wait_stats['wait_ms']}ms ({wait_source})",
+                "Wait Adjustments": wait_stats['adjustments'],
                 "Avg Throughput": f"{avg_throughput:.2f}/s",
             },
             "operations": operations,
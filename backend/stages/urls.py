@@ -8,26 +8,35 @@ Attaches URLs to tree nodes with counts.
 import sys
 import io
 import time
+import queue
+import asyncio
+import threading
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from contextlib import redirect_stdout, redirect_stderr
+from typing import Dict, Iterator, List, Set, Tuple
+from contextlib import asynccontextmanager, redirect_stdout, redirect_stderr
 from datetime import datetime
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent))  # stages/
 sys.path.insert(0, str(Path(__file__).parent.parent / "scraper"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "prod_page_v2"))
 
 from stages.storage import load_navigation, save_urls, get_domain, ensure_domain_dir
 from llm_handler import LLMHandler
 from stages.metrics import update_stage_metrics, calculate_cost, set_current_stage, get_stage_metrics_from_tracker
 from brand import Brand
+from navigation.popup_playbook import PopupPlaybook, load_saved_playbook
+from lineage_memory import LineageMemory, load_saved_lineage_memory
 
 
 import re
 from urllib.parse import urlparse, parse_qs
 
 
+# How often the stage 2 pool is resized to the governor's current share (s)
+POOL_RESIZE_INTERVAL_S = 2.0
+
+
 def _is_all_category(name: str) -> bool:
     """Check if category name is an 'all' type (View All, Shop All, etc.)."""
     # Match standalone word "all" (case insensitive)
@@ -94,100 +103,254 @@ def extract_urls_from_category(category_url: str, category_name: str, brand_inst
     """
     from url_extractor import extract_urls_from_category as extract_category
 
-    # Use quiet=True to suppress console output during parallel extraction
-    # Generate a simple log entry instead
-    log_lines = []
-    log_lines.append(f"Category: {category_name}")
-    log_lines.append(f"URL: {category_url}")
-    log_lines.append("=" * 60)
-
     try:
+        # Use quiet=True to suppress console output during parallel extraction
         result = extract_category(category_url, brand_instance=brand_instance, quiet=True)
-        urls = [p.url for p in result.product_urls]
-        extraction_time = result.extraction_time
-        llm_usage = getattr(result, 'llm_usage', {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+    except Exception as e:
+        return _category_error(category_url, category_name, e)
+    return _category_result(category_url, category_name, result)
 
-        log_lines.append(f"Products found: {len(urls)}")
-        log_lines.append(f"Extraction time: {result.extraction_time:.2f}s")
 
-        # Scroll/extraction stats
-        discovery = getattr(result, 'discovery_info', {})
-        if discovery:
-            log_lines.append("")
-            log_lines.append("=" * 40)
-            log_lines.append("SCROLL STATS")
-            log_lines.append("=" * 40)
-            log_lines.append(f"Initial links: {discovery.get('initial_load_count', 0)}")
-            log_lines.append(f"After scrolling: {discovery.get('after_scroll_count', 0)}")
-            log_lines.append(f"After load more: {discovery.get('after_load_more_count', 0)}")
-            pagination = discovery.get('pagination_detected')
-            if pagination:
-                log_lines.append(f"Pagination element: {pagination.get('pagination_selector', 'none')}")
-                if pagination.get('pagination_found'):
-                    log_lines.append(f"Multi-page: {pagination.get('total_pages', 1)} pages detected")
-
-        if result.llm_filtering_stats:
-            stats = result.llm_filtering_stats
-            log_lines.append("")
-            log_lines.append("=" * 40)
-            log_lines.append("CLASSIFICATION STATS")
-            log_lines.append("=" * 40)
-            log_lines.append(f"Total links found on page: {stats.get('total_links_found', 0)}")
-            log_lines.append(f"Product links approved: {stats.get('product_links_approved', 0)}")
-            log_lines.append(f"Links rejected: {stats.get('links_rejected', 0)}")
-            log_lines.append(f"Pre-approved (from memory): {stats.get('pre_approved_count', 0)}")
-            log_lines.append(f"Newly classified by LLM: {stats.get('newly_classified_count', 0)}")
-
-            # Show approved lineages (DOM patterns that are products)
-            approved_lineages = stats.get('lineages_approved', [])
-            if approved_lineages:
-                log_lines.append("")
-                log_lines.append(f"APPROVED LINEAGES ({len(approved_lineages)}):")
-                for lineage in approved_lineages:
-                    log_lines.append(f"  ✓ {lineage}")
-
-            # Show rejected lineages with their URLs
-            rejected_by_lineage = stats.get('rejected_by_lineage', {})
-            if rejected_by_lineage:
-                log_lines.append("")
-                log_lines.append(f"REJECTED LINEAGES ({len(rejected_by_lineage)}):")
-                for lineage, rejected_links in rejected_by_lineage.items():
-                    log_lines.append(f"")
-                    log_lines.append(f"  ✗ LINEAGE: {lineage}")
-                    log_lines.append(f"    URLs ({len(rejected_links)}):")
-                    for link in rejected_links:
-                        text = link.get('link_text', '')[:50]
-                        text_display = f' "{text}"' if text else ''
-                        log_lines.append(f"      - {link.get('url', '')}{text_display}")
-
-        if result.errors:
-            log_lines.append("")
-            log_lines.append(f"ERRORS: {result.errors}")
+async def extract_urls_from_category_async(category_url: str, category_name: str, acquire, brand_instance=None) -> Dict:
+    """Async extract_urls_from_category on pages from `acquire` (a BrowserPool.acquire).
+
+    Returns dict with: urls, logs, extraction_time, llm_usage.
+    """
+    from url_extractor_async import extract_urls_from_category_async as extract_category
+
+    try:
+        result = await extract_category(category_url, acquire, brand_instance=brand_instance, quiet=True)
+    except Exception as e:
+        return _category_error(category_url, category_name, e)
+    return _category_result(category_url, category_name, result)
 
+
+def _category_log_header(category_url: str, category_name: str) -> List[str]:
+    return [f"Category: {category_name}", f"URL: {category_url}", "=" * 60]
+
+
+def _category_result(category_url: str, category_name: str, result) -> Dict:
+    """Build the per-category dict (urls + a simple log) from a URLExtractionResult."""
+    log_lines = _category_log_header(category_url, category_name)
+
+    urls = [p.url for p in result.product_urls]
+    extraction_time = result.extraction_time
+    llm_usage = getattr(result, 'llm_usage', {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+
+    log_lines.append(f"Products found: {len(urls)}")
+    log_lines.append(f"Extraction time: {result.extraction_time:.2f}s")
+
+    # Scroll/extraction stats
+    discovery = getattr(result, 'discovery_info', {})
+    if discovery:
         log_lines.append("")
         log_lines.append("=" * 40)
-        log_lines.append("PRODUCT URLs")
+        log_lines.append("SCROLL STATS")
         log_lines.append("=" * 40)
-        for url in urls:
-            log_lines.append(f"  - {url}")
-
-        return {
-            "urls": urls,
-            "logs": "\n".join(log_lines),
-            "extraction_time": extraction_time,
-            "llm_usage": llm_usage
-        }
+        log_lines.append(f"Initial links: {discovery.get('initial_load_count', 0)}")
+        log_lines.append(f"After scrolling: {discovery.get('after_scroll_count', 0)}")
+        log_lines.append(f"After load more: {discovery.get('after_load_more_count', 0)}")
+        pagination = discovery.get('pagination_detected')
+        if pagination:
+            log_lines.append(f"Pagination element: {pagination.get('pagination_selector', 'none')}")
+            if pagination.get('pagination_found'):
+                log_lines.append(f"Multi-page: {pagination.get('total_pages', 1)} pages detected")
+
+    if result.llm_filtering_stats:
+        stats = result.llm_filtering_stats
+        log_lines.append("")
+        log_lines.append("=" * 40)
+        log_lines.append("CLASSIFICATION STATS")
+        log_lines.append("=" * 40)
+        log_lines.append(f"Total links found on page: {stats.get('total_links_found', 0)}")
+        log_lines.append(f"Product links approved: {stats.get('product_links_approved', 0)}")
+        log_lines.append(f"Links rejected: {stats.get('links_rejected', 0)}")
+        log_lines.append(f"Pre-approved (from memory): {stats.get('pre_approved_count', 0)}")
+        log_lines.append(f"Newly classified by LLM: {stats.get('newly_classified_count', 0)}")
+
+        # Show approved lineages (DOM patterns that are products)
+        approved_lineages = stats.get('lineages_approved', [])
+        if approved_lineages:
+            log_lines.append("")
+            log_lines.append(f"APPROVED LINEAGES ({len(approved_lineages)}):")
+            for lineage in approved_lineages:
+                log_lines.append(f"  ✓ {lineage}")
+
+        # Show rejected lineages with their URLs
+        rejected_by_lineage = stats.get('rejected_by_lineage', {})
+        if rejected_by_lineage:
+            log_lines.append("")
+            log_lines.append(f"REJECTED LINEAGES ({len(rejected_by_lineage)}):")
+            for lineage, rejected_links in rejected_by_lineage.items():
+                log_lines.append(f"")
+                log_lines.append(f"  ✗ LINEAGE: {lineage}")
+                log_lines.append(f"    URLs ({len(rejected_links)}):")
+                for link in rejected_links:
+                    text = link.get('link_text', '')[:50]
+                    text_display = f' "{text}"' if text else ''
+                    log_lines.append(f"      - {link.get('url', '')}{text_display}")
+
+    if result.errors:
+        log_lines.append("")
+        log_lines.append(f"ERRORS: {result.errors}")
+
+    log_lines.append("")
+    log_lines.append("=" * 40)
+    log_lines.append("PRODUCT URLs")
+    log_lines.append("=" * 40)
+    for url in urls:
+        log_lines.append(f"  - {url}")
+
+    return {
+        "urls": urls,
+        "logs": "\n".join(log_lines),
+        "extraction_time": extraction_time,
+        "llm_usage": llm_usage
+    }
+
+
+def _category_error(category_url: str, category_name: str, error: Exception) -> Dict:
+    """Per-category dict for an extraction that raised."""
+    import traceback
+    log_lines = _category_log_header(category_url, category_name)
+    log_lines.append(f"ERROR: {error}")
+    log_lines.append(traceback.format_exc())
+    return {
+        "urls": [],
+        "logs": "\n".join(log_lines),
+        "extraction_time": 0.0,
+        "llm_usage": {"calls": 0, "input_tokens": 0, "output_tokens": 0},
+        "error": str(error)
+    }
+
+
+def attach_popup_playbook(brand_instance, domain: str):
+    """Give the shared Brand this domain's popup playbook (installed on every pooled context)."""
+    brand_instance.popup_playbook = load_saved_playbook(domain) or PopupPlaybook()
+    playbook = brand_instance.popup_playbook
+    if not playbook.empty:
+        print(f"Popup playbook: {len(playbook.rules)} hide rules, {len(playbook.cookies)} cookies")
+
+
+def save_popup_playbook(brand_instance, domain: str):
+    """Save popups learned during extraction (dismissals + load-more modal bypasses)."""
+    playbook = brand_instance.popup_playbook
+    if playbook is None:
+        return
+    playbook.add_modal_bypasses(brand_instance.load_more_modal_bypasses or {})
+    if playbook.changed:
+        try:
+            playbook.save(domain)
+        except Exception as e:
+            print(f"Could not save popup playbook: {e}")
+
+
+def attach_lineage_memory(brand_instance, domain: str):
+    """Give the shared Brand the link lineage decisions of previous runs - known lineages skip the LLM."""
+    brand_instance.lineage_memory = load_saved_lineage_memory(domain) or LineageMemory()
+    loaded = brand_instance.lineage_memory.apply(brand_instance)
+    if loaded:
+        print(f"Lineage memory: {loaded} lineages from previous runs")
+
+
+def save_lineage_memory(brand_instance, domain: str):
+    """Save this run's lineage decisions for the next run."""
+    memory = brand_instance.lineage_memory
+    if memory is None:
+        return
+    try:
+        memory.save(domain, brand_instance)
     except Exception as e:
-        import traceback
-        log_lines.append(f"ERROR: {e}")
-        log_lines.append(traceback.format_exc())
-        return {
-            "urls": [],
-            "logs": "\n".join(log_lines),
-            "extraction_time": 0.0,
-            "llm_usage": {"calls": 0, "input_tokens": 0, "output_tokens": 0},
-            "error": str(e)
-        }
+        print(f"Could not save lineage memory: {e}")
+
+
+def extract_categories_pooled(categories: List[Dict], brand_instance=None, workers: int = 4, governor=None) -> Iterator[Tuple[Dict, Dict]]:
+    """Extract categories as coroutines on one shared browser pool.
+
+    Browsers are launched once for the whole stage instead of once per
+    category page. Runs its own event loop in a background thread and
+    yields (category, result) as each category completes, like as_completed.
+
+    With a governor, the pool is sized to stage 2's current share and
+    resized as the share changes, so browsers beyond it are closed rather
+    than left idle.
+
+    Args:
+        categories: Dicts with "url" and "name"
+        brand_instance: Shared Brand (lineage / load-more / pagination caches)
+        workers: Largest pool size - pages loading at once
+        governor: Optional ResourceGovernor; each page also holds a url_slot
+    """
+    from browser_pool import BrowserPool
+    from url_extractor import SETTLE_JS
+
+    done = object()
+    results: "queue.Queue" = queue.Queue()
+
+    max_size = max(1, min(workers, len(categories)))
+
+    def share() -> int:
+        return max(1, min(max_size, governor.url_share())) if governor else max_size
+
+    async def run_all():
+        pool = BrowserPool(
+            size=share(), init_scripts=[SETTLE_JS],
+            playbook=brand_instance.popup_playbook if brand_instance else None,
+        )
+        loading = asyncio.Semaphore(max_size)
+
+        async def follow_governor():
+            while True:
+                await asyncio.sleep(POOL_RESIZE_INTERVAL_S)
+                size = await asyncio.to_thread(share)
+                if size != pool.size:
+                    print(f"[URLs] Governor share changed: browser pool {pool.size} → {size}")
+                    await pool.resize(size)
+
+        @asynccontextmanager
+        async def acquire():
+            # Bounded first so at most pool.size threads wait on the governor
+            async with loading:
+                if governor:
+                    await asyncio.to_thread(governor.acquire_url_slot)
+                try:
+                    async with pool.acquire() as page:
+                        yield page
+                finally:
+                    if governor:
+                        governor.release_url_slot()
+
+        async def one(category: Dict):
+            result = await extract_urls_from_category_async(category["url"], category["name"], acquire, brand_instance)
+            results.put((category, result))
+
+        await pool.start()
+        resizer = asyncio.create_task(follow_governor()) if governor else None
+        try:
+            await asyncio.gather(*(one(c) for c in categories))
+        finally:
+            if resizer:
+                resizer.cancel()
+            await pool.shutdown()
+
+    def run():
+        try:
+            asyncio.run(run_all())
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    while True:
+        item = results.get()
+        if item is done:
+            break
+        if isinstance(item, Exception):
+            raise item
+        yield item
+    thread.join()
 
 
 def attach_urls_to_tree(tree: list, url_map: Dict[str, List[str]]) -> list:
@@ -382,7 +545,7 @@ def extract_urls(domain: str, max_workers: int = 4) -> dict:
 
     Args:
         domain: Domain name (e.g., "eckhauslatta_com" or "eckhauslatta.com")
-        max_workers: Parallel workers for extraction
+        max_workers: Browsers in the shared stage 2 pool
 
     Returns:
         URLs tree dict
@@ -419,6 +582,8 @@ def extract_urls(domain: str, max_workers: int = 4) -> dict:
     # Create Brand instance for shared state (load more detection, lineage caching)
     brand_instance = Brand(url=f"https://{domain}/")
     print(f"Brand instance created for: {domain}")
+    attach_popup_playbook(brand_instance, clean_domain)
+    attach_lineage_memory(brand_instance, clean_domain)
     leaves, skipped_count, skipped_names = get_leaf_categories_with_stats(tree)
 
     unique_category_urls = len(set(leaf["url"] for leaf in leaves))
@@ -451,78 +616,70 @@ def extract_urls(domain: str, max_workers: int = 4) -> dict:
     category_metrics: List[Dict] = []  # Collect per-category metrics
     dedup_stats = {"total_raw": 0, "total_deduped": 0, "total_removed": 0}  # Track dedup
 
-    # Track which category URLs we've already submitted (avoid extracting same URL twice)
-    submitted_urls: Dict[str, any] = {}  # url -> future
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_leaf = {}
-        for leaf in leaves:
-            if leaf["url"] in submitted_urls:
-                # Reuse the existing future for this URL
-                future_to_leaf[submitted_urls[leaf["url"]]].append(leaf)
-            else:
-                # Submit new extraction task
-                future = executor.submit(extract_urls_from_category, leaf["url"], leaf["name"], brand_instance)
-                future_to_leaf[future] = [leaf]  # List to handle multiple leaves with same URL
-                submitted_urls[leaf["url"]] = future
-
-        completed = 0
-        for future in as_completed(future_to_leaf):
-            leaves_for_future = future_to_leaf[future]
-            completed += len(leaves_for_future)
-
-            # Show progress counter (same line)
-            print(f"\r  Extracting... {completed}/{len(leaves)}", end="", flush=True)
-
-            try:
-                result_data = future.result()
-                raw_urls = result_data["urls"]
-                logs = result_data["logs"]
-                extraction_time = result_data.get("extraction_time", 0.0)
-                llm_usage = result_data.get("llm_usage", {})
-
-                # Track raw URLs for full_urls.txt
-                all_raw_urls.extend(raw_urls)
-
-                # Dedupe URLs by path (removes color variants, etc.)
-                urls, raw_count, removed_count = dedupe_urls_by_path(raw_urls)
-                dedup_stats["total_raw"] += raw_count
-                dedup_stats["total_deduped"] += len(urls)
-                dedup_stats["total_removed"] += removed_count
-
-                # Apply results to all leaves that share this URL
-                for leaf in leaves_for_future:
-                    url_map[leaf["url"]] = urls
-                    all_urls.update(urls)
-                    dedup_note = f" (deduped from {raw_count})" if removed_count > 0 else ""
-                    results.append({"name": leaf["name"], "count": len(urls), "raw_count": raw_count, "error": None})
-                    category_logs[leaf["name"]] = logs
-
-                # Track metrics only once per actual extraction
-                category_metrics.append({
-                    "name": leaves_for_future[0]["name"],
-                    "duration": extraction_time,
-                    "products": len(urls),
-                    "llm_calls": llm_usage.get("calls", 0),
-                    "llm_cost": calculate_cost(
-                        llm_usage.get("input_tokens", 0),
-                        llm_usage.get("output_tokens", 0)
-                    )
-                })
-            except Exception as e:
-                for leaf in leaves_for_future:
-                    url_map[leaf["url"]] = []
-                    results.append({"name": leaf["name"], "count": 0, "error": str(e)})
-                    category_logs[leaf["name"]] = f"Error: {e}"
-                category_metrics.append({
-                    "name": leaves_for_future[0]["name"],
-                    "duration": 0.0,
-                    "products": 0,
-                    "llm_calls": 0,
-                    "llm_cost": 0.0
-                })
+    # Group leaves sharing a category URL (extract each URL once)
+    leaves_by_url: Dict[str, List[Dict]] = {}
+    for leaf in leaves:
+        leaves_by_url.setdefault(leaf["url"], []).append(leaf)
+    categories = [same_url[0] for same_url in leaves_by_url.values()]
+
+    completed = 0
+    for category, result_data in extract_categories_pooled(categories, brand_instance, workers=max_workers):
+        leaves_for_url = leaves_by_url[category["url"]]
+        completed += len(leaves_for_url)
+
+        # Show progress counter (same line)
+        print(f"\r  Extracting... {completed}/{len(leaves)}", end="", flush=True)
+
+        try:
+            raw_urls = result_data["urls"]
+            logs = result_data["logs"]
+            extraction_time = result_data.get("extraction_time", 0.0)
+            llm_usage = result_data.get("llm_usage", {})
+
+            # Track raw URLs for full_urls.txt
+            all_raw_urls.extend(raw_urls)
+
+            # Dedupe URLs by path (removes color variants, etc.)
+            urls, raw_count, removed_count = dedupe_urls_by_path(raw_urls)
+            dedup_stats["total_raw"] += raw_count
+            dedup_stats["total_deduped"] += len(urls)
+            dedup_stats["total_removed"] += removed_count
+
+            # Apply results to all leaves that share this URL
+            for leaf in leaves_for_url:
+                url_map[leaf["url"]] = urls
+                all_urls.update(urls)
+                dedup_note = f" (deduped from {raw_count})" if removed_count > 0 else ""
+                results.append({"name": leaf["name"], "count": len(urls), "raw_count": raw_count, "error": None})
+                category_logs[leaf["name"]] = logs
+
+            # Track metrics only once per actual extraction
+            category_metrics.append({
+                "name": leaves_for_url[0]["name"],
+                "duration": extraction_time,
+                "products": len(urls),
+                "llm_calls": llm_usage.get("calls", 0),
+                "llm_cost": calculate_cost(
+                    llm_usage.get("input_tokens", 0),
+                    llm_usage.get("output_tokens", 0)
+                )
+            })
+        except Exception as e:
+            for leaf in leaves_for_url:
+                url_map[leaf["url"]] = []
+                results.append({"name": leaf["name"], "count": 0, "error": str(e)})
+                category_logs[leaf["name"]] = f"Error: {e}"
+            category_metrics.append({
+                "name": leaves_for_url[0]["name"],
+                "duration": 0.0,
+                "products": 0,
+                "llm_calls": 0,
+                "llm_cost": 0.0
+            })
 
     print()  # Newline after progress
+    save_popup_playbook(brand_instance, clean_domain)
+    save_lineage_memory(brand_instance, clean_domain)
 
     # Capture stage timing and LLM usage
     stage_duration = time.time() - stage_start_time
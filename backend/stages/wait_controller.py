@@ -0,0 +1,186 @@
+"""
+Wait Time Controller - Online recalibration of the per-page wait during Stage 3.
+
+THE PROBLEM:
+    calibrate_wait_time() tries 300/800/2000ms ONCE on a single URL and the
+    result is used for the whole run. Retries escalate 2x/4x, but the base
+    wait never comes back down, and a site that slows down mid-run keeps
+    producing "name only" pages at the base wait.
+
+THE SOLUTION:
+    Track first-attempt outcomes per wait bucket while the run is going:
+    - Name-only / no-name pages at a bucket → content wasn't ready → step UP
+    - A long clean streak at a bucket → try the next bucket DOWN
+    - A bucket that produced content failures recently is not retried
+      downward until its cooldown expires
+
+    Only wait-sensitive failures count. HTTP errors and rate limits say
+    nothing about the wait and are ignored.
+
+    The chosen wait is persisted per domain (brand_meta.json → products.wait_ms)
+    so the next run starts from it instead of recalibrating.
+
+USAGE:
+    controller = WaitTimeController(initial_wait=800)
+    wait = controller.wait_ms
+    result = await extract(..., wait_time=wait)
+    controller.record(wait, result.success, result.error, result.status_code)
+    ...
+    controller.save(domain)
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def _ts() -> str:
+    """Timestamp prefix for log messages."""
+    return datetime.now().strftime("%H:%M:%S")
+
+
+# Ladder of wait times the controller moves along (ms)
+WAIT_BUCKETS = [300, 500, 800, 1200, 2000, 3000, 5000]
+
+# Extraction errors that mean "page content wasn't ready yet"
+WAIT_SENSITIVE_ERRORS = (
+    "Name only, no price/images/description",
+    "No product name",
+)
+
+
+def load_saved_wait(domain: str) -> Optional[int]:
+    """Wait time learned on a previous run, or None."""
+    from stages.storage import load_brand_meta
+
+    meta = load_brand_meta(domain) or {}
+    wait = meta.get("products", {}).get("wait_ms")
+    return int(wait) if wait else None
+
+
+class WaitTimeController:
+    """
+    Moves the base page wait along WAIT_BUCKETS based on live outcomes.
+
+    Args:
+        initial_wait: Starting wait in ms (snapped to the nearest bucket)
+        window: Outcomes remembered per bucket
+        min_samples: Samples needed in the window before stepping up
+        failure_threshold: Wait-sensitive failure rate that triggers a step up
+        success_streak: Consecutive clean pages before trying a shorter wait
+        cooldown: Seconds before a bucket that failed is tried again
+        quiet: Suppress print output (for dashboard mode)
+    """
+
+    def __init__(
+        self,
+        initial_wait: int = 800,
+        window: int = 20,
+        min_samples: int = 6,
+        failure_threshold: float = 0.15,
+        success_streak: int = 25,
+        cooldown: float = 60.0,
+        quiet: bool = False,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.success_streak = success_streak
+        self.cooldown = cooldown
+        self.quiet = quiet
+
+        self._index = self._nearest_bucket(initial_wait)
+        self._outcomes: Dict[int, deque] = {w: deque(maxlen=window) for w in WAIT_BUCKETS}
+        self._streak = 0
+        self._failed_at: Dict[int, float] = {}  # bucket -> last time it was abandoned
+        self._adjustments: List[Dict] = []
+
+    def _log(self, msg: str):
+        if not self.quiet:
+            print(msg)
+
+    @staticmethod
+    def _nearest_bucket(wait_ms: int) -> int:
+        return min(range(len(WAIT_BUCKETS)), key=lambda i: abs(WAIT_BUCKETS[i] - wait_ms))
+
+    @property
+    def wait_ms(self) -> int:
+        """Current base wait in ms."""
+        return WAIT_BUCKETS[self._index]
+
+    @property
+    def stats(self) -> Dict:
+        """Per-bucket success rates and adjustment history."""
+        buckets = {}
+        for w, outcomes in self._outcomes.items():
+            if outcomes:
+                buckets[w] = {
+                    "samples": len(outcomes),
+                    "success_rate": sum(outcomes) / len(outcomes),
+                }
+        return {
+            "wait_ms": self.wait_ms,
+            "streak": self._streak,
+            "buckets": buckets,
+            "adjustments": len(self._adjustments),
+        }
+
+    def record(self, wait_ms: int, success: bool, error: Optional[str] = None, status_code: int = 0):
+        """
+        Record a first-attempt outcome at `wait_ms`.
+
+        Outcomes recorded at a wait other than the current bucket (requests
+        that started before the last adjustment) still update that bucket's
+        history but don't move the controller.
+        """
+        if not success and (status_code >= 400 or error not in WAIT_SENSITIVE_ERRORS):
+            return  # Not about the wait
+
+        bucket = WAIT_BUCKETS[self._nearest_bucket(wait_ms)]
+        self._outcomes[bucket].append(1 if success else 0)
+
+        if bucket != self.wait_ms:
+            return
+
+        if success:
+            self._streak += 1
+            if self._streak >= self.success_streak:
+                self._try_step_down()
+        else:
+            self._streak = 0
+            outcomes = self._outcomes[bucket]
+            failure_rate = 1 - sum(outcomes) / len(outcomes)
+            if len(outcomes) >= self.min_samples and failure_rate > self.failure_threshold:
+                self._step(+1, f"{failure_rate:.0%} name-only over {len(outcomes)} pages")
+
+    def _try_step_down(self):
+        if self._index == 0:
+            return
+        lower = WAIT_BUCKETS[self._index - 1]
+        failed_at = self._failed_at.get(lower)
+        if failed_at and time.time() - failed_at < self.cooldown:
+            return
+        self._step(-1, f"{self._streak} clean pages in a row")
+
+    def _step(self, direction: int, reason: str):
+        new_index = max(0, min(len(WAIT_BUCKETS) - 1, self._index + direction))
+        if new_index == self._index:
+            return
+
+        old = self.wait_ms
+        if direction > 0:
+            self._failed_at[old] = time.time()
+        self._index = new_index
+        self._streak = 0
+        # Start the new bucket from a clean window so stale samples don't bounce it
+        self._outcomes[self.wait_ms].clear()
+
+        self._adjustments.append({"time": time.time(), "old": old, "new": self.wait_ms, "reason": reason})
+        self._log(f"[{_ts()}] [WaitController] {old}ms → {self.wait_ms}ms ({reason})")
+
+    def save(self, domain: str):
+        """Persist the current wait for the next run of this domain."""
+        from stages.storage import update_brand_meta
+
+        update_brand_meta(domain, "products", {"wait_ms": self.wait_ms})